@@ -7,6 +7,7 @@ from .models import (
     Urlaubsanspruch,
     Zeiterfassung,
     SaldoKorrektur,
+    SaldoWoche,
     Standort,
 )
 
@@ -434,3 +435,37 @@ class SaldoKorrekturAdmin(admin.ModelAdmin):
         return "-"
     get_mitarbeiter.short_description = "Mitarbeiter"
     get_mitarbeiter.admin_order_field = "mitarbeiter__nachname"
+
+
+@admin.register(SaldoWoche)
+class SaldoWocheAdmin(admin.ModelAdmin):
+    """Nur lesend – wird per Signal bzw. 'manage.py saldo_neuaufbau' gepflegt."""
+
+    list_display = [
+        "get_mitarbeiter",
+        "jahr",
+        "kw",
+        "montag",
+        "ist_minuten",
+        "soll_minuten",
+        "korrektur_minuten",
+        "saldo_minuten",
+        "aktualisiert_am",
+    ]
+    list_filter = ["jahr"]
+    search_fields = [
+        "mitarbeiter__vorname",
+        "mitarbeiter__nachname",
+    ]
+    list_select_related = ["mitarbeiter"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_mitarbeiter(self, obj):
+        return obj.mitarbeiter.vollname
+    get_mitarbeiter.short_description = "Mitarbeiter"
+    get_mitarbeiter.admin_order_field = "mitarbeiter__nachname"
@@ -1,7 +1,24 @@
 """
 Context Processors fuer die arbeitszeit-App.
 Stellt globale Template-Variablen fuer alle Views bereit.
+
+Die meisten Rollen- und Badge-Processors werden nicht mehr einzeln in
+settings.TEMPLATES registriert, sondern ueber nav_kontext() gebuendelt
+und pro User gecacht (siehe arbeitszeit/nav_kontext.py).
 """
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def nav_kontext(request):
+    """Stellt alle gebuendelten Navbar-Variablen aus dem NavKontext-Cache bereit.
+
+    Ersetzt die einzelnen Processors aus NavKontext.GEBUENDELTE_PROZESSOREN –
+    bei einem Cache-Treffer kostet der Seitenaufbau keine Zusatz-Abfragen.
+    """
+    from .nav_kontext import NavKontext
+    return NavKontext.fuer_request(request)
 
 
 def schichtplan_zugang(request):
@@ -165,6 +182,7 @@ def cmd_items(request):
     u = request.user
 
     from django.conf import settings
+    from .nav_kontext import NavKontext
 
     def url(name, *args):
         from django.urls import reverse, NoReverseMatch
@@ -173,27 +191,24 @@ def cmd_items(request):
         except NoReverseMatch:
             return "#"
 
-    # Berechtigungen ermitteln
-    hat_genehmiger = u.is_staff or u.is_superuser or getattr(u, "hat_genehmiger_rolle", False)
-    try:
-        hat_genehmiger = hat_genehmiger or request.hat_genehmiger_rolle
-    except AttributeError:
-        pass
-
-    ist_facility = getattr(request, "ist_facility_mitglied", False)
-    ist_vorg = getattr(request, "ist_vorgesetzter", False)
-    hat_schicht = getattr(request, "hat_schichtplan_zugang", False)
-    ist_fk = getattr(request, "ist_fuehrungskraft", False)
-    al_anzahl = getattr(request, "al_queue_anzahl", 0)
+    # Berechtigungen aus dem (gecachten) NavKontext ermitteln
+    nav = NavKontext.fuer_request(request)
+    hat_genehmiger = u.is_staff or u.is_superuser or nav.get("hat_genehmiger_rolle", False)
+
+    ist_facility = nav.get("ist_facility_mitglied", False)
+    ist_vorg = nav.get("ist_vorgesetzter", False)
+    hat_schicht = nav.get("hat_schichtplan_zugang", False)
+    ist_fk = nav.get("ist_fuehrungskraft", False)
+    al_anzahl = nav.get("al_queue_anzahl", 0)
     ist_facility_oder_staff = ist_facility or u.is_staff
-    ist_security = getattr(request, "ist_security_zugang", False)
-    ist_arbeitsschutz = getattr(request, "ist_arbeitsschutz", False)
+    ist_security = nav.get("ist_security_zugang", False)
+    ist_arbeitsschutz = nav.get("ist_arbeitsschutz", False)
     ist_eh_verantwortlicher = getattr(request, "ist_eh_verantwortlicher", False)
     ist_eh_ersthelfer = getattr(request, "ist_eh_ersthelfer", False)
-    ist_prozess = getattr(request, "ist_prozessverantwortlicher", False)
-    ist_pg = getattr(request, "ist_pg_mitglied", False)
-    ist_dms_admin = getattr(request, "ist_dms_admin", False)
-    stellenportal_verwalten = getattr(request, "stellenportal_kann_verwalten", False)
+    ist_prozess = nav.get("ist_prozessverantwortlicher", False)
+    ist_pg = nav.get("ist_pg_mitglied", False)
+    ist_dms_admin = nav.get("ist_dms_admin", False)
+    stellenportal_verwalten = nav.get("stellenportal_kann_verwalten", False)
     matrix_konfiguriert = getattr(request, "matrix_konfiguriert", False)
 
     items = [
@@ -271,11 +286,9 @@ def cmd_items(request):
         items.append({"l": "Eskalationen", "u": url("facility:al_queue"), "g": "Aufgaben"})
 
     # Meine Soll-Stunden
-    try:
-        ma_pk = u.mitarbeiter.pk
+    ma_pk = nav.get("nav_mitarbeiter_pk")
+    if ma_pk:
         items.append({"l": "Meine Soll-Stunden", "u": url("arbeitszeit:mitarbeiter_soll_uebersicht", ma_pk), "g": "Personal"})
-    except Exception:
-        pass
 
     # Vorgesetzten-Bereich
     if ist_vorg:
@@ -373,6 +386,7 @@ def dms_badge_kontext(request):
     if not request.user.is_authenticated:
         return {"dms_zugriffsantraege_anzahl": 0}
 
+    ist_dms_admin = False
     try:
         from dms.models import DokumentZugriffsschluessel, Dokument
         from django.db.models import Q
@@ -0,0 +1,165 @@
+"""
+FeiertagsService – prozessweit vorberechnete Feiertagskalender.
+
+workalendar berechnet bei jedem is_holiday()-Aufruf die Feiertagsregeln
+des Jahres neu (Ostern, bewegliche Feiertage, ...). Bei Monatsabschluessen
+fuer alle Mitarbeiter summiert sich das auf tausende Neuberechnungen.
+
+Der Service rechnet je (Bundesland, Jahr) einmal:
+  - frozenset der Feiertage
+  - deutsche Feiertagsnamen
+  - Werktage (Mo-Fr) und Arbeitstage (Mo-Fr ohne Feiertag) je Monat
+
+und haelt das Ergebnis in einem LRU-Cache. Schluessel ist das Bundesland,
+nicht der Standort – alle Standorte eines Bundeslands teilen sich einen
+Kalender. Feiertagsregeln aendern sich zur Laufzeit nicht, daher ist keine
+Invalidierung noetig (Tests: FeiertagsService.cache_leeren()).
+
+Die Methoden is_holiday/is_working_day/get_holiday_label entsprechen der
+workalendar-Schnittstelle – bestehender Code, der mit
+get_feiertagskalender() arbeitet, nutzt den Cache ohne Anpassung.
+"""
+import calendar
+import datetime
+from functools import lru_cache
+
+STANDARD_BUNDESLAND = "NW"
+
+
+class FeiertagsJahr:
+    """Vorberechnete Feiertage und Arbeitstage eines Bundeslands fuer ein Jahr."""
+
+    __slots__ = ("bundesland", "jahr", "feiertage", "labels", "namen",
+                 "werktage_monat", "arbeitstage_monat")
+
+    def __init__(self, bundesland, jahr, feiertage_liste):
+        from .models import FEIERTAG_DEUTSCH
+
+        self.bundesland = bundesland
+        self.jahr = jahr
+        self.labels = dict(feiertage_liste)
+        self.feiertage = frozenset(self.labels)
+        self.namen = {
+            datum: FEIERTAG_DEUTSCH.get(label, label)
+            for datum, label in self.labels.items()
+        }
+
+        werktage = []
+        arbeitstage = []
+        for monat in range(1, 13):
+            _, letzter_tag = calendar.monthrange(jahr, monat)
+            werk = 0
+            arbeit = 0
+            for tag in range(1, letzter_tag + 1):
+                datum = datetime.date(jahr, monat, tag)
+                if datum.weekday() < 5:
+                    werk += 1
+                    if datum not in self.feiertage:
+                        arbeit += 1
+            werktage.append(werk)
+            arbeitstage.append(arbeit)
+        # Index 0 = Januar
+        self.werktage_monat = tuple(werktage)
+        self.arbeitstage_monat = tuple(arbeitstage)
+
+    def werktags_feiertage(self, monat):
+        """Feiertage des Monats, die auf Mo-Fr fallen (sortiert)."""
+        return sorted(
+            d for d in self.feiertage if d.month == monat and d.weekday() < 5
+        )
+
+
+@lru_cache(maxsize=None)
+def _workalendar(bundesland):
+    from workalendar.europe import germany as ger
+
+    from .models import BUNDESLAND_WORKALENDAR
+
+    klassen_name = BUNDESLAND_WORKALENDAR.get(bundesland, "NorthRhineWestphalia")
+    return getattr(ger, klassen_name)()
+
+
+@lru_cache(maxsize=256)
+def _feiertagsjahr(bundesland, jahr):
+    return FeiertagsJahr(bundesland, jahr, _workalendar(bundesland).holidays(jahr))
+
+
+def _als_datum(datum):
+    if isinstance(datum, datetime.datetime):
+        return datum.date()
+    return datum
+
+
+class FeiertagsService:
+    """Feiertagskalender eines Bundeslands auf Basis der vorberechneten Jahre."""
+
+    def __init__(self, bundesland):
+        self.bundesland = bundesland
+
+    def __repr__(self):
+        return f"<FeiertagsService {self.bundesland}>"
+
+    @classmethod
+    def fuer_bundesland(cls, bundesland):
+        return _service(bundesland or STANDARD_BUNDESLAND)
+
+    @classmethod
+    def fuer_standort(cls, standort):
+        """Akzeptiert ein Standort-Objekt, None oder den alten kuerzel-String (→ NRW)."""
+        return cls.fuer_bundesland(getattr(standort, "bundesland", None))
+
+    @staticmethod
+    def cache_leeren():
+        _feiertagsjahr.cache_clear()
+
+    def jahr(self, jahr):
+        return _feiertagsjahr(self.bundesland, jahr)
+
+    def feiertage(self, jahr):
+        """frozenset aller Feiertage des Jahres."""
+        return self.jahr(jahr).feiertage
+
+    def arbeitstage(self, jahr, monat):
+        """Anzahl Arbeitstage (Mo-Fr ohne Feiertage) im Monat."""
+        return self.jahr(jahr).arbeitstage_monat[monat - 1]
+
+    def ist_feiertag(self, datum):
+        datum = _als_datum(datum)
+        return datum in self.jahr(datum.year).feiertage
+
+    def feiertag_name(self, datum):
+        """Deutscher Name des Feiertags oder None."""
+        datum = _als_datum(datum)
+        return self.jahr(datum.year).namen.get(datum)
+
+    def feiertage_im_zeitraum(self, start, ende):
+        """Feiertage zwischen start und ende (inklusive).
+
+        Returns: (set of date, dict date -> Bezeichnung)
+        """
+        feiertage_set = set()
+        feiertage_namen = {}
+        for jahr in range(start.year, ende.year + 1):
+            for datum, name in self.jahr(jahr).namen.items():
+                if start <= datum <= ende:
+                    feiertage_set.add(datum)
+                    feiertage_namen[datum] = name
+        return feiertage_set, feiertage_namen
+
+    # --- workalendar-kompatible Schnittstelle ---
+
+    def is_holiday(self, day):
+        return self.ist_feiertag(day)
+
+    def is_working_day(self, day):
+        day = _als_datum(day)
+        return day.weekday() < 5 and not self.ist_feiertag(day)
+
+    def get_holiday_label(self, day):
+        day = _als_datum(day)
+        return self.jahr(day.year).labels.get(day)
+
+
+@lru_cache(maxsize=None)
+def _service(bundesland):
+    return FeiertagsService(bundesland)
@@ -0,0 +1,111 @@
+"""
+Management-Command: saldo_neuaufbau
+
+Baut den Wochensaldo-Ledger (SaldoWoche) vollstaendig aus Zeiterfassung
+und SaldoKorrektur neu auf. Im Normalbetrieb pflegen Signale den Ledger
+inkrementell – der Neuaufbau ist fuer die Erstbefuellung nach der
+Migration und fuer Reparaturen (z.B. nach Massen-Updates per SQL).
+
+Je Mitarbeiter in einer Transaktion: alte Wochen loeschen, neu summieren
+(GROUP BY Woche in der Datenbank), per bulk_create schreiben.
+
+Aufruf:
+    python manage.py saldo_neuaufbau
+    python manage.py saldo_neuaufbau --mitarbeiter 12
+    python manage.py saldo_neuaufbau --jahr 2026
+"""
+import logging
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, ExtractYear, TruncWeek
+
+from arbeitszeit.models import Mitarbeiter, SaldoKorrektur, SaldoWoche, Zeiterfassung
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Baut den Wochensaldo-Ledger (SaldoWoche) aus den Zeiterfassungen neu auf."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mitarbeiter",
+            type=int,
+            help="Nur fuer bestimmten Mitarbeiter (ID)",
+        )
+        parser.add_argument(
+            "--jahr",
+            type=int,
+            help="Nur dieses Kalenderjahr neu aufbauen",
+        )
+
+    def handle(self, *args, **options):
+        mitarbeiter_qs = Mitarbeiter.objects.order_by("pk")
+        if options["mitarbeiter"]:
+            mitarbeiter_qs = mitarbeiter_qs.filter(pk=options["mitarbeiter"])
+
+        jahr = options["jahr"]
+        gesamt_wochen = 0
+        for mitarbeiter_id in mitarbeiter_qs.values_list("pk", flat=True):
+            gesamt_wochen += self._neuaufbau(mitarbeiter_id, jahr)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ledger neu aufgebaut: {gesamt_wochen} Wochen "
+            f"fuer {mitarbeiter_qs.count()} Mitarbeiter."
+        ))
+
+    @transaction.atomic
+    def _neuaufbau(self, mitarbeiter_id, jahr):
+        erfassungen = Zeiterfassung.objects.filter(
+            mitarbeiter_id=mitarbeiter_id,
+        ).exclude(art__in=Zeiterfassung.SALDO_NEUTRALE_ARTEN)
+        korrekturen = SaldoKorrektur.objects.filter(mitarbeiter_id=mitarbeiter_id)
+        alte = SaldoWoche.objects.filter(mitarbeiter_id=mitarbeiter_id)
+        if jahr:
+            erfassungen = erfassungen.filter(datum__year=jahr)
+            korrekturen = korrekturen.filter(datum__year=jahr)
+            alte = alte.filter(jahr=jahr)
+
+        wochen = {}
+
+        def _woche(zeile):
+            montag = zeile["montag"]
+            if not isinstance(montag, date):
+                montag = montag.date()
+            schluessel = (zeile["jahr"], montag)
+            if schluessel not in wochen:
+                wochen[schluessel] = SaldoWoche(
+                    mitarbeiter_id=mitarbeiter_id,
+                    jahr=zeile["jahr"],
+                    kw=montag.isocalendar()[1],
+                    montag=montag,
+                )
+            return wochen[schluessel]
+
+        for zeile in (
+            erfassungen
+            .annotate(jahr=ExtractYear("datum"), montag=TruncWeek("datum"))
+            .values("jahr", "montag")
+            .annotate(
+                ist=Coalesce(Sum("arbeitszeit_minuten"), 0),
+                soll=Coalesce(Sum("soll_minuten"), 0),
+            )
+        ):
+            woche = _woche(zeile)
+            woche.ist_minuten = zeile["ist"]
+            woche.soll_minuten = zeile["soll"]
+
+        for zeile in (
+            korrekturen
+            .annotate(jahr=ExtractYear("datum"), montag=TruncWeek("datum"))
+            .values("jahr", "montag")
+            .annotate(summe=Sum("minuten"))
+        ):
+            _woche(zeile).korrektur_minuten = zeile["summe"] or 0
+
+        alte.delete()
+        SaldoWoche.objects.bulk_create(wochen.values(), batch_size=500)
+        return len(wochen)
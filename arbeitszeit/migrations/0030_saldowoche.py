@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arbeitszeit', '0007_mitarbeiter_austritt_datum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoWoche',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aktualisiert_am', models.DateTimeField(auto_now=True)),
+                ('ist_minuten', models.IntegerField(default=0, verbose_name='Ist (Minuten)')),
+                ('jahr', models.IntegerField(verbose_name='Kalenderjahr')),
+                ('korrektur_minuten', models.IntegerField(default=0, help_text='Summe der SaldoKorrekturen mit Stichtag in dieser Woche', verbose_name='Korrekturen (Minuten)')),
+                ('kw', models.IntegerField(verbose_name='Kalenderwoche (ISO)')),
+                ('montag', models.DateField(verbose_name='Montag der Woche')),
+                ('soll_minuten', models.IntegerField(default=0, verbose_name='Soll (Minuten)')),
+                ('mitarbeiter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldo_wochen', to='arbeitszeit.mitarbeiter')),
+            ],
+            options={
+                'verbose_name': 'Wochensaldo',
+                'verbose_name_plural': 'Wochensalden',
+                'ordering': ['mitarbeiter', 'montag', 'jahr'],
+                'unique_together': {('mitarbeiter', 'jahr', 'montag')},
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.db import migrations
+
+# Stand bei Anlage des Ledgers – entspricht Zeiterfassung.SALDO_NEUTRALE_ARTEN
+SALDO_NEUTRALE_ARTEN = ("hybrid", "buero", "urlaub")
+
+
+def saldowoche_befuellen(apps, schema_editor):
+    """Erstbefuellung des Ledgers (spaeter: python manage.py saldo_neuaufbau)."""
+    Zeiterfassung = apps.get_model("arbeitszeit", "Zeiterfassung")
+    SaldoKorrektur = apps.get_model("arbeitszeit", "SaldoKorrektur")
+    SaldoWoche = apps.get_model("arbeitszeit", "SaldoWoche")
+
+    wochen = {}
+
+    def _woche(mitarbeiter_id, datum):
+        montag = datum - timedelta(days=datum.weekday())
+        schluessel = (mitarbeiter_id, datum.year, montag)
+        if schluessel not in wochen:
+            wochen[schluessel] = SaldoWoche(
+                mitarbeiter_id=mitarbeiter_id,
+                jahr=datum.year,
+                kw=montag.isocalendar()[1],
+                montag=montag,
+            )
+        return wochen[schluessel]
+
+    erfassungen = (
+        Zeiterfassung.objects.exclude(art__in=SALDO_NEUTRALE_ARTEN)
+        .values_list("mitarbeiter_id", "datum", "arbeitszeit_minuten", "soll_minuten")
+        .iterator()
+    )
+    for mitarbeiter_id, datum, ist, soll in erfassungen:
+        woche = _woche(mitarbeiter_id, datum)
+        woche.ist_minuten += ist or 0
+        woche.soll_minuten += soll or 0
+
+    for mitarbeiter_id, datum, minuten in SaldoKorrektur.objects.values_list(
+        "mitarbeiter_id", "datum", "minuten"
+    ).iterator():
+        _woche(mitarbeiter_id, datum).korrektur_minuten += minuten
+
+    SaldoWoche.objects.bulk_create(wochen.values(), batch_size=500)
+
+
+def saldowoche_leeren(apps, schema_editor):
+    apps.get_model("arbeitszeit", "SaldoWoche").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("arbeitszeit", "0030_saldowoche"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            saldowoche_befuellen,
+            reverse_code=saldowoche_leeren,
+        ),
+    ]
@@ -70,18 +70,14 @@ BUNDESLAND_CHOICES = [
 
 
 def get_feiertagskalender(standort):
-    """Gibt den workalendar-Kalender fuer den Standort zurueck.
+    """Gibt den (gecachten) Feiertagskalender fuer den Standort zurueck.
 
-    Akzeptiert ein Standort-Objekt (bevorzugt) oder den alten kuerzel-String.
+    Akzeptiert ein Standort-Objekt (bevorzugt) oder den alten kuerzel-String
+    (Fallback NRW). Siehe arbeitszeit/feiertage.py.
     """
-    from workalendar.europe.germany import NorthRhineWestphalia
+    from .feiertage import FeiertagsService
 
-    # Neues System: Standort-Objekt mit bundesland-Feld
-    if hasattr(standort, "get_feiertagskalender"):
-        return standort.get_feiertagskalender()
-
-    # Fallback fuer alten String-Aufruf
-    return NorthRhineWestphalia()
+    return FeiertagsService.fuer_standort(standort)
 
 
 class Standort(models.Model):
@@ -119,15 +115,16 @@ class Standort(models.Model):
         return f"{self.name} ({self.plz})"
 
     def get_feiertagskalender(self):
-        """Gibt den workalendar-Kalender fuer dieses Bundesland zurueck."""
-        from workalendar.europe import germany as ger
-        klassen_name = BUNDESLAND_WORKALENDAR.get(self.bundesland, "NorthRhineWestphalia")
-        klasse = getattr(ger, klassen_name)
-        return klasse()
+        """Gibt den Feiertagskalender fuer dieses Bundesland zurueck (gecacht)."""
+        from .feiertage import FeiertagsService
+
+        return FeiertagsService.fuer_bundesland(self.bundesland)
 
 
 def feiertag_name_deutsch(cal, datum):
     """Gibt den deutschen Namen des Feiertags zurueck."""
+    if hasattr(cal, "feiertag_name"):
+        return cal.feiertag_name(datum)
     name_en = cal.get_holiday_label(datum)
     return FEIERTAG_DEUTSCH.get(name_en, name_en)
 
@@ -247,31 +244,20 @@ class MonatlicheArbeitszeitSoll(models.Model):
         wochenstunden = vereinbarung.wochenstunden
 
         # 2. Berechne Arbeitstage und Feiertage (standortabhaengig)
-        cal = get_feiertagskalender(mitarbeiter.standort)
-        _, letzter_tag = calendar.monthrange(jahr, monat)
-        
-        arbeitstage_gesamt = 0
-        feiertage = []
-        
-        for tag in range(1, letzter_tag + 1):
-            datum = datetime.date(jahr, monat, tag)
-            wochentag = datum.weekday()
-            
-            # Nur Werktage (Mo-Fr) zählen
-            if wochentag < 5:
-                arbeitstage_gesamt += 1
-                
-                # Prüfe ob Feiertag
-                if cal.is_holiday(datum):
-                    feiertag_name = feiertag_name_deutsch(cal, datum)
-                    feiertage.append({
-                        'datum': datum.isoformat(),
-                        'name': feiertag_name,
-                        'wochentag': calendar.day_name[wochentag]
-                    })
-        
+        # Werktage und Feiertage kommen vorberechnet aus dem FeiertagsService
+        feiertags_jahr = get_feiertagskalender(mitarbeiter.standort).jahr(jahr)
+        arbeitstage_gesamt = feiertags_jahr.werktage_monat[monat - 1]
+        arbeitstage_effektiv = feiertags_jahr.arbeitstage_monat[monat - 1]
+
+        feiertage = [
+            {
+                'datum': datum.isoformat(),
+                'name': feiertags_jahr.namen[datum],
+                'wochentag': calendar.day_name[datum.weekday()]
+            }
+            for datum in feiertags_jahr.werktags_feiertage(monat)
+        ]
         feiertage_anzahl = len(feiertage)
-        arbeitstage_effektiv = arbeitstage_gesamt - feiertage_anzahl
         
         # 3. Berechne Soll-Stunden
         # Formel: (Wochenstunden / 5 Tage) × Effektive Arbeitstage
@@ -1220,6 +1206,8 @@ class Zeiterfassung(models.Model):
     art = models.CharField(
         max_length=20, choices=ART_CHOICES, default="homeoffice"
     )
+    # Arten ohne Ist/Soll-Differenz (zaehlen nicht zum Zeitsaldo)
+    SALDO_NEUTRALE_ARTEN = ("hybrid", "buero", "urlaub")
 
     # Manuelle Pause (ueberschreibt automatische, wenn hoeher)
     manuelle_pause = models.IntegerField(
@@ -1297,7 +1285,7 @@ class Zeiterfassung(models.Model):
 
         Bei Hybrid wird keine Differenz berechnet (None).
         """
-        if self.art in ("hybrid", "buero", "urlaub"):
+        if self.art in self.SALDO_NEUTRALE_ARTEN:
             return None
         ist = self.arbeitszeit_minuten or 0
         soll = self.soll_minuten or 0
@@ -1341,6 +1329,117 @@ class Zeiterfassung(models.Model):
             raise ValidationError("Ungültige Stundenzahl")
         
         
+class SaldoWoche(models.Model):
+    """Materialisiertes Zeitsaldo je Mitarbeiter und Kalenderwoche (Ledger).
+
+    Ein Eintrag je Mitarbeiter, Kalenderjahr und ISO-Woche. Wochen ueber den
+    Jahreswechsel werden geteilt (z.B. 30.12.-31.12. und 01.01.-05.01.),
+    damit Jahressalden wie bisher exakt am 1. Januar beginnen.
+
+    Gepflegt ueber Signale auf Zeiterfassung und SaldoKorrektur
+    (arbeitszeit/signals.py). Vollstaendiger Neuaufbau:
+        python manage.py saldo_neuaufbau
+    """
+
+    aktualisiert_am = models.DateTimeField(auto_now=True)
+    ist_minuten = models.IntegerField(default=0, verbose_name="Ist (Minuten)")
+    jahr = models.IntegerField(verbose_name="Kalenderjahr")
+    korrektur_minuten = models.IntegerField(
+        default=0,
+        verbose_name="Korrekturen (Minuten)",
+        help_text="Summe der SaldoKorrekturen mit Stichtag in dieser Woche",
+    )
+    kw = models.IntegerField(verbose_name="Kalenderwoche (ISO)")
+    mitarbeiter = models.ForeignKey(
+        Mitarbeiter,
+        on_delete=models.CASCADE,
+        related_name="saldo_wochen",
+    )
+    montag = models.DateField(verbose_name="Montag der Woche")
+    soll_minuten = models.IntegerField(default=0, verbose_name="Soll (Minuten)")
+
+    class Meta:
+        ordering = ["mitarbeiter", "montag", "jahr"]
+        unique_together = ["mitarbeiter", "jahr", "montag"]
+        verbose_name = "Wochensaldo"
+        verbose_name_plural = "Wochensalden"
+
+    def __str__(self):
+        return (
+            f"{self.mitarbeiter.vollname} - KW {self.kw}/{self.jahr}"
+            f" ({self.saldo_minuten:+d} min)"
+        )
+
+    @property
+    def saldo_minuten(self):
+        """Saldo der Woche: Ist - Soll + Korrekturen."""
+        return self.ist_minuten - self.soll_minuten + self.korrektur_minuten
+
+    @classmethod
+    def aktualisiere(cls, mitarbeiter_id, datum):
+        """Berechnet den Eintrag der Woche, in der datum liegt, neu.
+
+        Idempotent: summiert die Woche frisch aus Zeiterfassung und
+        SaldoKorrektur (nur Tage desselben Kalenderjahres).
+        """
+        from datetime import date, timedelta
+        from django.db.models import Count, Sum
+        from django.db.models.functions import Coalesce
+
+        montag = datum - timedelta(days=datum.weekday())
+        von = max(montag, date(datum.year, 1, 1))
+        bis = min(montag + timedelta(days=6), date(datum.year, 12, 31))
+
+        erfassungen = (
+            Zeiterfassung.objects.filter(
+                mitarbeiter_id=mitarbeiter_id,
+                datum__gte=von,
+                datum__lte=bis,
+            )
+            .exclude(art__in=Zeiterfassung.SALDO_NEUTRALE_ARTEN)
+            .aggregate(
+                anzahl=Count("id"),
+                ist=Coalesce(Sum("arbeitszeit_minuten"), 0),
+                soll=Coalesce(Sum("soll_minuten"), 0),
+            )
+        )
+        korrekturen = SaldoKorrektur.objects.filter(
+            mitarbeiter_id=mitarbeiter_id,
+            datum__gte=von,
+            datum__lte=bis,
+        ).aggregate(anzahl=Count("id"), summe=Coalesce(Sum("minuten"), 0))
+
+        if not erfassungen["anzahl"] and not korrekturen["anzahl"]:
+            cls.objects.filter(
+                mitarbeiter_id=mitarbeiter_id, jahr=datum.year, montag=montag,
+            ).delete()
+            return None
+
+        obj, _ = cls.objects.update_or_create(
+            mitarbeiter_id=mitarbeiter_id,
+            jahr=datum.year,
+            montag=montag,
+            defaults={
+                "kw": montag.isocalendar()[1],
+                "ist_minuten": erfassungen["ist"],
+                "soll_minuten": erfassungen["soll"],
+                "korrektur_minuten": korrekturen["summe"],
+            },
+        )
+        return obj
+
+    @classmethod
+    def saldo_vor(cls, mitarbeiter, jahr, montag):
+        """Kumuliertes Saldo im Kalenderjahr bis vor die Woche ab montag."""
+        from django.db.models import F, Sum
+
+        return cls.objects.filter(
+            mitarbeiter=mitarbeiter, jahr=jahr, montag__lt=montag,
+        ).aggregate(
+            total=Sum(F("ist_minuten") - F("soll_minuten") + F("korrektur_minuten"))
+        )["total"] or 0
+
+
 #####Soll Zeit Berechnung mit Feiertagen #####        
 @classmethod
 def berechne_und_speichere(cls, mitarbeiter, jahr, monat):
@@ -1363,29 +1462,19 @@ def berechne_und_speichere(cls, mitarbeiter, jahr, monat):
         )
     
     # 2. Berechne Arbeitstage und Feiertage (standortabhaengig)
-    cal = get_feiertagskalender(mitarbeiter.standort)
-    _, letzter_tag = calendar.monthrange(jahr, monat)
-    
-    arbeitstage_gesamt = 0
-    feiertage = []
-    
-    for tag in range(1, letzter_tag + 1):
-        datum = datetime.date(jahr, monat, tag)
-        wochentag = datum.weekday()
-        
-        if wochentag < 5:  # Mo-Fr
-            arbeitstage_gesamt += 1
-            
-            if cal.is_holiday(datum):
-                feiertag_name = feiertag_name_deutsch(cal, datum)
-                feiertage.append({
-                    'datum': datum.isoformat(),
-                    'name': feiertag_name,
-                    'wochentag': calendar.day_name[wochentag]
-                })
-    
+    feiertags_jahr = get_feiertagskalender(mitarbeiter.standort).jahr(jahr)
+    arbeitstage_gesamt = feiertags_jahr.werktage_monat[monat - 1]
+    arbeitstage_effektiv = feiertags_jahr.arbeitstage_monat[monat - 1]
+
+    feiertage = [
+        {
+            'datum': datum.isoformat(),
+            'name': feiertags_jahr.namen[datum],
+            'wochentag': calendar.day_name[datum.weekday()]
+        }
+        for datum in feiertags_jahr.werktags_feiertage(monat)
+    ]
     feiertage_anzahl = len(feiertage)
-    arbeitstage_effektiv = arbeitstage_gesamt - feiertage_anzahl
     
     # 3. Berechne Soll-Stunden
     tagesstunden = wochenstunden / Decimal('5')
@@ -0,0 +1,128 @@
+"""
+NavKontext – gebuendelte Navbar-Variablen pro User.
+
+Fasst die Rollen-Flags und Badge-Zaehler der einzelnen Context Processors
+(Schichtplan-Zugang, Arbeitsstapel, Team-Stapel, DMS, Facility, ...) zu
+einem Dict zusammen und legt es pro User im Cache 'nav_kontext' ab.
+
+Invalidierung (siehe arbeitszeit/signals.py): Aenderungen, die nur einen
+User betreffen (eigener User-Datensatz, Gruppen, Objekt-Rechte, Team-
+Mitgliedschaft), erneuern dessen User-Version; alle anderen die globale
+Version. Beide Versionen sind Teil des Cache-Keys – alte Eintraege werden
+nicht mehr gelesen und laufen ueber den Timeout aus. Der Timeout ist
+zugleich das Sicherheitsnetz fuer Aenderungen ohne Signal (z.B.
+QuerySet.update()).
+"""
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "nav_kontext"
+VERSION_KEY = "nav_kontext:version"
+
+# Context Processors, deren Ergebnis gebuendelt und gecacht wird.
+# Alarm-Banner (ersthelfe, sicherheit) bleiben bewusst live.
+GEBUENDELTE_PROZESSOREN = [
+    "arbeitszeit.context_processors.schichtplan_zugang",
+    "arbeitszeit.context_processors.genehmiger_rolle",
+    "arbeitszeit.context_processors.workflow_tasks_anzahl",
+    "arbeitszeit.context_processors.team_stapel_anzahl",
+    "arbeitszeit.context_processors.prozessverantwortlicher",
+    "arbeitszeit.context_processors.personalgewinnung_kontext",
+    "arbeitszeit.context_processors.dms_badge_kontext",
+    "facility.context_processors.facility_context",
+    "stellenportal.context_processors.stellenportal_context",
+    "veranstaltungen.context_processors.veranstaltungen_context",
+    "it_status.context_processors.it_status_ampel",
+]
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _timeout():
+    return getattr(settings, "NAV_KONTEXT_TIMEOUT", 120)
+
+
+class NavKontext:
+    """Berechnet und cacht die Navbar-Variablen eines Users."""
+
+    def __init__(self, request):
+        self.request = request
+        self.user = request.user
+
+    @classmethod
+    def fuer_request(cls, request):
+        """Liefert den NavKontext des Requests (pro Request nur einmal ermittelt)."""
+        daten = getattr(request, "_nav_kontext", None)
+        if daten is None:
+            daten = cls(request).laden()
+            request._nav_kontext = daten
+        return daten
+
+    @staticmethod
+    def invalidieren(user_id=None):
+        """Verwirft gecachte Bundles – die eines Users oder (ohne user_id) alle.
+
+        Die Version wird neu gesetzt statt hochgezaehlt: FileBasedCache.incr()
+        ist get + set und nicht atomar, zwei parallele Invalidierungen koennten
+        sonst dieselbe Version schreiben und eine davon ginge verloren.
+        """
+        key = VERSION_KEY if user_id is None else f"{VERSION_KEY}:{user_id}"
+        try:
+            _cache().set(key, uuid.uuid4().hex, None)
+        except Exception:
+            logger.exception("NavKontext-Invalidierung fehlgeschlagen")
+
+    def _cache_key(self):
+        user_key = f"{VERSION_KEY}:{self.user.pk}"
+        versionen = _cache().get_many([VERSION_KEY, user_key])
+        return (
+            f"nav_kontext:{versionen.get(VERSION_KEY, 0)}:"
+            f"{versionen.get(user_key, 0)}:{self.user.pk}"
+        )
+
+    def laden(self):
+        """Liest das Bundle aus dem Cache oder berechnet es neu."""
+        if not self.user.is_authenticated:
+            return self.berechnen()
+
+        try:
+            key = self._cache_key()
+            daten = _cache().get(key)
+        except Exception:
+            logger.exception("NavKontext-Cache nicht lesbar")
+            return self.berechnen()
+
+        if daten is None:
+            daten = self.berechnen()
+            try:
+                _cache().set(key, daten, _timeout())
+            except Exception:
+                logger.exception("NavKontext-Cache nicht schreibbar")
+        return daten
+
+    def berechnen(self):
+        """Fuehrt alle gebuendelten Context Processors in einem Durchlauf aus."""
+        daten = {}
+        for pfad in GEBUENDELTE_PROZESSOREN:
+            try:
+                daten.update(import_string(pfad)(self.request))
+            except Exception:
+                logger.exception("NavKontext: %s fehlgeschlagen", pfad)
+
+        # Fuer die Befehlspalette (cmd_items) – spart dort die Mitarbeiter-Abfrage
+        mitarbeiter_pk = None
+        if self.user.is_authenticated:
+            try:
+                mitarbeiter_pk = self.user.mitarbeiter.pk
+            except Exception:
+                pass
+        daten["nav_mitarbeiter_pk"] = mitarbeiter_pk
+        return daten
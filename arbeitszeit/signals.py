@@ -3,6 +3,8 @@
 Django Signals fuer automatische Berechnungen und Berechtigungssync.
 """
 
+from datetime import date
+
 from django.contrib.auth.signals import user_logged_in
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -65,3 +67,196 @@ def sync_genehmiger_permission(sender, instance, **kwargs):
     except Exception:
         # Signal-Fehler sollen den Speichervorgang nicht blockieren
         pass
+
+
+# ---------------------------------------------------------------------------
+# NavKontext-Invalidierung
+# ---------------------------------------------------------------------------
+# Jede Aenderung an einer dieser Tabellen kann Badges oder Rollen-Flags
+# in der Navbar veraendern – das gecachte Bundle wird dann verworfen.
+# Betrifft die Aenderung nur einen User, wird nur dessen Bundle verworfen.
+
+_NAV_KONTEXT_MODELLE = [
+    "workflow.WorkflowTask",
+    "formulare.TeamQueue",
+    "dms.Dokument",
+    "dms.DokumentZugriffsschluessel",
+    "auth.Group",
+    "auth.Permission",
+    "guardian.GroupObjectPermission",
+    "arbeitszeit.Mitarbeiter",
+    "hr.HRMitarbeiter",
+    "hr.Stelle",
+    "facility.FacilityTeam",
+    "facility.Stoermeldung",
+    "raumbuch.ZutrittsToken",
+    "stellenportal.Ausschreibung",
+    "stellenportal.Bewerbung",
+    "veranstaltungen.Feier",
+    "it_status.ITSystem",
+]
+
+# Modelle, deren Aenderung nur den Bundle eines Users betrifft: Label → User-ID
+_NAV_KONTEXT_USER_MODELLE = {
+    "auth.User": lambda instance: instance.pk,
+    "guardian.UserObjectPermission": lambda instance: instance.user_id,
+}
+
+# User-Felder, die in die Navbar eingehen (Rollen-Flags). Speichern mit
+# update_fields ohne eines davon – etwa last_login beim Login – invalidiert nicht.
+_NAV_KONTEXT_USER_FELDER = {"is_active", "is_staff", "is_superuser"}
+
+# M2M-Felder, deren Aenderung ebenfalls invalidiert (Team-/Gruppen-Mitgliedschaft)
+_NAV_KONTEXT_M2M = [
+    ("auth.Group", "permissions"),
+]
+
+# M2M-Felder zwischen User und Gruppe/Team – betreffen nur die beteiligten User
+_NAV_KONTEXT_USER_M2M = [
+    ("auth.User", "groups"),
+    ("auth.User", "user_permissions"),
+    ("formulare.TeamQueue", "mitglieder"),
+    ("facility.FacilityTeam", "mitglieder"),
+]
+
+
+def _nav_kontext_invalidieren(sender, **kwargs):
+    from .nav_kontext import NavKontext
+    NavKontext.invalidieren()
+
+
+def _nav_kontext_user_invalidieren(sender, instance, update_fields=None, **kwargs):
+    from django.contrib.auth.models import User
+
+    from .nav_kontext import NavKontext
+
+    if sender is User and update_fields and not _NAV_KONTEXT_USER_FELDER.intersection(update_fields):
+        return
+    user_id = _NAV_KONTEXT_USER_MODELLE[sender._meta.label](instance)
+    if user_id is not None:
+        NavKontext.invalidieren(user_id)
+
+
+def _nav_kontext_m2m_invalidieren(sender, instance, action, reverse, pk_set, **kwargs):
+    from django.contrib.auth.models import User
+
+    from .nav_kontext import NavKontext
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, User):
+        user_ids = [instance.pk]
+    elif action == "post_clear":
+        NavKontext.invalidieren()  # bisherige Mitglieder nicht mehr bekannt
+        return
+    else:
+        user_ids = pk_set or ()
+    for user_id in user_ids:
+        NavKontext.invalidieren(user_id)
+
+
+def _verbinde_nav_kontext_signale():
+    from django.apps import apps
+    from django.db.models.signals import m2m_changed, post_delete
+
+    for label in _NAV_KONTEXT_MODELLE:
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        uid = f"nav_kontext_{label}"
+        post_save.connect(_nav_kontext_invalidieren, sender=model, dispatch_uid=uid)
+        post_delete.connect(_nav_kontext_invalidieren, sender=model, dispatch_uid=uid)
+
+    for label in _NAV_KONTEXT_USER_MODELLE:
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        uid = f"nav_kontext_{label}"
+        post_save.connect(_nav_kontext_user_invalidieren, sender=model, dispatch_uid=uid)
+        post_delete.connect(_nav_kontext_user_invalidieren, sender=model, dispatch_uid=uid)
+
+    for m2m_felder, empfaenger in (
+        (_NAV_KONTEXT_M2M, _nav_kontext_invalidieren),
+        (_NAV_KONTEXT_USER_M2M, _nav_kontext_m2m_invalidieren),
+    ):
+        for label, feld in m2m_felder:
+            try:
+                through = getattr(apps.get_model(label), feld).through
+            except (LookupError, AttributeError):
+                continue
+            m2m_changed.connect(
+                empfaenger,
+                sender=through,
+                dispatch_uid=f"nav_kontext_{label}_{feld}",
+            )
+
+
+_verbinde_nav_kontext_signale()
+
+
+# ---------------------------------------------------------------------------
+# SaldoWoche-Ledger
+# ---------------------------------------------------------------------------
+# Jede gespeicherte/geloeschte Zeiterfassung oder SaldoKorrektur rechnet
+# die betroffene Woche neu. Wird das Datum (oder der Mitarbeiter) einer
+# Buchung geaendert, wird zusaetzlich die alte Woche nachgezogen.
+
+def _saldo_ursprung(instance):
+    datum = instance.datum
+    if isinstance(datum, str):
+        datum = date.fromisoformat(datum)
+    return instance.mitarbeiter_id, datum
+
+
+def _saldo_woche(ursprung):
+    mitarbeiter_id, datum = ursprung
+    return mitarbeiter_id, datum.year, datum.isocalendar()[:2]
+
+
+def _saldo_merke_ursprung(sender, instance, **kwargs):
+    # Nur bereits geladene Werte lesen – bei .only()/.defer() keine Nachlade-Query
+    instance._saldo_ursprung = None
+    if "datum" in instance.__dict__ and "mitarbeiter_id" in instance.__dict__:
+        try:
+            instance._saldo_ursprung = _saldo_ursprung(instance)
+        except (TypeError, ValueError):
+            pass
+
+
+def _saldo_nach_speichern(sender, instance, **kwargs):
+    from .models import SaldoWoche
+
+    neu = _saldo_ursprung(instance)
+    SaldoWoche.aktualisiere(*neu)
+
+    alt = getattr(instance, "_saldo_ursprung", None)
+    if alt and alt[0] and alt[1] and _saldo_woche(alt) != _saldo_woche(neu):
+        SaldoWoche.aktualisiere(*alt)
+    instance._saldo_ursprung = neu
+
+
+def _saldo_nach_loeschen(sender, instance, origin=None, **kwargs):
+    from .models import SaldoWoche
+
+    # Kaskade (Mitarbeiter/User geloescht): SaldoWoche faellt ohnehin mit weg
+    ursprung_model = getattr(origin, "model", None) or type(origin)
+    if origin is not None and ursprung_model is not sender:
+        return
+    SaldoWoche.aktualisiere(*_saldo_ursprung(instance))
+
+
+def _verbinde_saldo_signale():
+    from django.db.models.signals import post_delete, post_init
+
+    from .models import SaldoKorrektur, Zeiterfassung
+
+    for model in (Zeiterfassung, SaldoKorrektur):
+        uid = f"saldo_woche_{model.__name__}"
+        post_init.connect(_saldo_merke_ursprung, sender=model, dispatch_uid=uid)
+        post_save.connect(_saldo_nach_speichern, sender=model, dispatch_uid=uid)
+        post_delete.connect(_saldo_nach_loeschen, sender=model, dispatch_uid=uid)
+
+
+_verbinde_saldo_signale()
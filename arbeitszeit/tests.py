@@ -1,3 +1,208 @@
-from django.test import TestCase
+import calendar
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from workalendar.europe import Berlin, NorthRhineWestphalia
+
+from .feiertage import FeiertagsService
+from .models import Mitarbeiter, SaldoKorrektur, SaldoWoche, Zeiterfassung
+from .nav_kontext import NavKontext
+
+
+class SaldoWocheTest(TestCase):
+    """Ledger SaldoWoche gegen frisch aus den Buchungen berechnetes Saldo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("saldo")
+        cls.ma = Mitarbeiter.objects.create(
+            user=user, personalnummer="S1", vorname="S", nachname="M", abteilung="IT",
+        )
+
+    def _erfassen(self, datum, ende=time(16, 30), soll=480, art="homeoffice"):
+        return Zeiterfassung.objects.create(
+            mitarbeiter=self.ma, datum=datum, art=art,
+            arbeitsbeginn=time(8, 0), arbeitsende=ende, soll_minuten=soll,
+        )
+
+    def _ledger(self, jahr):
+        return sum(w.saldo_minuten for w in SaldoWoche.objects.filter(mitarbeiter=self.ma, jahr=jahr))
+
+    def _nachgerechnet(self, jahr):
+        erfassungen = sum(
+            z.differenz_minuten or 0
+            for z in Zeiterfassung.objects.filter(mitarbeiter=self.ma, datum__year=jahr)
+        )
+        korrekturen = sum(
+            k.minuten for k in SaldoKorrektur.objects.filter(mitarbeiter=self.ma, datum__year=jahr)
+        )
+        return erfassungen + korrekturen
+
+    def _wochen(self):
+        return list(
+            SaldoWoche.objects.filter(mitarbeiter=self.ma)
+            .order_by("jahr", "montag")
+            .values_list("jahr", "montag", "ist_minuten", "soll_minuten", "korrektur_minuten")
+        )
+
+    def test_ledger_folgt_buchungen(self):
+        montag = self._erfassen(date(2026, 10, 12))                 # +0
+        self._erfassen(date(2026, 10, 13), ende=time(18, 0))        # +75
+        self._erfassen(date(2026, 10, 14), art="buero")             # neutral
+        self._erfassen(date(2026, 10, 20), ende=time(12, 0))        # -240
+        korrektur = SaldoKorrektur.objects.create(mitarbeiter=self.ma, datum=date(2026, 10, 15), minuten=120)
+        self.assertEqual(self._ledger(2026), self._nachgerechnet(2026))
+        self.assertEqual(self._ledger(2026), 75 - 240 + 120)
+
+        # Verschieben in eine andere Woche zieht beide Wochen nach
+        montag.datum = date(2026, 11, 2)
+        montag.arbeitsende = time(17, 0)
+        montag.save()
+        korrektur.delete()
+        self.assertEqual(self._ledger(2026), self._nachgerechnet(2026))
+        self.assertEqual(
+            SaldoWoche.saldo_vor(self.ma, 2026, date(2026, 11, 2)), 75 - 240,
+        )
+
+    def test_leere_woche_wird_entfernt(self):
+        erfassung = self._erfassen(date(2026, 10, 12))
+        self.assertEqual(SaldoWoche.objects.filter(mitarbeiter=self.ma).count(), 1)
+        erfassung.delete()
+        self.assertFalse(SaldoWoche.objects.filter(mitarbeiter=self.ma).exists())
+
+    def test_woche_ueber_jahreswechsel_geteilt(self):
+        self._erfassen(date(2026, 12, 30), ende=time(17, 0))        # +30
+        self._erfassen(date(2027, 1, 1), ende=time(12, 0))          # -240
+        self.assertEqual(self._ledger(2026), 30)
+        self.assertEqual(self._ledger(2027), -240)
+        self.assertEqual(
+            [(jahr, montag) for jahr, montag, *_ in self._wochen()],
+            [(2026, date(2026, 12, 28)), (2027, date(2026, 12, 28))],
+        )
+
+    def test_neuaufbau_entspricht_signalen(self):
+        self._erfassen(date(2026, 10, 12), ende=time(17, 15))
+        self._erfassen(date(2026, 10, 21), ende=time(15, 0))
+        self._erfassen(date(2026, 12, 31))
+        self._erfassen(date(2027, 1, 2), ende=time(18, 0))
+        SaldoKorrektur.objects.create(mitarbeiter=self.ma, datum=date(2026, 1, 1), minuten=-90)
+        erwartet = self._wochen()
+
+        # Massen-Update ohne Signale: Ledger veraltet, Neuaufbau repariert ihn
+        Zeiterfassung.objects.filter(mitarbeiter=self.ma).update(soll_minuten=0)
+        SaldoWoche.objects.filter(mitarbeiter=self.ma).update(ist_minuten=0)
+        call_command("saldo_neuaufbau", mitarbeiter=self.ma.pk, stdout=StringIO())
+        self.assertEqual(self._ledger(2026), self._nachgerechnet(2026))
+        self.assertEqual(self._ledger(2027), self._nachgerechnet(2027))
+
+        Zeiterfassung.objects.filter(mitarbeiter=self.ma).update(soll_minuten=480)
+        call_command("saldo_neuaufbau", stdout=StringIO())
+        self.assertEqual(self._wochen(), erwartet)
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "nav_kontext": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "nav-kontext-test",
+    },
+})
+class NavKontextTest(TestCase):
+    """Gecachtes Navbar-Bundle: Invalidierung ueber Signale und Versionen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.anna = User.objects.create_user("anna")
+        cls.bert = User.objects.create_user("bert")
+        cls.zugang = Permission.objects.get(codename="schichtplan_zugang")
+
+    def _laden(self, user):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=user.pk)
+        return NavKontext(request).laden()
+
+    def _key(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return NavKontext(request)._cache_key()
+
+    def test_bundle_wird_gecacht(self):
+        self._laden(self.anna)
+        request = RequestFactory().get("/")
+        request.user = self.anna
+        with self.assertNumQueries(0):
+            self.assertFalse(NavKontext(request).laden()["hat_schichtplan_zugang"])
+
+    def test_rechtevergabe_sichtbar_nach_invalidierung(self):
+        self.assertFalse(self._laden(self.anna)["hat_schichtplan_zugang"])
+        self.anna.user_permissions.add(self.zugang)
+        self.assertTrue(self._laden(self.anna)["hat_schichtplan_zugang"])
+
+        gruppe = Group.objects.create(name="Planer")
+        self.assertFalse(self._laden(self.bert)["hat_schichtplan_zugang"])
+        gruppe.user_set.add(self.bert)
+        gruppe.permissions.add(self.zugang)
+        self.assertTrue(self._laden(self.bert)["hat_schichtplan_zugang"])
+
+    def test_user_invalidierung_betrifft_nur_diesen_user(self):
+        anna, bert = self._key(self.anna), self._key(self.bert)
+        NavKontext.invalidieren(self.anna.pk)
+        self.assertNotEqual(self._key(self.anna), anna)
+        self.assertEqual(self._key(self.bert), bert)
+
+        NavKontext.invalidieren()
+        self.assertNotEqual(self._key(self.bert), bert)
+
+    def test_login_invalidiert_nicht(self):
+        key = self._key(self.anna)
+        self.anna.save(update_fields=["last_login"])
+        self.assertEqual(self._key(self.anna), key)
+
+        self.anna.is_staff = True
+        self.anna.save(update_fields=["is_staff"])
+        self.assertNotEqual(self._key(self.anna), key)
+        self.assertTrue(self._laden(self.anna)["hat_genehmiger_rolle"])
+
+
+class FeiertagsServiceTest(SimpleTestCase):
+    """Vorberechnete Feiertagsjahre gegen die workalendar-Berechnung."""
+
+    def setUp(self):
+        FeiertagsService.cache_leeren()
+
+    def test_entspricht_workalendar(self):
+        for kuerzel, kalender in (("NW", NorthRhineWestphalia()), ("BE", Berlin())):
+            service = FeiertagsService.fuer_bundesland(kuerzel)
+            tag = date(2026, 1, 1)
+            while tag.year == 2026:
+                self.assertEqual(service.is_holiday(tag), kalender.is_holiday(tag), tag)
+                self.assertEqual(service.is_working_day(tag), kalender.is_working_day(tag), tag)
+                self.assertEqual(service.get_holiday_label(tag), kalender.get_holiday_label(tag), tag)
+                tag += timedelta(days=1)
+            for monat in range(1, 13):
+                arbeitstage = sum(
+                    1 for t in range(1, calendar.monthrange(2026, monat)[1] + 1)
+                    if kalender.is_working_day(date(2026, monat, t))
+                )
+                self.assertEqual(service.arbeitstage(2026, monat), arbeitstage, (kuerzel, monat))
+
+    def test_bundesland_und_standort(self):
+        fronleichnam = date(2026, 6, 4)
+        self.assertTrue(FeiertagsService.fuer_bundesland("NW").ist_feiertag(fronleichnam))
+        self.assertFalse(FeiertagsService.fuer_bundesland("BE").ist_feiertag(fronleichnam))
+        # Standort ohne Bundesland bzw. alter kuerzel-String: NRW
+        self.assertIs(FeiertagsService.fuer_standort("BN"), FeiertagsService.fuer_bundesland("NW"))
+        self.assertIs(FeiertagsService.fuer_standort(None), FeiertagsService.fuer_bundesland("NW"))
+
+    def test_namen_und_zeitraum(self):
+        service = FeiertagsService.fuer_bundesland("NW")
+        self.assertTrue(service.ist_feiertag(datetime(2026, 12, 25, 9, 30)))
+        self.assertIsNone(service.feiertag_name(date(2026, 12, 23)))
+        tage, namen = service.feiertage_im_zeitraum(date(2026, 12, 20), date(2027, 1, 6))
+        self.assertEqual(tage, {date(2026, 12, 25), date(2026, 12, 26), date(2027, 1, 1)})
+        self.assertEqual(set(namen), tage)
+        self.assertEqual(namen[date(2027, 1, 1)], service.feiertag_name(date(2027, 1, 1)))
 
-# Create your tests here.
@@ -33,6 +33,7 @@ from .models import (
     Wochenbericht,
     Monatsbericht,
     SaldoKorrektur,
+    SaldoWoche,
 )
 from .forms import RegisterForm
 
@@ -1042,20 +1043,19 @@ def _soll_minuten_aus_vereinbarung(mitarbeiter, datum):
     - Bei Wechselwochen: Durchschnitt ueber alle Wochen.
     - Bei regelmaessiger Vereinbarung: Wochenstunden / 5.
     """
-    from .models import get_feiertagskalender, Tagesarbeitszeit
+    return _soll_minuten_fuer_tage(mitarbeiter, [datum])[datum]
 
-    # Wochenende: kein Soll (Mo-Fr = 0-4)
-    if datum.weekday() >= 5:
-        return 0
 
-    # Feiertags-Check: kein Soll an Feiertagen
-    cal = get_feiertagskalender(mitarbeiter.standort)
-    if cal.is_holiday(datum):
-        return 0
+def _soll_minuten_fuer_tage(mitarbeiter, tage):
+    """Wie _soll_minuten_aus_vereinbarung(), fuer mehrere Tage auf einmal.
 
-    vereinbarung = mitarbeiter.get_aktuelle_vereinbarung(datum)
-    if not vereinbarung:
-        return None
+    Feiertagskalender, Vereinbarungen und Tagesarbeitszeiten werden nur
+    einmal geladen statt je Tag (Wochen-/Monatsansichten).
+
+    Returns:
+        dict {datum: soll_minuten oder None}
+    """
+    from .models import get_feiertagskalender
 
     # Wochentag-Mapping: Python weekday() -> Tagesarbeitszeit
     WOCHENTAG_MAP = {
@@ -1065,26 +1065,60 @@ def _soll_minuten_aus_vereinbarung(mitarbeiter, datum):
         3: "donnerstag",
         4: "freitag",
     }
-    wochentag_name = WOCHENTAG_MAP[datum.weekday()]
 
-    if vereinbarung.arbeitszeit_typ == "individuell":
-        # Tagesarbeitszeiten fuer diesen Wochentag holen
-        tage = Tagesarbeitszeit.objects.filter(
-            vereinbarung=vereinbarung,
-            wochentag=wochentag_name,
-        )
-        if tage.exists():
-            # Durchschnitt ueber alle Wochen (z.B. Woche 1 + 2)
-            gesamt = sum(t.zeit_in_minuten for t in tage)
-            return int(round(gesamt / tage.count()))
-        # Kein Eintrag fuer diesen Tag -> 0 Soll
-        return 0
+    ergebnis = {}
+    werktage = [d for d in tage if d.weekday() < 5]
+    for datum in tage:
+        # Wochenende: kein Soll (Mo-Fr = 0-4)
+        ergebnis[datum] = 0
+    if not werktage:
+        return ergebnis
 
-    # Regelmaessig: Wochenstunden / 5
-    if vereinbarung.wochenstunden:
-        tages_soll = float(vereinbarung.wochenstunden) / 5
-        return int(round(tages_soll * 60))
-    return None
+    cal = get_feiertagskalender(mitarbeiter.standort)
+
+    # Kettenmodell wie Mitarbeiter.get_aktuelle_vereinbarung():
+    # die letzte Version mit gueltig_ab <= Tag gewinnt
+    vereinbarungen = list(
+        mitarbeiter.arbeitszeitvereinbarungen.filter(
+            status__in=["aktiv", "genehmigt"],
+            gueltig_ab__lte=max(werktage),
+        ).order_by("-gueltig_ab", "-versionsnummer")
+        .prefetch_related("tagesarbeitszeiten")
+    )
+
+    for datum in werktage:
+        # Feiertags-Check: kein Soll an Feiertagen
+        if cal.is_holiday(datum):
+            continue
+
+        vereinbarung = next(
+            (v for v in vereinbarungen if v.gueltig_ab <= datum), None
+        )
+        if not vereinbarung:
+            ergebnis[datum] = None
+            continue
+
+        if vereinbarung.arbeitszeit_typ == "individuell":
+            # Tagesarbeitszeiten fuer diesen Wochentag
+            wochentag_name = WOCHENTAG_MAP[datum.weekday()]
+            tage_va = [
+                t for t in vereinbarung.tagesarbeitszeiten.all()
+                if t.wochentag == wochentag_name
+            ]
+            if tage_va:
+                # Durchschnitt ueber alle Wochen (z.B. Woche 1 + 2)
+                gesamt = sum(t.zeit_in_minuten for t in tage_va)
+                ergebnis[datum] = int(round(gesamt / len(tage_va)))
+            # Kein Eintrag fuer diesen Tag -> 0 Soll
+            continue
+
+        # Regelmaessig: Wochenstunden / 5
+        if vereinbarung.wochenstunden:
+            tages_soll = float(vereinbarung.wochenstunden) / 5
+            ergebnis[datum] = int(round(tages_soll * 60))
+        else:
+            ergebnis[datum] = None
+    return ergebnis
 
 
 def _erstelle_urlaub_eintraege(mitarbeiter, datum_von, datum_bis,
@@ -1454,6 +1488,11 @@ def zeiterfassung_uebersicht(request):
         # Z-AG Genehmigungsstatus fuer Farbkodierung
         zag_status_map = _baue_zag_status_map(mitarbeiter)
 
+        # Soll-Minuten fuer alle 7 Tage in einem Durchlauf
+        soll_je_tag = _soll_minuten_fuer_tage(
+            mitarbeiter, [montag + timedelta(days=i) for i in range(7)]
+        )
+
         wochen_tage = []
         gesamt_soll = 0
         for i in range(7):
@@ -1464,10 +1503,7 @@ def zeiterfassung_uebersicht(request):
                 feiertag_name_deutsch(cal, tag_datum)
                 if ist_feiertag else ""
             )
-            # Soll-Minuten fuer jeden Tag berechnen
-            soll = _soll_minuten_aus_vereinbarung(
-                mitarbeiter, tag_datum
-            )
+            soll = soll_je_tag[tag_datum]
             soll_fmt = ""
             if soll is not None and soll > 0:
                 soll_fmt = (
@@ -1502,30 +1538,9 @@ def zeiterfassung_uebersicht(request):
             if e.differenz_minuten is not None
         )
 
-        # Kumuliertes Jahressaldo bis Start/Ende dieser KW
-        jahresanfang = date(jahr, 1, 1)
-
-        # Differenz aller Vorwochen (Jahresanfang bis Sonntag davor)
-        erfassungen_vorher = (
-            mitarbeiter.zeiterfassungen.filter(
-                datum__gte=jahresanfang,
-                datum__lt=montag,
-            ).exclude(art="urlaub")
-        )
-        saldo_vorwochen = sum(
-            e.differenz_minuten for e in erfassungen_vorher
-            if e.differenz_minuten is not None
-        )
-
-        # Saldo-Korrekturen bis vor dieser Woche
-        korrektur_vor_kw = (
-            SaldoKorrektur.objects.filter(
-                mitarbeiter=mitarbeiter,
-                datum__gte=jahresanfang,
-                datum__lt=montag,
-            ).aggregate(total=Sum("minuten"))["total"]
-            or 0
-        )
+        # Kumuliertes Jahressaldo bis Start dieser KW
+        # (Differenzen + Korrekturen ab 1.1., aus dem Ledger SaldoWoche)
+        saldo_start_kw = SaldoWoche.saldo_vor(mitarbeiter, jahr, montag)
 
         # Saldo-Korrekturen innerhalb dieser Woche
         korrektur_in_kw = (
@@ -1537,7 +1552,6 @@ def zeiterfassung_uebersicht(request):
             or 0
         )
 
-        saldo_start_kw = saldo_vorwochen + korrektur_vor_kw
         saldo_ende_kw = (
             saldo_start_kw + gesamt_differenz + korrektur_in_kw
         )
@@ -1806,7 +1820,7 @@ def wochenbericht_pdf(request):
         return redirect("arbeitszeit:dashboard")
 
     from datetime import timedelta
-    from weasyprint import HTML
+    from utils.pdf_render import render_pdf
     from .models import get_feiertagskalender, feiertag_name_deutsch
 
     heute = timezone.now().date()
@@ -1829,6 +1843,9 @@ def wochenbericht_pdf(request):
     cal = get_feiertagskalender(mitarbeiter.standort)
 
     WOCHENTAGE = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+    soll_je_tag = _soll_minuten_fuer_tage(
+        mitarbeiter, [montag + timedelta(days=i) for i in range(7)]
+    )
     wochen_tage = []
     gesamt_soll = 0
     for i in range(7):
@@ -1839,9 +1856,7 @@ def wochenbericht_pdf(request):
             feiertag_name_deutsch(cal, tag_datum)
             if ist_feiertag else ""
         )
-        soll = _soll_minuten_aus_vereinbarung(
-            mitarbeiter, tag_datum
-        )
+        soll = soll_je_tag[tag_datum]
         soll_fmt = ""
         if soll is not None and soll > 0:
             soll_fmt = f"{soll // 60}:{soll % 60:02d}h"
@@ -1893,11 +1908,7 @@ def wochenbericht_pdf(request):
     html_string = render_to_string(
         "arbeitszeit/pdf_wochenbericht.html", context
     )
-    html = HTML(
-        string=html_string,
-        base_url=request.build_absolute_uri("/"),
-    )
-    pdf = html.write_pdf()
+    pdf = render_pdf(html_string, base_url=request.build_absolute_uri("/"), cache=False)
     filename_wb = (
         f"Wochenbericht_{mitarbeiter.nachname}_KW{kw}_{jahr}.pdf"
     )
@@ -1931,7 +1942,7 @@ def monatsbericht_pdf(request):
 
     import calendar as cal_mod
     import datetime as dt_mod
-    from weasyprint import HTML
+    from utils.pdf_render import render_pdf
     from .models import get_feiertagskalender, feiertag_name_deutsch
 
     heute = timezone.now().date()
@@ -1956,9 +1967,12 @@ def monatsbericht_pdf(request):
 
     # Soll pro erfasstem Tag berechnen
     erfassungen = list(erfassungen_qs)
+    soll_je_tag = _soll_minuten_fuer_tage(
+        mitarbeiter, [e.datum for e in erfassungen]
+    )
     gesamt_soll = 0
     for e in erfassungen:
-        soll = _soll_minuten_aus_vereinbarung(mitarbeiter, e.datum)
+        soll = soll_je_tag[e.datum]
         e.soll_minuten_pdf = soll
         e.soll_formatiert_pdf = (
             f"{soll // 60}:{soll % 60:02d}h" if soll else ""
@@ -2005,11 +2019,7 @@ def monatsbericht_pdf(request):
     html_string = render_to_string(
         "arbeitszeit/pdf_monatsbericht.html", context
     )
-    html = HTML(
-        string=html_string,
-        base_url=request.build_absolute_uri("/"),
-    )
-    pdf = html.write_pdf()
+    pdf = render_pdf(html_string, base_url=request.build_absolute_uri("/"), cache=False)
     pdf = _signiere_pdf_sicher(
         pdf, request.user,
         f"Monatsbericht_{mitarbeiter.nachname}_{monat:02d}_{jahr}.pdf"
@@ -2087,13 +2097,14 @@ def wochenbericht_csv(request):
     gesamt_ist = 0
     gesamt_soll = 0
     gesamt_differenz = 0
+    soll_je_tag = _soll_minuten_fuer_tage(
+        mitarbeiter, [montag + timedelta(days=i) for i in range(7)]
+    )
 
     for i in range(7):
         tag_datum = montag + timedelta(days=i)
         erfassung = erfassungen_dict.get(tag_datum)
-        soll = _soll_minuten_aus_vereinbarung(
-            mitarbeiter, tag_datum
-        )
+        soll = soll_je_tag[tag_datum]
 
         if erfassung:
             art = erfassung.get_art_display()
@@ -2181,9 +2192,12 @@ def monatsbericht_csv(request):
     ]
     WOCHENTAGE = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
 
-    erfassungen = mitarbeiter.zeiterfassungen.filter(
+    erfassungen = list(mitarbeiter.zeiterfassungen.filter(
         datum__year=jahr, datum__month=monat,
-    ).order_by("datum")
+    ).order_by("datum"))
+    soll_je_tag = _soll_minuten_fuer_tage(
+        mitarbeiter, [e.datum for e in erfassungen]
+    )
 
     # CSV-Response
     filename = (
@@ -2224,9 +2238,7 @@ def monatsbericht_csv(request):
         ist_min = erfassung.arbeitszeit_minuten or 0
         ist_str = _minuten_dezimal(ist_min)
 
-        soll = _soll_minuten_aus_vereinbarung(
-            mitarbeiter, erfassung.datum
-        )
+        soll = soll_je_tag[erfassung.datum]
         soll_min = soll if soll else 0
         soll_str = _minuten_dezimal(soll_min)
 
@@ -0,0 +1,19 @@
+"""
+Performance-Benchmarks fuer die heissen Pfade von PRIMA.
+
+Misst je Szenario Anzahl der SQL-Queries (CaptureQueriesContext) und
+Wall-Clock-Latenz und schreibt das Ergebnis als JSON – zwei Laeufe lassen
+sich damit direkt vergleichen (z.B. vor/nach einer Aenderung).
+
+Vorbereitung (einmalig, Entwicklungsdatenbank):
+    python manage.py erzeuge_lastdaten --mitarbeiter 500
+
+Aufruf:
+    python -m benchmarks                           # JSON nach stdout
+    python -m benchmarks --ausgabe vorher.json
+    python -m benchmarks --ausgabe nachher.json --vergleich vorher.json
+    python -m benchmarks --nur dokument_liste --wiederholungen 20
+
+Alle Szenarien laufen in einer Transaktion, die am Ende zurueckgerollt
+wird – der Datenbestand bleibt fuer den naechsten Lauf unveraendert.
+"""
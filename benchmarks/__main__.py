@@ -0,0 +1,113 @@
+"""Kommandozeile: python -m benchmarks (siehe benchmarks/__init__.py)."""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+
+import django
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _datenumfang():
+    from django.apps import apps
+
+    umfang = {}
+    for label in (
+        "hr.HRMitarbeiter", "hr.Stelle", "arbeitszeit.Zeiterfassung",
+        "dms.Dokument", "workflow.WorkflowInstance", "schichtplan.Schicht",
+    ):
+        umfang[label] = apps.get_model(label).objects.count()
+    return umfang
+
+
+@contextlib.contextmanager
+def _stdout_nach_stderr():
+    """Leitet stdout (auch auf Dateideskriptor-Ebene, z.B. Solver-Log) nach stderr um."""
+    sys.stdout.flush()
+    gesichert = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(gesichert, 1)
+        os.close(gesichert)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--wiederholungen", type=int, default=5,
+                        help="Laeufe je Szenario (Standard: 5)")
+    parser.add_argument("--nur", action="append", default=[],
+                        help="Nur dieses Szenario (mehrfach angebbar)")
+    parser.add_argument("--solver-timeout", type=int, default=30,
+                        help="Zeitlimit des Schichtplan-Solvers in Sekunden (Standard: 30)")
+    parser.add_argument("--ausgabe", help="JSON-Datei statt stdout")
+    parser.add_argument("--vergleich", help="Frueheres Ergebnis (JSON) zum Gegenueberstellen")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.db import connection, transaction
+    from django.test.utils import setup_test_environment
+    from django.utils import timezone
+
+    from .messung import messe, vergleiche
+    from .szenarien import SZENARIEN, BenchmarkKontext
+
+    # testserver in ALLOWED_HOSTS, E-Mails nur in den Speicher
+    setup_test_environment()
+
+    ergebnis = {
+        "zeitpunkt": timezone.now().isoformat(),
+        "git_commit": _git_commit(),
+        "datenbank": connection.vendor,
+        "wiederholungen": args.wiederholungen,
+        "solver_timeout": args.solver_timeout,
+        "datenumfang": _datenumfang(),
+        "szenarien": {},
+    }
+
+    # Ausgaben der Views/Generatoren nicht ins JSON mischen
+    with transaction.atomic(), _stdout_nach_stderr():
+        kontext = BenchmarkKontext(solver_timeout=args.solver_timeout)
+        for name, funktion, max_laeufe in SZENARIEN:
+            if args.nur and name not in args.nur:
+                continue
+            laeufe = min(args.wiederholungen, max_laeufe or args.wiederholungen)
+            try:
+                ergebnis["szenarien"][name] = messe(lambda: funktion(kontext), laeufe)
+            except Exception as exc:
+                ergebnis["szenarien"][name] = {"fehler": f"{type(exc).__name__}: {exc}"}
+            print(f"{name}: {ergebnis['szenarien'][name]}", file=sys.stderr)
+        # Datenbestand unveraendert lassen
+        transaction.set_rollback(True)
+
+    if args.vergleich:
+        with open(args.vergleich, encoding="utf-8") as datei:
+            ergebnis["vergleich"] = vergleiche(json.load(datei), ergebnis)
+
+    text = json.dumps(ergebnis, indent=2, ensure_ascii=False)
+    if args.ausgabe:
+        with open(args.ausgabe, "w", encoding="utf-8") as datei:
+            datei.write(text + "\n")
+    else:
+        print(text)
+    return 0 if all("fehler" not in s for s in ergebnis["szenarien"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
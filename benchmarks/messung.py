@@ -0,0 +1,65 @@
+"""Messung von Query-Anzahl und Latenz eines Aufrufs."""
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def messe(funktion, wiederholungen=5):
+    """Fuehrt funktion() wiederholt aus und misst Queries und Laufzeit.
+
+    Der erste Lauf wird getrennt ausgewiesen (kalte Caches: OrgGraph,
+    FeiertagsService, NavKontext, ...); min/median/max beziehen sich auf
+    die folgenden Laeufe (bei nur einem Lauf auf diesen).
+
+    Returns:
+        dict mit queries, queries_erster_lauf, latenz_ms (min/median/max/erster_lauf)
+    """
+    latenzen = []
+    queries = []
+    for _ in range(max(1, wiederholungen)):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            funktion()
+            latenzen.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    warm = latenzen[1:] or latenzen
+    return {
+        "laeufe": len(latenzen),
+        "queries": queries[-1],
+        "queries_erster_lauf": queries[0],
+        "latenz_ms": {
+            "min": round(min(warm), 2),
+            "median": round(statistics.median(warm), 2),
+            "max": round(max(warm), 2),
+            "erster_lauf": round(latenzen[0], 2),
+        },
+    }
+
+
+def vergleiche(vorher, nachher):
+    """Stellt zwei Benchmark-Ergebnisse (JSON-Dicts) gegenueber.
+
+    Returns:
+        dict Szenario -> Differenzen (Queries absolut, Median-Latenz in Prozent)
+    """
+    vergleich = {}
+    for name, neu in nachher.get("szenarien", {}).items():
+        alt = vorher.get("szenarien", {}).get(name)
+        if not alt or "fehler" in alt or "fehler" in neu:
+            continue
+        alt_median = alt["latenz_ms"]["median"]
+        neu_median = neu["latenz_ms"]["median"]
+        vergleich[name] = {
+            "queries_vorher": alt["queries"],
+            "queries_nachher": neu["queries"],
+            "queries_delta": neu["queries"] - alt["queries"],
+            "median_ms_vorher": alt_median,
+            "median_ms_nachher": neu_median,
+            "median_delta_prozent": (
+                round((neu_median - alt_median) / alt_median * 100, 1) if alt_median else None
+            ),
+        }
+    return vergleich
@@ -0,0 +1,125 @@
+"""Benchmark-Szenarien.
+
+Jedes Szenario ist eine Funktion, die einen einzelnen Aufruf des
+gemessenen Pfads ausfuehrt. Views laufen ueber den Django-Test-Client
+(inkl. Middleware, Context Processors und Template-Rendering).
+
+Neue Szenarien: Funktion schreiben und in SZENARIEN eintragen.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+
+class BenchmarkKontext:
+    """Benutzer, Clients und Eingabedaten fuer die Szenarien."""
+
+    def __init__(self, solver_timeout=30):
+        from arbeitszeit.models import Mitarbeiter
+        from schichtplan.models import Schichtplan
+        from workflow.models import WorkflowTask
+
+        # Mitarbeiter-Sicht: Stelle mit den meisten offenen Tasks (voller Arbeitsstapel)
+        stelle_id = (
+            WorkflowTask.objects.filter(status="offen", zugewiesen_an_stelle__isnull=False)
+            .values("zugewiesen_an_stelle")
+            .annotate(anzahl=Count("id"))
+            .order_by("-anzahl")
+            .values_list("zugewiesen_an_stelle", flat=True)
+            .first()
+        )
+        ma = None
+        if stelle_id:
+            ma = Mitarbeiter.objects.filter(
+                user__hr_mitarbeiter__stelle_id=stelle_id
+            ).select_related("user").first()
+        if ma is None:
+            ma = Mitarbeiter.objects.annotate(
+                anzahl=Count("zeiterfassungen")
+            ).order_by("-anzahl").select_related("user").first()
+        if ma is None:
+            raise RuntimeError(
+                "Keine Lastdaten gefunden – zuerst 'manage.py erzeuge_lastdaten' ausfuehren."
+            )
+        self.mitarbeiter = ma
+        self.client = Client()
+        self.client.force_login(ma.user)
+
+        # Staff-Sicht fuer die Organigramm-Endpunkte (nur in der Benchmark-Transaktion)
+        staff, _ = User.objects.get_or_create(
+            username="benchmark_staff", defaults={"is_staff": True}
+        )
+        self.staff_client = Client()
+        self.staff_client.force_login(staff)
+
+        self.schichtplan = (
+            Schichtplan.objects.filter(name__startswith="Lastdaten")
+            .order_by("-start_datum")
+            .first()
+        )
+        self.solver_timeout = solver_timeout
+
+
+def _get(client, url):
+    antwort = client.get(url)
+    if antwort.status_code != 200:
+        raise AssertionError(f"{url}: HTTP {antwort.status_code}")
+    return antwort
+
+
+def zeiterfassung_uebersicht(kontext):
+    _get(kontext.client, reverse("arbeitszeit:zeiterfassung_uebersicht") + "?ansicht=monat")
+
+
+def dokument_liste(kontext):
+    _get(kontext.client, reverse("dms:liste"))
+
+
+def arbeitsstapel(kontext):
+    _get(kontext.client, reverse("workflow:arbeitsstapel"))
+
+
+def stellen_organigramm(kontext):
+    _get(kontext.staff_client, reverse("hr:stellen_organigramm"))
+
+
+def orgchart_editor_data(kontext):
+    _get(kontext.staff_client, reverse("hr:orgchart_editor_data"))
+
+
+def tree_editor_data(kontext):
+    _get(kontext.staff_client, reverse("hr:tree_editor_data"))
+
+
+def netzwerk_editor_data(kontext):
+    _get(kontext.staff_client, reverse("hr:netzwerk_editor_data"))
+
+
+def schichtplan_generiere_vorschlag(kontext):
+    from schichtplan.models import Schicht
+    from schichtplan.services import SchichtplanGenerator
+    from schichtplan.views import get_planbare_mitarbeiter
+
+    plan = kontext.schichtplan
+    if plan is None:
+        raise AssertionError("Kein Lastdaten-Schichtplan vorhanden")
+    Schicht.objects.filter(schichtplan=plan).delete()
+    generator = SchichtplanGenerator(get_planbare_mitarbeiter(), plan)
+    # Nur fuer diesen Lauf (nicht gespeichert) – vergleichbare Laufzeiten
+    generator.config.solver_timeout_sekunden = kontext.solver_timeout
+    generator.generiere_vorschlag(plan)
+
+
+# (Name, Funktion, maximale Wiederholungen – None = wie --wiederholungen)
+SZENARIEN = [
+    ("zeiterfassung_uebersicht", zeiterfassung_uebersicht, None),
+    ("dokument_liste", dokument_liste, None),
+    ("arbeitsstapel", arbeitsstapel, None),
+    ("stellen_organigramm", stellen_organigramm, None),
+    ("orgchart_editor_data", orgchart_editor_data, None),
+    ("tree_editor_data", tree_editor_data, None),
+    ("netzwerk_editor_data", netzwerk_editor_data, None),
+    # Solver-Laufzeit wird durch --solver-timeout begrenzt – ein Lauf genuegt
+    ("schichtplan_generiere_vorschlag", schichtplan_generiere_vorschlag, 1),
+]
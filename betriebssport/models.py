@@ -280,7 +280,7 @@ class BetriebssportGutschrift(models.Model):
         Bevorzugt vorhandene SignaturJob-PDF-Bytes; faellt auf WeasyPrint zurueck.
         """
         from dms.models import Dokument, DokumentKategorie
-        from dms.services import speichere_dokument, suchvektor_befuellen
+        from dms.services import speichere_dokument, suchindex_einreihen
 
         kategorie = DokumentKategorie.objects.filter(pk=kategorie_id).first()
         titel = f"BS-Gutschrift {self.gruppe.name} {self.monat:%m/%Y}"
@@ -304,7 +304,7 @@ class BetriebssportGutschrift(models.Model):
             if kategorie:
                 bestehendes.kategorie = kategorie
             bestehendes.save()
-            suchvektor_befuellen(bestehendes)
+            suchindex_einreihen(bestehendes)
             return bestehendes
 
         dok = Dokument(
@@ -326,7 +326,7 @@ class BetriebssportGutschrift(models.Model):
         )
         speichere_dokument(dok, pdf_bytes)
         dok.save()
-        suchvektor_befuellen(dok)
+        suchindex_einreihen(dok)
         return dok
 
     def _pdf_bytes_holen(self):
@@ -348,7 +348,7 @@ class BetriebssportGutschrift(models.Model):
         except Exception:
             pass
         try:
-            from weasyprint import HTML
+            from utils.pdf_render import render_pdf
             from django.template.loader import render_to_string
             from django.conf import settings
             from django.utils import timezone as tz
@@ -394,7 +394,7 @@ class BetriebssportGutschrift(models.Model):
                 if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != "*"
                 else "http://localhost:8000"
             )
-            return HTML(string=html_string, base_url=host).write_pdf()
+            return render_pdf(html_string, base_url=host)
         except Exception as exc:
             logger.warning("WeasyPrint-Fallback fehlgeschlagen fuer BS pk=%s: %s", self.pk, exc)
             return None
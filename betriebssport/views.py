@@ -120,7 +120,7 @@ def _starte_workflow(gutschrift, user):
 def _auto_signiere(gutschrift, request):
     """PDF erzeugen und sofort signieren."""
     try:
-        from weasyprint import HTML
+        from utils.pdf_render import render_pdf
         from django.template.loader import render_to_string
         from signatur.services import signiere_pdf
 
@@ -130,10 +130,7 @@ def _auto_signiere(gutschrift, request):
             ctx,
             request=request,
         )
-        pdf = HTML(
-            string=html_string,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        pdf = render_pdf(html_string, base_url=request.build_absolute_uri())
 
         user = gutschrift.erstellt_von.user if gutschrift.erstellt_von else request.user
         dateiname = f"BS-{gutschrift.pk}_{gutschrift.gruppe.name}_{gutschrift.monat:%Y-%m}.pdf".replace(" ", "_")
@@ -715,7 +712,7 @@ def gutschrift_download(request, pk, monat_str):
 
     # PDF immer frisch mit aktuellem Workflow-Stand erzeugen
     try:
-        from weasyprint import HTML
+        from utils.pdf_render import render_pdf
         from django.template.loader import render_to_string
 
         ctx = _gutschrift_pdf_context(gutschrift)
@@ -724,10 +721,7 @@ def gutschrift_download(request, pk, monat_str):
             ctx,
             request=request,
         )
-        pdf_bytes = HTML(
-            string=html_string,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        pdf_bytes = render_pdf(html_string, base_url=request.build_absolute_uri())
     except Exception as exc:
         logger.error("WeasyPrint-Fehler: %s", exc)
         messages.error(request, "PDF konnte nicht erzeugt werden.")
@@ -281,7 +281,7 @@ def hr_ablehnen(request, pk):
 def _bewerbung_docx_ins_dms(docx_bytes, dateiname, titel, beschreibung, erstellt_von, bewerbung):
     """Legt ein Bewerbungs-DOCX im DMS ab (Klasse 2 – sensibel) und gibt die Dok-ID zurueck."""
     from dms.models import Dokument, DokumentKategorie
-    from dms.services import speichere_dokument
+    from dms.services import INHALT_FELDER, speichere_dokument
 
     mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
@@ -308,7 +308,7 @@ def _bewerbung_docx_ins_dms(docx_bytes, dateiname, titel, beschreibung, erstellt
     )
     dok.save()
     speichere_dokument(dok, docx_bytes)
-    dok.save(update_fields=["inhalt_verschluesselt", "inhalt_roh", "verschluessel_nonce"])
+    dok.save(update_fields=INHALT_FELDER)
 
     # HR-Team (kuerzel='PG') und Bewerber-HR-User freischalten
     try:
@@ -3,10 +3,14 @@
 import json
 import logging
 import re
+import threading
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
 
+from contextlib import contextmanager
+
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -16,6 +20,48 @@ logger = logging.getLogger(__name__)
 # Interne Hilfsfunktionen
 # ---------------------------------------------------------------------------
 
+_frist = threading.local()
+
+
+@contextmanager
+def http_frist(sekunden):
+    """Begrenzt alle HTTP-Aufrufe dieses Threads auf insgesamt sekunden.
+
+    sicherheit.alarm_fanout setzt das Budget je Zustellauftrag: Folgeaufrufe
+    (createRoom + send) und Wiederholungen bei 429 bleiben darin, der
+    Pool-Thread ist spaetestens danach wieder frei.
+    """
+    vorher = getattr(_frist, "ende", None)
+    _frist.ende = time.monotonic() + sekunden
+    try:
+        yield
+    finally:
+        _frist.ende = vorher
+
+
+def http_timeout(standard):
+    """timeout= fuer urlopen: standard, begrenzt auf das Restbudget aus http_frist().
+
+    Wirft TimeoutError, wenn das Budget bereits verbraucht ist.
+    """
+    ende = getattr(_frist, "ende", None)
+    if ende is None:
+        return standard
+    rest = ende - time.monotonic()
+    if rest <= 0:
+        raise TimeoutError("Zeitbudget fuer HTTP-Aufrufe verbraucht")
+    return min(standard, rest)
+
+
+def matrix_zugang():
+    """(homeserver, bot_token) fuer die Client-Server-API; leere Strings wenn nicht konfiguriert."""
+    homeserver = (
+        getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "").rstrip("/")
+        or getattr(settings, "MATRIX_HOMESERVER_URL", "").rstrip("/")
+    )
+    return homeserver, getattr(settings, "MATRIX_BOT_TOKEN", "")
+
+
 def _slugify(text):
     """Erzeugt einen URL-sicheren Slug ohne externe Abhaengigkeiten."""
     text = str(text).lower().strip()
@@ -73,9 +119,11 @@ def _matrix_rate_limit_warten(exc, kontext=""):
         warte_ms = int(body.get("retry_after_ms", 5000))
     except Exception:
         warte_ms = 5000
-    warte_sek = max(warte_ms / 1000, 1.0)
+    warte_sek = max(warte_ms / 1000, 1.0) + 0.2
+    if http_timeout(warte_sek) < warte_sek:
+        raise TimeoutError(f"Matrix Rate Limit ({kontext}) ueberschreitet das Zeitbudget")
     logger.info("Matrix Rate Limit (%s) – warte %.1f Sekunden.", kontext, warte_sek)
-    time.sleep(warte_sek + 0.2)
+    time.sleep(warte_sek)
 
 
 def matrix_nachricht_senden(room_id, text):
@@ -85,6 +133,9 @@ def matrix_nachricht_senden(room_id, text):
     Schlaegt still fehl wenn nicht konfiguriert – kein Blocking des Hauptprozesses.
     Verwendet PUT /rooms/{room_id}/send/m.room.message/{txn_id}
     Bei HTTP 429 wird einmal nach retry_after_ms wiederholt.
+
+    Rueckgabe: True bei Erfolg, False bei Fehler, None wenn nicht konfiguriert
+    (wird von sicherheit.alarm_fanout als Zustellstatus ausgewertet).
     """
     homeserver = (
         getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "").rstrip("/")
@@ -96,7 +147,7 @@ def matrix_nachricht_senden(room_id, text):
             "Matrix-Benachrichtigung uebersprungen (MATRIX_HOMESERVER_URL oder "
             "MATRIX_BOT_TOKEN nicht konfiguriert)."
         )
-        return
+        return None
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -110,7 +161,7 @@ def matrix_nachricht_senden(room_id, text):
         )
         payload = json.dumps({"msgtype": "m.text", "body": text}).encode("utf-8")
         req = urllib.request.Request(url, data=payload, headers=headers, method="PUT")
-        with urllib.request.urlopen(req, timeout=10) as resp:
+        with urllib.request.urlopen(req, timeout=http_timeout(10)) as resp:
             logger.info(
                 "Matrix-Nachricht gesendet in Raum %s (HTTP %s)", room_id, resp.status
             )
@@ -118,16 +169,17 @@ def matrix_nachricht_senden(room_id, text):
     for versuch in range(5):
         try:
             _sende(str(int(time.time() * 1000) + versuch))
-            break
+            return True
         except urllib.error.HTTPError as exc:
             if exc.code == 429:
                 _matrix_rate_limit_warten(exc, room_id)
                 continue
             logger.warning("Matrix-Nachricht konnte nicht gesendet werden: %s", exc)
-            break
+            return False
         except urllib.error.URLError as exc:
             logger.warning("Matrix-Nachricht konnte nicht gesendet werden: %s", exc)
-            break
+            return False
+    return False
 
 
 def matrix_dm_senden(empfaenger_matrix_id, text):
@@ -170,7 +222,7 @@ def matrix_dm_senden(empfaenger_matrix_id, text):
         req = urllib.request.Request(
             create_url, data=create_payload, headers=headers, method="POST"
         )
-        with urllib.request.urlopen(req, timeout=10) as resp:
+        with urllib.request.urlopen(req, timeout=http_timeout(10)) as resp:
             return json.loads(resp.read().decode("utf-8")).get("room_id")
 
     # Raum erstellen – bis zu 5 Versuche bei 429
@@ -225,7 +277,7 @@ def matrix_messages_seit_token(room_id, since_token=None):
         url = f"{homeserver}/_matrix/client/v3/rooms/{room_id}/messages?dir=b&limit=1"
         req = urllib.request.Request(url, headers=headers, method="GET")
         try:
-            with urllib.request.urlopen(req, timeout=5) as resp:
+            with urllib.request.urlopen(req, timeout=http_timeout(5)) as resp:
                 data = json.loads(resp.read().decode("utf-8"))
                 since_token = data.get("end", "")
         except urllib.error.URLError as exc:
@@ -240,14 +292,24 @@ def matrix_messages_seit_token(room_id, since_token=None):
     )
     req = urllib.request.Request(url, headers=headers, method="GET")
     try:
-        with urllib.request.urlopen(req, timeout=5) as resp:
+        with urllib.request.urlopen(req, timeout=http_timeout(5)) as resp:
             data = json.loads(resp.read().decode("utf-8"))
     except urllib.error.URLError as exc:
         logger.warning("matrix_messages_seit_token Fehler: %s", exc)
         return [], since_token
 
+    nachrichten = matrix_text_nachrichten(data.get("chunk", []))
+    neuer_token = data.get("end", since_token)
+    return nachrichten, neuer_token
+
+
+def matrix_text_nachrichten(events):
+    """Filtert m.text-Nachrichten aus einer Matrix-Eventliste.
+
+    Gibt Liste von dicts mit 'sender', 'body', 'event_id', 'ts' (ms) zurueck.
+    """
     nachrichten = []
-    for event in data.get("chunk", []):
+    for event in events:
         if event.get("type") != "m.room.message":
             continue
         content = event.get("content", {})
@@ -257,10 +319,88 @@ def matrix_messages_seit_token(room_id, since_token=None):
             "sender": event.get("sender", ""),
             "body": content.get("body", "").strip(),
             "event_id": event.get("event_id", ""),
+            "ts": event.get("origin_server_ts", 0),
         })
+    return nachrichten
 
-    neuer_token = data.get("end", since_token)
-    return nachrichten, neuer_token
+
+def _matrix_bot_zugang():
+    """Gibt (homeserver, headers) fuer den Bot zurueck oder (None, None)."""
+    homeserver = (
+        getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "").rstrip("/")
+        or getattr(settings, "MATRIX_HOMESERVER_URL", "").rstrip("/")
+    )
+    token = getattr(settings, "MATRIX_BOT_TOKEN", "")
+    if not homeserver or not token:
+        return None, None
+    return homeserver, {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+
+
+def matrix_filter_anlegen(filter_def):
+    """Legt einen Sync-Filter fuer den Bot an und gibt die filter_id zurueck.
+
+    Verwendet GET /account/whoami + POST /user/{user_id}/filter.
+    Gibt None zurueck wenn nicht konfiguriert oder bei Fehler.
+    """
+    homeserver, headers = _matrix_bot_zugang()
+    if not homeserver:
+        return None
+
+    try:
+        req = urllib.request.Request(
+            f"{homeserver}/_matrix/client/v3/account/whoami",
+            headers=headers, method="GET",
+        )
+        with urllib.request.urlopen(req, timeout=http_timeout(10)) as resp:
+            user_id = json.loads(resp.read().decode("utf-8"))["user_id"]
+
+        req = urllib.request.Request(
+            f"{homeserver}/_matrix/client/v3/user/{urllib.parse.quote(user_id)}/filter",
+            data=json.dumps(filter_def).encode("utf-8"),
+            headers=headers, method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=http_timeout(10)) as resp:
+            return json.loads(resp.read().decode("utf-8")).get("filter_id")
+    except (urllib.error.URLError, KeyError, ValueError) as exc:
+        logger.warning("Matrix-Filter konnte nicht angelegt werden: %s", exc)
+        return None
+
+
+def matrix_sync(since_token=None, filter_id=None, timeout_ms=30000):
+    """Ein /sync-Aufruf (Long-Poll) fuer den Bot.
+
+    Der Homeserver antwortet sofort bei neuen Events, sonst nach timeout_ms.
+    Gibt das Antwort-dict zurueck (u.a. 'next_batch', 'rooms') oder None
+    bei Fehler / fehlender Konfiguration. Bei HTTP 429 wird gewartet.
+    """
+    homeserver, headers = _matrix_bot_zugang()
+    if not homeserver:
+        return None
+
+    parameter = {"timeout": str(int(timeout_ms))}
+    if since_token:
+        parameter["since"] = since_token
+    if filter_id:
+        parameter["filter"] = filter_id
+    url = f"{homeserver}/_matrix/client/v3/sync?{urllib.parse.urlencode(parameter)}"
+
+    req = urllib.request.Request(url, headers=headers, method="GET")
+    try:
+        # Socket-Timeout etwas laenger als der Long-Poll selbst
+        with urllib.request.urlopen(req, timeout=timeout_ms / 1000 + 15) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as exc:
+        if exc.code == 429:
+            _matrix_rate_limit_warten(exc, "sync")
+        else:
+            logger.warning("matrix_sync Fehler: %s", exc)
+        return None
+    except (urllib.error.URLError, TimeoutError, ValueError) as exc:
+        logger.warning("matrix_sync Fehler: %s", exc)
+        return None
 
 
 def matrix_nutzer_in_raum_einladen(room_id, matrix_user_id):
@@ -291,7 +431,7 @@ def matrix_nutzer_in_raum_einladen(room_id, matrix_user_id):
         method="POST",
     )
     try:
-        urllib.request.urlopen(req, timeout=5)
+        urllib.request.urlopen(req, timeout=http_timeout(5))
         logger.info("Matrix-Einladung gesendet: %s -> %s", matrix_user_id, room_id)
         return True
     except urllib.error.HTTPError as exc:
@@ -333,7 +473,7 @@ def matrix_power_level_setzen(room_id, matrix_user_id, level=50):
     url_get = f"{homeserver}/_matrix/client/v3/rooms/{room_id}/state/m.room.power_levels"
     req_get = urllib.request.Request(url_get, headers=headers, method="GET")
     try:
-        with urllib.request.urlopen(req_get, timeout=5) as resp:
+        with urllib.request.urlopen(req_get, timeout=http_timeout(5)) as resp:
             power_levels = json.loads(resp.read().decode("utf-8"))
     except Exception as exc:
         logger.warning("Power-Levels lesen fehlgeschlagen fuer %s: %s", room_id, exc)
@@ -349,7 +489,7 @@ def matrix_power_level_setzen(room_id, matrix_user_id, level=50):
     payload = json.dumps(power_levels).encode("utf-8")
     req_put = urllib.request.Request(url_put, data=payload, headers=headers, method="PUT")
     try:
-        urllib.request.urlopen(req_put, timeout=5)
+        urllib.request.urlopen(req_put, timeout=http_timeout(5))
         logger.info("Power Level %s gesetzt fuer %s in %s", level, matrix_user_id, room_id)
         return True
     except urllib.error.HTTPError as exc:
@@ -387,7 +527,7 @@ def matrix_reaktionen_holen(room_id, event_id):
         method="GET",
     )
     try:
-        with urllib.request.urlopen(req, timeout=5) as resp:
+        with urllib.request.urlopen(req, timeout=http_timeout(5)) as resp:
             data = json.loads(resp.read().decode("utf-8"))
     except urllib.error.URLError as exc:
         logger.warning("matrix_reaktionen_holen Fehler: %s", exc)
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import sys
 
@@ -83,6 +84,8 @@ DOKUMENT_VERSCHLUESSEL_KEY = os.environ.get("DOKUMENT_VERSCHLUESSEL_KEY", "")
 # Signatur-System
 # ---------------------------------------------------------------------------
 SIGNATUR_BACKEND = os.environ.get("SIGNATUR_BACKEND", "intern")
+# Lebensdauer (Sekunden) gecachter Zertifikate und entsperrter Signer (signatur/schluessel_cache.py)
+SIGNATUR_SCHLUESSEL_CACHE_SEKUNDEN = int(os.environ.get("SIGNATUR_SCHLUESSEL_CACHE_SEKUNDEN", "300"))
 
 # ---------------------------------------------------------------------------
 # DMS – Dokumentenmanagementsystem
@@ -91,6 +94,23 @@ SIGNATUR_BACKEND = os.environ.get("SIGNATUR_BACKEND", "intern")
 # Generieren: python -c "import os; print(os.urandom(32).hex())"
 DMS_VERSCHLUESSEL_KEY = os.environ.get("DMS_VERSCHLUESSEL_KEY", "")
 
+# Inhaltsspeicher (dms/speicher.py):
+#   "datenbank" → Inhalt als BinaryField (Standard, kein persistentes Volume noetig)
+#   "datei"     → SHA-256-adressierte Chunks unter DMS_SPEICHER_PFAD
+#                 (Volume muss persistent sein und mitgesichert werden!)
+# Bestehende Inhalte umziehen: python manage.py dms_blobs_auslagern
+DMS_SPEICHER_BACKEND = os.environ.get("DMS_SPEICHER_BACKEND", "datenbank")
+DMS_SPEICHER_PFAD = os.environ.get("DMS_SPEICHER_PFAD", "")  # leer = MEDIA_ROOT/dms_blobs
+DMS_CHUNK_GROESSE = int(os.environ.get("DMS_CHUNK_GROESSE", str(4 * 1024 * 1024)))
+
+# Suche (dms/suche.py): unter so vielen FTS-Treffern ergaenzt die
+# Trigramm-Suche (pg_trgm) unscharfe Treffer auf Titel/Dateiname
+DMS_SUCHE_MIN_TREFFER = int(os.environ.get("DMS_SUCHE_MIN_TREFFER", "5"))
+
+# Zugriffsprotokoll: Teilabrufe (HTTP 206) desselben Users fuer dasselbe
+# Dokument innerhalb dieses Fensters (Sekunden) ergeben einen Eintrag
+DMS_PROTOKOLL_FENSTER = int(os.environ.get("DMS_PROTOKOLL_FENSTER", "60"))
+
 # Paperless-ngx Integration (optional)
 PAPERLESS_URL = os.environ.get("PAPERLESS_URL", "")
 PAPERLESS_TOKEN = os.environ.get("PAPERLESS_TOKEN", "")
@@ -138,20 +158,13 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'arbeitszeit.context_processors.schichtplan_zugang',
-                'arbeitszeit.context_processors.genehmiger_rolle',
-                'arbeitszeit.context_processors.workflow_tasks_anzahl',
-                'arbeitszeit.context_processors.team_stapel_anzahl',
-                'arbeitszeit.context_processors.prozessverantwortlicher',
-                'arbeitszeit.context_processors.personalgewinnung_kontext',
-                'arbeitszeit.context_processors.dms_badge_kontext',
+                # Buendelt Rollen-Flags und Badges (Schichtplan, Genehmiger,
+                # Arbeitsstapel, Team-Stapel, DMS, Facility, Stellenportal,
+                # Veranstaltungen, IT-Ampel) – pro User gecacht
+                'arbeitszeit.context_processors.nav_kontext',
                 'arbeitszeit.context_processors.hilfe_kontext',
                 'arbeitszeit.context_processors.cmd_items',
-                'facility.context_processors.facility_context',
-                'stellenportal.context_processors.stellenportal_context',
-                'veranstaltungen.context_processors.veranstaltungen_context',
                 'matrix_integration.context_processors.matrix_kontext',
-                'it_status.context_processors.it_status_ampel',
                 'ersthelfe.context_processors.eh_badge',
                 'sicherheit.context_processors.sicherheit_banner',
             ],
@@ -198,6 +211,37 @@ else:
     except Exception:
         pass
 
+# ---------------------------------------------------------------------------
+# Caches
+# ---------------------------------------------------------------------------
+# nav_kontext: Navbar-Bundle pro User (arbeitszeit/nav_kontext.py).
+# org_graph: nur die Versionsnummer des OrgGraph (hr/org_graph.py),
+# der Graph selbst liegt prozesslokal.
+# Dateibasiert, damit alle Gunicorn-Worker dieselbe Invalidierung sehen.
+NAV_KONTEXT_TIMEOUT = int(os.environ.get("NAV_KONTEXT_TIMEOUT", 120))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "nav_kontext": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "NAV_KONTEXT_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "prima_nav_kontext"),
+        ),
+        "TIMEOUT": NAV_KONTEXT_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "org_graph": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "ORG_GRAPH_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "prima_org_graph"),
+        ),
+        "TIMEOUT": None,
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -257,6 +301,24 @@ CLAMAV_TIMEOUT = int(os.environ.get("CLAMAV_TIMEOUT", 15))
 # True = Upload ablehnen wenn Scanner nicht erreichbar (sicherer aber strenger)
 CLAMAV_BLOCKIERE_BEI_FEHLER = os.environ.get("CLAMAV_BLOCKIERE_BEI_FEHLER", "False") == "True"
 
+# ---------------------------------------------------------------------------
+# PDF-Erzeugung (WeasyPrint, utils/pdf_render.py)
+# Worker-Prozesse mit vorgeladenen Fonts + Datei-Cache fuer unveraenderte PDFs.
+# ---------------------------------------------------------------------------
+# 0 = im Request-Prozess rendern (ohne Pool)
+PDF_RENDER_WORKER = int(os.environ.get("PDF_RENDER_WORKER", "2"))
+PDF_RENDER_TIMEOUT = int(os.environ.get("PDF_RENDER_TIMEOUT", "60"))
+# Erhoehen, wenn sich CSS, Fonts oder eingebundene Bilder der PDF-Vorlagen aendern
+PDF_RENDER_VERSION = os.environ.get("PDF_RENDER_VERSION", "1")
+# Zusaetzliche Stylesheets (Dateipfade), einmal je Worker geparst
+PDF_RENDER_STYLESHEETS = [
+    p for p in os.environ.get("PDF_RENDER_STYLESHEETS", "").split(",") if p.strip()
+]
+# Leer = Cache deaktiviert (Standard: PDFs liegen unverschluesselt auf der Platte;
+# personenbezogene Berichte werden auch bei gesetztem Verzeichnis nie gecacht)
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", "")
+PDF_CACHE_TAGE = int(os.environ.get("PDF_CACHE_TAGE", "30"))
+
 # Email-Domain fuer stellenbasierte Adressen
 STELLEN_EMAIL_DOMAIN = os.environ.get('STELLEN_EMAIL_DOMAIN', 'firma.de')
 
@@ -392,6 +454,9 @@ MATRIX_SERVER_NAME = os.environ.get("MATRIX_SERVER_NAME", "")
 MATRIX_BOT_TOKEN = os.environ.get("MATRIX_BOT_TOKEN", "")
 MATRIX_ADMIN_TOKEN = os.environ.get("MATRIX_ADMIN_TOKEN", "")
 
+# Long-Poll-Timeout des Sync-Listeners (manage.py matrix_sync_listener) in ms
+MATRIX_SYNC_TIMEOUT_MS = int(os.environ.get("MATRIX_SYNC_TIMEOUT_MS", "30000"))
+
 # Matrix-Raum-ID des Facility-Teams (fuer automatische Stoermeldungs-Pings)
 # Format: !raumid:server  – im Element-Client unter Raumeinstellungen abrufbar
 MATRIX_FACILITY_ROOM_ID = os.environ.get("MATRIX_FACILITY_ROOM_ID", "")
@@ -421,5 +486,11 @@ MATRIX_SECURITY_PING_ROOM_ID    = os.environ.get("MATRIX_SECURITY_PING_ROOM_ID",
 MATRIX_BRANDERKUNDER_ROOM_ID    = os.environ.get("MATRIX_BRANDERKUNDER_ROOM_ID", "")
 MATRIX_RAEUMUNGSHELFER_ROOM_ID  = os.environ.get("MATRIX_RAEUMUNGSHELFER_ROOM_ID", "")
 
+# Alarm-Fan-out (sicherheit.alarm_fanout): parallele Zustellung von Matrix/ntfy
+# WORKER begrenzt gleichzeitige Requests (Synapse-Rate-Limit), TIMEOUT in Sekunden
+# je Zustellung – danach wird sie als timeout protokolliert.
+ALARM_FANOUT_WORKER = int(os.environ.get("ALARM_FANOUT_WORKER", "8"))
+ALARM_FANOUT_TIMEOUT = int(os.environ.get("ALARM_FANOUT_TIMEOUT", "15"))
+
 # Basis-URL fuer Token-Links in Matrix-DMs
 PRIMA_BASE_URL = os.environ.get("PRIMA_BASE_URL", "https://prima.georg-klein.com")
\ No newline at end of file
@@ -35,7 +35,7 @@ def dashboard(request):
 @login_required
 def auskunft_pdf(request):
     """DSGVO Art. 15 – Selbstauskunft: alle ueber den User gespeicherten Daten als PDF."""
-    from weasyprint import HTML
+    from utils.pdf_render import render_pdf
     from django.template.loader import render_to_string
 
     user = request.user
@@ -43,7 +43,7 @@ def auskunft_pdf(request):
     kontext["auskunft_datum"] = timezone.now()
 
     html_str = render_to_string("datenschutz/auskunft_pdf.html", kontext)
-    pdf = HTML(string=html_str, base_url=request.build_absolute_uri("/")).write_pdf()
+    pdf = render_pdf(html_str, base_url=request.build_absolute_uri("/"), cache=False)
 
     dateiname = f"DSGVO_Auskunft_{user.username}_{timezone.now().date()}.pdf"
     response = HttpResponse(pdf, content_type="application/pdf")
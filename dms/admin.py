@@ -4,10 +4,12 @@ from .models import (
     ApiToken,
     Dokument,
     DokumentKategorie,
+    DokumentSichtbarkeit,
     DokumentTag,
     DokumentZugriffsschluessel,
     PaperlessImportLog,
     PaperlessWorkflowRegel,
+    SuchIndexAuftrag,
     ZugriffsProtokoll,
 )
 
@@ -86,3 +88,18 @@ class PaperlessWorkflowRegelAdmin(admin.ModelAdmin):
     list_filter = ["aktiv", "treffer_typ"]
     search_fields = ["bezeichnung", "paperless_name"]
     list_editable = ["prioritaet", "aktiv"]
+
+
+@admin.register(SuchIndexAuftrag)
+class SuchIndexAuftragAdmin(admin.ModelAdmin):
+    list_display = ["dokument", "eingereiht_am", "gesperrt_am", "versuche", "letzter_fehler"]
+    list_filter = ["paperless_aktualisieren"]
+    raw_id_fields = ["dokument"]
+    readonly_fields = ["gesperrt_am", "letzter_fehler"]
+
+
+@admin.register(DokumentSichtbarkeit)
+class DokumentSichtbarkeitAdmin(admin.ModelAdmin):
+    list_display = ["dokument", "user"]
+    raw_id_fields = ["dokument", "user"]
+    search_fields = ["dokument__titel", "user__username"]
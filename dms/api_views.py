@@ -11,13 +11,14 @@ import logging
 from datetime import timedelta
 from functools import wraps
 
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from .auslieferung import inhalt_antwort, ist_protokollpflichtig
 from .models import ApiToken, Dokument, DokumentKategorie, DokumentVersion, ZugriffsProtokoll
-from .services import lade_dokument, speichere_dokument
+from .services import speichere_dokument
 
 logger = logging.getLogger(__name__)
 
@@ -161,7 +162,7 @@ def api_dokumente(request):
 
 def _api_dokumente_liste(request):
     """Dokumentenliste mit Filterung und Paginierung."""
-    qs = Dokument.objects.all()
+    qs = Dokument.objects.ohne_inhalt()
 
     # Klassen-Einschraenkung durch Token-Berechtigung
     if request.api_token.erlaubte_klassen == "offen":
@@ -194,7 +195,7 @@ def _api_dokumente_liste(request):
         return JsonResponse({"fehler": "limit und offset muessen Ganzzahlen sein.", "code": "BAD_REQUEST"}, status=400)
 
     gesamt = qs.count()
-    dokumente = qs.select_related("kategorie")[offset:offset + limit]
+    dokumente = qs.select_related("kategorie").prefetch_related("tags")[offset:offset + limit]
 
     return JsonResponse({
         "gesamt": gesamt,
@@ -271,6 +272,8 @@ def _api_dokument_upload(request):
         inhalt_roh=dok.inhalt_roh,
         inhalt_verschluesselt=dok.inhalt_verschluesselt,
         verschluessel_nonce=dok.verschluessel_nonce,
+        inhalt_hash=dok.inhalt_hash,
+        inhalt_manifest=dok.inhalt_manifest,
         groesse_bytes=len(inhalt),
         kommentar=kommentar,
     )
@@ -311,19 +314,20 @@ def api_dokument_inhalt(request, pk):
     """GET /dms/api/v1/dokumente/{pk}/inhalt/
     Rohen Dateiinhalt als Binaer-Download zurueckgeben.
     Content-Type entspricht dem MIME-Typ des Dokuments.
+    Unterstuetzt ETag/If-None-Match (304) und Range (206).
     """
     try:
-        dok = Dokument.objects.get(pk=pk)
+        dok = Dokument.objects.ohne_inhalt().get(pk=pk)
     except Dokument.DoesNotExist:
         return JsonResponse({"fehler": f"Dokument {pk} nicht gefunden.", "code": "NOT_FOUND"}, status=404)
 
     if dok.klasse == "sensibel" and request.api_token.erlaubte_klassen != "beide":
         return JsonResponse({"fehler": "Keine Berechtigung fuer sensible Dokumente.", "code": "FORBIDDEN"}, status=403)
 
-    inhalt = lade_dokument(dok)
-    _protokolliere_api(request, dok, "api_download", f"Dokument-ID {pk}")
+    response = inhalt_antwort(request, dok, dok.dateityp)
+    if ist_protokollpflichtig(response, f"token{request.api_token.pk}", dok.pk, "api_download"):
+        _protokolliere_api(request, dok, "api_download", f"Dokument-ID {pk}")
 
-    response = HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
     response["Content-Disposition"] = f'attachment; filename="{dok.dateiname}"'
     response["X-PRIMA-Dokument-ID"] = str(dok.pk)
     response["X-PRIMA-Version"] = str(dok.version)
@@ -369,6 +373,8 @@ def api_dokument_neue_version(request, pk):
         inhalt_roh=dok.inhalt_roh,
         inhalt_verschluesselt=dok.inhalt_verschluesselt,
         verschluessel_nonce=dok.verschluessel_nonce,
+        inhalt_hash=dok.inhalt_hash,
+        inhalt_manifest=dok.inhalt_manifest,
         groesse_bytes=len(inhalt),
         kommentar=kommentar,
     )
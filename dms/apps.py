@@ -5,3 +5,6 @@ class DmsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dms"
     verbose_name = "DMS – Dokumentenmanagement"
+
+    def ready(self):
+        import dms.signals  # noqa: F401 – Signals registrieren
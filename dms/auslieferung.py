@@ -0,0 +1,130 @@
+"""
+HTTP-Auslieferung von Dokument- und Versionsinhalten.
+
+inhalt_antwort() streamt den Klartext und unterstuetzt dabei:
+  - ETag aus inhalt_hash + Versionsnummer; If-None-Match → 304 ohne
+    Entschluesselung (der Inhalt wird gar nicht erst gelesen)
+  - Range: bytes=… (ein Bereich) → 206 Partial Content; bei Segment-
+    verschluesselung werden nur die beruehrten Segmente entschluesselt
+  - If-Range: Bereich nur, wenn der ETag noch passt – sonst volle Antwort
+
+Mehrere Bereiche in einem Request werden ignoriert (volle Antwort, RFC 9110
+erlaubt das). Berechtigungen prueft der aufrufende View vorher.
+
+ist_protokollpflichtig() entscheidet, ob der View einen ZugriffsProtokoll-
+Eintrag schreibt: jede Antwort mit Inhalt zaehlt, nur Teilabrufe desselben
+Abrufers innerhalb von DMS_PROTOKOLL_FENSTER Sekunden werden zusammengefasst.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .services import inhalt_groesse, iter_inhalt
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def inhalt_etag(obj):
+    """Starker ETag fuer Dokument (version) bzw. DokumentVersion (version_nr).
+
+    None fuer Alt-Datensaetze ohne inhalt_hash – dann ohne Caching.
+    """
+    if not obj.inhalt_hash:
+        return None
+    version = getattr(obj, "version_nr", None) or obj.version
+    return f'"{obj.inhalt_hash}-{version}"'
+
+
+def _bereich(request, groesse, etag):
+    """Wertet Range/If-Range aus.
+
+    Returns:
+        None fuer die volle Antwort, (start, ende) mit ende exklusiv,
+        oder "ungueltig" fuer einen nicht erfuellbaren Bereich (416).
+    """
+    kopf = request.META.get("HTTP_RANGE", "").strip()
+    if not kopf or not groesse or request.method not in ("GET", "HEAD"):
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if if_range and (not etag or if_range != etag):
+        return None
+    treffer = _RANGE_RE.match(kopf.replace(" ", ""))
+    if not treffer:
+        return None
+    von, bis = treffer.groups()
+    if not von and not bis:
+        return None
+    if not von:
+        # Suffix: die letzten n Bytes
+        laenge = int(bis)
+        if laenge == 0:
+            return "ungueltig"
+        return max(groesse - laenge, 0), groesse
+    start = int(von)
+    ende = min(int(bis) + 1, groesse) if bis else groesse
+    if start >= groesse or (bis and int(bis) < start):
+        return "ungueltig"
+    return start, ende
+
+
+def inhalt_antwort(request, obj, dateityp):
+    """Streamt den Klartext eines Dokuments/einer Version mit ETag- und Range-Support.
+
+    Fehler beim Entschluesseln des ersten Segments (Schluessel fehlt,
+    Daten manipuliert) werden hier geworfen – vor dem Senden der Antwort.
+    """
+    etag = inhalt_etag(obj)
+    if etag:
+        nicht_geaendert = get_conditional_response(request, etag=etag)
+        if nicht_geaendert is not None:
+            patch_cache_control(nicht_geaendert, private=True, no_cache=True)
+            return nicht_geaendert
+
+    groesse = inhalt_groesse(obj)
+    bereich = _bereich(request, groesse, etag)
+    if bereich == "ungueltig":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{groesse}"
+        return response
+
+    content_type = dateityp or "application/octet-stream"
+    if bereich is None:
+        response = StreamingHttpResponse(iter_inhalt(obj), content_type=content_type)
+        response["Content-Length"] = groesse
+    else:
+        start, ende = bereich
+        response = StreamingHttpResponse(
+            iter_inhalt(obj, start, ende), content_type=content_type, status=206
+        )
+        response["Content-Length"] = ende - start
+        response["Content-Range"] = f"bytes {start}-{ende - 1}/{groesse}"
+
+    response["Accept-Ranges"] = "bytes"
+    if etag:
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def ist_protokollpflichtig(response, wer, *abruf):
+    """True, wenn die Antwort einen ZugriffsProtokoll-Eintrag braucht.
+
+    Jede Antwort mit Inhalt (200/206) ist protokollpflichtig – unabhaengig
+    davon, welchen Bereich der Client anfordert. Teilabrufe (206) desselben
+    Abrufers (wer) fuer dasselbe Objekt (abruf, z.B. Dokument-ID und Aktion)
+    innerhalb von DMS_PROTOKOLL_FENSTER Sekunden ergeben einen Eintrag, damit
+    ein PDF-Viewer nicht pro Seite protokolliert wird. Der Cache ist je
+    Prozess; im Zweifel entsteht ein Eintrag zu viel, nie einer zu wenig.
+    """
+    if response.status_code not in (200, 206):
+        return False
+    schluessel = "dms_abruf:" + ":".join(str(teil) for teil in (wer, *abruf))
+    fenster = getattr(settings, "DMS_PROTOKOLL_FENSTER", 60)
+    if response.status_code == 200:
+        # Volle Antwort immer; folgende Teilabrufe gehoeren zu diesem Eintrag
+        cache.set(schluessel, True, fenster)
+        return True
+    return cache.add(schluessel, True, fenster)
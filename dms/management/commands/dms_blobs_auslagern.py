@@ -0,0 +1,148 @@
+"""
+Management-Command: dms_blobs_auslagern
+
+Verschiebt bestehende DMS-Inhalte (Dokument + DokumentVersion) aus den
+BinaryFields in den Chunk-Speicher (DMS_SPEICHER_BACKEND="datei").
+
+Ohne Downtime und wiederaufsetzbar:
+  - Zeilen werden nach ID in Stapeln abgearbeitet (Keyset, kein OFFSET)
+  - Die gespeicherten Bytes werden unveraendert uebernommen
+    (Klasse 2 bleibt Chiffretext, kein Entschluesseln noetig)
+  - Umgestellt wird per UPDATE ... WHERE inhalt_manifest IS NULL – parallel
+    gespeicherte Inhalte werden nie ueberschrieben
+  - Abbruch jederzeit moeglich; erneuter Aufruf macht beim Rest weiter
+
+Danach Speicherplatz in PostgreSQL freigeben: VACUUM FULL dms_dokument, dms_dokumentversion
+
+Aufruf:
+    python manage.py dms_blobs_auslagern
+    python manage.py dms_blobs_auslagern --batch 20 --pause 0.5
+    python manage.py dms_blobs_auslagern --dry-run
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from dms.models import Dokument, DokumentVersion
+from dms.speicher import get_speicher, inhalt_hash
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Verschiebt DMS-Inhalte aus der Datenbank in den Chunk-Speicher (wiederaufsetzbar)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=50,
+            help="Anzahl Zeilen pro Stapel (Standard: 50).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Pause in Sekunden zwischen zwei Stapeln (entlastet die DB im Betrieb).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Hoechstens so viele Zeilen je Tabelle verschieben (0 = alle).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nur zaehlen, nichts verschieben.",
+        )
+
+    def handle(self, *args, **options):
+        speicher = get_speicher()
+        if not speicher.AUSGELAGERT:
+            raise CommandError(
+                "DMS_SPEICHER_BACKEND ist nicht 'datei' – neue Uploads wuerden "
+                "weiter in die Datenbank geschrieben. Erst Backend umstellen."
+            )
+
+        for modell, klasse_feld in (
+            (Dokument, "klasse"),
+            (DokumentVersion, "dokument__klasse"),
+        ):
+            self._auslagern(modell, klasse_feld, speicher, options)
+
+    def _offene(self, modell):
+        return modell.objects.filter(inhalt_manifest__isnull=True).filter(
+            Q(inhalt_roh__isnull=False) | Q(inhalt_verschluesselt__isnull=False)
+        )
+
+    def _auslagern(self, modell, klasse_feld, speicher, options):
+        name = modell._meta.verbose_name_plural
+        offen = self._offene(modell)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{name}: {offen.count()} Zeilen noch in der Datenbank.")
+            return
+
+        letzte_id = 0
+        verschoben = 0
+        uebersprungen = 0
+        limit = options["limit"]
+
+        while True:
+            ids = list(
+                offen.filter(pk__gt=letzte_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:options["batch"]]
+            )
+            if not ids:
+                break
+
+            for pk in ids:
+                letzte_id = pk
+                # Einzeln laden – immer nur ein Blob gleichzeitig im Speicher
+                zeile = (
+                    modell.objects.filter(pk=pk)
+                    .values("inhalt_roh", "inhalt_verschluesselt", klasse_feld)
+                    .first()
+                )
+                if zeile is None:
+                    continue
+                if zeile[klasse_feld] == "sensibel":
+                    gespeichert = zeile["inhalt_verschluesselt"]
+                else:
+                    gespeichert = zeile["inhalt_roh"]
+                if gespeichert is None:
+                    uebersprungen += 1
+                    logger.warning("%s %s: kein Inhalt passend zur Klasse – uebersprungen", name, pk)
+                    continue
+
+                gespeichert = bytes(gespeichert)
+                manifest = speicher.schreibe(gespeichert)
+                aktualisiert = modell.objects.filter(
+                    pk=pk, inhalt_manifest__isnull=True
+                ).update(
+                    inhalt_manifest=manifest,
+                    inhalt_hash=inhalt_hash(gespeichert),
+                    inhalt_roh=None,
+                    inhalt_verschluesselt=None,
+                )
+                if aktualisiert:
+                    verschoben += 1
+
+                if limit and verschoben >= limit:
+                    break
+
+            self.stdout.write(f"{name}: {verschoben} verschoben (bis ID {letzte_id}) ...")
+            self.stdout.flush()
+            if limit and verschoben >= limit:
+                break
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{name}: {verschoben} verschoben, {uebersprungen} uebersprungen, "
+            f"{offen.count()} verbleibend."
+        ))
@@ -0,0 +1,171 @@
+"""
+Management-Command: dms_index_worker
+
+Arbeitet die SuchIndexAuftrag-Warteschlange ab. Uploads reihen Dokumente
+nur noch ein (suchindex_einreihen); Textextraktion (PDF/DOCX/XLSX lokal),
+optionaler OCR-Refresh aus Paperless und tsvector-Aufbau laufen hier.
+
+Ablauf je Durchgang:
+  1. Bis zu --batch Auftraege per select_for_update(skip_locked=True)
+     claimen (mehrere Worker parallel moeglich; SQLite: unter BEGIN
+     IMMEDIATE, dort wirkt select_for_update nicht)
+  2. Text je Dokument ermitteln (Stapel ohne Inhalt geladen, Inhalt bzw.
+     OCR-Text einzeln je Dokument – nie alle Blobs eines Stapels auf einmal):
+       Paperless-Dokument → ocr_text (ggf. frisch aus Paperless); ist er
+                            leer (z.B. nach OnlyOffice-Bearbeitung), lokal
+       sonst              → Text aus dem Dateiinhalt extrahieren
+  3. Alle Texte des Stapels in einem UPDATE ... FROM (VALUES ...) schreiben
+  4. Erledigte Auftraege loeschen; Fehler am Auftrag vermerken, mit
+     Backoff erneut versuchen und nach SuchIndexAuftrag.MAX_VERSUCHE
+     liegen lassen (im Admin sichtbar)
+
+Auftraege, die laenger als SPERRE_TIMEOUT gesperrt sind (Worker
+abgestuerzt), werden wieder freigegeben.
+
+Aufruf:
+    python manage.py dms_index_worker            # Endlosschleife
+    python manage.py dms_index_worker --einmal   # Warteschlange abarbeiten und beenden
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from dms.models import Dokument, SuchIndexAuftrag
+from dms.services import INHALT_FELDER, lade_dokument, paperless_ocr_laden, suchvektoren_aktualisieren
+from dms.textextraktion import extrahiere_text
+from utils.transaktion import schreibtransaktion
+
+logger = logging.getLogger(__name__)
+
+# Nach dieser Zeit gilt ein gesperrter Auftrag als verwaist
+SPERRE_TIMEOUT = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = "Baut Volltext-Suchvektoren fuer eingereihte DMS-Dokumente auf."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--einmal",
+            action="store_true",
+            help="Nur die aktuell eingereihten Auftraege abarbeiten und dann beenden.",
+        )
+        parser.add_argument(
+            "--intervall",
+            type=float,
+            default=5.0,
+            help="Wartezeit in Sekunden, wenn nichts ansteht (Standard: 5).",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=500,
+            help="Anzahl Dokumente pro Stapel bzw. UPDATE (Standard: 500).",
+        )
+
+    def handle(self, *args, **options):
+        if options["verbosity"] >= 1:
+            self.stdout.write("DMS-Index-Worker gestartet.\n")
+            self.stdout.flush()
+
+        while True:
+            close_old_connections()
+            self._verwaiste_freigeben()
+            auftraege = self._claimen(options["batch"])
+            if auftraege:
+                self._bearbeite(auftraege, options["verbosity"])
+                continue
+            if options["einmal"]:
+                break
+            time.sleep(options["intervall"])
+
+    def _verwaiste_freigeben(self):
+        freigegeben = SuchIndexAuftrag.objects.filter(
+            gesperrt_am__lt=timezone.now() - SPERRE_TIMEOUT,
+        ).update(gesperrt_am=None)
+        if freigegeben:
+            logger.warning("Suchindex: %d verwaiste Auftraege wieder freigegeben", freigegeben)
+
+    def _claimen(self, anzahl):
+        """Claimt offene Auftraege (parallele Worker ueberspringen gesperrte)."""
+        jetzt = timezone.now()
+        with schreibtransaktion():
+            auftraege = list(
+                SuchIndexAuftrag.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    gesperrt_am__isnull=True,
+                    eingereiht_am__lte=jetzt,
+                    versuche__lt=SuchIndexAuftrag.MAX_VERSUCHE,
+                )
+                .order_by("eingereiht_am")[:anzahl]
+            )
+            if auftraege:
+                SuchIndexAuftrag.objects.filter(pk__in=[a.pk for a in auftraege]).update(
+                    gesperrt_am=jetzt,
+                )
+        for auftrag in auftraege:
+            auftrag.gesperrt_am = jetzt
+        return auftraege
+
+    def _text_fuer(self, dok, auftrag):
+        """Durchsuchbarer Text eines Dokuments (Paperless-OCR oder lokal extrahiert)."""
+        if dok.paperless_id:
+            if auftrag.paperless_aktualisieren:
+                frisch = paperless_ocr_laden(dok.paperless_id)
+                if frisch is not None:
+                    return frisch
+            ocr_text = Dokument.objects.filter(pk=dok.pk).values_list("ocr_text", flat=True).first()
+            if ocr_text:
+                return ocr_text
+        # Inhalt erst hier und nur fuer dieses Dokument laden
+        mit_inhalt = Dokument.objects.only("klasse", *INHALT_FELDER).get(pk=dok.pk)
+        try:
+            inhalt = lade_dokument(mit_inhalt)
+        except ValueError:
+            return ""  # Dokument ohne Inhalt – nur Titel/Beschreibung indizieren
+        return extrahiere_text(inhalt, dok.dateityp, dok.dateiname)
+
+    def _bearbeite(self, auftraege, verbosity):
+        dokumente = Dokument.objects.ohne_inhalt().in_bulk([a.dokument_id for a in auftraege])
+        texte = []
+        erledigt = []
+        for auftrag in auftraege:
+            dok = dokumente.get(auftrag.dokument_id)
+            if dok is None or dok.klasse == "sensibel":
+                erledigt.append(auftrag)
+                continue
+            try:
+                texte.append((dok.pk, self._text_fuer(dok, auftrag)))
+            except Exception as exc:
+                versuche = auftrag.versuche + 1
+                SuchIndexAuftrag.objects.filter(pk=auftrag.pk).update(
+                    versuche=versuche,
+                    eingereiht_am=timezone.now() + timedelta(minutes=2 ** versuche),
+                    gesperrt_am=None,
+                    letzter_fehler=str(exc)[:2000],
+                )
+                logger.warning(
+                    "Suchindex Dokument %s Versuch %d fehlgeschlagen: %s", dok.pk, versuche, exc,
+                )
+            else:
+                erledigt.append(auftrag)
+
+        aktualisiert = suchvektoren_aktualisieren(texte)
+
+        # Nur loeschen, was seit dem Claim nicht erneut eingereiht wurde
+        # (suchindex_einreihen setzt eingereiht_am neu und gibt die Sperre frei)
+        SuchIndexAuftrag.objects.filter(
+            pk__in=[a.pk for a in erledigt], eingereiht_am__lte=auftraege[0].gesperrt_am,
+        ).delete()
+
+        if verbosity >= 1:
+            self.stdout.write(
+                f"[SUCHINDEX] {aktualisiert} Dokument(e) indiziert, "
+                f"{len(auftraege) - len(erledigt)} Fehler.\n"
+            )
+            self.stdout.flush()
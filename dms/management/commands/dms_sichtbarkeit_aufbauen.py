@@ -0,0 +1,31 @@
+"""
+Management-Command: dms_sichtbarkeit_aufbauen
+
+Baut DokumentSichtbarkeit fuer alle sensiblen Dokumente neu auf – immer
+dann, wenn sich Sichtbarkeitsregeln ohne Signals geaendert haben
+(QuerySet.update, Datenimport, Umbenennen der AZV-Kategorie, neue
+OrgEinheit einer Stelle).
+
+Aufruf:
+    python manage.py dms_sichtbarkeit_aufbauen [--batch 500]
+"""
+from django.core.management.base import BaseCommand
+
+from dms.models import DokumentSichtbarkeit
+
+
+class Command(BaseCommand):
+    help = "DokumentSichtbarkeit (Listenfilter fuer sensible Dokumente) neu aufbauen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=500,
+            help="Anzahl Dokumente pro Stapel (Standard: 500)",
+        )
+
+    def handle(self, *args, **options):
+        anzahl = DokumentSichtbarkeit.neu_aufbauen(batch=options["batch"])
+        if options["verbosity"] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"{anzahl} Sichtbarkeits-Eintraege geschrieben."))
@@ -0,0 +1,73 @@
+"""
+Management-Command: dms_speicher_aufraeumen
+
+Loescht Chunks im DMS-Dateispeicher, die kein Dokument und keine
+DokumentVersion mehr referenziert (Mark-and-Sweep):
+
+  1. Mark:  alle SHA-256 aus inhalt_manifest (Dokument + DokumentVersion)
+            sammeln – nur die Manifest-Spalte wird gelesen, keine Blobs
+  2. Sweep: Chunk-Dateien ausserhalb dieser Menge loeschen, sofern sie
+            aelter als --min-alter Stunden sind
+
+Die Altersgrenze schuetzt Chunks laufender Uploads: sie liegen schon im
+Speicher, ihr Manifest ist aber noch nicht committet. Wiederverwendete
+Chunks bekommen beim Schreiben eine frische mtime.
+
+Laeuft naechtlich ueber den Scheduler (nach loesche_freigegebene_dokumente
+bzw. geloeschten Dokumenten/Versionen).
+
+Aufruf:
+    python manage.py dms_speicher_aufraeumen
+    python manage.py dms_speicher_aufraeumen --dry-run
+    python manage.py dms_speicher_aufraeumen --min-alter 48
+"""
+from django.core.management.base import BaseCommand
+
+from dms.models import Dokument, DokumentVersion
+from dms.speicher import DateisystemSpeicher
+
+
+class Command(BaseCommand):
+    help = "Loescht nicht mehr referenzierte Chunks aus dem DMS-Dateispeicher."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-alter",
+            type=float,
+            default=24.0,
+            help="Nur Chunks loeschen, die aelter als so viele Stunden sind (Standard: 24).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Nur zaehlen, nichts loeschen.",
+        )
+
+    def handle(self, *args, **options):
+        # Auch bei zurueckgestelltem Backend: ausgelagerte Inhalte liegen hier
+        speicher = DateisystemSpeicher()
+        if not speicher.pfad.is_dir():
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"Kein Chunk-Speicher unter {speicher.pfad}.")
+            return
+
+        referenziert = set()
+        for modell in (Dokument, DokumentVersion):
+            manifeste = (
+                modell.objects.filter(inhalt_manifest__isnull=False)
+                .values_list("inhalt_manifest", flat=True)
+                .iterator(chunk_size=2000)
+            )
+            for manifest in manifeste:
+                referenziert.update(chunk_hash for chunk_hash, _laenge in manifest)
+
+        anzahl, groesse = speicher.aufraeumen(
+            referenziert, options["min_alter"] * 3600, dry_run=options["dry_run"],
+        )
+
+        if options["verbosity"] >= 1:
+            verb = "loeschbar" if options["dry_run"] else "geloescht"
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(referenziert)} Chunks referenziert, {anzahl} {verb} "
+                f"({groesse / 1024 / 1024:.1f} MiB)."
+            ))
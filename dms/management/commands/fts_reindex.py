@@ -10,14 +10,18 @@ Verwendung:
     python manage.py fts_reindex
     python manage.py fts_reindex --nur-leer      # nur Dok ohne Vektor
     python manage.py fts_reindex --paperless      # OCR-Text neu aus Paperless holen
-    python manage.py fts_reindex --batch 500      # Stapelgroesse (Standard: 200)
+    python manage.py fts_reindex --batch 1000     # Stapelgroesse (Standard: 500)
+
+Neue Uploads indiziert dms_index_worker; dieser Command ist fuer den
+Komplettlauf gedacht (ein UPDATE pro Stapel, Keyset-Paginierung).
 """
 import logging
+import urllib.error
 
 from django.core.management.base import BaseCommand
 
 from dms.models import Dokument
-from dms.services import suchvektor_befuellen
+from dms.services import paperless_ocr_laden, suchvektoren_aktualisieren
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +43,8 @@ class Command(BaseCommand):
         parser.add_argument(
             "--batch",
             type=int,
-            default=200,
-            help="Anzahl Dokumente pro Datenbankabfrage (Standard: 200)",
+            default=500,
+            help="Anzahl Dokumente pro Datenbankabfrage und UPDATE (Standard: 500)",
         )
 
     def handle(self, *args, **options):
@@ -59,61 +63,52 @@ class Command(BaseCommand):
             f"in Stapeln von {batch} ..."
         )
 
-        # Paperless-Verbindung fuer OCR-Refresh vorbereiten
-        paperless_client = None
+        # Paperless-Verbindung fuer OCR-Refresh pruefen
         if paperless_refresh:
             from django.conf import settings as conf
-            import urllib.request
-            pl_base = getattr(conf, "PAPERLESS_URL", "").rstrip("/")
-            pl_token = getattr(conf, "PAPERLESS_TOKEN", "")
-            if pl_base and pl_token:
-                paperless_client = (pl_base, pl_token)
+            if getattr(conf, "PAPERLESS_URL", "") and getattr(conf, "PAPERLESS_TOKEN", ""):
                 self.stdout.write("  Paperless-API verbunden – OCR-Text wird aktualisiert.")
             else:
                 self.stdout.write("  WARNUNG: PAPERLESS_URL/TOKEN fehlen – kein OCR-Refresh.")
+                paperless_refresh = False
 
         verarbeitet = 0
         fehler = 0
-        offset = 0
+        letzte_id = 0
 
+        # Keyset-Paginierung ueber pk: jeder Stapel ist ein Index-Range-Scan,
+        # auch bei --nur-leer (bereits indizierte Dokumente fallen aus qs heraus)
         while True:
-            stapel = list(qs.order_by("pk")[offset:offset + batch])
+            stapel = list(
+                qs.filter(pk__gt=letzte_id)
+                .order_by("pk")
+                .only("pk", "paperless_id", "ocr_text")[:batch]
+            )
             if not stapel:
                 break
+            letzte_id = stapel[-1].pk
 
+            texte = []
             for dok in stapel:
                 ocr_text = dok.ocr_text or ""
 
                 # Optional: OCR-Text frisch aus Paperless laden
-                if paperless_refresh and dok.paperless_id and paperless_client:
-                    pl_base, pl_token = paperless_client
-                    import json
-                    import urllib.error
+                if paperless_refresh and dok.paperless_id:
                     try:
-                        req = urllib.request.Request(
-                            f"{pl_base}/api/documents/{dok.paperless_id}/",
-                            headers={
-                                "Authorization": f"Token {pl_token}",
-                                "Accept": "application/json",
-                            },
-                        )
-                        with urllib.request.urlopen(req, timeout=15) as resp:
-                            daten = json.loads(resp.read().decode("utf-8"))
-                        ocr_text = (daten.get("content") or "").strip()
-                        if ocr_text != dok.ocr_text:
-                            Dokument.objects.filter(pk=dok.pk).update(ocr_text=ocr_text)
+                        ocr_text = paperless_ocr_laden(dok.paperless_id) or ocr_text
                     except urllib.error.URLError as exc:
                         logger.warning("OCR-Refresh fehlgeschlagen fuer Dok %s: %s", dok.pk, exc)
 
-                try:
-                    suchvektor_befuellen(dok, ocr_text)
-                    verarbeitet += 1
-                except Exception as exc:
-                    logger.error("Reindex fehlgeschlagen fuer Dok %s: %s", dok.pk, exc)
-                    fehler += 1
+                texte.append((dok.pk, ocr_text))
+
+            # Ein UPDATE ... FROM (VALUES ...) pro Stapel
+            try:
+                verarbeitet += suchvektoren_aktualisieren(texte)
+            except Exception as exc:
+                logger.error("Reindex fehlgeschlagen fuer Stapel ab Dok %s: %s", stapel[0].pk, exc)
+                fehler += len(stapel)
 
-            offset += batch
-            self.stdout.write(f"  {min(offset, gesamt)}/{gesamt} verarbeitet ...")
+            self.stdout.write(f"  {verarbeitet + fehler}/{gesamt} verarbeitet ...")
 
         self.stdout.write(
             self.style.SUCCESS(
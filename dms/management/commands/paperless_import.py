@@ -22,7 +22,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from dms.models import Dokument, DokumentKategorie, DokumentTag, PaperlessImportLog, PaperlessWorkflowRegel
-from dms.services import speichere_dokument, suchvektor_befuellen
+from dms.services import speichere_dokument, suchindex_einreihen
 
 logger = logging.getLogger(__name__)
 
@@ -196,8 +196,9 @@ class Command(BaseCommand):
                         )
                         dok.tags.add(prima_tag)
 
-                # Suchvektor nach dem Speichern befuellen (pk benoetigt)
-                suchvektor_befuellen(dok, ocr_text)
+                # Suchvektor baut dms_index_worker aus dem gespeicherten ocr_text auf;
+                # ist Paperless mit der OCR noch nicht fertig, holt er sie spaeter nach
+                suchindex_einreihen(dok, paperless=not ocr_text)
                 PaperlessImportLog.objects.create(
                     paperless_id=pl_id,
                     dokument=dok,
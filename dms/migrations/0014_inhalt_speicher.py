@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dms', '0013_alter_zugriffsprotokoll_aktion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dokument',
+            name='inhalt_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, verbose_name='Inhalt-Hash (SHA-256)'),
+        ),
+        migrations.AddField(
+            model_name='dokument',
+            name='inhalt_manifest',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Chunk-Manifest'),
+        ),
+        migrations.AddField(
+            model_name='dokumentversion',
+            name='inhalt_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, verbose_name='Inhalt-Hash (SHA-256)'),
+        ),
+        migrations.AddField(
+            model_name='dokumentversion',
+            name='inhalt_manifest',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Chunk-Manifest'),
+        ),
+    ]
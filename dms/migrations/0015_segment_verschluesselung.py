@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dms', '0014_inhalt_speicher'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dokument',
+            name='verschluessel_nonce',
+            field=models.CharField(blank=True, max_length=64, verbose_name='AES-GCM Nonce (Hex)'),
+        ),
+        migrations.AlterField(
+            model_name='dokumentversion',
+            name='verschluessel_nonce',
+            field=models.CharField(blank=True, max_length=64, verbose_name='AES-GCM Nonce (Hex)'),
+        ),
+    ]
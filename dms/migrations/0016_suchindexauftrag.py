@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dms', '0015_segment_verschluesselung'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuchIndexAuftrag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eingereiht_am', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Eingereiht am')),
+                ('gesperrt_am', models.DateTimeField(blank=True, help_text='Zeitpunkt der Uebernahme durch den Worker', null=True, verbose_name='Gesperrt am')),
+                ('letzter_fehler', models.TextField(blank=True, verbose_name='Letzter Fehler')),
+                ('paperless_aktualisieren', models.BooleanField(default=False, verbose_name='OCR-Text neu aus Paperless laden')),
+                ('versuche', models.PositiveIntegerField(default=0, verbose_name='Versuche')),
+                ('dokument', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='suchindex_auftrag', to='dms.dokument', verbose_name='Dokument')),
+            ],
+            options={
+                'verbose_name': 'Suchindex-Auftrag',
+                'verbose_name_plural': 'Suchindex-Auftraege',
+                'ordering': ['eingereiht_am'],
+            },
+        ),
+    ]
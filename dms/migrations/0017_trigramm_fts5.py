@@ -0,0 +1,106 @@
+"""
+Migration 0017: Indizes fuer die unscharfe DMS-Suche.
+
+PostgreSQL: pg_trgm-Extension + GIN-Trigramm-Indizes auf titel und dateiname
+            (Tippfehler-Toleranz per TrigramWordSimilarity). Fehlt das Recht
+            zum Anlegen der Extension, wird der Schritt uebersprungen – die
+            Suche faellt dann auf reines FTS zurueck.
+SQLite:     FTS5-Tabelle dms_dokument_fts (External Content auf dms_dokument),
+            per Trigger synchron gehalten. Ersetzt den icontains-Tablescan.
+            Tokenizer seit Migration 0019: trigram (Teilwoerter).
+            Achtung: Baut eine spaetere Migration dms_dokument auf SQLite neu
+            auf (AlterField u. a.), gehen die Trigger verloren – dort dann
+            suchindizes_erstellen() erneut ausfuehren.
+"""
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+_FTS_SPALTEN = "titel, beschreibung, dateiname, ocr_text"
+
+
+def _pg_trigramm_erstellen(schema_editor):
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as exc:
+        logger.warning("pg_trgm nicht verfuegbar, Trigramm-Suche deaktiviert: %s", exc)
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS dms_dokument_titel_trgm "
+        "ON dms_dokument USING GIN (titel gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS dms_dokument_dateiname_trgm "
+        "ON dms_dokument USING GIN (dateiname gin_trgm_ops)"
+    )
+
+
+def _sqlite_fts5_erstellen(schema_editor, tokenize="unicode61 remove_diacritics 2"):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            logger.warning("SQLite ohne FTS5, DMS-Suche bleibt bei icontains.")
+            return
+    neu = "new.titel, new.beschreibung, new.dateiname, new.ocr_text"
+    alt = "old.titel, old.beschreibung, old.dateiname, old.ocr_text"
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS dms_dokument_fts USING fts5("
+        f"{_FTS_SPALTEN}, content='dms_dokument', content_rowid='id', "
+        f"tokenize='{tokenize}')"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS dms_dokument_fts_ai AFTER INSERT ON dms_dokument BEGIN "
+        f"INSERT INTO dms_dokument_fts(rowid, {_FTS_SPALTEN}) VALUES (new.id, {neu}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS dms_dokument_fts_ad AFTER DELETE ON dms_dokument BEGIN "
+        f"INSERT INTO dms_dokument_fts(dms_dokument_fts, rowid, {_FTS_SPALTEN}) "
+        f"VALUES ('delete', old.id, {alt}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS dms_dokument_fts_au AFTER UPDATE OF {_FTS_SPALTEN} "
+        f"ON dms_dokument BEGIN "
+        f"INSERT INTO dms_dokument_fts(dms_dokument_fts, rowid, {_FTS_SPALTEN}) "
+        f"VALUES ('delete', old.id, {alt}); "
+        f"INSERT INTO dms_dokument_fts(rowid, {_FTS_SPALTEN}) VALUES (new.id, {neu}); END"
+    )
+    # Bestand einmalig indizieren
+    schema_editor.execute("INSERT INTO dms_dokument_fts(dms_dokument_fts) VALUES ('rebuild')")
+
+
+def suchindizes_erstellen(apps, schema_editor):
+    """Legt die Suchindizes passend zur Datenbank an."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _pg_trigramm_erstellen(schema_editor)
+    elif vendor == "sqlite":
+        _sqlite_fts5_erstellen(schema_editor)
+
+
+def suchindizes_loeschen(apps, schema_editor):
+    """Entfernt die Suchindizes (die pg_trgm-Extension bleibt bestehen)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS dms_dokument_titel_trgm")
+        schema_editor.execute("DROP INDEX IF EXISTS dms_dokument_dateiname_trgm")
+    elif vendor == "sqlite":
+        for trigger in ("dms_dokument_fts_ai", "dms_dokument_fts_ad", "dms_dokument_fts_au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS dms_dokument_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dms", "0016_suchindexauftrag"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            suchindizes_erstellen,
+            suchindizes_loeschen,
+        ),
+    ]
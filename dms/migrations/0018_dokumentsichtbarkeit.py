@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:49
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def sichtbarkeit_aufbauen(apps, schema_editor):
+    """Erstbefuellung (wie DokumentSichtbarkeit.neu_aufbauen / dms_sichtbarkeit_aufbauen)."""
+    Dokument = apps.get_model("dms", "Dokument")
+    DokumentKategorie = apps.get_model("dms", "DokumentKategorie")
+    DokumentSichtbarkeit = apps.get_model("dms", "DokumentSichtbarkeit")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    HRMitarbeiter = apps.get_model("hr", "HRMitarbeiter")
+    TeamQueue = apps.get_model("formulare", "TeamQueue")
+    WorkflowTask = apps.get_model("workflow", "WorkflowTask")
+
+    dokumente = list(
+        Dokument.objects.filter(klasse="sensibel")
+        .values_list("pk", "eigentuemereinheit_id", "kategorie_id")
+    )
+    if not dokumente:
+        return
+    paare = set(
+        Dokument.sichtbar_fuer.through.objects.filter(dokument__klasse="sensibel")
+        .values_list("dokument_id", "user_id")
+    )
+
+    org_user = defaultdict(set)
+    stelle_user = {}
+    for org_id, stelle_id, user_id in HRMitarbeiter.objects.filter(
+        user__isnull=False, stelle__isnull=False,
+    ).values_list("stelle__org_einheit_id", "stelle_id", "user_id"):
+        org_user[org_id].add(user_id)
+        stelle_user[stelle_id] = user_id
+    team_user = defaultdict(set)
+    for team_id, kuerzel, user_id in TeamQueue.mitglieder.through.objects.values_list(
+        "teamqueue_id", "teamqueue__kuerzel", "user_id",
+    ):
+        team_user[team_id].add(user_id)
+        if kuerzel == "azv":
+            team_user["azv"].add(user_id)
+    azv_kategorie_ids = set(
+        DokumentKategorie.objects.filter(name="Arbeitszeitvereinbarungen").values_list("pk", flat=True)
+    )
+
+    sensibel_ids = set()
+    for dok_id, org_id, kategorie_id in dokumente:
+        sensibel_ids.add(dok_id)
+        paare.update((dok_id, user_id) for user_id in org_user.get(org_id, ()))
+        if kategorie_id in azv_kategorie_ids:
+            paare.update((dok_id, user_id) for user_id in team_user["azv"])
+
+    dok_ct = ContentType.objects.filter(app_label="dms", model="dokument").first()
+    if dok_ct:
+        for dok_id, user_id, team_id, stelle_id in WorkflowTask.objects.filter(
+            instance__content_type=dok_ct,
+            instance__status="laufend",
+            status__in=["offen", "in_bearbeitung"],
+        ).values_list(
+            "instance__object_id", "zugewiesen_an_user_id", "zugewiesen_an_team_id", "zugewiesen_an_stelle_id",
+        ):
+            if dok_id not in sensibel_ids:
+                continue
+            if user_id:
+                paare.add((dok_id, user_id))
+            paare.update((dok_id, mitglied) for mitglied in team_user.get(team_id, ()))
+            if stelle_id in stelle_user:
+                paare.add((dok_id, stelle_user[stelle_id]))
+
+    DokumentSichtbarkeit.objects.bulk_create(
+        [DokumentSichtbarkeit(dokument_id=dok_id, user_id=user_id) for dok_id, user_id in paare],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dms', '0017_trigramm_fts5'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('formulare', '0027_add_antrags_signatur_pdf'),
+        ('hr', '0014_nummernkreis'),
+        ('workflow', '0016_workflowoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DokumentSichtbarkeit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dokument', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sichtbarkeiten', to='dms.dokument', verbose_name='Dokument')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dms_sichtbarkeiten', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Dokument-Sichtbarkeit',
+                'verbose_name_plural': 'Dokument-Sichtbarkeiten',
+                'constraints': [models.UniqueConstraint(fields=('user', 'dokument'), name='dokumentsichtbarkeit_user_dok')],
+            },
+        ),
+        migrations.RunPython(sichtbarkeit_aufbauen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+"""
+Migration 0019: SQLite-FTS5 auf den trigram-Tokenizer umstellen.
+
+Mit unicode61 findet die Praefixsuche nur Wortanfaenge – "plan" trifft
+"Urlaubsplan" nicht, die alte icontains-Suche dagegen schon. trigram
+(SQLite >= 3.34) indiziert Zeichen-Trigramme und findet beliebige
+Teilstrings ab drei Zeichen; ab SQLite 3.45 zusaetzlich ohne Akzente.
+Ist trigram nicht verfuegbar, bleibt die Tabelle bei unicode61
+(dms/suche.py ergaenzt dann bei wenigen Treffern per icontains).
+
+Die Trigger aus 0017 schreiben per Tabellenname und bleiben bestehen.
+PostgreSQL: keine Aenderung.
+"""
+import importlib
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+_fts5 = importlib.import_module("dms.migrations.0017_trigramm_fts5")
+
+# Bevorzugte Tokenizer, der erste verfuegbare gewinnt
+_TRIGRAMM_TOKENIZER = ("trigram remove_diacritics 1", "trigram")
+
+
+def _fts5_tabelle_vorhanden(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dms_dokument_fts'"
+        )
+        return cursor.fetchone() is not None
+
+
+def _neu_erstellen(schema_editor, tokenize):
+    with transaction.atomic(using=schema_editor.connection.alias):
+        schema_editor.execute("DROP TABLE dms_dokument_fts")
+        _fts5._sqlite_fts5_erstellen(schema_editor, tokenize)
+
+
+def trigramm_aktivieren(apps, schema_editor):
+    """Baut die FTS5-Tabelle mit trigram neu auf (nur SQLite mit FTS5)."""
+    if schema_editor.connection.vendor != "sqlite" or not _fts5_tabelle_vorhanden(schema_editor):
+        return
+    for tokenize in _TRIGRAMM_TOKENIZER:
+        try:
+            _neu_erstellen(schema_editor, tokenize)
+        except DatabaseError:
+            continue
+        return
+    logger.warning("SQLite ohne trigram-Tokenizer (< 3.34), DMS-Suche bleibt bei unicode61.")
+
+
+def trigramm_deaktivieren(apps, schema_editor):
+    """Zurueck auf unicode61 (Stand Migration 0017)."""
+    if schema_editor.connection.vendor != "sqlite" or not _fts5_tabelle_vorhanden(schema_editor):
+        return
+    _neu_erstellen(schema_editor, "unicode61 remove_diacritics 2")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dms", "0018_dokumentsichtbarkeit"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            trigramm_aktivieren,
+            trigramm_deaktivieren,
+        ),
+    ]
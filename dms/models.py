@@ -7,14 +7,18 @@ Zwei Dokumentenklassen:
   Klasse 2 – SENSIBEL: Personalakten, Lohnunterlagen, Zeugnisse
                         AES-256-GCM verschluesselt (DMS_VERSCHLUESSEL_KEY)
 
-Alle Inhalte als BinaryField – kein Dateisystem, kein Railway-Ephemeral-FS-Problem.
+Inhalte standardmaessig als BinaryField – kein Dateisystem, kein
+Railway-Ephemeral-FS-Problem. Optional (DMS_SPEICHER_BACKEND="datei") als
+SHA-256-adressierte Chunks im Dateisystem, siehe dms/speicher.py.
 """
 import logging
+from collections import defaultdict
 
 from django.contrib.auth.models import User
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +77,30 @@ class DokumentTag(models.Model):
         return self.name
 
 
+# Felder, die in Listen nie gebraucht werden, aber pro Zeile Megabytes
+# aus der Datenbank holen koennen.
+DOKUMENT_INHALT_FELDER = (
+    "inhalt_roh",
+    "inhalt_verschluesselt",
+    "inhalt_manifest",
+    "ocr_text",
+    "suchvektor",
+)
+
+# Blob-Felder einer DokumentVersion (geladen erst bei der Auslieferung)
+VERSION_INHALT_FELDER = ("inhalt_roh", "inhalt_verschluesselt")
+
+
+class DokumentQuerySet(models.QuerySet):
+    def ohne_inhalt(self):
+        """Fuer Listen: laesst Inhalt, OCR-Text und Suchvektor im SELECT weg.
+
+        Zugriff auf ein zurueckgestelltes Feld laedt es einzeln nach – Views,
+        die den Inhalt ausliefern, laden das Dokument daher ohne ohne_inhalt().
+        """
+        return self.defer(*DOKUMENT_INHALT_FELDER)
+
+
 class Dokument(models.Model):
     """Zentrales DMS-Dokument – eine Klasse fuer beide Dokumentenklassen.
 
@@ -83,6 +111,9 @@ class Dokument(models.Model):
     Klasse 2 (sensibel):
       - inhalt_verschluesselt befuellt (AES-256-GCM), inhalt_roh leer
       - suchvektor leer (kein FTS-Index auf sensible Daten)
+
+    Bei DMS_SPEICHER_BACKEND="datei" bleiben beide BinaryFields leer; der
+    Inhalt liegt dann ueber inhalt_manifest im Chunk-Speicher.
     """
 
     # ------------------------------------------------------------------
@@ -123,24 +154,35 @@ class Dokument(models.Model):
     inhalt_verschluesselt = models.BinaryField(
         null=True, blank=True, verbose_name="Inhalt (AES-256-GCM, Klasse 2)"
     )
+    # Alt-Format: 12-Byte-Nonce (Hex); Segment-Format: "s1:" + Salt (Hex)
     verschluessel_nonce = models.CharField(
-        max_length=24,
+        max_length=64,
         blank=True,
         verbose_name="AES-GCM Nonce (Hex)",
     )
+    # Ausgelagerter Inhalt (dms/speicher.py): SHA-256 der gespeicherten Bytes
+    # (bei Klasse 2 des Chiffretexts) und Chunk-Liste [[sha256, laenge], ...].
+    # inhalt_manifest leer = Inhalt liegt in inhalt_roh / inhalt_verschluesselt.
+    inhalt_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, editable=False,
+        verbose_name="Inhalt-Hash (SHA-256)",
+    )
+    inhalt_manifest = models.JSONField(
+        null=True, blank=True, editable=False, verbose_name="Chunk-Manifest",
+    )
 
     # ------------------------------------------------------------------
     # Volltext-Suchvektor (nur Klasse 1)
     # ------------------------------------------------------------------
     # PostgreSQL tsvector-Spalte mit GIN-Index.
-    # Wird befuellt durch suchvektor_befuellen() in services.py:
+    # Wird asynchron befuellt durch dms_index_worker (suchindex_einreihen()):
     #   - Titel (Gewicht A), Beschreibung (Gewicht B), OCR-Text (Gewicht C)
     # Sensible Dokumente (Klasse 2): bleibt leer (kein FTS auf verschluesselte Daten).
     suchvektor = SearchVectorField(null=True, blank=True, editable=False, verbose_name="Suchvektor")
 
-    # OCR-Text aus Paperless-ngx (nur Klasse 1, nur bei Paperless-Import).
-    # Wird fuer den Suchvektor verwendet und ermoeglicht spaetere Reindizierung
-    # ohne erneuten Paperless-API-Aufruf.
+    # OCR-Text aus Paperless-ngx bzw. lokal extrahierter Text (nur Klasse 1,
+    # dms_index_worker). Wird fuer den Suchvektor verwendet und ermoeglicht
+    # spaetere Reindizierung ohne erneute Extraktion oder Paperless-API-Aufruf.
     ocr_text = models.TextField(blank=True, editable=False, verbose_name="OCR-Text")
 
     # ------------------------------------------------------------------
@@ -239,6 +281,8 @@ class Dokument(models.Model):
         verbose_name="Workflow-Instanz",
     )
 
+    objects = DokumentQuerySet.as_manager()
+
     class Meta:
         ordering = ["-erstellt_am"]
         verbose_name = "Dokument"
@@ -486,7 +530,14 @@ class DokumentVersion(models.Model):
         max_length=300, blank=True, verbose_name="Kommentar"
     )
     verschluessel_nonce = models.CharField(
-        max_length=24, blank=True, verbose_name="AES-GCM Nonce (Hex)"
+        max_length=64, blank=True, verbose_name="AES-GCM Nonce (Hex)"
+    )
+    inhalt_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, editable=False,
+        verbose_name="Inhalt-Hash (SHA-256)",
+    )
+    inhalt_manifest = models.JSONField(
+        null=True, blank=True, editable=False, verbose_name="Chunk-Manifest",
     )
     version_nr = models.PositiveIntegerField(verbose_name="Versionsnummer")
 
@@ -659,3 +710,258 @@ class PaperlessWorkflowRegel(models.Model):
 
     def __str__(self):
         return f"{self.bezeichnung} [{self.get_treffer_typ_display()}: {self.paperless_name}]"
+
+
+class SuchIndexAuftrag(models.Model):
+    """Warteschlange fuer den Volltext-Index (abgearbeitet von dms_index_worker).
+
+    Uploads legen nur einen Auftrag an (suchindex_einreihen in services.py);
+    Textextraktion und tsvector-Aufbau laufen ausserhalb des Requests.
+    Pro Dokument gibt es hoechstens einen offenen Auftrag – erneutes
+    Einreihen setzt eingereiht_am neu, damit ein gerade laufender Worker
+    den Auftrag danach nicht loescht.
+    """
+
+    MAX_VERSUCHE = 5
+
+    dokument = models.OneToOneField(
+        Dokument,
+        on_delete=models.CASCADE,
+        related_name="suchindex_auftrag",
+        verbose_name="Dokument",
+    )
+    eingereiht_am = models.DateTimeField(default=timezone.now, verbose_name="Eingereiht am")
+    gesperrt_am = models.DateTimeField(
+        null=True, blank=True, verbose_name="Gesperrt am",
+        help_text="Zeitpunkt der Uebernahme durch den Worker",
+    )
+    letzter_fehler = models.TextField(blank=True, verbose_name="Letzter Fehler")
+    paperless_aktualisieren = models.BooleanField(
+        default=False, verbose_name="OCR-Text neu aus Paperless laden",
+    )
+    versuche = models.PositiveIntegerField(default=0, verbose_name="Versuche")
+
+    class Meta:
+        ordering = ["eingereiht_am"]
+        verbose_name = "Suchindex-Auftrag"
+        verbose_name_plural = "Suchindex-Auftraege"
+
+    def __str__(self):
+        return f"Suchindex Dokument #{self.dokument_id} ({self.eingereiht_am:%d.%m.%Y %H:%M})"
+
+
+# Dokumente dieser Kategorie sieht das AZV-Team (TeamQueue kuerzel="azv")
+AZV_KATEGORIE = "Arbeitszeitvereinbarungen"
+
+
+class DokumentSichtbarkeit(models.Model):
+    """Vorberechnete Sichtbarkeit sensibler Dokumente: eine Zeile je (Dokument, User).
+
+    dokument_liste filtert damit per Semi-Join ueber den Unique-Index
+    (user, dokument) statt ueber ODER-verknuepfte Unterabfragen. Regeln
+    wie _darf_sensibel_zugreifen (ohne Zugriffsschluessel):
+      - Mitglied der Eigentuemer-OrgEinheit (hr_mitarbeiter.stelle.org_einheit)
+      - Eintrag in sichtbar_fuer
+      - AZV-Team bei Dokumenten der Kategorie AZV_KATEGORIE
+      - offener Task eines laufenden Workflows (User, Team oder Stelle)
+
+    Offene Dokumente haben keine Zeilen. Die Signals in dms/signals.py halten
+    die Tabelle aktuell; Aenderungen ohne Signals (QuerySet.update, Umbenennen
+    der AZV-Kategorie) holt dms_sichtbarkeit_aufbauen nach.
+    """
+
+    dokument = models.ForeignKey(
+        Dokument,
+        on_delete=models.CASCADE,
+        related_name="sichtbarkeiten",
+        verbose_name="Dokument",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="dms_sichtbarkeiten",
+        verbose_name="User",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "dokument"], name="dokumentsichtbarkeit_user_dok"),
+        ]
+        verbose_name = "Dokument-Sichtbarkeit"
+        verbose_name_plural = "Dokument-Sichtbarkeiten"
+
+    def __str__(self):
+        return f"Dokument #{self.dokument_id} sichtbar fuer User #{self.user_id}"
+
+    @staticmethod
+    def berechtigte(dokumente):
+        """Berechtigte User-IDs je Dokument.
+
+        Args:
+            dokumente: Iterable von (id, eigentuemereinheit_id, kategorie_id)
+                sensibler Dokumente
+
+        Returns:
+            {dokument_id: {user_id, ...}}
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from formulare.models import TeamQueue
+        from hr.models import HRMitarbeiter
+        from workflow.models import WorkflowInstance, WorkflowTask
+
+        dokumente = list(dokumente)
+        ergebnis = {dok_id: set() for dok_id, _, _ in dokumente}
+        if not dokumente:
+            return ergebnis
+
+        for dok_id, user_id in Dokument.sichtbar_fuer.through.objects.filter(
+            dokument_id__in=ergebnis,
+        ).values_list("dokument_id", "user_id"):
+            ergebnis[dok_id].add(user_id)
+
+        org_user = defaultdict(set)
+        for org_id, user_id in HRMitarbeiter.objects.filter(
+            user__isnull=False,
+            stelle__org_einheit_id__in={org_id for _, org_id, _ in dokumente if org_id},
+        ).values_list("stelle__org_einheit_id", "user_id"):
+            org_user[org_id].add(user_id)
+
+        azv_kategorie_ids = set(
+            DokumentKategorie.objects.filter(name=AZV_KATEGORIE).values_list("pk", flat=True)
+        )
+        azv_user = set(
+            TeamQueue.mitglieder.through.objects.filter(
+                teamqueue__kuerzel="azv",
+            ).values_list("user_id", flat=True)
+        )
+
+        for dok_id, org_id, kategorie_id in dokumente:
+            ergebnis[dok_id] |= org_user.get(org_id, set())
+            if kategorie_id in azv_kategorie_ids:
+                ergebnis[dok_id] |= azv_user
+
+        tasks = list(
+            WorkflowTask.objects.filter(
+                instance__content_type=ContentType.objects.get_for_model(Dokument),
+                instance__object_id__in=ergebnis,
+                instance__status=WorkflowInstance.STATUS_LAUFEND,
+                status__in=[WorkflowTask.STATUS_OFFEN, WorkflowTask.STATUS_IN_BEARBEITUNG],
+            ).values_list(
+                "instance__object_id",
+                "zugewiesen_an_user_id",
+                "zugewiesen_an_team_id",
+                "zugewiesen_an_stelle_id",
+            )
+        )
+        if tasks:
+            team_user = defaultdict(set)
+            for team_id, user_id in TeamQueue.mitglieder.through.objects.filter(
+                teamqueue_id__in={team_id for _, _, team_id, _ in tasks if team_id},
+            ).values_list("teamqueue_id", "user_id"):
+                team_user[team_id].add(user_id)
+            stelle_user = dict(
+                HRMitarbeiter.objects.filter(
+                    user__isnull=False,
+                    stelle_id__in={stelle_id for _, _, _, stelle_id in tasks if stelle_id},
+                ).values_list("stelle_id", "user_id")
+            )
+            for dok_id, user_id, team_id, stelle_id in tasks:
+                if user_id:
+                    ergebnis[dok_id].add(user_id)
+                ergebnis[dok_id] |= team_user.get(team_id, set())
+                if stelle_id in stelle_user:
+                    ergebnis[dok_id].add(stelle_user[stelle_id])
+
+        return ergebnis
+
+    @classmethod
+    def fuer_dokumente_aktualisieren(cls, dokument_ids):
+        """Berechnet die Zeilen der angegebenen Dokumente neu."""
+        dokument_ids = set(dokument_ids)
+        if not dokument_ids:
+            return
+        berechtigte = cls.berechtigte(
+            Dokument.objects.filter(pk__in=dokument_ids, klasse="sensibel")
+            .values_list("pk", "eigentuemereinheit_id", "kategorie_id")
+        )
+        with transaction.atomic():
+            cls.objects.filter(dokument_id__in=dokument_ids).delete()
+            cls.objects.bulk_create(
+                [cls(dokument_id=dok_id, user_id=user_id)
+                 for dok_id, user_ids in berechtigte.items() for user_id in user_ids],
+                batch_size=1000,
+            )
+
+    @classmethod
+    def fuer_user_aktualisieren(cls, user):
+        """Berechnet die Zeilen eines Users neu (Team-, Stellen- oder OrgEinheit-Wechsel).
+
+        Andere User der betroffenen Dokumente bleiben unberuehrt.
+        user darf ein User oder eine User-ID sein.
+        """
+        from formulare.models import TeamQueue
+        from hr.models import HRMitarbeiter
+        from workflow.models import WorkflowInstance, WorkflowTask
+
+        user_id = getattr(user, "pk", user)
+        # Kandidaten: bisher sichtbare Dokumente + alle, die es jetzt sein koennten
+        bedingung = models.Q(sichtbar_fuer=user)
+        org_einheit_id = (
+            HRMitarbeiter.objects.filter(user=user)
+            .values_list("stelle__org_einheit_id", flat=True).first()
+        )
+        if org_einheit_id:
+            bedingung |= models.Q(eigentuemereinheit_id=org_einheit_id)
+        if TeamQueue.objects.filter(kuerzel="azv", mitglieder=user).exists():
+            bedingung |= models.Q(kategorie__name=AZV_KATEGORIE)
+        kandidaten = set(cls.objects.filter(user=user).values_list("dokument_id", flat=True))
+        kandidaten |= set(
+            Dokument.objects.filter(klasse="sensibel").filter(bedingung).values_list("pk", flat=True)
+        )
+        kandidaten |= set(
+            WorkflowTask.objects.filter(
+                models.Q(zugewiesen_an_user=user)
+                | models.Q(zugewiesen_an_team__mitglieder=user)
+                | models.Q(zugewiesen_an_stelle__hrmitarbeiter__user=user),
+                instance__content_type__app_label="dms",
+                instance__content_type__model="dokument",
+                instance__status=WorkflowInstance.STATUS_LAUFEND,
+                status__in=[WorkflowTask.STATUS_OFFEN, WorkflowTask.STATUS_IN_BEARBEITUNG],
+            ).values_list("instance__object_id", flat=True)
+        )
+
+        berechtigte = cls.berechtigte(
+            Dokument.objects.filter(pk__in=kandidaten, klasse="sensibel")
+            .values_list("pk", "eigentuemereinheit_id", "kategorie_id")
+        )
+        sichtbar = {dok_id for dok_id, user_ids in berechtigte.items() if user_id in user_ids}
+        with transaction.atomic():
+            cls.objects.filter(user=user).exclude(dokument_id__in=sichtbar).delete()
+            cls.objects.bulk_create(
+                [cls(dokument_id=dok_id, user_id=user_id) for dok_id in sichtbar],
+                ignore_conflicts=True,
+            )
+
+    @classmethod
+    def neu_aufbauen(cls, batch: int = 500) -> int:
+        """Baut die gesamte Tabelle neu auf. Gibt die Anzahl Zeilen zurueck."""
+        anzahl = 0
+        letzte_id = 0
+        with transaction.atomic():
+            cls.objects.all().delete()
+            while True:
+                stapel = list(
+                    Dokument.objects.filter(klasse="sensibel", pk__gt=letzte_id)
+                    .order_by("pk")
+                    .values_list("pk", "eigentuemereinheit_id", "kategorie_id")[:batch]
+                )
+                if not stapel:
+                    break
+                letzte_id = stapel[-1][0]
+                zeilen = cls.objects.bulk_create(
+                    [cls(dokument_id=dok_id, user_id=user_id)
+                     for dok_id, user_ids in cls.berechtigte(stapel).items() for user_id in user_ids],
+                    batch_size=1000,
+                )
+                anzahl += len(zeilen)
+        return anzahl
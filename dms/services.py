@@ -1,21 +1,39 @@
 """
 DMS-Verschluesselungs-Service.
 
-Klasse 2 (sensibel): AES-256-GCM mit serverseitigem Schluessel (DMS_VERSCHLUESSEL_KEY).
+Klasse 2 (sensibel): AES-256-GCM mit serverseitigem Schluessel (DMS_VERSCHLUESSEL_KEY),
+                     in 1-MiB-Segmenten (Streaming, Range-Zugriff ohne Volldekodierung).
 Klasse 1 (offen):    Kein Schluessel – Rohdaten werden direkt gespeichert.
 
 Schluessel generieren (einmalig):
     python -c "import os; print(os.urandom(32).hex())"
+
+Ablage der (ggf. verschluesselten) Bytes: je nach DMS_SPEICHER_BACKEND in den
+BinaryFields oder als Chunks im Dateisystem (dms/speicher.py). Views greifen
+nur ueber speichere_*/lade_* zu, nie direkt auf inhalt_roh/inhalt_verschluesselt.
 """
+import itertools
 import logging
 import os
 
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from django.conf import settings
 
+from .speicher import DateisystemSpeicher, get_speicher, inhalt_hash
+
 logger = logging.getLogger(__name__)
 
-NONCE_BYTES = 12  # AES-GCM Standard-Nonce
+NONCE_BYTES = 12  # AES-GCM Standard-Nonce (Alt-Format: ein GCM ueber die ganze Datei)
+TAG_BYTES = 16
+
+# Segment-Format (Streaming): 1 MiB Klartext je GCM-Segment
+SEGMENT_FORMAT = "s1:"
+SEGMENT_GROESSE = 1024 * 1024
+SEGMENT_CHIFFRE_GROESSE = SEGMENT_GROESSE + TAG_BYTES
+SEGMENT_SALT_BYTES = 16
+SEGMENT_PRAEFIX_BYTES = 7
 
 
 def _get_aes_schluessel() -> bytes:
@@ -32,18 +50,95 @@ def _get_aes_schluessel() -> bytes:
     return key
 
 
+def _segment_chiffre(nonce_feld: str) -> tuple[AESGCM, bytes]:
+    """Leitet Datei-Schluessel und Nonce-Praefix aus Hauptschluessel + Salt ab."""
+    salt = bytes.fromhex(nonce_feld[len(SEGMENT_FORMAT):])
+    material = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32 + SEGMENT_PRAEFIX_BYTES,
+        salt=salt,
+        info=b"PRIMA-DMS-Segment-v1",
+    ).derive(_get_aes_schluessel())
+    return AESGCM(material[:32]), material[32:]
+
+
+def _segment_nonce(praefix: bytes, index: int, letztes: bool) -> bytes:
+    """Nonce = Praefix (7) | Segmentnummer (4, big endian) | Letztes-Flag (1)."""
+    return praefix + index.to_bytes(4, "big") + (b"\x01" if letztes else b"\x00")
+
+
+def ist_segmentiert(nonce_feld: str) -> bool:
+    """True fuer das Segment-Format, False fuer Alt-Inhalte (ein GCM ueber alles)."""
+    return bool(nonce_feld) and nonce_feld.startswith(SEGMENT_FORMAT)
+
+
+def _segment_anzahl(chiffre_laenge: int) -> int:
+    return max(1, -(-chiffre_laenge // SEGMENT_CHIFFRE_GROESSE))
+
+
+def klartext_laenge(chiffre_laenge: int, nonce_feld: str) -> int:
+    """Klartextgroesse aus der Groesse des gespeicherten Chiffretexts."""
+    if ist_segmentiert(nonce_feld):
+        return chiffre_laenge - TAG_BYTES * _segment_anzahl(chiffre_laenge)
+    return max(chiffre_laenge - TAG_BYTES, 0)
+
+
 def verschluessel_inhalt(inhalt: bytes) -> tuple[bytes, str]:
-    """Verschluesselt Dokumentinhalt mit AES-256-GCM.
+    """Verschluesselt Dokumentinhalt segmentweise mit AES-256-GCM.
+
+    Je SEGMENT_GROESSE Klartext ein eigenes GCM-Segment (+16 Byte Tag).
+    Segmentnummer und Letztes-Flag stecken in der Nonce – Vertauschen,
+    Weglassen oder Abschneiden von Segmenten faellt beim Entschluesseln auf.
 
     Returns:
-        (verschluesselte_bytes, nonce_hex)
-        Beide Werte in der DB speichern.
+        (verschluesselte_bytes, nonce_feld)
+        Beide Werte in der DB speichern. nonce_feld = "s1:" + Salt (Hex).
     """
-    aes_schluessel = _get_aes_schluessel()
-    nonce = os.urandom(NONCE_BYTES)
-    aesgcm = AESGCM(aes_schluessel)
-    verschluesselt = aesgcm.encrypt(nonce, inhalt, None)
-    return verschluesselt, nonce.hex()
+    nonce_feld = SEGMENT_FORMAT + os.urandom(SEGMENT_SALT_BYTES).hex()
+    aesgcm, praefix = _segment_chiffre(nonce_feld)
+    ansicht = memoryview(inhalt)
+    anzahl = max(1, -(-len(inhalt) // SEGMENT_GROESSE))
+    segmente = []
+    for index in range(anzahl):
+        segment = ansicht[index * SEGMENT_GROESSE:(index + 1) * SEGMENT_GROESSE]
+        nonce = _segment_nonce(praefix, index, index == anzahl - 1)
+        segmente.append(aesgcm.encrypt(nonce, bytes(segment), None))
+    return b"".join(segmente), nonce_feld
+
+
+def iter_entschluessel(teile, nonce_feld: str, chiffre_laenge: int, erstes_segment: int = 0):
+    """Entschluesselt segmentweise – Speicherbedarf ein Segment, egal wie gross die Datei.
+
+    Args:
+        teile:          Iterator ueber Chiffretext-Stuecke beliebiger Groesse,
+                        beginnend an der Grenze von Segment erstes_segment
+        nonce_feld:     Wert aus verschluessel_nonce (Segment-Format)
+        chiffre_laenge: Gesamtgroesse des gespeicherten Chiffretexts
+        erstes_segment: Nummer des ersten gelieferten Segments (Range-Zugriff)
+
+    Yields:
+        Klartext je Segment
+
+    Raises:
+        cryptography.exceptions.InvalidTag: Segment manipuliert, vertauscht oder abgeschnitten
+    """
+    aesgcm, praefix = _segment_chiffre(nonce_feld)
+    letztes = _segment_anzahl(chiffre_laenge) - 1
+    index = erstes_segment
+    puffer = bytearray()
+
+    def _entschluessele(segment):
+        return aesgcm.decrypt(_segment_nonce(praefix, index, index == letztes), bytes(segment), None)
+
+    for teil in teile:
+        puffer += teil
+        while len(puffer) >= SEGMENT_CHIFFRE_GROESSE and index < letztes:
+            yield _entschluessele(puffer[:SEGMENT_CHIFFRE_GROESSE])
+            del puffer[:SEGMENT_CHIFFRE_GROESSE]
+            index += 1
+    if puffer:
+        # Rest = Schlusssegment (jedes Segment hat mind. 16 Byte Tag)
+        yield _entschluessele(puffer)
 
 
 def entschluessel_inhalt(verschluesselt: bytes, nonce_hex: str) -> bytes:
@@ -51,7 +146,7 @@ def entschluessel_inhalt(verschluesselt: bytes, nonce_hex: str) -> bytes:
 
     Args:
         verschluesselt: Verschluesselte Bytes aus der DB
-        nonce_hex: Hex-Nonce aus der DB
+        nonce_hex: Nonce-Feld aus der DB (Segment-Format oder Alt-Format Hex)
 
     Returns:
         Originale Datei-Bytes
@@ -60,38 +155,160 @@ def entschluessel_inhalt(verschluesselt: bytes, nonce_hex: str) -> bytes:
         ValueError: Schluessel fehlt oder falsche Laenge
         cryptography.exceptions.InvalidTag: Daten manipuliert oder Schluessel falsch
     """
+    if ist_segmentiert(nonce_hex):
+        return b"".join(iter_entschluessel([verschluesselt], nonce_hex, len(verschluesselt)))
     aes_schluessel = _get_aes_schluessel()
     nonce = bytes.fromhex(nonce_hex)
     aesgcm = AESGCM(aes_schluessel)
     return aesgcm.decrypt(nonce, bytes(verschluesselt), None)
 
 
+# Felder, die speichere_dokument()/speichere_version() befuellen –
+# fuer save(update_fields=...) in den Aufrufern.
+INHALT_FELDER = [
+    "inhalt_roh", "inhalt_verschluesselt", "verschluessel_nonce",
+    "inhalt_hash", "inhalt_manifest",
+]
+
+
+def _speichere_inhalt(obj, inhalt_bytes: bytes, sensibel: bool) -> None:
+    """Verschluesselt (Klasse 2) und legt die Bytes im konfigurierten Speicher ab."""
+    if sensibel:
+        gespeichert, nonce_hex = verschluessel_inhalt(inhalt_bytes)
+    else:
+        gespeichert, nonce_hex = inhalt_bytes, ""
+
+    speicher = get_speicher()
+    obj.verschluessel_nonce = nonce_hex
+    obj.inhalt_hash = inhalt_hash(gespeichert)
+    obj.inhalt_roh = None
+    obj.inhalt_verschluesselt = None
+    if speicher.AUSGELAGERT:
+        obj.inhalt_manifest = speicher.schreibe(gespeichert)
+    else:
+        obj.inhalt_manifest = None
+        if sensibel:
+            obj.inhalt_verschluesselt = gespeichert
+        else:
+            obj.inhalt_roh = gespeichert
+
+
+def _ist_sensibel(obj) -> bool:
+    """Dokument traegt die Klasse selbst, DokumentVersion erbt sie vom Dokument."""
+    klasse = getattr(obj, "klasse", None) or obj.dokument.klasse
+    return klasse == "sensibel"
+
+
+def _chunk_speicher():
+    speicher = get_speicher()
+    if not speicher.AUSGELAGERT:
+        # Backend zurueckgestellt – ausgelagerte Inhalte bleiben lesbar
+        speicher = DateisystemSpeicher()
+    return speicher
+
+
+def _gespeichert_laenge(obj, sensibel: bool) -> int:
+    if obj.inhalt_manifest is not None:
+        return sum(laenge for _hash, laenge in obj.inhalt_manifest)
+    feld = obj.inhalt_verschluesselt if sensibel else obj.inhalt_roh
+    return len(feld) if feld else 0
+
+
+def _iter_gespeichert(obj, sensibel: bool, start: int, ende: int):
+    """Liefert die gespeicherten Bytes [start, ende) stueckweise."""
+    if obj.inhalt_manifest is not None:
+        yield from _chunk_speicher().iter_lese_bereich(obj.inhalt_manifest, start, ende)
+        return
+    feld = obj.inhalt_verschluesselt if sensibel else obj.inhalt_roh
+    if not feld:
+        return
+    ansicht = memoryview(feld)
+    for pos in range(start, ende, SEGMENT_GROESSE):
+        yield bytes(ansicht[pos:min(pos + SEGMENT_GROESSE, ende)])
+
+
+def _iter_klartext(obj, sensibel: bool, start: int, ende: int):
+    """Liefert den Klartext [start, ende) – bei Segment-Format nur die beruehrten Segmente."""
+    if start >= ende:
+        return
+    if not sensibel:
+        yield from _iter_gespeichert(obj, False, start, ende)
+        return
+
+    chiffre_laenge = _gespeichert_laenge(obj, True)
+    nonce_feld = obj.verschluessel_nonce
+    if not ist_segmentiert(nonce_feld):
+        # Alt-Format: ein GCM-Tag ueber die ganze Datei – nur vollstaendig pruefbar
+        gespeichert = b"".join(_iter_gespeichert(obj, True, 0, chiffre_laenge))
+        yield entschluessel_inhalt(gespeichert, nonce_feld)[start:ende]
+        return
+
+    erstes = start // SEGMENT_GROESSE
+    letztes = (ende - 1) // SEGMENT_GROESSE
+    teile = _iter_gespeichert(
+        obj, True,
+        erstes * SEGMENT_CHIFFRE_GROESSE,
+        min((letztes + 1) * SEGMENT_CHIFFRE_GROESSE, chiffre_laenge),
+    )
+    pos = erstes * SEGMENT_GROESSE
+    for klartext in iter_entschluessel(teile, nonce_feld, chiffre_laenge, erstes):
+        yield klartext[max(start - pos, 0):ende - pos]
+        pos += len(klartext)
+
+
+def inhalt_groesse(obj) -> int:
+    """Klartextgroesse eines Dokuments oder einer DokumentVersion (ohne Laden)."""
+    sensibel = _ist_sensibel(obj)
+    chiffre_laenge = _gespeichert_laenge(obj, sensibel)
+    if sensibel and chiffre_laenge:
+        return klartext_laenge(chiffre_laenge, obj.verschluessel_nonce)
+    return chiffre_laenge
+
+
+def iter_inhalt(obj, start: int = 0, ende: int | None = None):
+    """Klartext eines Dokuments/einer Version als Iterator (fuer StreamingHttpResponse).
+
+    Speicherbedarf: ein Segment bzw. ein Chunk statt der ganzen Datei.
+    Das erste Stueck wird sofort entschluesselt – fehlender Schluessel oder
+    manipulierte Daten fallen damit vor dem Senden der Antwort auf.
+
+    Args:
+        start, ende: Byte-Bereich [start, ende) des Klartexts (Standard: alles)
+    """
+    if ende is None:
+        ende = inhalt_groesse(obj)
+    teile = _iter_klartext(obj, _ist_sensibel(obj), start, ende)
+    erstes = next(teile, None)
+    if erstes is None:
+        return iter(())
+    return itertools.chain([erstes], teile)
+
+
+def _lade_inhalt(obj) -> bytes:
+    return b"".join(_iter_klartext(obj, _ist_sensibel(obj), 0, inhalt_groesse(obj)))
+
+
 def speichere_dokument(dokument, inhalt_bytes: bytes) -> None:
     """Speichert Dokumentinhalt – verschluesselt (Klasse 2) oder roh (Klasse 1).
 
     Befuellt die richtigen Felder des Dokument-Objekts (ohne .save() aufzurufen).
     """
-    if dokument.klasse == "sensibel":
-        verschluesselt, nonce_hex = verschluessel_inhalt(inhalt_bytes)
-        dokument.inhalt_verschluesselt = verschluesselt
-        dokument.verschluessel_nonce = nonce_hex
-        dokument.inhalt_roh = None
-    else:
-        dokument.inhalt_roh = inhalt_bytes
-        dokument.inhalt_verschluesselt = None
-        dokument.verschluessel_nonce = ""
+    _speichere_inhalt(dokument, inhalt_bytes, dokument.klasse == "sensibel")
+
+
+def speichere_version(version, inhalt_bytes: bytes) -> None:
+    """Wie speichere_dokument(), fuer eine DokumentVersion (Klasse vom Dokument)."""
+    _speichere_inhalt(version, inhalt_bytes, version.dokument.klasse == "sensibel")
 
 
 def lade_dokument_inhalt(dokument) -> bytes:
     """Laedt den Dokumentinhalt – entschluesselt bei Klasse 2, roh bei Klasse 1."""
-    if dokument.klasse == "sensibel":
-        if not dokument.inhalt_verschluesselt:
-            return b""
-        return entschluessel_inhalt(
-            bytes(dokument.inhalt_verschluesselt),
-            dokument.verschluessel_nonce,
-        )
-    return bytes(dokument.inhalt_roh) if dokument.inhalt_roh else b""
+    return _lade_inhalt(dokument)
+
+
+def lade_version(version) -> bytes:
+    """Laedt den Inhalt einer DokumentVersion (entschluesselt bei Klasse 2)."""
+    return _lade_inhalt(version)
 
 
 def suchvektor_befuellen(dokument, ocr_text: str = "") -> None:
@@ -127,6 +344,106 @@ def suchvektor_befuellen(dokument, ocr_text: str = "") -> None:
     DokumentModel.objects.filter(pk=dokument.pk).update(suchvektor=vektor)
 
 
+def suchindex_einreihen(dokument, paperless: bool = False) -> None:
+    """Reiht ein gespeichertes Dokument fuer den Volltextindex ein.
+
+    Ersetzt im Request den direkten Aufruf von suchvektor_befuellen():
+    Textextraktion und tsvector-Aufbau uebernimmt dms_index_worker.
+    Sensible Dokumente (Klasse 2) werden nicht indiziert.
+
+    Args:
+        paperless: OCR-Text vor dem Indizieren neu aus Paperless laden
+    """
+    from django.utils import timezone
+
+    from .models import SuchIndexAuftrag
+
+    if dokument.klasse == "sensibel":
+        return
+    SuchIndexAuftrag.objects.update_or_create(
+        dokument_id=dokument.pk,
+        defaults={
+            "eingereiht_am": timezone.now(),
+            "gesperrt_am": None,
+            "letzter_fehler": "",
+            "paperless_aktualisieren": paperless,
+            "versuche": 0,
+        },
+    )
+
+
+def suchvektoren_aktualisieren(texte) -> int:
+    """Schreibt Volltext und Suchvektor vieler Dokumente in einem UPDATE.
+
+    PostgreSQL: UPDATE ... FROM (VALUES ...) mit derselben Gewichtung wie
+    suchvektor_befuellen() (Titel A, Beschreibung B, Text C). Andere
+    Datenbanken: nur ocr_text (kein tsvector).
+
+    Args:
+        texte: Liste von (dokument_id, text)
+
+    Returns:
+        Anzahl aktualisierter Dokumente
+    """
+    from django.db import connection
+
+    from .models import Dokument as DokumentModel
+
+    texte = list(texte)
+    if not texte:
+        return 0
+    if connection.vendor != "postgresql":
+        return DokumentModel.objects.bulk_update(
+            [DokumentModel(pk=dok_id, ocr_text=text) for dok_id, text in texte], ["ocr_text"]
+        )
+
+    werte = ", ".join(["(%s::bigint, %s::text)"] * len(texte))
+    parameter = [wert for paar in texte for wert in paar]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {DokumentModel._meta.db_table} AS d
+               SET ocr_text = v.text,
+                   suchvektor =
+                       setweight(to_tsvector('german', COALESCE(d.titel, '')), 'A')
+                       || setweight(to_tsvector('german', COALESCE(d.beschreibung, '')), 'B')
+                       || setweight(to_tsvector('german', v.text), 'C')
+              FROM (VALUES {werte}) AS v(id, text)
+             WHERE d.id = v.id AND d.klasse = 'offen'
+            """,
+            parameter,
+        )
+        return cursor.rowcount
+
+
+def paperless_ocr_laden(paperless_id) -> str | None:
+    """Laedt den OCR-Text eines Dokuments aus der Paperless-ngx-API.
+
+    Returns:
+        OCR-Text, oder None wenn PAPERLESS_URL/PAPERLESS_TOKEN fehlen
+
+    Raises:
+        urllib.error.URLError: Paperless nicht erreichbar
+    """
+    import json
+    import urllib.request
+
+    pl_base = getattr(settings, "PAPERLESS_URL", "").rstrip("/")
+    pl_token = getattr(settings, "PAPERLESS_TOKEN", "")
+    if not pl_base or not pl_token:
+        return None
+    req = urllib.request.Request(
+        f"{pl_base}/api/documents/{paperless_id}/",
+        headers={
+            "Authorization": f"Token {pl_token}",
+            "Accept": "application/json",
+        },
+    )
+    with urllib.request.urlopen(req, timeout=15) as resp:
+        daten = json.loads(resp.read().decode("utf-8"))
+    return (daten.get("content") or "").strip()
+
+
 def lade_dokument(dokument) -> bytes:
     """Laedt und (falls noetig) entschluesselt den Dokumentinhalt.
 
@@ -136,14 +453,13 @@ def lade_dokument(dokument) -> bytes:
     Raises:
         ValueError: Dokument hat keinen Inhalt
     """
-    if dokument.klasse == "sensibel":
-        if not dokument.inhalt_verschluesselt or not dokument.verschluessel_nonce:
+    sensibel = dokument.klasse == "sensibel"
+    hat_inhalt = dokument.inhalt_manifest is not None or (
+        dokument.inhalt_verschluesselt if sensibel else dokument.inhalt_roh
+    )
+    if sensibel:
+        if not hat_inhalt or not dokument.verschluessel_nonce:
             raise ValueError(f"Dokument {dokument.pk} hat keinen verschluesselten Inhalt.")
-        return entschluessel_inhalt(
-            bytes(dokument.inhalt_verschluesselt),
-            dokument.verschluessel_nonce,
-        )
-    else:
-        if not dokument.inhalt_roh:
-            raise ValueError(f"Dokument {dokument.pk} hat keinen Inhalt.")
-        return bytes(dokument.inhalt_roh)
+    elif not hat_inhalt:
+        raise ValueError(f"Dokument {dokument.pk} hat keinen Inhalt.")
+    return _lade_inhalt(dokument)
@@ -0,0 +1,152 @@
+"""
+Signals der DMS-App: DokumentSichtbarkeit aktuell halten.
+
+  Dokument gespeichert (Klasse, Kategorie, OrgEinheit) → Zeilen des Dokuments
+  sichtbar_fuer geaendert                               → Zeilen des Dokuments
+  WorkflowTask/-Instance gespeichert oder geloescht     → Zeilen des Dokuments
+  Team-Mitgliedschaft, Stelle eines Mitarbeiters        → Zeilen des Users
+  User eines Mitarbeiters gewechselt                    → Zeilen des alten und neuen Users
+  Mitarbeiter geloescht                                 → Zeilen des Users
+  OrgEinheit einer Stelle geaendert                     → Zeilen der Stelleninhaber
+
+Massen-Updates ueber QuerySet.update() loesen keine Signals aus; dafuer gibt
+es dms_sichtbarkeit_aufbauen.
+"""
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from formulare.models import TeamQueue
+from hr.models import HRMitarbeiter, Stelle
+from workflow.models import WorkflowInstance, WorkflowTask
+
+from .models import Dokument, DokumentSichtbarkeit
+
+# Nur Aenderungen dieser Felder beeinflussen die Sichtbarkeit
+_SICHTBARKEIT_FELDER = {"klasse", "kategorie", "kategorie_id", "eigentuemereinheit", "eigentuemereinheit_id"}
+
+
+@receiver(post_save, sender=Dokument, dispatch_uid="dms_sichtbarkeit_dokument")
+def sichtbarkeit_nach_dokument_speichern(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not _SICHTBARKEIT_FELDER.intersection(update_fields):
+        return
+    if created and instance.klasse != "sensibel":
+        return  # offene Dokumente haben keine Zeilen
+    DokumentSichtbarkeit.fuer_dokumente_aktualisieren([instance.pk])
+
+
+@receiver(m2m_changed, sender=Dokument.sichtbar_fuer.through, dispatch_uid="dms_sichtbarkeit_freigabe")
+def sichtbarkeit_nach_freigabe(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        DokumentSichtbarkeit.fuer_dokumente_aktualisieren([instance.pk])
+    elif action == "post_clear":
+        DokumentSichtbarkeit.fuer_user_aktualisieren(instance)
+    else:
+        DokumentSichtbarkeit.fuer_dokumente_aktualisieren(pk_set)
+
+
+def _workflow_dokument(instance_id):
+    """Dokument-ID einer WorkflowInstance oder None, wenn sie kein Dokument betrifft."""
+    return (
+        WorkflowInstance.objects
+        .filter(pk=instance_id, content_type=ContentType.objects.get_for_model(Dokument))
+        .values_list("object_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=WorkflowTask, dispatch_uid="dms_sichtbarkeit_task_speichern")
+@receiver(post_delete, sender=WorkflowTask, dispatch_uid="dms_sichtbarkeit_task_loeschen")
+def sichtbarkeit_nach_task(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    dok_id = _workflow_dokument(instance.instance_id)
+    if dok_id is not None:
+        DokumentSichtbarkeit.fuer_dokumente_aktualisieren([dok_id])
+
+
+@receiver(post_save, sender=WorkflowInstance, dispatch_uid="dms_sichtbarkeit_workflow")
+def sichtbarkeit_nach_workflow(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return  # neue Instanzen haben noch keine Tasks
+    if instance.content_type_id == ContentType.objects.get_for_model(Dokument).pk:
+        DokumentSichtbarkeit.fuer_dokumente_aktualisieren([instance.object_id])
+
+
+@receiver(m2m_changed, sender=TeamQueue.mitglieder.through, dispatch_uid="dms_sichtbarkeit_team")
+def sichtbarkeit_nach_teamwechsel(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and not reverse:
+        # Nach dem Leeren sind die bisherigen Mitglieder nicht mehr abfragbar
+        instance._sichtbarkeit_mitglieder = list(instance.mitglieder.all())
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        users = [instance]
+    elif action == "post_clear":
+        users = getattr(instance, "_sichtbarkeit_mitglieder", [])
+    else:
+        users = User.objects.filter(pk__in=pk_set)
+    for user in users:
+        DokumentSichtbarkeit.fuer_user_aktualisieren(user)
+
+
+def _vorher(modell, instance, felder):
+    """Gespeicherte Werte der felder vor dem Speichern (leer bei neuen Objekten)."""
+    if instance.pk is None:
+        return {}
+    return modell.objects.filter(pk=instance.pk).values(*felder).first() or {}
+
+
+@receiver(pre_save, sender=HRMitarbeiter, dispatch_uid="dms_sichtbarkeit_mitarbeiter_vorher")
+def sichtbarkeit_mitarbeiter_merken(sender, instance, raw=False, **kwargs):
+    instance._sichtbarkeit_vorher = {} if raw else _vorher(HRMitarbeiter, instance, ["user_id", "stelle_id"])
+
+
+@receiver(post_save, sender=HRMitarbeiter, dispatch_uid="dms_sichtbarkeit_mitarbeiter")
+def sichtbarkeit_nach_stellenwechsel(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"stelle", "stelle_id", "user", "user_id"}.intersection(update_fields):
+        return
+    vorher = getattr(instance, "_sichtbarkeit_vorher", {})
+    alter_user_id = vorher.get("user_id")
+    if alter_user_id and alter_user_id != instance.user_id:
+        # Der bisherige User verliert die Sichtbarkeit ueber diesen Mitarbeiter
+        DokumentSichtbarkeit.fuer_user_aktualisieren(alter_user_id)
+    if instance.user_id is not None and (
+        not vorher or vorher != {"user_id": instance.user_id, "stelle_id": instance.stelle_id}
+    ):
+        DokumentSichtbarkeit.fuer_user_aktualisieren(instance.user_id)
+
+
+@receiver(post_delete, sender=HRMitarbeiter, dispatch_uid="dms_sichtbarkeit_mitarbeiter_loeschen")
+def sichtbarkeit_nach_mitarbeiter_loeschen(sender, instance, origin=None, **kwargs):
+    if instance.user_id is None:
+        return
+    # User geloescht: dessen Zeilen fallen per Kaskade ohnehin weg
+    if isinstance(origin, User) or getattr(origin, "model", None) is User:
+        return
+    DokumentSichtbarkeit.fuer_user_aktualisieren(instance.user_id)
+
+
+@receiver(pre_save, sender=Stelle, dispatch_uid="dms_sichtbarkeit_stelle_vorher")
+def sichtbarkeit_stelle_merken(sender, instance, raw=False, **kwargs):
+    instance._sichtbarkeit_vorher = {} if raw else _vorher(Stelle, instance, ["org_einheit_id"])
+
+
+@receiver(post_save, sender=Stelle, dispatch_uid="dms_sichtbarkeit_stelle")
+def sichtbarkeit_nach_org_wechsel(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return  # neue Stellen haben noch keine Inhaber
+    vorher = getattr(instance, "_sichtbarkeit_vorher", {})
+    if vorher.get("org_einheit_id") == instance.org_einheit_id:
+        return
+    inhaber = HRMitarbeiter.objects.filter(stelle=instance, user__isnull=False).values_list("user_id", flat=True)
+    for user_id in inhaber:
+        DokumentSichtbarkeit.fuer_user_aktualisieren(user_id)
@@ -0,0 +1,208 @@
+"""
+DMS-Inhaltsspeicher (DokumentSpeicher).
+
+Legt Dokumentinhalte wahlweise in der Datenbank (BinaryField, Standard)
+oder inhaltsadressiert im Dateisystem ab:
+
+  "datenbank" → inhalt_roh / inhalt_verschluesselt wie bisher
+  "datei"     → Inhalt in Chunks (Standard 4 MiB) zerlegt, jeder Chunk unter
+                seinem SHA-256 abgelegt: <DMS_SPEICHER_PFAD>/ab/cd/abcd...
+                In der DB bleiben nur inhalt_hash + inhalt_manifest.
+
+Identische Chunks werden nur einmal gespeichert – unveraenderte Teile
+aufeinanderfolgender Versionen belegen dadurch keinen zusaetzlichen Platz.
+Sensible Dokumente (Klasse 2) werden vor dem Ablegen verschluesselt;
+der Speicher sieht nur Chiffretext.
+
+Umstellung bestehender Dokumente: python manage.py dms_blobs_auslagern
+
+Chunks werden beim Loeschen eines Dokuments nicht sofort entfernt (andere
+Versionen/Dokumente koennen sie teilen). dms_speicher_aufraeumen loescht
+per Mark-and-Sweep alle Chunks, die kein inhalt_manifest mehr referenziert.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STANDARD_CHUNK_GROESSE = 4 * 1024 * 1024  # 4 MiB
+
+_SPEICHER_CACHE = None
+
+
+class DokumentSpeicher:
+    """Abstrakte Basisklasse – alle Speicher-Backends erben hiervon."""
+
+    SPEICHER_NAME = "abstract"
+    # False = Inhalt bleibt in den BinaryFields des Dokuments
+    AUSGELAGERT = True
+
+    def schreibe(self, daten: bytes) -> list:
+        """Legt daten ab und gibt das Chunk-Manifest zurueck.
+
+        Returns:
+            Liste [[sha256_hex, laenge], ...] in Dateireihenfolge
+        """
+        raise NotImplementedError
+
+    def lese_chunk(self, chunk_hash: str) -> bytes:
+        """Liest einen einzelnen Chunk anhand seines SHA-256."""
+        raise NotImplementedError
+
+    def iter_lese(self, manifest: list):
+        """Liefert den Inhalt chunkweise (konstanter Speicherbedarf)."""
+        for chunk_hash, _laenge in manifest:
+            yield self.lese_chunk(chunk_hash)
+
+    def iter_lese_bereich(self, manifest: list, start: int, ende: int):
+        """Liefert nur die Bytes [start, ende) – liest ausschliesslich die beruehrten Chunks."""
+        pos = 0
+        for chunk_hash, laenge in manifest:
+            chunk_ende = pos + laenge
+            if chunk_ende > start and pos < ende:
+                chunk = self.lese_chunk(chunk_hash)
+                yield chunk[max(start - pos, 0):min(ende, chunk_ende) - pos]
+            pos = chunk_ende
+            if pos >= ende:
+                break
+
+    def lese(self, manifest: list) -> bytes:
+        """Setzt den vollstaendigen Inhalt aus dem Manifest zusammen."""
+        return b"".join(self.iter_lese(manifest))
+
+
+class DatenbankSpeicher(DokumentSpeicher):
+    """Bisheriges Verhalten: Inhalt bleibt als BinaryField in der Tabelle."""
+
+    SPEICHER_NAME = "datenbank"
+    AUSGELAGERT = False
+
+
+class DateisystemSpeicher(DokumentSpeicher):
+    """Inhaltsadressierter Chunk-Speicher im lokalen Dateisystem."""
+
+    SPEICHER_NAME = "datei"
+
+    def __init__(self, pfad=None, chunk_groesse=None):
+        self.pfad = Path(pfad or getattr(settings, "DMS_SPEICHER_PFAD", "")
+                         or Path(settings.MEDIA_ROOT) / "dms_blobs")
+        self.chunk_groesse = chunk_groesse or getattr(
+            settings, "DMS_CHUNK_GROESSE", STANDARD_CHUNK_GROESSE
+        )
+
+    def _chunk_pfad(self, chunk_hash: str) -> Path:
+        return self.pfad / chunk_hash[:2] / chunk_hash[2:4] / chunk_hash
+
+    def _schreibe_chunk(self, chunk: bytes) -> str:
+        chunk_hash = hashlib.sha256(chunk).hexdigest()
+        ziel = self._chunk_pfad(chunk_hash)
+        try:
+            # Deduplizierung: Chunk bereits vorhanden. mtime auffrischen, damit
+            # dms_speicher_aufraeumen ihn nicht vor dem Commit des Manifests loescht.
+            os.utime(ziel)
+            return chunk_hash
+        except FileNotFoundError:
+            pass
+
+        ziel.parent.mkdir(parents=True, exist_ok=True)
+        # Atomar schreiben: temporaere Datei im Zielordner, dann umbenennen
+        fd, tmp_pfad = tempfile.mkstemp(dir=ziel.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_pfad, ziel)
+        except BaseException:
+            try:
+                os.unlink(tmp_pfad)
+            except OSError:
+                pass
+            raise
+        return chunk_hash
+
+    def schreibe(self, daten: bytes) -> list:
+        manifest = []
+        ansicht = memoryview(daten)
+        for start in range(0, len(daten), self.chunk_groesse):
+            chunk = bytes(ansicht[start:start + self.chunk_groesse])
+            manifest.append([self._schreibe_chunk(chunk), len(chunk)])
+        return manifest
+
+    def lese_chunk(self, chunk_hash: str) -> bytes:
+        pfad = self._chunk_pfad(chunk_hash)
+        try:
+            with open(pfad, "rb") as f:
+                chunk = f.read()
+        except FileNotFoundError:
+            raise ValueError(f"DMS-Chunk {chunk_hash} fehlt im Speicher ({self.pfad}).")
+        if hashlib.sha256(chunk).hexdigest() != chunk_hash:
+            raise ValueError(f"DMS-Chunk {chunk_hash} ist beschaedigt (Pruefsumme falsch).")
+        return chunk
+
+    def aufraeumen(self, referenziert, min_alter: float, dry_run: bool = False):
+        """Loescht Chunks (und liegengebliebene .tmp-Dateien), die nicht in referenziert sind.
+
+        Args:
+            referenziert: Menge der SHA-256 aller noch genutzten Chunks
+            min_alter: nur Dateien loeschen, die aelter sind (Sekunden) – schuetzt
+                       Chunks laufender Uploads, deren Manifest noch nicht committet ist
+            dry_run: nur zaehlen
+
+        Returns:
+            (anzahl, bytes) der geloeschten bzw. loeschbaren Dateien
+        """
+        grenze = time.time() - min_alter
+        anzahl = groesse = 0
+        if not self.pfad.is_dir():
+            return anzahl, groesse
+        for datei in self.pfad.glob("??/??/*"):
+            if datei.name in referenziert:
+                continue
+            try:
+                info = datei.stat()
+                if info.st_mtime >= grenze:
+                    continue
+                if not dry_run:
+                    datei.unlink()
+            except FileNotFoundError:
+                continue
+            anzahl += 1
+            groesse += info.st_size
+        return anzahl, groesse
+
+
+def get_speicher() -> DokumentSpeicher:
+    """
+    Gibt den konfigurierten DMS-Speicher zurueck (settings.DMS_SPEICHER_BACKEND).
+    Wird gecacht nach erstem Aufruf.
+    """
+    global _SPEICHER_CACHE
+    if _SPEICHER_CACHE is not None:
+        return _SPEICHER_CACHE
+
+    name = getattr(settings, "DMS_SPEICHER_BACKEND", "datenbank") or "datenbank"
+
+    if name == "datenbank":
+        _SPEICHER_CACHE = DatenbankSpeicher()
+    elif name == "datei":
+        _SPEICHER_CACHE = DateisystemSpeicher()
+    else:
+        raise ValueError(
+            f"Unbekannter DMS_SPEICHER_BACKEND: '{name}'. "
+            "Erlaubt: 'datenbank', 'datei'"
+        )
+
+    logger.info("DMS-Speicher: %s", name)
+    return _SPEICHER_CACHE
+
+
+def inhalt_hash(daten: bytes) -> str:
+    """SHA-256 (hex) des gespeicherten Inhalts – Grundlage fuer Manifest und ETag."""
+    return hashlib.sha256(daten).hexdigest()
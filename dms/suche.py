@@ -0,0 +1,152 @@
+"""
+Indexgestuetzte DMS-Suche fuer PostgreSQL und SQLite.
+
+volltext_filtern(qs, q) waehlt je Datenbank den passenden Weg:
+
+  PostgreSQL  FTS auf suchvektor (GIN). Liefert das weniger als
+              DMS_SUCHE_MIN_TREFFER Treffer und ist pg_trgm installiert,
+              kommen Trigramm-Treffer auf titel/dateiname dazu (Tippfehler,
+              Teilwoerter in Komposita). Sortierung: FTS-Rang, dann Aehnlichkeit.
+  SQLite      FTS5-Tabelle dms_dokument_fts (Migration 0017, per Trigger
+              synchron). Tokenizer trigram (Migration 0019): Teilstring-
+              Suche je Wort wie icontains – Woerter unter drei Zeichen kann
+              trigram nicht abfragen, sie werden per icontains auf die
+              FTS-Treffer angewandt. Alte SQLite-Versionen ohne trigram
+              (unicode61): Praefixsuche je Wort, bei weniger als
+              DMS_SUCHE_MIN_TREFFER Treffern ergaenzt um icontains auf den Titel.
+  sonst       icontains auf Titel/Beschreibung (Tablescan).
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Verfuegbarkeit der optionalen Indizes je Datenbank-Alias (einmal pro Prozess)
+_verfuegbar = {}
+
+_WORT_RE = re.compile(r"\w+", re.UNICODE)
+
+# trigram kann nur Terme ab dieser Laenge abfragen
+TRIGRAMM_MIN_LAENGE = 3
+
+
+def _abfrage(sql):
+    """Erste Spalte der ersten Zeile (oder None), je Datenbank-Alias gecacht."""
+    alias = connection.alias
+    if (alias, sql) not in _verfuegbar:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            zeile = cursor.fetchone()
+            _verfuegbar[(alias, sql)] = zeile[0] if zeile else None
+    return _verfuegbar[(alias, sql)]
+
+
+def trigramm_verfuegbar():
+    """True, wenn pg_trgm installiert ist (Migration 0017 hat die Indizes angelegt)."""
+    return _abfrage("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'") is not None
+
+
+def _fts5_definition():
+    return _abfrage(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'dms_dokument_fts'"
+    )
+
+
+def fts5_verfuegbar():
+    """True, wenn die SQLite-FTS5-Tabelle existiert."""
+    return _fts5_definition() is not None
+
+
+def fts5_trigramm():
+    """True, wenn die FTS5-Tabelle den trigram-Tokenizer nutzt (Migration 0019)."""
+    return "trigram" in (_fts5_definition() or "")
+
+
+def fts5_ausdruck(q, trigramm=False):
+    """Baut aus der Benutzereingabe einen sicheren FTS5-MATCH-Ausdruck.
+
+    unicode61: jedes Wort als Praefix-Phrase ("wort"*).
+    trigram:   jedes Wort ab TRIGRAMM_MIN_LAENGE Zeichen als Phrase ("wort") –
+               trifft es an beliebiger Stelle; kuerzere Woerter entfallen.
+    Gequotet greift FTS5-Syntax (AND/OR/NEAR, Spaltenfilter, Sonderzeichen)
+    aus der Eingabe nicht. Leerer String, wenn kein Wort uebrig bleibt.
+    """
+    woerter = _WORT_RE.findall(q)
+    if trigramm:
+        return " ".join(f'"{wort}"' for wort in woerter if len(wort) >= TRIGRAMM_MIN_LAENGE)
+    return " ".join(f'"{wort}"*' for wort in woerter)
+
+
+def _icontains(q):
+    return Q(titel__icontains=q) | Q(beschreibung__icontains=q)
+
+
+def _sqlite_fts5(qs, q):
+    trigramm = fts5_trigramm()
+    ausdruck = fts5_ausdruck(q, trigramm)
+    if not ausdruck:
+        # Nur Woerter unter drei Zeichen (trigram) bzw. gar keine Woerter
+        return qs.filter(_icontains(q)) if trigramm and _WORT_RE.search(q) else qs.none()
+    fts = Q(pk__in=RawSQL(
+        "SELECT rowid FROM dms_dokument_fts WHERE dms_dokument_fts MATCH %s",
+        (ausdruck,),
+    ))
+    if trigramm:
+        treffer = qs.filter(fts)
+        for wort in _WORT_RE.findall(q):
+            if len(wort) < TRIGRAMM_MIN_LAENGE:
+                treffer = treffer.filter(_icontains(wort))
+        return treffer
+    # unicode61 findet nur Wortanfaenge: bei wenigen Treffern Teilwoerter im Titel ergaenzen
+    min_treffer = getattr(settings, "DMS_SUCHE_MIN_TREFFER", 5)
+    if qs.filter(fts)[:min_treffer].count() >= min_treffer:
+        return qs.filter(fts)
+    return qs.filter(fts | Q(titel__icontains=q))
+
+
+def _postgres(qs, q):
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        TrigramWordSimilarity,
+    )
+    from django.db.models import F
+    from django.db.models.functions import Greatest
+
+    query = SearchQuery(q, config="german")
+    treffer = qs.filter(suchvektor=query)
+    min_treffer = getattr(settings, "DMS_SUCHE_MIN_TREFFER", 5)
+    if not trigramm_verfuegbar() or treffer[:min_treffer].count() >= min_treffer:
+        # Nutzt den GIN-Index auf suchvektor (tsvector-Spalte).
+        return treffer.annotate(rank=SearchRank("suchvektor", query)).order_by("-rank")
+
+    # Wenige FTS-Treffer: Trigramm-Operatoren (%>) nutzen die GIN-Indizes
+    # auf titel/dateiname; PostgreSQL verknuepft alle drei per BitmapOr.
+    return (
+        qs.filter(
+            Q(suchvektor=query)
+            | Q(titel__trigram_word_similar=q)
+            | Q(dateiname__trigram_word_similar=q)
+        )
+        .annotate(
+            rank=SearchRank("suchvektor", query),
+            aehnlichkeit=Greatest(
+                TrigramWordSimilarity(q, "titel"),
+                TrigramWordSimilarity(q, "dateiname"),
+            ),
+        )
+        .order_by(F("rank").desc(nulls_last=True), "-aehnlichkeit")
+    )
+
+
+def volltext_filtern(qs, q):
+    """Filtert und sortiert ein Dokument-QuerySet nach dem Suchbegriff q."""
+    if connection.vendor == "postgresql":
+        return _postgres(qs, q)
+
+    if connection.vendor == "sqlite" and fts5_verfuegbar():
+        return _sqlite_fts5(qs, q)
+
+    return qs.filter(_icontains(q))
@@ -0,0 +1,474 @@
+import importlib
+import io
+import os
+import re
+import tempfile
+import time
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    AZV_KATEGORIE,
+    DOKUMENT_INHALT_FELDER,
+    ApiToken,
+    Dokument,
+    DokumentKategorie,
+    DokumentSichtbarkeit,
+    DokumentZugriffsschluessel,
+    SuchIndexAuftrag,
+    ZugriffsProtokoll,
+)
+from .services import speichere_dokument, suchindex_einreihen
+from .speicher import DateisystemSpeicher
+from . import suche
+from .suche import fts5_ausdruck, volltext_filtern
+from .textextraktion import extrahiere_text
+
+
+class ListenOhneInhaltTest(TestCase):
+    """Listen-Views duerfen Inhalt, OCR-Text und Suchvektor nie selektieren."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("dms_admin", password="x", is_staff=True)
+        cls.user = User.objects.create_user("dms_user", password="x")
+        inhalt = b"%PDF" + b"x" * 4096
+        cls.offen = Dokument.objects.create(
+            titel="Betriebsanweisung", dateiname="ba.pdf", dateityp="application/pdf",
+            groesse_bytes=len(inhalt), inhalt_roh=inhalt, ocr_text="Volltext " * 100,
+            erstellt_von=cls.admin,
+        )
+        Dokument.objects.create(
+            titel="Eigene Notiz", dateiname="notiz.pdf", dateityp="application/pdf",
+            groesse_bytes=len(inhalt), inhalt_roh=inhalt, ist_persoenlich=True,
+            erstellt_von=cls.user,
+        )
+        DokumentZugriffsschluessel.objects.create(
+            dokument=cls.offen, user=cls.user, antrag_grund="Pruefung",
+        )
+        ZugriffsProtokoll.objects.create(dokument=cls.offen, user=cls.admin, aktion="loeschen")
+        cls.api_token = ApiToken.objects.create(bezeichnung="Test")
+
+    def _selektierte_spalten(self, queries):
+        """SELECT-Listen aller erfassten Queries (ohne WHERE/ORDER BY)."""
+        for query in queries:
+            sql = query["sql"]
+            if sql.lstrip().upper().startswith("SELECT"):
+                yield re.split(r"\sFROM\s", sql, maxsplit=1)[0]
+
+    def assertKeinInhaltSelektiert(self, antwort_holen):
+        with CaptureQueriesContext(connection) as ctx:
+            antwort = antwort_holen()
+        self.assertEqual(antwort.status_code, 200)
+        for select in self._selektierte_spalten(ctx.captured_queries):
+            for feld in DOKUMENT_INHALT_FELDER:
+                self.assertNotIn(f'"{feld}"', select)
+
+    def test_dokument_liste(self):
+        for user in (self.user, self.admin):
+            self.client.force_login(user)
+            self.assertKeinInhaltSelektiert(lambda: self.client.get(reverse("dms:liste")))
+
+    def test_meine_ablage(self):
+        self.client.force_login(self.user)
+        self.assertKeinInhaltSelektiert(lambda: self.client.get(reverse("dms:meine_ablage")))
+
+    def test_zugriffsantraege_und_loeschprotokoll(self):
+        self.client.force_login(self.admin)
+        self.assertKeinInhaltSelektiert(lambda: self.client.get(reverse("dms:zugriffsantraege")))
+        self.assertKeinInhaltSelektiert(lambda: self.client.get(reverse("dms:loeschprotokoll")))
+
+    def test_api_dokumente(self):
+        self.assertKeinInhaltSelektiert(lambda: self.client.get(
+            reverse("dms:api_dokumente"),
+            HTTP_AUTHORIZATION=f"Bearer {self.api_token.token}",
+        ))
+
+
+class SpeicherAufraeumenTest(TestCase):
+    """dms_speicher_aufraeumen loescht nur alte, nicht referenzierte Chunks."""
+
+    def test_mark_and_sweep(self):
+        with tempfile.TemporaryDirectory() as pfad, override_settings(DMS_SPEICHER_PFAD=pfad):
+            speicher = DateisystemSpeicher(chunk_groesse=4)
+            manifest = speicher.schreibe(b"abcdefgh")
+            Dokument.objects.create(
+                titel="Chunked", dateiname="c.txt", dateityp="text/plain", groesse_bytes=8,
+                inhalt_manifest=manifest,
+            )
+            verwaist = speicher._chunk_pfad(speicher.schreibe(b"weg!")[0][0])
+            frisch = speicher._chunk_pfad(speicher.schreibe(b"neu!")[0][0])
+            alt = time.time() - 2 * 86400
+            for datei in [verwaist] + [speicher._chunk_pfad(h) for h, _l in manifest]:
+                os.utime(datei, (alt, alt))
+
+            call_command("dms_speicher_aufraeumen", verbosity=0)
+
+            self.assertFalse(verwaist.exists())
+            self.assertTrue(frisch.exists())  # juenger als --min-alter
+            self.assertEqual(speicher.lese(manifest), b"abcdefgh")
+
+            # Wiederverwendung frischt die mtime auf – kein Loeschen vor dem Commit
+            speicher.schreibe(b"abcd")
+            self.assertGreater(speicher._chunk_pfad(manifest[0][0]).stat().st_mtime, alt)
+
+
+class InhaltAuslieferungTest(TestCase):
+    """ETag/304 und Range/206 am Beispiel der Vorschau (gleicher Pfad fuer Download/API)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("dms_leser", password="x")
+        cls.inhalt = bytes(range(256)) * 40
+        cls.dok = Dokument(
+            titel="Handbuch", dateiname="handbuch.pdf", dateityp="application/pdf",
+            groesse_bytes=len(cls.inhalt),
+        )
+        speichere_dokument(cls.dok, cls.inhalt)
+        cls.dok.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse("dms:vorschau", args=[self.dok.pk])
+
+    def test_etag_und_304(self):
+        antwort = self.client.get(self.url)
+        self.assertEqual(antwort.status_code, 200)
+        self.assertEqual(b"".join(antwort.streaming_content), self.inhalt)
+        etag = antwort["ETag"]
+        self.assertIn(self.dok.inhalt_hash, etag)
+
+        with CaptureQueriesContext(connection) as ctx:
+            antwort = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(antwort.status_code, 304)
+        for query in ctx.captured_queries:
+            self.assertNotIn('"inhalt_roh"', query["sql"])
+
+    def test_range(self):
+        antwort = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(antwort.status_code, 206)
+        self.assertEqual(antwort["Content-Range"], f"bytes 100-199/{len(self.inhalt)}")
+        self.assertEqual(b"".join(antwort.streaming_content), self.inhalt[100:200])
+
+        antwort = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(antwort.streaming_content), self.inhalt[-10:])
+
+        antwort = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.inhalt)}-")
+        self.assertEqual(antwort.status_code, 416)
+
+    def test_teilabruf_wird_protokolliert(self):
+        protokoll = ZugriffsProtokoll.objects.filter(dokument=self.dok, aktion="vorschau")
+        # Auch ein Bereich ab Byte > 0 ist ein Abruf – egal, was der Client anfordert
+        self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(protokoll.count(), 1)
+        # Weitere Bereiche desselben Users im Zeitfenster: kein neuer Eintrag
+        self.client.get(self.url, HTTP_RANGE="bytes=0-99")
+        self.assertEqual(protokoll.count(), 1)
+        # Volle Antwort: immer protokolliert
+        self.client.get(self.url)
+        self.assertEqual(protokoll.count(), 2)
+        self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.inhalt)}-")
+        self.assertEqual(protokoll.count(), 2)
+
+    def test_if_range_veraltet_liefert_alles(self):
+        antwort = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"veraltet-1"')
+        self.assertEqual(antwort.status_code, 200)
+        self.assertEqual(b"".join(antwort.streaming_content), self.inhalt)
+
+
+class TextextraktionTest(TestCase):
+    """Lokale Textextraktion je Dateiformat."""
+
+    def test_docx(self):
+        from docx import Document as DocxDocument
+
+        doc = DocxDocument()
+        doc.add_paragraph("Brandschutzordnung Teil B")
+        doc.add_table(rows=1, cols=2).rows[0].cells[0].text = "Sammelplatz"
+        puffer = io.BytesIO()
+        doc.save(puffer)
+        text = extrahiere_text(puffer.getvalue(), "", "ordnung.docx")
+        self.assertIn("Brandschutzordnung", text)
+        self.assertIn("Sammelplatz", text)
+
+    def test_xlsx(self):
+        from openpyxl import Workbook
+
+        mappe = Workbook()
+        mappe.active.title = "Inventar"
+        mappe.active.append(["Feuerloescher", 12, None])
+        puffer = io.BytesIO()
+        mappe.save(puffer)
+        text = extrahiere_text(puffer.getvalue(), "", "liste.xlsx")
+        self.assertIn("Inventar", text)
+        self.assertIn("Feuerloescher 12", text)
+
+    def test_text_und_unbekannt(self):
+        self.assertEqual(extrahiere_text(b"a\x00b", "text/plain"), "a b")
+        self.assertEqual(extrahiere_text(b"\x89PNG", "image/png", "bild.png"), "")
+
+    def test_kaputtes_pdf_wirft(self):
+        with self.assertRaises(Exception):
+            extrahiere_text(b"%PDF-kaputt", "application/pdf")
+
+
+class IndexWorkerTest(TransactionTestCase):
+    """dms_index_worker arbeitet die Warteschlange ab und laedt Inhalte nur einzeln.
+
+    TransactionTestCase: der Worker claimt auf SQLite unter BEGIN IMMEDIATE
+    und lehnt den Aufruf innerhalb von atomic() ab.
+    """
+
+    def _dokument(self, titel, inhalt, dateityp="text/plain", **felder):
+        dok = Dokument(
+            titel=titel, dateiname=f"{titel}.txt", dateityp=dateityp,
+            groesse_bytes=len(inhalt), **felder,
+        )
+        speichere_dokument(dok, inhalt)
+        dok.save()
+        suchindex_einreihen(dok)
+        return dok
+
+    def _worker(self):
+        call_command("dms_index_worker", einmal=True, verbosity=0)
+
+    def test_text_wird_extrahiert_und_auftrag_geloescht(self):
+        dok = self._dokument("notiz", "Fluchtweg Nord".encode())
+        with CaptureQueriesContext(connection) as ctx:
+            self._worker()
+        dok.refresh_from_db()
+        self.assertEqual(dok.ocr_text, "Fluchtweg Nord")
+        self.assertFalse(SuchIndexAuftrag.objects.exists())
+        # Der Stapel selbst (IN-Liste) selektiert keine Blobs
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if sql.startswith("SELECT") and " IN (" in sql and '"dms_dokument"' in sql:
+                self.assertNotIn('"inhalt_roh"', sql.split(" FROM ")[0])
+
+    def test_fehler_wird_am_auftrag_vermerkt(self):
+        dok = self._dokument("kaputt", b"%PDF-kaputt", dateityp="application/pdf")
+        self._worker()
+        auftrag = SuchIndexAuftrag.objects.get(dokument=dok)
+        self.assertEqual(auftrag.versuche, 1)
+        self.assertIsNone(auftrag.gesperrt_am)
+        self.assertTrue(auftrag.letzter_fehler)
+        self.assertGreater(auftrag.eingereiht_am, timezone.now())
+
+    def test_paperless_ocr(self):
+        dok = self._dokument("scan", b"lokaler Text", paperless_id=7, ocr_text="OCR aus Paperless")
+        self._worker()
+        dok.refresh_from_db()
+        self.assertEqual(dok.ocr_text, "OCR aus Paperless")
+
+        # Leerer OCR-Text (z.B. nach OnlyOffice-Bearbeitung): lokal extrahieren
+        Dokument.objects.filter(pk=dok.pk).update(ocr_text="")
+        suchindex_einreihen(dok)
+        self._worker()
+        dok.refresh_from_db()
+        self.assertEqual(dok.ocr_text, "lokaler Text")
+
+        suchindex_einreihen(dok, paperless=True)
+        with mock.patch(
+            "dms.management.commands.dms_index_worker.paperless_ocr_laden", return_value="frische OCR",
+        ) as laden:
+            self._worker()
+        laden.assert_called_once_with(7)
+        dok.refresh_from_db()
+        self.assertEqual(dok.ocr_text, "frische OCR")
+
+
+class FtsReindexTest(TestCase):
+    """fts_reindex blaettert per Keyset ueber alle offenen Dokumente."""
+
+    def test_alle_stapel(self):
+        for nr in range(5):
+            Dokument.objects.create(
+                titel=f"Dok {nr}", dateiname="d.txt", dateityp="text/plain", groesse_bytes=1,
+                ocr_text=f"Text {nr}",
+            )
+        Dokument.objects.create(
+            titel="Geheim", dateiname="g.txt", dateityp="text/plain", groesse_bytes=1, klasse="sensibel",
+        )
+        ausgabe = io.StringIO()
+        call_command("fts_reindex", batch=2, stdout=ausgabe)
+        self.assertIn("Fertig: 5 Suchvektoren aufgebaut, 0 Fehler.", ausgabe.getvalue())
+
+
+class VolltextSucheTest(TestCase):
+    """Suche ueber volltext_filtern (FTS5, PostgreSQL-FTS oder icontains je nach DB)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for titel in ("Urlaubsplan Sommer", "Betriebsanweisung Stapler"):
+            Dokument.objects.create(
+                titel=titel, dateiname="d.pdf", dateityp="application/pdf", groesse_bytes=1,
+            )
+
+    def test_treffer_nach_titel(self):
+        treffer = volltext_filtern(Dokument.objects.all(), "Urlaubsplan")
+        self.assertEqual([d.titel for d in treffer], ["Urlaubsplan Sommer"])
+
+    def test_teilwort(self):
+        treffer = volltext_filtern(Dokument.objects.all(), "plan")
+        self.assertEqual([d.titel for d in treffer], ["Urlaubsplan Sommer"])
+
+    def test_fts5_syntax_wird_gequotet(self):
+        self.assertEqual(fts5_ausdruck('Stapler" OR titel:*'), '"Stapler"* "OR"* "titel"*')
+        self.assertEqual(fts5_ausdruck("--"), "")
+        self.assertEqual(fts5_ausdruck('Stapler" OR ab', trigramm=True), '"Stapler"')
+
+
+@skipUnless(connection.vendor == "sqlite", "FTS5-Tabelle nur auf SQLite")
+class Fts5SucheTest(TestCase):
+    """FTS5-Pfad mit der Tabelle aus Migration 0017/0019 und ihren Triggern."""
+
+    def setUp(self):
+        fts5 = importlib.import_module("dms.migrations.0017_trigramm_fts5")
+        trigramm = importlib.import_module("dms.migrations.0019_fts5_trigramm_tokenizer")
+        # Ohne "with": der SQLite-Schema-Editor liesse sich in der Test-Transaktion nicht
+        # betreten; die RunPython-Funktionen brauchen nur execute() und connection.
+        schema_editor = connection.schema_editor()
+        fts5.suchindizes_erstellen(None, schema_editor)
+        trigramm.trigramm_aktivieren(None, schema_editor)
+        # Die Verfuegbarkeit ist je Prozess gecacht
+        suche._verfuegbar.clear()
+        self.addCleanup(suche._verfuegbar.clear)
+        if not suche.fts5_verfuegbar():
+            self.skipTest("SQLite ohne FTS5")
+
+    def _titel(self, q):
+        return sorted(d.titel for d in volltext_filtern(Dokument.objects.all(), q))
+
+    def test_trigger_und_teilwoerter(self):
+        self.assertTrue(suche.fts5_trigramm())
+        dok = Dokument.objects.create(
+            titel="Urlaubsplan Sommer", dateiname="u.pdf", dateityp="application/pdf", groesse_bytes=1,
+            ocr_text="Abwesenheiten im Juli",
+        )
+        Dokument.objects.create(
+            titel="Betriebsanweisung Stapler", dateiname="b.pdf", dateityp="application/pdf", groesse_bytes=1,
+        )
+        self.assertEqual(self._titel("plan"), ["Urlaubsplan Sommer"])
+        self.assertEqual(self._titel("URLAUB juli"), ["Urlaubsplan Sommer"])
+        # Woerter unter drei Zeichen: icontains auf die FTS-Treffer
+        self.assertEqual(self._titel("Stapler Be"), ["Betriebsanweisung Stapler"])
+        self.assertEqual(self._titel("zz"), [])
+
+        # Update- und Delete-Trigger halten die FTS-Tabelle synchron
+        dok.titel = "Dienstplan Winter"
+        dok.save()
+        self.assertEqual(self._titel("Urlaub"), [])
+        self.assertEqual(self._titel("plan"), ["Dienstplan Winter"])
+        dok.delete()
+        self.assertEqual(self._titel("plan"), [])
+
+
+class SichtbarkeitTest(TestCase):
+    """DokumentSichtbarkeit folgt Freigaben, OrgEinheit, AZV-Team und Workflow-Tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from formulare.models import TeamQueue
+        from hr.models import HRMitarbeiter, OrgEinheit, Stelle
+
+        cls.org = OrgEinheit.objects.create(bezeichnung="Personal", kuerzel="PA")
+        cls.stelle = Stelle.objects.create(bezeichnung="Sachbearbeitung", kuerzel="pa1", org_einheit=cls.org)
+        cls.pa_user = User.objects.create_user("pa_user")
+        HRMitarbeiter.objects.create(vorname="P", nachname="A", user=cls.pa_user, stelle=cls.stelle)
+        cls.fremd = User.objects.create_user("fremd")
+        # Migration arbeitszeit 0029 legt die AZV-Queue bereits an
+        cls.azv_team, _ = TeamQueue.objects.get_or_create(kuerzel="azv", defaults={"name": "AZV"})
+        cls.azv_kategorie = DokumentKategorie.objects.create(name=AZV_KATEGORIE, klasse="sensibel")
+        cls.personalakte = Dokument.objects.create(
+            titel="Zeugnis Mustermann", dateiname="p.pdf", dateityp="application/pdf", groesse_bytes=1,
+            klasse="sensibel", eigentuemereinheit=cls.org,
+        )
+
+    def sichtbar(self, user):
+        return set(DokumentSichtbarkeit.objects.filter(user=user).values_list("dokument_id", flat=True))
+
+    def test_orgeinheit_und_freigabe(self):
+        self.assertEqual(self.sichtbar(self.pa_user), {self.personalakte.pk})
+        self.assertEqual(self.sichtbar(self.fremd), set())
+
+        self.personalakte.sichtbar_fuer.add(self.fremd)
+        self.assertEqual(self.sichtbar(self.fremd), {self.personalakte.pk})
+        self.personalakte.sichtbar_fuer.remove(self.fremd)
+        self.assertEqual(self.sichtbar(self.fremd), set())
+
+        self.personalakte.klasse = "offen"
+        self.personalakte.save()
+        self.assertEqual(self.sichtbar(self.pa_user), set())
+
+    def test_azv_team(self):
+        azv = Dokument.objects.create(
+            titel="AZV", dateiname="a.pdf", dateityp="application/pdf", groesse_bytes=1,
+            klasse="sensibel", kategorie=self.azv_kategorie,
+        )
+        self.azv_team.mitglieder.add(self.fremd)
+        self.assertEqual(self.sichtbar(self.fremd), {azv.pk})
+        self.azv_team.mitglieder.clear()
+        self.assertEqual(self.sichtbar(self.fremd), set())
+
+    def test_workflow_task(self):
+        from django.contrib.contenttypes.models import ContentType
+        from workflow.models import WorkflowInstance, WorkflowStep, WorkflowTask, WorkflowTemplate
+
+        template = WorkflowTemplate.objects.create(name="Pruefung")
+        instanz = WorkflowInstance.objects.create(
+            template=template,
+            content_type=ContentType.objects.get_for_model(Dokument),
+            object_id=self.personalakte.pk,
+        )
+        task = WorkflowTask.objects.create(
+            instance=instanz,
+            step=WorkflowStep.objects.create(template=template, reihenfolge=1, titel="Pruefen"),
+            frist=timezone.now(),
+            zugewiesen_an_user=self.fremd,
+        )
+        self.assertEqual(self.sichtbar(self.fremd), {self.personalakte.pk})
+
+        task.status = WorkflowTask.STATUS_ERLEDIGT
+        task.save()
+        self.assertEqual(self.sichtbar(self.fremd), set())
+
+    def test_mitarbeiter_und_stelle(self):
+        from hr.models import HRMitarbeiter, OrgEinheit
+
+        mitarbeiter = HRMitarbeiter.objects.get(user=self.pa_user)
+        # User des Mitarbeiters wechselt: alter User verliert, neuer gewinnt
+        mitarbeiter.user = self.fremd
+        mitarbeiter.save()
+        self.assertEqual(self.sichtbar(self.pa_user), set())
+        self.assertEqual(self.sichtbar(self.fremd), {self.personalakte.pk})
+
+        # Stelle wandert in eine andere OrgEinheit
+        self.stelle.org_einheit = OrgEinheit.objects.create(bezeichnung="Einkauf", kuerzel="EK")
+        self.stelle.save()
+        self.assertEqual(self.sichtbar(self.fremd), set())
+        self.stelle.org_einheit = self.org
+        self.stelle.save()
+        self.assertEqual(self.sichtbar(self.fremd), {self.personalakte.pk})
+
+        mitarbeiter.delete()
+        self.assertEqual(self.sichtbar(self.fremd), set())
+
+    def test_liste_und_neu_aufbauen(self):
+        self.client.force_login(self.fremd)
+        antwort = self.client.get(reverse("dms:liste"))
+        self.assertNotContains(antwort, "Zeugnis Mustermann")
+        self.client.force_login(self.pa_user)
+        self.assertContains(self.client.get(reverse("dms:liste")), "Zeugnis Mustermann")
+
+        DokumentSichtbarkeit.objects.all().delete()
+        self.assertEqual(DokumentSichtbarkeit.neu_aufbauen(), 1)
+        self.assertEqual(self.sichtbar(self.pa_user), {self.personalakte.pk})
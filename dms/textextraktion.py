@@ -0,0 +1,81 @@
+"""
+Lokale Textextraktion fuer den DMS-Volltextindex (PDF, DOCX, XLSX, Text).
+
+Wird vom dms_index_worker aufgerufen – nie im Upload-Request. Gescannte
+PDFs ohne Textebene liefern leeren Text; deren OCR kommt aus Paperless.
+"""
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL begrenzt einen tsvector auf 1 MB – mehr Text bringt nichts
+MAX_ZEICHEN = 500_000
+
+_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _pdf_text(inhalt: bytes) -> str:
+    from pypdf import PdfReader
+
+    teile, laenge = [], 0
+    for seite in PdfReader(io.BytesIO(inhalt)).pages:
+        text = seite.extract_text() or ""
+        teile.append(text)
+        laenge += len(text)
+        if laenge >= MAX_ZEICHEN:
+            break
+    return "\n".join(teile)
+
+
+def _docx_text(inhalt: bytes) -> str:
+    from docx import Document
+
+    doc = Document(io.BytesIO(inhalt))
+    teile = [absatz.text for absatz in doc.paragraphs]
+    for tabelle in doc.tables:
+        for zeile in tabelle.rows:
+            teile.append(" ".join(zelle.text for zelle in zeile.cells))
+    return "\n".join(teile)
+
+
+def _xlsx_text(inhalt: bytes) -> str:
+    from openpyxl import load_workbook
+
+    mappe = load_workbook(io.BytesIO(inhalt), read_only=True, data_only=True)
+    teile, laenge = [], 0
+    try:
+        for blatt in mappe.worksheets:
+            teile.append(blatt.title)
+            for zeile in blatt.iter_rows(values_only=True):
+                text = " ".join(str(wert) for wert in zeile if wert is not None)
+                if text:
+                    teile.append(text)
+                    laenge += len(text)
+                if laenge >= MAX_ZEICHEN:
+                    return "\n".join(teile)
+    finally:
+        mappe.close()
+    return "\n".join(teile)
+
+
+def extrahiere_text(inhalt: bytes, dateityp: str, dateiname: str = "") -> str:
+    """Extrahiert durchsuchbaren Text aus dem Dateiinhalt.
+
+    Unbekannte Formate liefern "". Fehler der Parser werden geworfen –
+    der Worker protokolliert sie am Auftrag.
+    """
+    dateiname = dateiname.lower()
+    if dateityp == "application/pdf" or dateiname.endswith(".pdf"):
+        text = _pdf_text(inhalt)
+    elif dateityp == _DOCX or dateiname.endswith(".docx"):
+        text = _docx_text(inhalt)
+    elif dateityp == _XLSX or dateiname.endswith(".xlsx"):
+        text = _xlsx_text(inhalt)
+    elif dateityp.startswith("text/"):
+        text = inhalt.decode("utf-8", errors="replace")
+    else:
+        return ""
+    # NUL-Zeichen sind in PostgreSQL-Textspalten nicht erlaubt
+    return text.replace("\x00", " ")[:MAX_ZEICHEN]
@@ -15,12 +15,17 @@ from django.views.decorators.csrf import csrf_exempt
 from guardian.shortcuts import assign_perm, remove_perm
 
 from .forms import DokumentKategorieForm, DokumentNeuForm, DokumentSucheForm, DokumentUploadForm, PaperlessWorkflowRegelForm, PersoenlicheAblageFreigabeForm, PersoenlicheAblageUploadForm, ZugriffsantragForm
-from .models import DAUER_OPTIONEN, ApiToken, Dokument, DokumentKategorie, DokumentVersion, DokumentZugriffsschluessel, PaperlessWorkflowRegel, ZugriffsProtokoll
+from .models import DAUER_OPTIONEN, DOKUMENT_INHALT_FELDER, VERSION_INHALT_FELDER, ApiToken, Dokument, DokumentKategorie, DokumentSichtbarkeit, DokumentVersion, DokumentZugriffsschluessel, PaperlessWorkflowRegel, ZugriffsProtokoll
 from workflow.models import WorkflowTemplate
-from .services import lade_dokument, speichere_dokument, suchvektor_befuellen
+from .auslieferung import inhalt_antwort, ist_protokollpflichtig
+from .services import lade_dokument, speichere_dokument, suchindex_einreihen
+from .suche import volltext_filtern
 
 logger = logging.getLogger(__name__)
 
+# Fuer Listen ueber Zugriffsschluessel/Protokoll mit select_related("dokument")
+_DOKUMENT_INHALT_ZURUECKSTELLEN = [f"dokument__{feld}" for feld in DOKUMENT_INHALT_FELDER]
+
 
 # ---------------------------------------------------------------------------
 # Hilfsfunktionen
@@ -160,56 +165,15 @@ def dokument_liste(request):
     """Listet alle fuer den User sichtbaren Dokumente mit Suche."""
     form = DokumentSucheForm(request.GET or None)
     # Persoenliche Dokumente werden in "Meine Ablage" angezeigt, nicht hier
-    qs = Dokument.objects.filter(ist_persoenlich=False).select_related("kategorie", "eigentuemereinheit").prefetch_related("tags")
+    qs = Dokument.objects.ohne_inhalt().filter(ist_persoenlich=False).select_related("kategorie", "eigentuemereinheit").prefetch_related("tags")
 
-    # Sensible Dokumente: Sichtbarkeit nach Rolle und OrgEinheit-Zugehoerigkeit
+    # Sensible Dokumente: vorberechnete Sichtbarkeit (OrgEinheit, sichtbar_fuer,
+    # AZV-Team, offene Workflow-Tasks) – ein Semi-Join ueber (user, dokument)
     if not request.user.is_superuser and not request.user.is_staff:
-        user_org_ids = _get_user_orgeinheit_ids(request.user)
-        ist_azv = _ist_azv_team_mitglied(request.user)
-
-        # Basis: offene Dokumente
-        q_filter = db_models.Q(klasse="offen")
-
-        # Sensible Dokumente der eigenen Abteilung
-        if user_org_ids:
-            q_filter |= db_models.Q(klasse="sensibel", eigentuemereinheit_id__in=user_org_ids)
-
-        # Sensible Dokumente aus sichtbar_fuer
-        q_filter |= db_models.Q(klasse="sensibel", sichtbar_fuer=request.user)
-
-        # AZV-Team-Mitglieder sehen alle AZV-Dokumente (dynamisch)
-        if ist_azv:
-            from dms.models import DokumentKategorie
-            azv_kat = DokumentKategorie.objects.filter(name="Arbeitszeitvereinbarungen").first()
-            if azv_kat:
-                q_filter |= db_models.Q(klasse="sensibel", kategorie=azv_kat)
-
-        # Dokumente mit laufendem Workflow auf dem der User einen offenen Task hat
-        from django.contrib.contenttypes.models import ContentType
-        from workflow.models import WorkflowInstance, WorkflowTask
-        dok_ct = ContentType.objects.get_for_model(Dokument)
-        workflow_dok_ids = (
-            WorkflowInstance.objects
-            .filter(
-                content_type=dok_ct,
-                status=WorkflowInstance.STATUS_LAUFEND,
-                tasks__status__in=[WorkflowTask.STATUS_OFFEN, WorkflowTask.STATUS_IN_BEARBEITUNG],
-            )
-            .filter(
-                db_models.Q(tasks__zugewiesen_an_user=request.user)
-                | db_models.Q(tasks__zugewiesen_an_team__mitglieder=request.user)
-                | db_models.Q(tasks__zugewiesen_an_stelle=getattr(
-                    getattr(getattr(request.user, "hr_mitarbeiter", None), "stelle", None),
-                    "pk", None,
-                ))
-            )
-            .values_list("object_id", flat=True)
-            .distinct()
+        qs = qs.filter(
+            db_models.Q(klasse="offen")
+            | db_models.Q(pk__in=DokumentSichtbarkeit.objects.filter(user=request.user).values("dokument_id"))
         )
-        if workflow_dok_ids:
-            q_filter |= db_models.Q(klasse="sensibel", pk__in=workflow_dok_ids)
-
-        qs = qs.filter(q_filter).distinct()
 
     if form.is_valid():
         q = form.cleaned_data.get("q")
@@ -219,21 +183,7 @@ def dokument_liste(request):
         orgeinheit = form.cleaned_data.get("orgeinheit")
 
         if q:
-            from django.db import connection
-            if connection.vendor == "postgresql":
-                from django.contrib.postgres.search import SearchQuery, SearchRank
-                # Nutzt den GIN-Index auf suchvektor (tsvector-Spalte).
-                # filter(suchvektor=query) aktiviert den Index; annotate ergaenzt die Rang-Sortierung.
-                query = SearchQuery(q, config="german")
-                qs = (
-                    qs.filter(suchvektor=query)
-                    .annotate(rank=SearchRank("suchvektor", query))
-                    .order_by("-rank")
-                )
-            else:
-                qs = qs.filter(
-                    db_models.Q(titel__icontains=q) | db_models.Q(beschreibung__icontains=q)
-                )
+            qs = volltext_filtern(qs, q)
         if klasse:
             qs = qs.filter(klasse=klasse)
         if kategorie:
@@ -285,7 +235,7 @@ def dokument_liste(request):
                 wf_abgebrochen_ids.add(oid)
 
     # Posteingang: offene Workflow-Vorschlaege (nur eigene oder staff)
-    posteingang_qs = Dokument.objects.filter(
+    posteingang_qs = Dokument.objects.ohne_inhalt().filter(
         workflow_vorschlag__isnull=False,
         workflow_vorschlag_erledigt=False,
     ).select_related("workflow_vorschlag").order_by("-erstellt_am")
@@ -302,12 +252,12 @@ def dokument_liste(request):
 
     # Persoenliche Ablage des eingeloggten Users (nur fuer ihn selbst sichtbar)
     meine_ablage_docs = (
-        Dokument.objects
+        Dokument.objects.ohne_inhalt()
         .filter(ist_persoenlich=True, erstellt_von=request.user)
         .order_by("-erstellt_am")[:10]
     )
     meine_freigaben = (
-        Dokument.objects
+        Dokument.objects.ohne_inhalt()
         .filter(ist_persoenlich=True, sichtbar_fuer=request.user)
         .exclude(erstellt_von=request.user)
         .order_by("-erstellt_am")[:5]
@@ -406,7 +356,7 @@ def dokument_upload(request):
 
         dok.save()
         form.save_m2m()
-        suchvektor_befuellen(dok)
+        suchindex_einreihen(dok)
 
         _protokolliere(request, dok, aktion="erstellt")
         messages.success(request, f'Dokument "{dok.titel}" wurde erfolgreich hochgeladen.')
@@ -560,7 +510,7 @@ def dokument_neu(request):
             return render(request, "dms/dokument_neu.html", {"form": form})
 
         dok.save()
-        suchvektor_befuellen(dok)
+        suchindex_einreihen(dok)
 
         _protokolliere(request, dok, aktion="erstellt", notiz=f"Neues {dateityp.upper()} via OnlyOffice angelegt")
         return redirect("dms:onlyoffice_editor", pk=dok.pk)
@@ -577,8 +527,9 @@ def dokument_download(request, pk):
     """Oeffnet OnlyOffice-Editor fuer unterstuetzte Typen, sonst Datei-Download.
 
     Sensible Dokumente: nur mit aktivem Zugriffsschluessel moeglich.
+    Inhalt wird erst nach der ETag-Pruefung geladen (304 ohne Blob-Transfer).
     """
-    dok = get_object_or_404(Dokument, pk=pk)
+    dok = get_object_or_404(Dokument.objects.ohne_inhalt(), pk=pk)
 
     if dok.klasse == "sensibel" and not _darf_sensibel_zugreifen(request, dok):
         messages.error(request, "Sie benoetigen einen gueltigen Zugriffsschluessel fuer dieses Dokument.")
@@ -591,17 +542,16 @@ def dokument_download(request, pk):
 
     # Fallback: Datei herunterladen
     try:
-        inhalt = lade_dokument(dok)
+        response = inhalt_antwort(request, dok, dok.dateityp)
     except Exception as exc:
         logger.error("Download fehlgeschlagen fuer Dokument %s: %s", pk, exc)
         messages.error(request, "Das Dokument konnte nicht geladen werden.")
         return redirect("dms:liste")
 
-    _protokolliere(request, dok, aktion="download")
+    if ist_protokollpflichtig(response, request.user.pk, dok.pk, "download"):
+        _protokolliere(request, dok, aktion="download")
 
-    response = HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
     response["Content-Disposition"] = f'attachment; filename="{dok.dateiname}"'
-    response["Content-Length"] = len(inhalt)
     return response
 
 
@@ -611,7 +561,7 @@ def dokument_vorschau(request, pk):
 
     Sensible Dokumente: nur mit aktivem Zugriffsschluessel moeglich.
     """
-    dok = get_object_or_404(Dokument, pk=pk)
+    dok = get_object_or_404(Dokument.objects.ohne_inhalt(), pk=pk)
 
     if dok.klasse == "sensibel" and not _darf_sensibel_zugreifen(request, dok):
         messages.error(request, "Sie benoetigen einen gueltigen Zugriffsschluessel fuer dieses Dokument.")
@@ -624,15 +574,15 @@ def dokument_vorschau(request, pk):
 
     # Fallback: Inline-Anzeige (z.B. Bilder)
     try:
-        inhalt = lade_dokument(dok)
+        response = inhalt_antwort(request, dok, dok.dateityp)
     except Exception as exc:
         logger.error("Vorschau fehlgeschlagen fuer Dokument %s: %s", pk, exc)
         messages.error(request, "Das Dokument konnte nicht geladen werden.")
         return redirect("dms:liste")
 
-    _protokolliere(request, dok, aktion="vorschau")
+    if ist_protokollpflichtig(response, request.user.pk, dok.pk, "vorschau"):
+        _protokolliere(request, dok, aktion="vorschau")
 
-    response = HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
     response["Content-Disposition"] = f'inline; filename="{dok.dateiname}"'
     return response
 
@@ -805,20 +755,20 @@ def zugriffsantraege_liste(request):
     offene = DokumentZugriffsschluessel.objects.filter(
         filter_dok,
         status=DokumentZugriffsschluessel.STATUS_OFFEN,
-    ).select_related("user", "dokument").order_by("antrag_zeitpunkt")
+    ).select_related("user", "dokument").defer(*_DOKUMENT_INHALT_ZURUECKSTELLEN).order_by("antrag_zeitpunkt")
 
     aktive = DokumentZugriffsschluessel.objects.filter(
         filter_dok,
         status=DokumentZugriffsschluessel.STATUS_GENEHMIGT,
         gueltig_bis__gt=timezone.now(),
-    ).select_related("user", "dokument", "genehmigt_von").order_by("gueltig_bis")
+    ).select_related("user", "dokument", "genehmigt_von").defer(*_DOKUMENT_INHALT_ZURUECKSTELLEN).order_by("gueltig_bis")
 
     abgelaufen = DokumentZugriffsschluessel.objects.filter(filter_dok).exclude(
         status__in=[
             DokumentZugriffsschluessel.STATUS_OFFEN,
             DokumentZugriffsschluessel.STATUS_GENEHMIGT,
         ]
-    ).select_related("user", "dokument", "genehmigt_von").order_by("-antrag_zeitpunkt")[:50]
+    ).select_related("user", "dokument", "genehmigt_von").defer(*_DOKUMENT_INHALT_ZURUECKSTELLEN).order_by("-antrag_zeitpunkt")[:50]
 
     return render(request, "dms/zugriffsantraege.html", {
         "offene": offene,
@@ -1297,15 +1247,13 @@ def onlyoffice_dokument_laden(request, pk):
         except jwt.PyJWTError:
             return HttpResponse("Unauthorized", status=401)
 
-    dok = get_object_or_404(Dokument, pk=pk)
+    dok = get_object_or_404(Dokument.objects.ohne_inhalt(), pk=pk)
     try:
-        inhalt = lade_dokument(dok)
+        return inhalt_antwort(request, dok, dok.dateityp)
     except Exception as exc:
         logger.error("OnlyOffice Laden fehlgeschlagen fuer Dokument %s: %s", pk, exc)
         return HttpResponse("Fehler beim Laden", status=500)
 
-    return HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
-
 
 @csrf_exempt
 def onlyoffice_callback(request, pk):
@@ -1404,23 +1352,19 @@ def onlyoffice_callback(request, pk):
         erstellt_von=user,
         kommentar="via OnlyOffice",
     )
-    if dok.klasse == "sensibel":
-        from .services import verschluessel_inhalt
-        verschluesselt, nonce_hex = verschluessel_inhalt(neuer_inhalt)
-        version.inhalt_verschluesselt = verschluesselt
-        version.verschluessel_nonce = nonce_hex
-    else:
-        version.inhalt_roh = neuer_inhalt
+    from .services import INHALT_FELDER, speichere_version
+    speichere_version(version, neuer_inhalt)
     version.save()
 
     # Hauptdokument aktualisieren (aktueller Inhalt + Versionszaehler)
     speichere_dokument(dok, neuer_inhalt)
     dok.version = neue_nr
     dok.groesse_bytes = len(neuer_inhalt)
-    dok.save(update_fields=["inhalt_roh", "inhalt_verschluesselt",
-                             "verschluessel_nonce", "version", "groesse_bytes"])
-    # Suchvektor nach Aenderung neu aufbauen (Titel/Beschreibung unveraendert, ocr_text bleibt)
-    suchvektor_befuellen(dok, dok.ocr_text)
+    # Der gespeicherte (Paperless-)OCR-Text beschreibt den alten Inhalt
+    dok.ocr_text = ""
+    dok.save(update_fields=INHALT_FELDER + ["version", "groesse_bytes", "ocr_text"])
+    # Suchvektor nach Aenderung neu aufbauen lassen (Text wird neu extrahiert)
+    suchindex_einreihen(dok)
 
     # Protokolleintrag ohne Request-Objekt (Callback kommt vom OnlyOffice-Server)
     ZugriffsProtokoll.objects.create(
@@ -1516,15 +1460,10 @@ def version_restore(request, pk, version_nr):
     alte_version = get_object_or_404(DokumentVersion, dokument=dok, version_nr=version_nr)
 
     if request.method == "POST":
+        from .services import INHALT_FELDER, lade_version, speichere_version
+
         # Inhalt der alten Version lesen
-        if dok.klasse == "sensibel":
-            from .services import entschluessel_inhalt
-            inhalt = entschluessel_inhalt(
-                bytes(alte_version.inhalt_verschluesselt),
-                alte_version.verschluessel_nonce,
-            )
-        else:
-            inhalt = bytes(alte_version.inhalt_roh)
+        inhalt = lade_version(alte_version)
 
         # Neue Version erzeugen (Restore = neue Version, nicht Ueberschreiben)
         letzte_nr = dok.versionen.aggregate(
@@ -1540,21 +1479,14 @@ def version_restore(request, pk, version_nr):
             erstellt_von=request.user,
             kommentar=f"Wiederhergestellt aus Version {version_nr}",
         )
-        if dok.klasse == "sensibel":
-            from .services import verschluessel_inhalt
-            verschluesselt, nonce_hex = verschluessel_inhalt(inhalt)
-            neue_version.inhalt_verschluesselt = verschluesselt
-            neue_version.verschluessel_nonce = nonce_hex
-        else:
-            neue_version.inhalt_roh = inhalt
+        speichere_version(neue_version, inhalt)
         neue_version.save()
 
         # Hauptdokument aktualisieren
         speichere_dokument(dok, inhalt)
         dok.version = neue_nr
         dok.groesse_bytes = len(inhalt)
-        dok.save(update_fields=["inhalt_roh", "inhalt_verschluesselt",
-                                 "verschluessel_nonce", "version", "groesse_bytes"])
+        dok.save(update_fields=INHALT_FELDER + ["version", "groesse_bytes"])
 
         _protokolliere(
             request, dok, aktion="version_wiederhergestellt",
@@ -1587,20 +1519,15 @@ def version_vorschau(request, pk, version_nr):
     if onlyoffice_url and dok.dateityp in _ONLYOFFICE_MIME_TYPEN and dok.dateityp != "application/pdf":
         return redirect("dms:version_onlyoffice", pk=pk, version_nr=version_nr)
 
-    version = get_object_or_404(DokumentVersion, dokument=dok, version_nr=version_nr)
+    version = get_object_or_404(
+        DokumentVersion.objects.defer(*VERSION_INHALT_FELDER), dokument=dok, version_nr=version_nr
+    )
 
-    if dok.klasse == "sensibel":
-        from .services import entschluessel_inhalt
-        inhalt = entschluessel_inhalt(
-            bytes(version.inhalt_verschluesselt),
-            version.verschluessel_nonce,
-        )
-    else:
-        inhalt = bytes(version.inhalt_roh)
+    response = inhalt_antwort(request, version, dok.dateityp)
 
-    _protokolliere(request, dok, "vorschau", f"Version {version_nr} (Archiv-Vorschau)")
+    if ist_protokollpflichtig(response, request.user.pk, dok.pk, "vorschau", version_nr):
+        _protokolliere(request, dok, "vorschau", f"Version {version_nr} (Archiv-Vorschau)")
 
-    response = HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
     response["Content-Disposition"] = f'inline; filename="{version.dateiname}"'
     return response
 
@@ -1686,18 +1613,11 @@ def onlyoffice_version_laden(request, pk, version_nr):
             return HttpResponse("Unauthorized", status=401)
 
     dok = get_object_or_404(Dokument, pk=pk)
-    version = get_object_or_404(DokumentVersion, dokument=dok, version_nr=version_nr)
-
-    if dok.klasse == "sensibel":
-        from .services import entschluessel_inhalt
-        inhalt = entschluessel_inhalt(
-            bytes(version.inhalt_verschluesselt),
-            version.verschluessel_nonce,
-        )
-    else:
-        inhalt = bytes(version.inhalt_roh)
+    version = get_object_or_404(
+        DokumentVersion.objects.defer(*VERSION_INHALT_FELDER), dokument=dok, version_nr=version_nr
+    )
 
-    return HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
+    return inhalt_antwort(request, version, dok.dateityp)
 
 
 @login_required
@@ -1724,20 +1644,15 @@ def version_download(request, pk, version_nr):
             messages.error(request, "Keine Berechtigung fuer dieses Dokument.")
             return redirect("dms:detail", pk=pk)
 
-    version = get_object_or_404(DokumentVersion, dokument=dok, version_nr=version_nr)
+    version = get_object_or_404(
+        DokumentVersion.objects.defer(*VERSION_INHALT_FELDER), dokument=dok, version_nr=version_nr
+    )
 
-    if dok.klasse == "sensibel":
-        from .services import entschluessel_inhalt
-        inhalt = entschluessel_inhalt(
-            bytes(version.inhalt_verschluesselt),
-            version.verschluessel_nonce,
-        )
-    else:
-        inhalt = bytes(version.inhalt_roh)
+    response = inhalt_antwort(request, version, dok.dateityp)
 
-    _protokolliere(request, dok, "download", f"Version {version_nr} (Archiv-Download)")
+    if ist_protokollpflichtig(response, request.user.pk, dok.pk, "download", version_nr):
+        _protokolliere(request, dok, "download", f"Version {version_nr} (Archiv-Download)")
 
-    response = HttpResponse(inhalt, content_type=dok.dateityp or "application/octet-stream")
     # Dateiname mit Versionsnummer kennzeichnen
     name_teile = version.dateiname.rsplit(".", 1)
     if len(name_teile) == 2:
@@ -2250,12 +2165,12 @@ def meine_ablage(request):
     - Freigaben: andere haben diese Dokumente fuer mich freigegeben (sichtbar_fuer=user)
     """
     eigene = (
-        Dokument.objects
+        Dokument.objects.ohne_inhalt()
         .filter(ist_persoenlich=True, erstellt_von=request.user)
         .order_by("-erstellt_am")
     )
     freigaben = (
-        Dokument.objects
+        Dokument.objects.ohne_inhalt()
         .filter(ist_persoenlich=True, sichtbar_fuer=request.user)
         .exclude(erstellt_von=request.user)
         .order_by("-erstellt_am")
@@ -2309,7 +2224,7 @@ def meine_ablage_upload(request):
             return render(request, "dms/meine_ablage_upload.html", {"form": form})
 
         dok.save()
-        suchvektor_befuellen(dok)
+        suchindex_einreihen(dok)
         _protokolliere(request, dok, aktion="erstellt", notiz="Persoenliche Ablage")
         messages.success(request, f'"{dok.titel}" wurde in deine persoenliche Ablage hochgeladen.')
         return redirect("dms:meine_ablage")
@@ -2466,6 +2381,7 @@ def loeschprotokoll(request):
         ZugriffsProtokoll.objects
         .filter(aktion__in=["geloescht", "loeschen"])
         .select_related("user", "dokument")
+        .defer(*_DOKUMENT_INHALT_ZURUECKSTELLEN)
         .order_by("-zeitpunkt")
     )
     return render(request, "dms/loeschprotokoll.html", {"eintraege": eintraege})
@@ -1,15 +1,14 @@
 """
-Management-Command: Pollt Matrix-DMs und EH_PING-Textnachrichten auf Ersthelfer-Rueckmeldungen.
+Ersthelfer-Rueckmeldungen aus dem EH_PING-Kanal.
 
-Laeuft alle 30 Sekunden im Scheduler. Wertet aus:
-  - Zahl-Antworten (1/2/3/4) in persoenlichen DM-Raeumen (Option B)
-  - Zahl-Antworten (1/2/3/4) direkt im EH_PING-Kanal (Option C)
-
-Beide Quellen schreiben in dieselbe ErsteHilfeRueckmeldung.
+Wird vom Sync-Listener aufgerufen (manage.py matrix_sync_listener, siehe
+matrix_integration/sync.py). Wertet Zahl-Antworten (1-10) und Freitext
+direkt im EH_PING-Kanal aus und schreibt sie in ErsteHilfeRueckmeldung
+bzw. ErsteHilfeNachricht aller offenen Vorfaelle.
 """
 import logging
 
-from django.core.management.base import BaseCommand
+from matrix_integration.sync import SyncHandler, matrix_id_zu_hr_mitarbeiter, stichwort_status
 
 logger = logging.getLogger(__name__)
 
@@ -55,21 +54,6 @@ KEYWORD_STATUS = {
 }
 
 
-def _matrix_id_zu_ersthelfer(matrix_id):
-    """Loeest eine Matrix-ID (@kuerzel:server) in einen HRMitarbeiter auf."""
-    from django.conf import settings
-
-    from hr.models import HRMitarbeiter
-
-    server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
-    if not matrix_id.endswith(f":{server_name}"):
-        return None
-    kuerzel = matrix_id.split(":")[0].lstrip("@")
-    return HRMitarbeiter.objects.filter(
-        stelle__kuerzel=kuerzel
-    ).select_related("stelle").first()
-
-
 def _rueckmeldung_speichern(vorfall, ersthelfer, status, quelle):
     """Legt eine ErsteHilfeRueckmeldung an (falls noch nicht vorhanden fuer diesen Status)."""
     from config.kommunikation_utils import matrix_nachricht_senden
@@ -148,51 +132,40 @@ def _freitext_speichern(vorfall, ersthelfer, absender_matrix_id, text):
     )
 
 
-class Command(BaseCommand):
-    help = "Pollt Matrix-Reaktionen und DM-Antworten auf EH-Alarme"
+class EHRueckmeldungHandler(SyncHandler):
+    """Antworten im EH_PING-Kanal → Rueckmeldungen zu offenen Vorfaellen."""
 
-    def handle(self, *args, **options):
-        from config.kommunikation_utils import matrix_messages_seit_token
-        from django.conf import settings
+    name = "eh_rueckmeldung"
 
-        from ersthelfe.models import ErsteHilfeVorfall
+    def raeume(self):
+        from django.conf import settings
 
         eh_ping_room = getattr(settings, "MATRIX_EH_PING_ROOM_ID", "")
-        bot_kuerzel = "prima-bot"
-        server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
-        bot_id = f"@{bot_kuerzel}:{server_name}" if server_name else ""
+        return {eh_ping_room} if eh_ping_room else set()
 
-        offene_vorfaelle = ErsteHilfeVorfall.objects.filter(
-            status=ErsteHilfeVorfall.STATUS_OFFEN,
-        )
+    def verarbeite(self, room_id, nachrichten):
+        from ersthelfe.models import ErsteHilfeVorfall
 
-        for vorfall in offene_vorfaelle:
-
-            # --- Option C: Textnachrichten im EH_PING-Kanal ---
-            if eh_ping_room and vorfall.matrix_ping_since_token:
-                nachrichten, neuer_token = matrix_messages_seit_token(
-                    eh_ping_room,
-                    since_token=vorfall.matrix_ping_since_token,
-                )
-                if neuer_token and neuer_token != vorfall.matrix_ping_since_token:
-                    vorfall.matrix_ping_since_token = neuer_token
-                    vorfall.save(update_fields=["matrix_ping_since_token"])
-
-                for msg in nachrichten:
-                    if bot_id and msg["sender"] == bot_id:
-                        continue
-                    ersthelfer = _matrix_id_zu_ersthelfer(msg["sender"])
-                    if not ersthelfer:
-                        continue
-                    schluessel = msg["body"].lower().strip()
-                    status = KEYWORD_STATUS.get(schluessel)
-                    if not status:
-                        for kw, st in KEYWORD_STATUS.items():
-                            if schluessel.startswith(kw):
-                                status = st
-                                break
-                    if status:
-                        _rueckmeldung_speichern(vorfall, ersthelfer, status, "EH-PING-Antwort")
-                    else:
-                        # Unbekannter Text → als Freitextnachricht speichern
-                        _freitext_speichern(vorfall, ersthelfer, msg["sender"], msg["body"])
+        # Nur Vorfaelle, fuer die der Alarm im Kanal tatsaechlich gesendet wurde
+        offene_vorfaelle = list(
+            ErsteHilfeVorfall.objects.filter(
+                status=ErsteHilfeVorfall.STATUS_OFFEN,
+            ).exclude(matrix_ping_since_token="")
+        )
+        if not offene_vorfaelle:
+            return
+
+        for msg in nachrichten:
+            ersthelfer = matrix_id_zu_hr_mitarbeiter(msg["sender"])
+            if not ersthelfer:
+                continue
+            status = stichwort_status(msg["body"], KEYWORD_STATUS)
+            for vorfall in offene_vorfaelle:
+                # Nachrichten von vor dem Alarm gehoeren nicht zum Vorfall
+                if msg["ts"] and msg["ts"] < vorfall.erstellt_am.timestamp() * 1000:
+                    continue
+                if status:
+                    _rueckmeldung_speichern(vorfall, ersthelfer, status, "EH-PING-Antwort")
+                else:
+                    # Unbekannter Text → als Freitextnachricht speichern
+                    _freitext_speichern(vorfall, ersthelfer, msg["sender"], msg["body"])
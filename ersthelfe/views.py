@@ -7,6 +7,8 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
+from config.kommunikation_utils import http_timeout, matrix_zugang
+
 from .models import (
     ErsteHilfeErsthelferToken,
     ErsteHilfeNachricht,
@@ -41,6 +43,8 @@ def _ntfy_alarm_senden(vorfall, ort, zeit):
 
     Priority 'urgent' durchdringt den Nicht-Stoeren-Modus auf Android.
     Erfordert: ntfy-App auf Android, Topic eh-alarm-prima abonniert.
+    Laeuft im alarm_fanout-Pool: None wenn nicht konfiguriert, True bei
+    Erfolg, Fehler werden geworfen und als Zustellstatus erfasst.
     """
     import urllib.request
     from django.conf import settings
@@ -48,7 +52,7 @@ def _ntfy_alarm_senden(vorfall, ort, zeit):
     ntfy_url = getattr(settings, "NTFY_URL", "").rstrip("/")
     ntfy_topic = getattr(settings, "NTFY_EH_TOPIC", "")
     if not ntfy_url or not ntfy_topic:
-        return
+        return None
 
     nachricht = f"Einsatzort: {ort} | Alarmzeit: {zeit} Uhr | Vorfall #{vorfall.pk}"
     url = f"{ntfy_url}/{ntfy_topic}"
@@ -62,12 +66,10 @@ def _ntfy_alarm_senden(vorfall, ort, zeit):
         },
         method="POST",
     )
-    try:
-        with urllib.request.urlopen(req, timeout=5):
-            pass
-        logger.info("ntfy EH-Alarm fuer Vorfall %s gesendet.", vorfall.pk)
-    except Exception as exc:
-        logger.warning("ntfy EH-Alarm fehlgeschlagen (nicht kritisch): %s", exc)
+    with urllib.request.urlopen(req, timeout=http_timeout(5)):
+        pass
+    logger.info("ntfy EH-Alarm fuer Vorfall %s gesendet.", vorfall.pk)
+    return True
 
 
 def _setze_bot_als_moderator(homeserver, bot_token, room_id):
@@ -88,7 +90,7 @@ def _setze_bot_als_moderator(homeserver, bot_token, room_id):
             url_get,
             headers={"Authorization": f"Bearer {bot_token}"},
         )
-        with urllib.request.urlopen(req_get, timeout=5) as resp:
+        with urllib.request.urlopen(req_get, timeout=http_timeout(5)) as resp:
             power_levels = json.loads(resp.read().decode("utf-8"))
 
         # Bot-User-ID ermitteln
@@ -97,7 +99,7 @@ def _setze_bot_als_moderator(homeserver, bot_token, room_id):
             url_whoami,
             headers={"Authorization": f"Bearer {bot_token}"},
         )
-        with urllib.request.urlopen(req_who, timeout=5) as resp:
+        with urllib.request.urlopen(req_who, timeout=http_timeout(5)) as resp:
             bot_user_id = json.loads(resp.read().decode("utf-8")).get("user_id", "")
 
         if not bot_user_id:
@@ -118,7 +120,7 @@ def _setze_bot_als_moderator(homeserver, bot_token, room_id):
             headers={"Authorization": f"Bearer {bot_token}", "Content-Type": "application/json"},
             method="PUT",
         )
-        with urllib.request.urlopen(req_put, timeout=5):
+        with urllib.request.urlopen(req_put, timeout=http_timeout(5)):
             pass
         logger.info("Bot auf Power Level 50 im EH_PING-Raum gesetzt.")
     except Exception as exc:
@@ -126,30 +128,55 @@ def _setze_bot_als_moderator(homeserver, bot_token, room_id):
 
 
 def _benachrichtige_ersthelfer(vorfall):
+    """Stellt den EH-Alarm ueber alarm_fanout zu: ntfy-Push und EH_PING-Raum parallel.
+
+    Funktioniert auch ohne Matrix (graceful degradation) – Zustellstatus
+    steht in sicherheit.AlarmZustellung.
+    """
+    from django.conf import settings
+    from sicherheit import alarm_fanout
+    from sicherheit.models import AlarmZustellung
+
+    homeserver, bot_token = matrix_zugang()
+    eh_ping_room = getattr(settings, "MATRIX_EH_PING_ROOM_ID", "")
+
+    # ntfy: Push-Benachrichtigung mit Alarm-Ton fuer Android
+    jetzt_lokal = timezone.localtime(vorfall.erstellt_am)
+    auftraege = [alarm_fanout.Auftrag(
+        AlarmZustellung.KANAL_NTFY,
+        getattr(settings, "NTFY_EH_TOPIC", "") or "ntfy",
+        _ntfy_alarm_senden,
+        (vorfall, vorfall.ort, jetzt_lokal.strftime("%H:%M")),
+    )]
+
+    if homeserver and bot_token and eh_ping_room:
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_RAUM, eh_ping_room, _eh_ping_senden,
+            (vorfall, eh_ping_room),
+        ))
+    else:
+        logger.info("MATRIX_EH_PING_ROOM_ID nicht konfiguriert – EH-Ping uebersprungen.")
+
+    alarm_fanout.verteilen(AlarmZustellung.ART_ERSTE_HILFE, vorfall.pk, auftraege)
+
+
+def _eh_ping_senden(vorfall, eh_ping_room):
     """Sendet Alarm-Nachricht in den EH_PING Matrix-Raum.
 
     Ersthelfer und Betriebsarzt sind im Raum und antworten mit 1/2/3/4.
-    Speichert since_token fuer spaeteres Polling.
-    Funktioniert auch ohne Matrix (graceful degradation).
+    Speichert since_token fuer spaeteres Polling. Fehler werden geworfen
+    (alarm_fanout erfasst sie als Zustellstatus). Zugangsdaten kommen aus
+    den Settings, damit sie nicht in AlarmZustellung.argumente landen.
     """
     import json
     import time
-    import urllib.error
     import urllib.request
 
     from config.kommunikation_utils import matrix_messages_seit_token
-    from django.conf import settings
-
-    homeserver = (
-        getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "").rstrip("/")
-        or getattr(settings, "MATRIX_HOMESERVER_URL", "").rstrip("/")
-    )
-    bot_token = getattr(settings, "MATRIX_BOT_TOKEN", "")
-    eh_ping_room = getattr(settings, "MATRIX_EH_PING_ROOM_ID", "")
 
-    if not homeserver or not bot_token or not eh_ping_room:
-        logger.info("MATRIX_EH_PING_ROOM_ID nicht konfiguriert – EH-Ping uebersprungen.")
-        return
+    homeserver, bot_token = matrix_zugang()
+    if not homeserver or not bot_token:
+        return None
 
     # Sicherstellen dass der Bot Moderator-Rechte hat (noetig fuer @room-Mention mit Ton)
     _setze_bot_als_moderator(homeserver, bot_token, eh_ping_room)
@@ -212,19 +239,13 @@ def _benachrichtige_ersthelfer(vorfall):
         headers={"Authorization": f"Bearer {bot_token}", "Content-Type": "application/json"},
         method="PUT",
     )
-    try:
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            json.loads(resp.read().decode("utf-8"))
-            _, seit = matrix_messages_seit_token(eh_ping_room, since_token=None)
-            vorfall.matrix_ping_since_token = seit or ""
-            vorfall.save(update_fields=["matrix_ping_since_token"])
-            logger.info("EH_PING-Alarm gesendet, Vorfall %s", vorfall.pk)
-    except urllib.error.URLError as exc:
-        logger.warning("EH_PING-Alarm fehlgeschlagen: %s", exc)
-
-    # ntfy: Push-Benachrichtigung mit Alarm-Ton fuer Android
-    jetzt_lokal = timezone.localtime(vorfall.erstellt_am)
-    _ntfy_alarm_senden(vorfall, vorfall.ort, jetzt_lokal.strftime("%H:%M"))
+    with urllib.request.urlopen(req, timeout=http_timeout(5)) as resp:
+        json.loads(resp.read().decode("utf-8"))
+    _, seit = matrix_messages_seit_token(eh_ping_room, since_token=None)
+    vorfall.matrix_ping_since_token = seit or ""
+    vorfall.save(update_fields=["matrix_ping_since_token"])
+    logger.info("EH_PING-Alarm gesendet, Vorfall %s", vorfall.pk)
+    return True
 
 
 # ---------------------------------------------------------------------------
@@ -251,10 +272,9 @@ def vorfall_ausloesen(request):
         beschreibung=beschreibung,
     )
 
-    try:
-        _benachrichtige_ersthelfer(vorfall)
-    except Exception:
-        logger.exception("Fehler beim Benachrichtigen der Ersthelfer (Vorfall %s)", vorfall.pk)
+    # Meldekette im Fan-out-Pool – Antwort wartet nicht auf Matrix/ntfy
+    from sicherheit import alarm_fanout
+    alarm_fanout.nach_commit(_benachrichtige_ersthelfer, vorfall)
 
     messages.success(
         request,
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import FacilityTeam, Stoermeldung, Textbaustein, Wartungsplan
+from .models import (
+    FacilityTagesStatistik,
+    FacilityTeam,
+    Stoermeldung,
+    Textbaustein,
+    Wartungsplan,
+)
 
 
 @admin.register(Textbaustein)
@@ -37,3 +43,11 @@ class StoermeldungAdmin(admin.ModelAdmin):
     list_filter = ["kategorie", "status", "prioritaet"]
     search_fields = ["raumnummer", "beschreibung"]
     date_hierarchy = "erstellt_am"
+
+
+@admin.register(FacilityTagesStatistik)
+class FacilityTagesStatistikAdmin(admin.ModelAdmin):
+    list_display = ["tag", "kategorie", "raumnummer", "anzahl", "offen", "erledigt", "unloesbar"]
+    list_filter = ["kategorie"]
+    search_fields = ["raumnummer"]
+    date_hierarchy = "tag"
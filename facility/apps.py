@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FacilityConfig(AppConfig):
     name = "facility"
     verbose_name = "Facility Management"
+
+    def ready(self):
+        import facility.signals  # noqa: F401 – Signals registrieren
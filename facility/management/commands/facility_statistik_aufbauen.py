@@ -0,0 +1,32 @@
+"""
+Management-Command: facility_statistik_aufbauen
+
+Baut FacilityTagesStatistik aus den Stoermeldungen neu auf – einmalig
+nach dem Deployment und immer dann, wenn Meldungen ohne Signals geaendert
+wurden (QuerySet.update, Datenimport).
+
+Aufruf:
+    python manage.py facility_statistik_aufbauen [--von 2026-01-01]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from facility.models import FacilityTagesStatistik
+
+
+class Command(BaseCommand):
+    help = "FacilityTagesStatistik (Monatsbericht/Tendenzen) aus den Stoermeldungen neu aufbauen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--von",
+            type=date.fromisoformat,
+            default=None,
+            help="Nur ab diesem Tag neu aufbauen (Standard: alles)",
+        )
+
+    def handle(self, *args, **options):
+        anzahl = FacilityTagesStatistik.neu_aufbauen(von=options["von"])
+        if options["verbosity"] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"{anzahl} Tagesstatistik-Eintraege geschrieben."))
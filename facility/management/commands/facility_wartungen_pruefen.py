@@ -0,0 +1,35 @@
+"""
+Management-Command: facility_wartungen_pruefen
+
+Stellt fuer faellige Wartungsplaene je eine Stoermeldung in die
+Facility-Queue (Wartungsplan.faellige_ausloesen). Idempotent: pro
+Faelligkeit wird hoechstens eine Aufgabe erzeugt (Wasserstand
+letzte_pruefung), parallele Laeufe erzeugen keine Duplikate.
+
+Wird vom Scheduler (matrix_scheduler) stuendlich aufgerufen.
+
+Aufruf:
+    python manage.py facility_wartungen_pruefen [--stichtag 2026-01-31]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from facility.models import Wartungsplan
+
+
+class Command(BaseCommand):
+    help = "Faellige Wartungsplaene pruefen und Wartungsaufgaben in die Facility-Queue stellen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stichtag",
+            type=date.fromisoformat,
+            default=None,
+            help="Faelligkeiten bis zu diesem Tag pruefen (Standard: heute)",
+        )
+
+    def handle(self, *args, **options):
+        neu = Wartungsplan.faellige_ausloesen(stichtag=options["stichtag"])
+        if options["verbosity"] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"{neu} Wartungsaufgabe(n) ausgeloest."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0006_stoermeldung_db_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wartungsplan',
+            name='letzte_pruefung',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Letzte Pruefung'),
+        ),
+    ]
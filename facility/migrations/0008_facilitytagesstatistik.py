@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:33
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def statistik_aufbauen(apps, schema_editor):
+    """Erstbefuellung aus den vorhandenen Stoermeldungen (wie facility_statistik_aufbauen)."""
+    Stoermeldung = apps.get_model("facility", "Stoermeldung")
+    FacilityTagesStatistik = apps.get_model("facility", "FacilityTagesStatistik")
+
+    mit_zeit = models.Q(status="erledigt", bearbeitet_am__isnull=False)
+    zeilen = (
+        Stoermeldung.objects.annotate(tag=TruncDate("erstellt_am"))
+        .values("tag", "kategorie", "raumnummer")
+        .annotate(
+            anzahl=models.Count("pk"),
+            offen=models.Count(
+                "pk", filter=models.Q(status__in=["offen", "in_bearbeitung", "weitergeleitet"])
+            ),
+            erledigt=models.Count("pk", filter=models.Q(status="erledigt")),
+            unloesbar=models.Count("pk", filter=models.Q(status="unloesbar")),
+            bearbeitungszeit_summe=models.Sum(
+                models.ExpressionWrapper(
+                    models.F("bearbeitet_am") - models.F("erstellt_am"),
+                    output_field=models.DurationField(),
+                ),
+                filter=mit_zeit,
+            ),
+            bearbeitungszeit_anzahl=models.Count("pk", filter=mit_zeit),
+        )
+        .order_by()
+    )
+    eintraege = []
+    for zeile in zeilen:
+        zeile["bearbeitungszeit_summe"] = zeile["bearbeitungszeit_summe"] or datetime.timedelta(0)
+        eintraege.append(FacilityTagesStatistik(**zeile))
+    FacilityTagesStatistik.objects.bulk_create(eintraege, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0007_wartungsplan_letzte_pruefung'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilityTagesStatistik',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.DateField()),
+                ('kategorie', models.CharField(choices=[('elektro', 'Elektro'), ('sanitaer_heizung', 'Sanitaer / Heizung'), ('schlosser', 'Schlosser'), ('schreiner', 'Schreiner'), ('maler', 'Maler')], max_length=30)),
+                ('raumnummer', models.CharField(max_length=50)),
+                ('anzahl', models.PositiveIntegerField(default=0)),
+                ('offen', models.PositiveIntegerField(default=0)),
+                ('erledigt', models.PositiveIntegerField(default=0)),
+                ('unloesbar', models.PositiveIntegerField(default=0)),
+                ('bearbeitungszeit_summe', models.DurationField(default=datetime.timedelta(0))),
+                ('bearbeitungszeit_anzahl', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Facility-Tagesstatistik',
+                'verbose_name_plural': 'Facility-Tagesstatistiken',
+                'ordering': ['tag', 'kategorie', 'raumnummer'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stoermeldung',
+            index=models.Index(fields=['erstellt_am'], name='stoermeldung_erstellt_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='facilitytagesstatistik',
+            constraint=models.UniqueConstraint(fields=('tag', 'kategorie', 'raumnummer'), name='facility_tagesstatistik_eindeutig'),
+        ),
+        migrations.RunPython(statistik_aufbauen, migrations.RunPython.noop),
+    ]
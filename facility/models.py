@@ -1,8 +1,13 @@
-from datetime import date, timedelta
+import logging
+from datetime import date, datetime, time, timedelta
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
 from django.urls import reverse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
 
 KATEGORIE_CHOICES = [
     ("elektro", "Elektro"),
@@ -153,6 +158,15 @@ class Wartungsplan(models.Model):
         verbose_name="Naechste Faelligkeit",
         help_text="Wird automatisch berechnet.",
     )
+    # Wasserstand fuer facility_wartungen_pruefen: Tag, an dem zuletzt eine
+    # Wartungsaufgabe ausgeloest wurde. Geprueft werden nur Plaene, deren
+    # Faelligkeit danach liegt.
+    letzte_pruefung = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Letzte Pruefung",
+    )
 
     # Status
     ist_aktiv = models.BooleanField(default=True, verbose_name="Aktiv")
@@ -195,11 +209,87 @@ class Wartungsplan(models.Model):
         """True wenn die naechste Faelligkeit heute oder in der Vergangenheit liegt."""
         return self.naechste_faelligkeit <= date.today()
 
+    # Status ausgeloester Wartungsaufgaben, mit denen die Faelligkeit als
+    # abgearbeitet gilt (unloesbar: nicht ausgefuehrt, aber abgeschlossen).
+    # "weitergeleitet" ist noch offen – der AL hat die Aufgabe.
+    ABGESCHLOSSEN_STATUS = ("erledigt", "unloesbar")
+
     def hat_offene_aufgabe(self) -> bool:
         """True wenn bereits eine offene/laufende Wartungsaufgabe existiert."""
-        return self.ausgeloeste_meldungen.filter(
-            status__in=["offen", "in_bearbeitung"]
-        ).exists()
+        return self.ausgeloeste_meldungen.filter(status__in=OFFENE_STATUS).exists()
+
+    @classmethod
+    def faellige_ausloesen(cls, stichtag: date = None) -> int:
+        """Erzeugt Stoermeldungen fuer faellige Wartungsplaene (idempotent).
+
+        Betrachtet nur aktive Plaene mit naechste_faelligkeit <= stichtag, fuer
+        deren aktuelle Faelligkeit noch keine Aufgabe ausgeloest wurde. Das
+        Setzen von letzte_pruefung ist ein bedingtes UPDATE – parallele Laeufe
+        erzeugen deshalb keine Duplikate.
+        Endete die Aufgabe einer Faelligkeit ohne Erledigung (ABGESCHLOSSEN_STATUS,
+        z.B. unloesbar), wird naechste_faelligkeit ab letzte_pruefung
+        fortgeschrieben – sonst bliebe der Plan dauerhaft unter dem Wasserstand.
+        Gibt Anzahl neu erzeugter Meldungen zurueck.
+        """
+        from hr.models import HRMitarbeiter
+
+        stichtag = stichtag or date.today()
+        abgeschlossen = (
+            cls.objects.filter(
+                ist_aktiv=True,
+                letzte_pruefung__gte=models.F("naechste_faelligkeit"),
+                ausgeloeste_meldungen__status__in=cls.ABGESCHLOSSEN_STATUS,
+            )
+            .exclude(ausgeloeste_meldungen__status__in=OFFENE_STATUS)
+            .distinct()
+        )
+        for plan in abgeschlossen:
+            naechste = plan.berechne_naechste_faelligkeit(basis=plan.letzte_pruefung)
+            # Bedingt: ein paralleles Erledigen hat die Faelligkeit evtl. schon fortgeschrieben
+            if cls.objects.filter(pk=plan.pk, naechste_faelligkeit=plan.naechste_faelligkeit).update(
+                naechste_faelligkeit=naechste
+            ):
+                logger.info("Wartungsplan %s: naechste Faelligkeit %s", plan.pk, naechste)
+
+        offen = cls.objects.filter(
+            models.Q(letzte_pruefung__isnull=True)
+            | models.Q(letzte_pruefung__lt=models.F("naechste_faelligkeit")),
+            ist_aktiv=True,
+            naechste_faelligkeit__lte=stichtag,
+        )
+        if not offen.exists():
+            return 0
+
+        # System-Platzhalter: erster aktiver HR-Mitarbeiter als Melder fuer Wartungsaufgaben
+        system_melder = HRMitarbeiter.objects.filter(
+            user__is_active=True
+        ).order_by("pk").first()
+        if not system_melder:
+            logger.warning("Kein HR-Mitarbeiter fuer Wartungs-Ausloesung gefunden.")
+            return 0
+
+        neu = 0
+        for plan in offen:
+            if plan.hat_offene_aufgabe():
+                # Aufgabe laeuft noch (z.B. von Hand angelegt) – spaeter erneut pruefen
+                continue
+            with transaction.atomic():
+                if not offen.filter(pk=plan.pk).update(letzte_pruefung=stichtag):
+                    continue  # von parallelem Lauf uebernommen
+                Stoermeldung.objects.create(
+                    melder=system_melder,
+                    melder_telefon="-",
+                    raumnummer=plan.raumnummer,
+                    raum_freitext=plan.raum_freitext,
+                    kategorie=plan.kategorie,
+                    beschreibung=f"Wartung: {plan.name}\n{plan.beschreibung}".strip(),
+                    prioritaet=plan.prioritaet,
+                    ist_wartung=True,
+                    wartungsplan=plan,
+                )
+            logger.info("Wartungsaufgabe ausgeloest: Wartungsplan %s (%s)", plan.pk, plan.name)
+            neu += 1
+        return neu
 
     def intervall_anzeige(self) -> str:
         """Lesbare Intervall-Darstellung z.B. 'alle 30 Tage'."""
@@ -315,6 +405,9 @@ class Stoermeldung(models.Model):
         ordering = ["-erstellt_am"]
         verbose_name = "Stoermeldung"
         verbose_name_plural = "Stoermeldungen"
+        indexes = [
+            models.Index(fields=["erstellt_am"], name="stoermeldung_erstellt_idx"),
+        ]
 
     def __str__(self):
         prefix = "WAR" if self.ist_wartung else "STR"
@@ -326,3 +419,112 @@ class Stoermeldung(models.Model):
 
     def get_absolute_url(self):
         return reverse("facility:detail", args=[self.pk])
+
+
+# Status, die im Monatsbericht als "offen" zaehlen
+OFFENE_STATUS = ("offen", "in_bearbeitung", "weitergeleitet")
+
+
+def _statistik_aggregate():
+    """Aggregat-Ausdruecke fuer FacilityTagesStatistik ueber Stoermeldungen."""
+    mit_zeit = models.Q(status="erledigt", bearbeitet_am__isnull=False)
+    return {
+        "anzahl": models.Count("pk"),
+        "offen": models.Count("pk", filter=models.Q(status__in=OFFENE_STATUS)),
+        "erledigt": models.Count("pk", filter=models.Q(status="erledigt")),
+        "unloesbar": models.Count("pk", filter=models.Q(status="unloesbar")),
+        "bearbeitungszeit_summe": models.Sum(
+            models.ExpressionWrapper(
+                models.F("bearbeitet_am") - models.F("erstellt_am"),
+                output_field=models.DurationField(),
+            ),
+            filter=mit_zeit,
+        ),
+        "bearbeitungszeit_anzahl": models.Count("pk", filter=mit_zeit),
+    }
+
+
+class FacilityTagesStatistik(models.Model):
+    """Voraggregierte Stoermeldungen je Tag, Kategorie und Ort.
+
+    Grundlage fuer Monatsbericht und Tendenz-Erkennung, damit diese nicht
+    die gesamte Meldungshistorie durchlaufen. tag ist der lokale Tag von
+    erstellt_am. Jede gespeicherte oder geloeschte Stoermeldung berechnet
+    ihren Eintrag neu (signals.py); facility_statistik_aufbauen baut die
+    Tabelle komplett oder ab einem Stichtag neu auf.
+    """
+
+    tag = models.DateField()
+    kategorie = models.CharField(max_length=30, choices=KATEGORIE_CHOICES)
+    raumnummer = models.CharField(max_length=50)
+
+    anzahl = models.PositiveIntegerField(default=0)
+    offen = models.PositiveIntegerField(default=0)
+    erledigt = models.PositiveIntegerField(default=0)
+    unloesbar = models.PositiveIntegerField(default=0)
+    # Summe (bearbeitet_am - erstellt_am) der erledigten Meldungen mit Zeitstempel
+    bearbeitungszeit_summe = models.DurationField(default=timedelta(0))
+    bearbeitungszeit_anzahl = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["tag", "kategorie", "raumnummer"]
+        verbose_name = "Facility-Tagesstatistik"
+        verbose_name_plural = "Facility-Tagesstatistiken"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tag", "kategorie", "raumnummer"],
+                name="facility_tagesstatistik_eindeutig",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tag} {self.kategorie} {self.raumnummer}: {self.anzahl}"
+
+    @classmethod
+    def aktualisieren(cls, tag, kategorie, raumnummer):
+        """Berechnet den Eintrag fuer (tag, kategorie, raumnummer) neu."""
+        beginn = timezone.make_aware(datetime.combine(tag, time.min))
+        werte = Stoermeldung.objects.filter(
+            erstellt_am__gte=beginn,
+            erstellt_am__lt=beginn + timedelta(days=1),
+            kategorie=kategorie,
+            raumnummer=raumnummer,
+        ).aggregate(**_statistik_aggregate())
+
+        if not werte["anzahl"]:
+            cls.objects.filter(tag=tag, kategorie=kategorie, raumnummer=raumnummer).delete()
+            return
+        werte["bearbeitungszeit_summe"] = werte["bearbeitungszeit_summe"] or timedelta(0)
+        cls.objects.update_or_create(
+            tag=tag, kategorie=kategorie, raumnummer=raumnummer, defaults=werte
+        )
+
+    @classmethod
+    def neu_aufbauen(cls, von: date = None) -> int:
+        """Baut die Statistik (ab Tag von) in einer gruppierten Query neu auf.
+
+        Gibt Anzahl geschriebener Eintraege zurueck.
+        """
+        meldungen = Stoermeldung.objects.all()
+        alt = cls.objects.all()
+        if von:
+            meldungen = meldungen.filter(
+                erstellt_am__gte=timezone.make_aware(datetime.combine(von, time.min))
+            )
+            alt = alt.filter(tag__gte=von)
+
+        zeilen = (
+            meldungen.annotate(tag=TruncDate("erstellt_am"))
+            .values("tag", "kategorie", "raumnummer")
+            .annotate(**_statistik_aggregate())
+            .order_by()
+        )
+        eintraege = []
+        for zeile in zeilen:
+            zeile["bearbeitungszeit_summe"] = zeile["bearbeitungszeit_summe"] or timedelta(0)
+            eintraege.append(cls(**zeile))
+
+        with transaction.atomic():
+            alt.delete()
+            cls.objects.bulk_create(eintraege, batch_size=1000)
+        return len(eintraege)
@@ -0,0 +1,49 @@
+"""
+Signals der Facility-App: FacilityTagesStatistik aktuell halten.
+
+Jede gespeicherte oder geloeschte Stoermeldung berechnet den Eintrag ihres
+Schluessels (Tag, Kategorie, Ort) neu. Aendert sich der Schluessel – z.B.
+Kategorie bei einer Weiterleitung –, wird auch der alte Eintrag neu berechnet.
+Massen-Updates ueber QuerySet.update() loesen keine Signals aus; dafuer gibt
+es facility_statistik_aufbauen.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import FacilityTagesStatistik, Stoermeldung
+
+
+def _schluessel(erstellt_am, kategorie, raumnummer):
+    return (timezone.localdate(erstellt_am), kategorie, raumnummer)
+
+
+@receiver(pre_save, sender=Stoermeldung, dispatch_uid="facility_statistik_alter_schluessel")
+def statistik_alten_schluessel_merken(sender, instance, raw=False, **kwargs):
+    """Merkt den bisherigen Schluessel, falls Kategorie oder Ort geaendert werden."""
+    instance._statistik_schluessel_alt = None
+    if raw or instance.pk is None:
+        return
+    alt = Stoermeldung.objects.filter(pk=instance.pk).values_list(
+        "erstellt_am", "kategorie", "raumnummer"
+    ).first()
+    if alt is not None:
+        instance._statistik_schluessel_alt = _schluessel(*alt)
+
+
+@receiver(post_save, sender=Stoermeldung, dispatch_uid="facility_statistik_speichern")
+def statistik_nach_speichern(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    neu = _schluessel(instance.erstellt_am, instance.kategorie, instance.raumnummer)
+    FacilityTagesStatistik.aktualisieren(*neu)
+    alt = getattr(instance, "_statistik_schluessel_alt", None)
+    if alt is not None and alt != neu:
+        FacilityTagesStatistik.aktualisieren(*alt)
+
+
+@receiver(post_delete, sender=Stoermeldung, dispatch_uid="facility_statistik_loeschen")
+def statistik_nach_loeschen(sender, instance, **kwargs):
+    FacilityTagesStatistik.aktualisieren(
+        *_schluessel(instance.erstellt_am, instance.kategorie, instance.raumnummer)
+    )
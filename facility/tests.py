@@ -1,3 +1,131 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+
+from hr.models import HRMitarbeiter
+
+from .models import FacilityTagesStatistik, Stoermeldung, Wartungsplan
+
+
+class WartungenAusloesenTest(TestCase):
+    """Wartungsplan.faellige_ausloesen: Wasserstand letzte_pruefung und Folgezyklen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("hausmeister")
+        HRMitarbeiter.objects.create(vorname="H", nachname="M", user=user)
+
+    def setUp(self):
+        self.plan = Wartungsplan.objects.create(
+            name="Filterwechsel", raumnummer="K.01", kategorie="elektro",
+            intervall_wert=7, intervall_einheit="tage", naechste_faelligkeit=date(2026, 10, 1),
+        )
+
+    def _status_setzen(self, status):
+        Stoermeldung.objects.filter(wartungsplan=self.plan).update(status=status)
+
+    def test_einmal_je_faelligkeit(self):
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 9, 30)), 0)
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 2)), 1)
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 3)), 0)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.letzte_pruefung, date(2026, 10, 2))
+        meldung = Stoermeldung.objects.get(wartungsplan=self.plan)
+        self.assertTrue(meldung.ist_wartung)
+
+    def test_offene_aufgabe_blockiert_neue(self):
+        Wartungsplan.faellige_ausloesen(date(2026, 10, 2))
+        # Wasserstand zurueckgesetzt (z.B. Faelligkeit von Hand geaendert)
+        Wartungsplan.objects.filter(pk=self.plan.pk).update(letzte_pruefung=None)
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 3)), 0)
+        self.assertEqual(Stoermeldung.objects.filter(wartungsplan=self.plan).count(), 1)
+
+    def test_unloesbar_schreibt_faelligkeit_fort(self):
+        Wartungsplan.faellige_ausloesen(date(2026, 10, 2))
+        self._status_setzen("unloesbar")
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 3)), 0)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.naechste_faelligkeit, date(2026, 10, 9))
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 9)), 1)
+
+    def test_weitergeleitet_bleibt_offen(self):
+        Wartungsplan.faellige_ausloesen(date(2026, 10, 2))
+        self._status_setzen("weitergeleitet")
+        self.assertTrue(self.plan.hat_offene_aufgabe())
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 20)), 0)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.naechste_faelligkeit, date(2026, 10, 1))
+
+    def test_inaktiver_plan_wird_uebersprungen(self):
+        Wartungsplan.objects.filter(pk=self.plan.pk).update(ist_aktiv=False)
+        self.assertEqual(Wartungsplan.faellige_ausloesen(date(2026, 10, 2)), 0)
+
+
+class TagesStatistikTest(TestCase):
+    """FacilityTagesStatistik: Pflege per Signal entspricht dem Neuaufbau."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.melder = HRMitarbeiter.objects.create(vorname="M", nachname="Elder")
+
+    def _meldung(self, raumnummer="A.101", kategorie="elektro", erstellt_am=None):
+        meldung = Stoermeldung.objects.create(
+            melder=self.melder, melder_telefon="123", raumnummer=raumnummer, kategorie=kategorie,
+        )
+        if erstellt_am is not None:
+            # auto_now_add: Zeitstempel nachtraeglich setzen (ohne Signal)
+            Stoermeldung.objects.filter(pk=meldung.pk).update(erstellt_am=erstellt_am)
+            meldung.refresh_from_db()
+        return meldung
+
+    def _zeilen(self):
+        return list(FacilityTagesStatistik.objects.order_by("tag", "kategorie", "raumnummer").values(
+            "tag", "kategorie", "raumnummer", "anzahl", "offen", "erledigt", "unloesbar",
+            "bearbeitungszeit_summe", "bearbeitungszeit_anzahl",
+        ))
+
+    def _lokal(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_signale_entsprechen_neuaufbau(self):
+        spaet = self._meldung(erstellt_am=self._lokal(2026, 10, 1, 23, 30))
+        frueh = self._meldung(erstellt_am=self._lokal(2026, 10, 2, 0, 15))
+        weiter = self._meldung(raumnummer="B.2", erstellt_am=self._lokal(2026, 10, 2, 9, 0))
+        weg = self._meldung(kategorie="maler", erstellt_am=self._lokal(2026, 10, 2, 10, 0))
+        FacilityTagesStatistik.neu_aufbauen()
+
+        # Aenderungen ueber save()/delete() -> Signale
+        spaet.status = "erledigt"
+        spaet.bearbeitet_am = spaet.erstellt_am + timedelta(hours=3)
+        spaet.save()
+        frueh.status = "unloesbar"
+        frueh.save()
+        weiter.status = "weitergeleitet"
+        weiter.kategorie = "sanitaer_heizung"
+        weiter.save()
+        weg.delete()
+        self._meldung(raumnummer="C.3")
+
+        ueber_signale = self._zeilen()
+        self.assertEqual(FacilityTagesStatistik.neu_aufbauen(), len(ueber_signale))
+        self.assertEqual(self._zeilen(), ueber_signale)
+
+        erster = FacilityTagesStatistik.objects.get(tag=date(2026, 10, 1))
+        self.assertEqual((erster.anzahl, erster.erledigt), (1, 1))
+        self.assertEqual(erster.bearbeitungszeit_summe, timedelta(hours=3))
+        self.assertFalse(FacilityTagesStatistik.objects.filter(kategorie="maler").exists())
+        self.assertEqual(
+            FacilityTagesStatistik.objects.get(kategorie="sanitaer_heizung").offen, 1,
+        )
+
+    def test_neuaufbau_ab_stichtag(self):
+        self._meldung(erstellt_am=self._lokal(2026, 9, 30, 12, 0))
+        self._meldung(erstellt_am=self._lokal(2026, 10, 1, 12, 0))
+        FacilityTagesStatistik.neu_aufbauen()
+        FacilityTagesStatistik.objects.filter(tag=date(2026, 9, 30)).update(anzahl=99)
 
-# Create your tests here.
+        self.assertEqual(FacilityTagesStatistik.neu_aufbauen(von=date(2026, 10, 1)), 1)
+        self.assertEqual(FacilityTagesStatistik.objects.get(tag=date(2026, 9, 30)).anzahl, 99)
+        self.assertEqual(FacilityTagesStatistik.objects.get(tag=date(2026, 10, 1)).anzahl, 1)
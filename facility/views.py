@@ -1,7 +1,7 @@
 import calendar
 import json
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
 from django.conf import settings
 from django.contrib import messages
@@ -16,6 +16,7 @@ from config.kommunikation_utils import matrix_nachricht_senden
 from .models import (
     KATEGORIE_CHOICES,
     FacilityEinstellungen,
+    FacilityTagesStatistik,
     FacilityTeam,
     Stoermeldung,
     Textbaustein,
@@ -390,51 +391,6 @@ def textbausteine_laden(request):
 # ---------------------------------------------------------------------------
 
 
-def _pruefe_faellige_wartungen(kategorien=None):
-    """Erzeugt Stoermeldungen fuer faellige Wartungsplaene (ohne Duplikate).
-
-    Wird beim Oeffnen der Facility-Queue aufgerufen.
-    kategorien: Liste von Kategorie-Strings oder None (= alle).
-    Gibt Anzahl neu erzeugter Meldungen zurueck.
-    """
-    from datetime import date as _date
-    from hr.models import HRMitarbeiter
-
-    # System-Platzhalter: erster aktiver HR-Mitarbeiter als Melder fuer Wartungsaufgaben
-    system_melder = HRMitarbeiter.objects.filter(
-        user__is_active=True
-    ).order_by("pk").first()
-    if not system_melder:
-        logger.warning("Kein HR-Mitarbeiter fuer Wartungs-Ausloesung gefunden.")
-        return 0
-
-    qs = Wartungsplan.objects.filter(
-        ist_aktiv=True,
-        naechste_faelligkeit__lte=_date.today(),
-    )
-    if kategorien:
-        qs = qs.filter(kategorie__in=kategorien)
-
-    neu = 0
-    for plan in qs:
-        if plan.hat_offene_aufgabe():
-            continue  # Duplikat vermeiden
-        Stoermeldung.objects.create(
-            melder=system_melder,
-            melder_telefon="-",
-            raumnummer=plan.raumnummer,
-            raum_freitext=plan.raum_freitext,
-            kategorie=plan.kategorie,
-            beschreibung=f"Wartung: {plan.name}\n{plan.beschreibung}".strip(),
-            prioritaet=plan.prioritaet,
-            ist_wartung=True,
-            wartungsplan=plan,
-        )
-        logger.info("Wartungsaufgabe ausgeloest: Wartungsplan %s (%s)", plan.pk, plan.name)
-        neu += 1
-    return neu
-
-
 @login_required
 def facility_queue(request):
     """Facility-Team-Queue mit 4 Tabs."""
@@ -448,11 +404,7 @@ def facility_queue(request):
         else None
     )
 
-    # Faellige Wartungsplaene automatisch in Queue einstellen
-    neu_erzeugt = _pruefe_faellige_wartungen(kategorien)
-    if neu_erzeugt:
-        messages.info(request, f"{neu_erzeugt} neue Wartungsaufgabe(n) automatisch eingestellt.")
-
+    # Faellige Wartungsplaene stellt der Scheduler ein (facility_wartungen_pruefen)
     qs = Stoermeldung.objects.all()
     if kategorien is not None:
         qs = qs.filter(kategorie__in=kategorien)
@@ -957,7 +909,11 @@ def wartungsplan_bearbeiten(request, pk):
             plan.prioritaet = daten.get("prioritaet", "normal")
             plan.intervall_wert = int(daten["intervall_wert"])
             plan.intervall_einheit = daten["intervall_einheit"]
-            plan.naechste_faelligkeit = _date.fromisoformat(daten["naechste_faelligkeit"])
+            naechste_faelligkeit = _date.fromisoformat(daten["naechste_faelligkeit"])
+            if naechste_faelligkeit != plan.naechste_faelligkeit:
+                # Neue Faelligkeit: beim naechsten Scheduler-Lauf erneut pruefen
+                plan.letzte_pruefung = None
+            plan.naechste_faelligkeit = naechste_faelligkeit
             plan.ist_aktiv = "ist_aktiv" in daten
             plan.save()
             messages.success(request, f"Wartungsplan '{plan.name}' wurde gespeichert.")
@@ -1085,9 +1041,10 @@ def al_monatsreport(request):
 
     Zeigt Zusammenfassung, Kategorieverteilung, Top-Raeume und
     Tendenz-Erkennung (wiederkehrende Stoerungen am selben Ort).
+    Liest nur FacilityTagesStatistik (ein Eintrag je Tag/Kategorie/Ort).
     Zugang: ALs und Staff.
     """
-    from django.db.models import Count
+    from django.db.models import Sum
 
     if not _hat_al_zugang(request.user):
         return HttpResponseForbidden()
@@ -1110,78 +1067,75 @@ def al_monatsreport(request):
         jahr, monat = heute.year, heute.month
         monat_str = f"{jahr}-{monat:02d}"
 
+    # --- Alles aus der voraggregierten Tagesstatistik ---
     letzter_tag = calendar.monthrange(jahr, monat)[1]
-    von = timezone.make_aware(datetime(jahr, monat, 1, 0, 0, 0))
-    bis = timezone.make_aware(datetime(jahr, monat, letzter_tag, 23, 59, 59))
-
-    qs = Stoermeldung.objects.filter(erstellt_am__range=(von, bis))
-    gesamt = qs.count()
-
-    offen_count = qs.filter(
-        status__in=["offen", "in_bearbeitung", "weitergeleitet"]
-    ).count()
-    erledigt_count = qs.filter(status="erledigt").count()
-    unloesbar_count = qs.filter(status="unloesbar").count()
+    qs = FacilityTagesStatistik.objects.filter(
+        tag__range=(date(jahr, monat, 1), date(jahr, monat, letzter_tag))
+    )
+    summen = qs.aggregate(
+        gesamt=Sum("anzahl"),
+        offen=Sum("offen"),
+        erledigt=Sum("erledigt"),
+        unloesbar=Sum("unloesbar"),
+        zeit_summe=Sum("bearbeitungszeit_summe"),
+        zeit_anzahl=Sum("bearbeitungszeit_anzahl"),
+    )
+    gesamt = summen["gesamt"] or 0
+    offen_count = summen["offen"] or 0
+    erledigt_count = summen["erledigt"] or 0
+    unloesbar_count = summen["unloesbar"] or 0
 
     # --- Durchschnittliche Bearbeitungszeit (Stunden) ---
     avg_stunden = None
-    erledigte = list(
-        qs.filter(status="erledigt", bearbeitet_am__isnull=False).values_list(
-            "erstellt_am", "bearbeitet_am"
+    if summen["zeit_anzahl"]:
+        avg_stunden = round(
+            summen["zeit_summe"].total_seconds() / 3600 / summen["zeit_anzahl"], 1
         )
-    )
-    if erledigte:
-        zeiten = [
-            (bearbeitet - erstellt).total_seconds() / 3600
-            for erstellt, bearbeitet in erledigte
-        ]
-        avg_stunden = round(sum(zeiten) / len(zeiten), 1)
 
     # --- Nach Kategorie ---
     kategorie_label = dict(KATEGORIE_CHOICES)
     nach_kategorie_raw = (
         qs.values("kategorie")
-        .annotate(anzahl=Count("pk"))
-        .order_by("-anzahl")
+        .annotate(summe=Sum("anzahl"))
+        .order_by("-summe")
     )
     nach_kategorie = []
     for eintrag in nach_kategorie_raw:
-        anteil = round(eintrag["anzahl"] / gesamt * 100) if gesamt else 0
+        anteil = round(eintrag["summe"] / gesamt * 100) if gesamt else 0
         nach_kategorie.append({
             "label": kategorie_label.get(eintrag["kategorie"], eintrag["kategorie"]),
-            "anzahl": eintrag["anzahl"],
+            "anzahl": eintrag["summe"],
             "anteil": anteil,
         })
 
     # --- Top-Raeume (raumnummer + kategorie, Top 10) ---
     top_raeume_raw = (
         qs.values("raumnummer", "kategorie")
-        .annotate(anzahl=Count("pk"))
-        .order_by("-anzahl")[:10]
+        .annotate(summe=Sum("anzahl"))
+        .order_by("-summe")[:10]
     )
     top_raeume = [
         {
             "raum": r["raumnummer"],
             "kategorie": kategorie_label.get(r["kategorie"], r["kategorie"]),
-            "anzahl": r["anzahl"],
+            "anzahl": r["summe"],
         }
         for r in top_raeume_raw
     ]
 
     # --- Tendenz-Erkennung: gleicher Raum + Kategorie >= TREND_SCHWELLE in TREND_TAGE ---
-    grenze = timezone.now() - timedelta(days=TREND_TAGE)
     tendenzen_raw = (
-        Stoermeldung.objects.filter(erstellt_am__gte=grenze)
+        FacilityTagesStatistik.objects.filter(tag__gte=heute - timedelta(days=TREND_TAGE))
         .values("raumnummer", "kategorie")
-        .annotate(anzahl=Count("pk"))
-        .filter(anzahl__gte=TREND_SCHWELLE)
-        .order_by("-anzahl")
+        .annotate(summe=Sum("anzahl"))
+        .filter(summe__gte=TREND_SCHWELLE)
+        .order_by("-summe")
     )
     tendenzen = [
         {
             "raum": t["raumnummer"],
             "kategorie": kategorie_label.get(t["kategorie"], t["kategorie"]),
-            "anzahl": t["anzahl"],
+            "anzahl": t["summe"],
         }
         for t in tendenzen_raw
     ]
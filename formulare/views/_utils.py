@@ -205,23 +205,19 @@ def _signiere_und_speichere(antrag, user, pdf_bytes_neu, dateiname):
 def _signiere_pdf_alle_unterzeichner(pdf_bytes, unterzeichner, dateiname):
     """Signiert ein PDF inkrementell fuer jeden Unterzeichner in der Liste.
 
+    Alle Signaturen werden in einem Durchgang angehaengt (signiere_pdf_batch).
     Gibt das (mehrfach-)signierte PDF zurueck. Einzelne Signatur-Fehler
     werden geloggt aber nicht weitergeworfen, damit das PDF immer ausgeliefert wird.
     """
-    from signatur.services import signiere_pdf
-    for i, user in enumerate(unterzeichner):
-        try:
-            pdf_bytes = signiere_pdf(
-                pdf_bytes,
-                user,
-                dokument_name=dateiname,
-            )
-        except Exception as exc:
-            logger.warning(
-                "Signatur von %s fehlgeschlagen (Unterzeichner %s/%s, Dokument '%s'): %s",
-                user.username, i + 1, len(unterzeichner), dateiname, exc,
-            )
-    return pdf_bytes
+    from signatur.services import signiere_pdf_batch
+    try:
+        return signiere_pdf_batch(pdf_bytes, unterzeichner, dokument_name=dateiname)
+    except Exception as exc:
+        logger.warning(
+            "Signatur fehlgeschlagen (%s Unterzeichner, Dokument '%s'): %s",
+            len(unterzeichner), dateiname, exc,
+        )
+        return pdf_bytes
 
 
 def _hole_antrag_signatur(content_type_str, object_id):
@@ -246,7 +242,7 @@ def _auto_signiere_antrag(antrag, request, content_type_str, pdf_template, extra
     Schlaegt still fehl – unterbricht nie die Formular-Einreichung.
     """
     try:
-        from weasyprint import HTML
+        from utils.pdf_render import render_pdf
         from django.template.loader import render_to_string
 
         ctx = {"antrag": antrag, "betreff": antrag.get_betreff()}
@@ -254,10 +250,7 @@ def _auto_signiere_antrag(antrag, request, content_type_str, pdf_template, extra
             ctx.update(extra_context)
 
         html_string = render_to_string(pdf_template, ctx, request=request)
-        pdf_neu = HTML(
-            string=html_string,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        pdf_neu = render_pdf(html_string, base_url=request.build_absolute_uri())
         dateiname = antrag.get_betreff().replace(" ", "_") + ".pdf"
 
         _signiere_und_speichere(antrag, antrag.antragsteller.user, pdf_neu, dateiname)
@@ -363,14 +356,11 @@ def _auto_signiere_genehmigung(antrag, antrag_typ, request):
 
         if gespeichertes is None:
             # Noch kein gespeichertes PDF → frisch generieren
-            from weasyprint import HTML
+            from utils.pdf_render import render_pdf
             from django.template.loader import render_to_string
             ctx = {"antrag": antrag, "betreff": antrag.get_betreff()}
             html_string = render_to_string(pdf_template, ctx, request=request)
-            gespeichertes = HTML(
-                string=html_string,
-                base_url=request.build_absolute_uri(),
-            ).write_pdf()
+            gespeichertes = render_pdf(html_string, base_url=request.build_absolute_uri())
 
         _signiere_und_speichere(antrag, request.user, gespeichertes, dateiname)
         logger.info(
@@ -601,7 +591,8 @@ def _offene_antraege_fuer_user(user):
     Faellt auf guardian-Permissions zurueck wenn kein Stellensystem vorhanden.
     """
     from arbeitszeit.models import Mitarbeiter
-    from hr.models import HRMitarbeiter, Stelle
+    from hr.models import HRMitarbeiter
+    from hr.org_graph import OrgGraph
 
     if user.is_superuser or user.is_staff:
         return Mitarbeiter.objects.all()
@@ -614,29 +605,28 @@ def _offene_antraege_fuer_user(user):
         user_stelle = None
 
     if user_stelle is not None:
-        # Alle Stellen mit uebergeordneter Stelle laden
-        stellen_mit_vorgesetztem = Stelle.objects.filter(
-            uebergeordnete_stelle__isnull=False
-        ).select_related("uebergeordnete_stelle")
+        # Alle Stellen mit uebergeordneter Stelle aus dem OrgGraph (ohne Queries je Stelle)
+        graph = OrgGraph.aktuell()
 
         # Berechtigte Stellen: user_stelle ist die DIREKTE uebergeordnete Stelle (Heike sieht Alex)
         # ODER user_stelle ist die verantwortliche Stelle per Delegation (Alex sieht als Delegierter)
         # ABER: keine Selbst-Genehmigung (eigene Stelle nie in der Liste)
         berechtigte_stellen = []
-        for stelle in stellen_mit_vorgesetztem:
+        for stelle in graph.stellen.values():
+            if stelle.uebergeordnete_stelle_id is None:
+                continue
             # Nie eigene Stelle aufnehmen (Selbst-Genehmigung verhindern)
-            if stelle.pk == user_stelle.pk:
+            if stelle.id == user_stelle.pk:
                 continue
-            ug = stelle.uebergeordnete_stelle
             # Direkte Hierarchie
-            direkt_zustaendig = ug.pk == user_stelle.pk
+            direkt_zustaendig = stelle.uebergeordnete_stelle_id == user_stelle.pk
             # Delegation: user_stelle ist der Delegat von ug
-            verantwortliche = ug.verantwortliche_stelle()
+            verantwortliche = graph.verantwortliche_stelle(stelle.uebergeordnete_stelle_id)
             als_delegat_zustaendig = (
-                verantwortliche is not None and verantwortliche.pk == user_stelle.pk
+                verantwortliche is not None and verantwortliche.id == user_stelle.pk
             )
             if direkt_zustaendig or als_delegat_zustaendig:
-                berechtigte_stellen.append(stelle.pk)
+                berechtigte_stellen.append(stelle.id)
 
         if berechtigte_stellen:
             # HRMitarbeiter dieser Stellen
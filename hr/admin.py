@@ -5,6 +5,7 @@ from .models import (
     Bereich,
     HierarchieSnapshot,
     HRMitarbeiter,
+    Nummernkreis,
     OrgEinheit,
     Projektgruppe,
     Stelle,
@@ -307,3 +308,10 @@ class ProjektgruppeAdmin(admin.ModelAdmin):
     def anzahl_mitglieder(self, obj):
         """Zeigt Anzahl Mitglieder."""
         return obj.mitglieder_anzahl
+
+
+@admin.register(Nummernkreis)
+class NummernkreisAdmin(admin.ModelAdmin):
+    list_display = ["praefix", "jahr", "letzter_wert"]
+    list_filter = ["jahr"]
+    search_fields = ["praefix"]
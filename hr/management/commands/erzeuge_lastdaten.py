@@ -0,0 +1,506 @@
+"""
+Management Command: Erzeugt eine synthetische Firma in Produktionsgroesse
+als Datengrundlage fuer die Benchmarks (benchmarks/).
+
+Aufbau (baut auf erstelle_musterfirma auf):
+  1. erstelle_musterfirma – Bereiche, Abteilungen, Teams, ~110 HR-Mitarbeiter
+  2. weitere HR-Mitarbeiter bis --mitarbeiter erreicht ist
+  3. OrgEinheiten je Bereich/Abteilung und eine Stelle je HR-Mitarbeiter
+     (Hierarchie aus dem Vorgesetzten-Feld)
+  4. arbeitszeit.Mitarbeiter + ein Jahr Zeiterfassung (Mo-Fr),
+     anschliessend saldo_neuaufbau
+  5. DMS-Dokumente mit Zufallsinhalt (80 % offen, 20 % sensibel); offene
+     werden fuer dms_index_worker eingereiht, anschliessend
+     dms_sichtbarkeit_aufbauen
+  6. Workflow-Instanzen mit offenen Tasks beim direkten Vorgesetzten
+  7. Schichttypen T/N/Z, besetzter Schichtplan des Vormonats und leerer
+     Plan des Folgemonats (Eingabe fuer SchichtplanGenerator)
+
+Massendaten werden per bulk_create geschrieben (ohne Signale); die
+Zufallswerte haengen nur von --seed ab, zwei Laeufe mit gleichem Seed
+auf leerer Datenbank erzeugen denselben Datenbestand.
+
+Nur fuer Entwicklungs-/Benchmark-Datenbanken – ohne DEBUG nur mit --erzwingen.
+
+Aufruf: python manage.py erzeuge_lastdaten --mitarbeiter 500
+        python manage.py erzeuge_lastdaten --mitarbeiter 2000 --dokumente 5000 --seed 7
+"""
+import calendar
+import random
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hr.management.commands.erstelle_musterfirma import _zufallsdatum, _zufallsname
+from hr.models import Abteilung, Bereich, HRMitarbeiter, OrgEinheit, Stelle, Team
+
+BATCH = 2000
+
+# HR-Rolle -> (Kuerzel-Praefix, Stellen-Kategorie)
+STELLEN_ROLLEN = {
+    "gf": ("gf", "leitung"),
+    "bereichsleiter": ("bl", "leitung"),
+    "abteilungsleiter": ("al", "leitung"),
+    "assistent": ("as", "stab"),
+    "mitarbeiter": ("ma", "fachkraft"),
+}
+
+# Zeiterfassungs-Art je Arbeitstag (Gewichte), None = kein Eintrag
+ARTEN = [("homeoffice", 55), ("hybrid", 30), ("urlaub", 7), ("krank", 3), (None, 5)]
+
+SOLL_MINUTEN = 468  # Typ A – 7:48h
+
+
+class Command(BaseCommand):
+    help = "Erzeugt Lastdaten (Mitarbeiter, Zeiterfassung, Dokumente, Workflows, Schichtplaene)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mitarbeiter",
+            type=int,
+            default=500,
+            help="Gesamtzahl HR-Mitarbeiter (mindestens die Musterfirma, Standard: 500)",
+        )
+        parser.add_argument(
+            "--dokumente",
+            type=int,
+            help="Anzahl DMS-Dokumente (Standard: 2 je Mitarbeiter)",
+        )
+        parser.add_argument(
+            "--dokument-kb",
+            type=int,
+            default=64,
+            help="Mittlere Dokumentgroesse in KB (Standard: 64)",
+        )
+        parser.add_argument(
+            "--workflows",
+            type=int,
+            help="Anzahl Workflow-Instanzen (Standard: 1 je 2 Mitarbeiter)",
+        )
+        parser.add_argument(
+            "--tage",
+            type=int,
+            default=365,
+            help="Zeitraum der Zeiterfassung in Tagen bis gestern (Standard: 365)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Startwert des Zufallsgenerators (Standard: 42)",
+        )
+        parser.add_argument(
+            "--erzwingen",
+            action="store_true",
+            help="Auch ohne DEBUG ausfuehren",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["erzwingen"]:
+            raise CommandError(
+                "Lastdaten nur auf Entwicklungsdatenbanken erzeugen (DEBUG=True oder --erzwingen)."
+            )
+
+        random.seed(options["seed"])
+        anzahl = options["mitarbeiter"]
+
+        self.stdout.write("1/7 Musterfirma...")
+        call_command("erstelle_musterfirma", stdout=self.stdout)
+
+        with transaction.atomic():
+            self.stdout.write("2/7 HR-Mitarbeiter...")
+            self._hr_mitarbeiter(anzahl)
+            self.stdout.write("3/7 OrgEinheiten und Stellen...")
+            self._stellen()
+            self.stdout.write("4/7 Mitarbeiter und Zeiterfassung...")
+            mitarbeiter = self._mitarbeiter()
+            self._zeiterfassung(mitarbeiter, options["tage"])
+            self.stdout.write("5/7 Dokumente...")
+            self._dokumente(
+                options["dokumente"] if options["dokumente"] is not None else 2 * anzahl,
+                options["dokument_kb"],
+            )
+            self.stdout.write("6/7 Schichtplaene...")
+            self._schichtplaene(mitarbeiter)
+
+        # bulk_create loest keine Signale aus
+        from hr.org_graph import OrgGraph
+        OrgGraph.invalidieren()
+        call_command("saldo_neuaufbau", stdout=self.stdout)
+        call_command("dms_sichtbarkeit_aufbauen", stdout=self.stdout)
+
+        self.stdout.write("7/7 Workflows...")
+        self._workflows(
+            options["workflows"] if options["workflows"] is not None else anzahl // 2
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fertig! {HRMitarbeiter.objects.count()} HR-Mitarbeiter, "
+            f"{Stelle.objects.count()} Stellen, "
+            f"{self._anzahl('arbeitszeit.Zeiterfassung')} Zeiterfassungen, "
+            f"{self._anzahl('dms.Dokument')} Dokumente, "
+            f"{self._anzahl('workflow.WorkflowInstance')} Workflow-Instanzen, "
+            f"{self._anzahl('schichtplan.Schicht')} Schichten"
+        ))
+
+    @staticmethod
+    def _anzahl(label):
+        from django.apps import apps
+        return apps.get_model(label).objects.count()
+
+    # ------------------------------------------------------------------
+    # 2. HR-Mitarbeiter
+    # ------------------------------------------------------------------
+    def _hr_mitarbeiter(self, anzahl):
+        fehlend = anzahl - HRMitarbeiter.objects.count()
+        if fehlend <= 0:
+            return
+
+        # Teams mit Abteilungsleitung als Vorgesetzte
+        leitung = {
+            hr.abteilung_id: hr
+            for hr in HRMitarbeiter.objects.filter(rolle="abteilungsleiter")
+        }
+        teams = [t for t in Team.objects.select_related("abteilung") if t.abteilung_id in leitung]
+        if not teams:
+            raise CommandError("Keine Teams gefunden – erstelle_musterfirma fehlgeschlagen?")
+
+        start = HRMitarbeiter.objects.filter(personalnummer__startswith="LD-").count()
+        passwort = make_password(None)
+        personen = []
+        for i in range(start, start + fehlend):
+            vn, nn = _zufallsname()
+            personen.append((f"LD-{i:05d}", vn, nn, random.choice(teams)))
+
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"ld.{persnr.lower()}",
+                    first_name=vn,
+                    last_name=nn,
+                    email=f"ld.{persnr.lower()}@apex-solutions.de",
+                    password=passwort,
+                )
+                for persnr, vn, nn, _team in personen
+            ],
+            batch_size=BATCH,
+        )
+        HRMitarbeiter.objects.bulk_create(
+            [
+                HRMitarbeiter(
+                    vorname=vn,
+                    nachname=nn,
+                    personalnummer=persnr,
+                    rolle="mitarbeiter",
+                    bereich_id=team.abteilung.bereich_id,
+                    abteilung_id=team.abteilung_id,
+                    team=team,
+                    vorgesetzter=leitung[team.abteilung_id],
+                    user=user,
+                    eintrittsdatum=_zufallsdatum(),
+                    email=f"{vn.lower()}.{nn.lower()}@apex-solutions.de",
+                )
+                for (persnr, vn, nn, team), user in zip(personen, users)
+            ],
+            batch_size=BATCH,
+        )
+
+    # ------------------------------------------------------------------
+    # 3. OrgEinheiten und Stellen
+    # ------------------------------------------------------------------
+    def _stellen(self):
+        gf, _ = OrgEinheit.objects.get_or_create(
+            kuerzel="GF", defaults={"bezeichnung": "Geschaeftsfuehrung"}
+        )
+        org_je_bereich = {}
+        for bereich in Bereich.objects.all():
+            if bereich.kuerzel == "GF":
+                org_je_bereich[bereich.pk] = gf
+                continue
+            org, _ = OrgEinheit.objects.get_or_create(
+                kuerzel=bereich.kuerzel,
+                defaults={"bezeichnung": bereich.name, "uebergeordnet": gf},
+            )
+            org_je_bereich[bereich.pk] = org
+        org_je_abteilung = {}
+        for abteilung in Abteilung.objects.all():
+            org, _ = OrgEinheit.objects.get_or_create(
+                kuerzel=abteilung.kuerzel,
+                defaults={
+                    "bezeichnung": abteilung.name,
+                    "uebergeordnet": org_je_bereich.get(abteilung.bereich_id),
+                },
+            )
+            org_je_abteilung[abteilung.pk] = org
+
+        ohne_stelle = list(
+            HRMitarbeiter.objects.filter(stelle__isnull=True).order_by("personalnummer")
+        )
+        neue_stellen = []
+        for hr in ohne_stelle:
+            praefix, kategorie = STELLEN_ROLLEN.get(hr.rolle, ("ma", "fachkraft"))
+            org = org_je_abteilung.get(hr.abteilung_id) or org_je_bereich.get(hr.bereich_id) or gf
+            neue_stellen.append(Stelle(
+                kuerzel=f"{praefix}_{(hr.personalnummer or str(hr.pk)).lower()}"[:20],
+                bezeichnung=f"{hr.get_rolle_display()} {org.kuerzel}",
+                kategorie=kategorie,
+                org_einheit=org,
+            ))
+        Stelle.objects.bulk_create(neue_stellen, batch_size=BATCH)
+        for hr, stelle in zip(ohne_stelle, neue_stellen):
+            hr.stelle = stelle
+        HRMitarbeiter.objects.bulk_update(ohne_stelle, ["stelle"], batch_size=BATCH)
+
+        # Stellen-Hierarchie aus dem Vorgesetzten-Feld
+        stelle_je_hr = dict(HRMitarbeiter.objects.values_list("pk", "stelle_id"))
+        stellen = []
+        for hr in ohne_stelle:
+            vorgesetzten_stelle = stelle_je_hr.get(hr.vorgesetzter_id)
+            if vorgesetzten_stelle and vorgesetzten_stelle != hr.stelle.pk:
+                hr.stelle.uebergeordnete_stelle_id = vorgesetzten_stelle
+                stellen.append(hr.stelle)
+        Stelle.objects.bulk_update(stellen, ["uebergeordnete_stelle"], batch_size=BATCH)
+
+        # Leitende Stellen der Abteilungen
+        for hr in ohne_stelle:
+            if hr.rolle == "abteilungsleiter" and hr.abteilung_id in org_je_abteilung:
+                OrgEinheit.objects.filter(
+                    pk=org_je_abteilung[hr.abteilung_id].pk, leitende_stelle__isnull=True
+                ).update(leitende_stelle=hr.stelle)
+
+    # ------------------------------------------------------------------
+    # 4. Mitarbeiter und Zeiterfassung
+    # ------------------------------------------------------------------
+    def _mitarbeiter(self):
+        from arbeitszeit.models import Mitarbeiter
+
+        vorhandene_user = set(Mitarbeiter.objects.values_list("user_id", flat=True))
+        vorhandene_persnr = set(Mitarbeiter.objects.values_list("personalnummer", flat=True))
+        hr_liste = list(
+            HRMitarbeiter.objects.filter(user__isnull=False)
+            .exclude(user_id__in=vorhandene_user)
+            .exclude(personalnummer__in=vorhandene_persnr)
+            .select_related("abteilung")
+            .order_by("personalnummer")
+        )
+        Mitarbeiter.objects.bulk_create(
+            [
+                Mitarbeiter(
+                    user_id=hr.user_id,
+                    personalnummer=hr.personalnummer or f"HR-{hr.pk}",
+                    vorname=hr.vorname,
+                    nachname=hr.nachname,
+                    abteilung=hr.abteilung.name if hr.abteilung else "Geschaeftsfuehrung",
+                    eintrittsdatum=hr.eintrittsdatum,
+                )
+                for hr in hr_liste
+            ],
+            batch_size=BATCH,
+        )
+
+        # Vorgesetzte wie in HR
+        ma_je_user = {
+            ma.user_id: ma
+            for ma in Mitarbeiter.objects.filter(user_id__in=[hr.user_id for hr in hr_liste])
+        }
+        user_je_hr = dict(HRMitarbeiter.objects.values_list("pk", "user_id"))
+        geaendert = []
+        for hr in hr_liste:
+            vorgesetzter = ma_je_user.get(user_je_hr.get(hr.vorgesetzter_id))
+            ma = ma_je_user.get(hr.user_id)
+            if ma and vorgesetzter:
+                ma.vorgesetzter = vorgesetzter
+                geaendert.append(ma)
+        Mitarbeiter.objects.bulk_update(geaendert, ["vorgesetzter"], batch_size=BATCH)
+
+        # 15 planbare Schicht-Mitarbeiter (MA1-MA15), falls noch keine vorhanden
+        neu = list(ma_je_user.values())
+        if not Mitarbeiter.objects.filter(schichtplan_kennung__startswith="MA").exists():
+            schicht_ma = random.sample(neu, min(15, len(neu)))
+            for nummer, ma in enumerate(schicht_ma, start=1):
+                ma.schichtplan_kennung = f"MA{nummer}"
+            Mitarbeiter.objects.bulk_update(schicht_ma, ["schichtplan_kennung"], batch_size=BATCH)
+        return neu
+
+    def _zeiterfassung(self, mitarbeiter, tage):
+        from arbeitszeit.models import Zeiterfassung, berechne_pause
+
+        heute = timezone.localdate()
+        arbeitstage = [
+            heute - timedelta(days=d)
+            for d in range(tage, 0, -1)
+            if (heute - timedelta(days=d)).weekday() < 5
+        ]
+        arten = [a for a, _ in ARTEN]
+        gewichte = [g for _, g in ARTEN]
+
+        puffer = []
+        for ma in mitarbeiter:
+            for datum in arbeitstage:
+                art = random.choices(arten, gewichte)[0]
+                if art is None:
+                    continue
+                eintrag = Zeiterfassung(
+                    mitarbeiter=ma, datum=datum, art=art, soll_minuten=SOLL_MINUTEN,
+                )
+                if art in ("homeoffice", "hybrid"):
+                    beginn = datetime.combine(datum, time(7)) + timedelta(minutes=random.randint(0, 120))
+                    brutto = random.randint(420, 570)
+                    pause = 0 if art == "hybrid" else berechne_pause(brutto)
+                    eintrag.arbeitsbeginn = beginn.time()
+                    eintrag.arbeitsende = (beginn + timedelta(minutes=brutto)).time()
+                    eintrag.pause_minuten = pause
+                    eintrag.arbeitszeit_minuten = brutto - pause
+                puffer.append(eintrag)
+                if len(puffer) >= BATCH:
+                    Zeiterfassung.objects.bulk_create(puffer, ignore_conflicts=True)
+                    puffer = []
+        if puffer:
+            Zeiterfassung.objects.bulk_create(puffer, ignore_conflicts=True)
+
+    # ------------------------------------------------------------------
+    # 5. Dokumente
+    # ------------------------------------------------------------------
+    def _dokumente(self, anzahl, groesse_kb):
+        from dms.models import Dokument, DokumentKategorie, SuchIndexAuftrag
+        from dms.services import speichere_dokument
+
+        if anzahl <= 0:
+            return
+        letzte_id = Dokument.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        orgs = list(OrgEinheit.objects.all())
+        user_ids = list(
+            HRMitarbeiter.objects.filter(user__isnull=False)
+            .order_by("personalnummer").values_list("user_id", flat=True)
+        )
+        kategorien = list(DokumentKategorie.objects.all()) or [None]
+        start = Dokument.objects.filter(dateiname__startswith="lastdaten_").count()
+
+        puffer = []
+        for i in range(start, start + anzahl):
+            inhalt = b"%PDF-1.4\n" + random.randbytes(
+                max(1, int(random.uniform(0.5, 1.5) * groesse_kb * 1024))
+            )
+            dokument = Dokument(
+                dateiname=f"lastdaten_{i:06d}.pdf",
+                dateityp="application/pdf",
+                groesse_bytes=len(inhalt),
+                titel=f"Lastdaten-Dokument {i}",
+                kategorie=random.choice(kategorien),
+                klasse="sensibel" if random.random() < 0.2 else "offen",
+                eigentuemereinheit=random.choice(orgs) if orgs else None,
+                erstellt_von_id=random.choice(user_ids) if user_ids else None,
+            )
+            speichere_dokument(dokument, inhalt)
+            puffer.append(dokument)
+            # Blobs halten den Speicher hoch – kleinere Batches
+            if len(puffer) >= 200:
+                Dokument.objects.bulk_create(puffer)
+                puffer = []
+        if puffer:
+            Dokument.objects.bulk_create(puffer)
+
+        # bulk_create umgeht suchindex_einreihen: offene Dokumente fuer den Index einreihen
+        offene = Dokument.objects.filter(pk__gt=letzte_id, klasse="offen").values_list("pk", flat=True)
+        SuchIndexAuftrag.objects.bulk_create(
+            [SuchIndexAuftrag(dokument_id=dok_id) for dok_id in offene.iterator()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    # ------------------------------------------------------------------
+    # 6. Schichtplaene
+    # ------------------------------------------------------------------
+    def _schichtplaene(self, mitarbeiter):
+        from arbeitszeit.models import Mitarbeiter
+        from schichtplan.models import Schicht, Schichtplan, Schichttyp
+
+        typ_t, _ = Schichttyp.objects.get_or_create(
+            kuerzel="T",
+            defaults={"name": "Tagschicht", "start_zeit": time(6), "ende_zeit": time(18)},
+        )
+        typ_n, _ = Schichttyp.objects.get_or_create(
+            kuerzel="N",
+            defaults={"name": "Nachtschicht", "start_zeit": time(18), "ende_zeit": time(6)},
+        )
+        Schichttyp.objects.get_or_create(
+            kuerzel="Z",
+            defaults={"name": "Zusatzdienst", "start_zeit": time(8), "ende_zeit": time(16)},
+        )
+
+        heute = timezone.localdate()
+        erster = heute.replace(day=1)
+        vormonat = (erster - timedelta(days=1)).replace(day=1)
+        folgemonat = (erster + timedelta(days=32)).replace(day=1)
+
+        schicht_ma = list(
+            Mitarbeiter.objects.filter(schichtplan_kennung__startswith="MA").order_by("pk")
+        )
+        plan, angelegt = Schichtplan.objects.get_or_create(
+            name=f"Lastdaten {vormonat:%m/%Y}",
+            defaults={
+                "start_datum": vormonat,
+                "ende_datum": erster - timedelta(days=1),
+                "status": "veroeffentlicht",
+            },
+        )
+        if angelegt and schicht_ma:
+            schichten = []
+            for tag in range(calendar.monthrange(vormonat.year, vormonat.month)[1]):
+                datum = vormonat + timedelta(days=tag)
+                besetzung = random.sample(schicht_ma, min(4, len(schicht_ma)))
+                for ma, typ in zip(besetzung, (typ_t, typ_t, typ_n, typ_n)):
+                    schichten.append(Schicht(schichtplan=plan, mitarbeiter=ma, datum=datum, schichttyp=typ))
+            Schicht.objects.bulk_create(schichten, batch_size=BATCH)
+
+        # Leerer Plan des Folgemonats – Eingabe fuer den Generator-Benchmark
+        Schichtplan.objects.get_or_create(
+            name=f"Lastdaten {folgemonat:%m/%Y}",
+            defaults={
+                "start_datum": folgemonat,
+                "ende_datum": folgemonat.replace(
+                    day=calendar.monthrange(folgemonat.year, folgemonat.month)[1]
+                ),
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # 7. Workflows
+    # ------------------------------------------------------------------
+    def _workflows(self, anzahl):
+        from arbeitszeit.models import Zeiterfassung
+        from workflow.models import WorkflowInstance, WorkflowStep, WorkflowTemplate
+        from workflow.services import WorkflowEngine
+
+        if anzahl <= 0:
+            return
+        template, angelegt = WorkflowTemplate.objects.get_or_create(
+            name="Lastdaten-Freigabe",
+            defaults={"beschreibung": "Synthetischer Freigabe-Workflow (erzeuge_lastdaten)"},
+        )
+        if angelegt:
+            WorkflowStep.objects.create(
+                template=template,
+                reihenfolge=1,
+                titel="Freigabe Vorgesetzte",
+                zustaendig_rolle=WorkflowStep.ROLLE_DIREKTER_VORGESETZTER,
+                frist_tage=3,
+            )
+
+        fehlend = anzahl - WorkflowInstance.objects.filter(template=template).count()
+        if fehlend <= 0:
+            return
+        ids = list(
+            Zeiterfassung.objects.filter(mitarbeiter__user__hr_mitarbeiter__stelle__isnull=False)
+            .order_by("pk").values_list("pk", flat=True)
+        )
+        engine = WorkflowEngine()
+        for pk in random.sample(ids, min(fehlend, len(ids))):
+            eintrag = Zeiterfassung.objects.select_related("mitarbeiter__user").get(pk=pk)
+            engine.start_workflow(template, eintrag, eintrag.mitarbeiter.user)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0013_add_matrix_bot_dm_room_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Nummernkreis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('praefix', models.CharField(max_length=30, verbose_name='Praefix')),
+                ('jahr', models.PositiveIntegerField(default=0, help_text='0 = jahresunabhaengig', verbose_name='Jahr')),
+                ('letzter_wert', models.PositiveBigIntegerField(default=0, verbose_name='Letzter Wert')),
+            ],
+            options={
+                'verbose_name': 'Nummernkreis',
+                'verbose_name_plural': 'Nummernkreise',
+                'constraints': [models.UniqueConstraint(fields=('praefix', 'jahr'), name='nummernkreis_praefix_jahr_unique')],
+            },
+        ),
+    ]
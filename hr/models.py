@@ -365,15 +365,18 @@ class HRMitarbeiter(models.Model):
         """Generiert die naechste freie 5-stellige Personalnummer (ab 10001)."""
         from django.db.models import Max
 
-        hoechste = (
-            cls.objects.filter(personalnummer__regex=r"^\d{5}$")
-            .aggregate(Max("personalnummer"))["personalnummer__max"]
-        )
-        naechste = int(hoechste) + 1 if hoechste else 10001
+        def bisher_hoechste():
+            hoechste = (
+                cls.objects.filter(personalnummer__regex=r"^\d{5}$")
+                .aggregate(Max("personalnummer"))["personalnummer__max"]
+            )
+            return int(hoechste) if hoechste else 10000
 
-        # Luecken ueberspringen falls Nummer bereits vergeben
+        naechste = Nummernkreis.naechster_wert("PERSONALNUMMER", startwert=bisher_hoechste)
+
+        # Luecken ueberspringen falls Nummer bereits (manuell) vergeben
         while cls.objects.filter(personalnummer=str(naechste)).exists():
-            naechste += 1
+            naechste = Nummernkreis.naechster_wert("PERSONALNUMMER", startwert=bisher_hoechste)
 
         return str(naechste)
 
@@ -698,3 +701,98 @@ class Projektgruppe(models.Model):
                     result[org_name] = []
                 result[org_name].append(mitglied)
         return result
+
+
+class Nummernkreis(models.Model):
+    """Fortlaufender Zaehler fuer Geschaeftsnummern (Buchungs-, Personalnummern, ...).
+
+    Eine Zeile je (praefix, jahr). naechster_wert() erhoeht letzter_wert
+    atomar per UPDATE ... RETURNING – ein Index-Update statt MAX()-Scan,
+    und parallele Aufrufe erhalten nie dieselbe Nummer.
+    """
+
+    praefix = models.CharField(max_length=30, verbose_name="Praefix")
+    jahr = models.PositiveIntegerField(
+        default=0, verbose_name="Jahr", help_text="0 = jahresunabhaengig"
+    )
+    letzter_wert = models.PositiveBigIntegerField(default=0, verbose_name="Letzter Wert")
+
+    class Meta:
+        verbose_name = "Nummernkreis"
+        verbose_name_plural = "Nummernkreise"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["praefix", "jahr"], name="nummernkreis_praefix_jahr_unique"
+            ),
+        ]
+
+    def __str__(self):
+        if self.jahr:
+            return f"{self.praefix}/{self.jahr}: {self.letzter_wert}"
+        return f"{self.praefix}: {self.letzter_wert}"
+
+    @staticmethod
+    def _update_returning():
+        """True, wenn die Datenbank UPDATE ... RETURNING kann (PostgreSQL, SQLite >= 3.35)."""
+        from django.db import connection
+
+        if connection.vendor == "postgresql":
+            return True
+        if connection.vendor == "sqlite":
+            return connection.Database.sqlite_version_info >= (3, 35, 0)
+        return False
+
+    @classmethod
+    def _erhoehen(cls, praefix, jahr):
+        """Erhoeht den Zaehler um 1 und gibt den neuen Wert zurueck (None = kein Zaehler)."""
+        from django.db import connection
+
+        if cls._update_returning():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {cls._meta.db_table} SET letzter_wert = letzter_wert + 1 "
+                    "WHERE praefix = %s AND jahr = %s RETURNING letzter_wert",
+                    [praefix, jahr],
+                )
+                zeile = cursor.fetchone()
+            return zeile[0] if zeile else None
+
+        # Sonst (aeltere SQLite, MySQL, ...): UPDATE sperrt, Lesen in derselben Transaktion
+        zeilen = cls.objects.filter(praefix=praefix, jahr=jahr)
+        if not zeilen.update(letzter_wert=models.F("letzter_wert") + 1):
+            return None
+        return zeilen.values_list("letzter_wert", flat=True).get()
+
+    @classmethod
+    def naechster_wert(cls, praefix, jahr=0, startwert=None):
+        """Zieht die naechste Nummer aus dem Nummernkreis.
+
+        Args:
+            praefix: Name des Nummernkreises (z.B. "RB-20260316")
+            jahr: Jahr bei jaehrlich neu beginnenden Kreisen, sonst 0
+            startwert: Callable, das beim ersten Zugriff den bisher hoechsten
+                Wert liefert (Uebernahme bestehender Daten), sonst 0
+
+        Innerhalb einer offenen Transaktion gehoert die Nummer zu dieser: wird
+        der Datensatz, der sie traegt, in derselben Transaktion angelegt, gibt
+        ein Rollback die Nummer wieder frei (keine Luecke). Der Zaehler bleibt
+        dafuer bis zum Commit gesperrt.
+
+        Returns:
+            int
+        """
+        from django.db import IntegrityError, transaction
+
+        with transaction.atomic():
+            wert = cls._erhoehen(praefix, jahr)
+            if wert is not None:
+                return wert
+            try:
+                # Erster Zugriff – Zaehler anlegen
+                with transaction.atomic():
+                    letzter = (startwert() if startwert else 0) or 0
+                    cls.objects.create(praefix=praefix, jahr=jahr, letzter_wert=letzter + 1)
+                return letzter + 1
+            except IntegrityError:
+                # Parallel angelegt – jetzt existiert die Zeile
+                return cls._erhoehen(praefix, jahr)
@@ -0,0 +1,314 @@
+"""
+OrgGraph – die komplette Organisationsstruktur als In-Memory-Graph.
+
+Die Organigramm-Ansichten und die Rollenaufloesung im Workflow liefen
+bisher rekursiv ueber die FKs (uebergeordnet, uebergeordnete_stelle,
+hrmitarbeiter) – eine Query pro Knoten bzw. pro Ebene.
+
+OrgGraph laedt stattdessen alle OrgEinheiten und alle Stellen (inkl.
+Inhaber, Delegation und Vertretung) in genau zwei Queries und baut daraus
+Adjazenz-Maps:
+  - untereinheiten:  einheit_id -> [einheit_id, ...]
+  - untergeordnete:  stelle_id  -> [stelle_id, ...]
+  - stellen_je_einheit / wurzel_stellen_je_einheit
+
+Invalidierung: Speichern/Loeschen von OrgEinheit, Stelle und HRMitarbeiter
+setzt eine neue Version im Cache 'org_graph' (siehe hr/signals.py). Jeder
+Prozess haelt seinen Graphen zusammen mit der Version, zu der er geladen
+wurde, und baut ihn neu auf, sobald die Version abweicht. MAX_ALTER ist das
+Sicherheitsnetz fuer Aenderungen ohne Signal (QuerySet.update()).
+
+Die Knoten sind schreibgeschuetzte Datenobjekte, keine Model-Instanzen.
+Wer eine Stelle speichern will, holt sie per als_stelle() aus der DB.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "org_graph"
+VERSION_KEY = "org_graph:version"
+
+# Sekunden, nach denen ein Graph auch ohne Versionswechsel neu geladen wird
+MAX_ALTER = 300
+
+# (version, geladen_um, graph) – prozesslokal
+_AKTUELL = None
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+class EinheitKnoten:
+    """OrgEinheit im Graphen."""
+
+    __slots__ = ("id", "kuerzel", "bezeichnung", "ist_reserviert",
+                 "uebergeordnet_id", "leitende_stelle_id")
+
+    def __init__(self, zeile):
+        self.id = zeile["id"]
+        self.kuerzel = zeile["kuerzel"]
+        self.bezeichnung = zeile["bezeichnung"]
+        self.ist_reserviert = zeile["ist_reserviert"]
+        self.uebergeordnet_id = zeile["uebergeordnet_id"]
+        self.leitende_stelle_id = zeile["leitende_stelle_id"]
+
+    def __repr__(self):
+        return f"<EinheitKnoten {self.kuerzel}>"
+
+
+class StellenKnoten:
+    """Stelle im Graphen (inkl. Inhaber)."""
+
+    __slots__ = ("id", "kuerzel", "bezeichnung", "kategorie", "org_einheit_id",
+                 "uebergeordnete_stelle_id", "delegiert_an_id", "vertreten_durch_id",
+                 "vertretung_von", "vertretung_bis", "inhaber_id", "inhaber_name")
+
+    def __init__(self, zeile):
+        self.id = zeile["id"]
+        self.kuerzel = zeile["kuerzel"]
+        self.bezeichnung = zeile["bezeichnung"]
+        self.kategorie = zeile["kategorie"]
+        self.org_einheit_id = zeile["org_einheit_id"]
+        self.uebergeordnete_stelle_id = zeile["uebergeordnete_stelle_id"]
+        self.delegiert_an_id = zeile["delegiert_an_id"]
+        self.vertreten_durch_id = zeile["vertreten_durch_id"]
+        self.vertretung_von = zeile["vertretung_von"]
+        self.vertretung_bis = zeile["vertretung_bis"]
+        self.inhaber_id = zeile["hrmitarbeiter__id"]
+        if self.inhaber_id is not None:
+            self.inhaber_name = f"{zeile['hrmitarbeiter__vorname']} {zeile['hrmitarbeiter__nachname']}"
+        else:
+            self.inhaber_name = None
+
+    def __repr__(self):
+        return f"<StellenKnoten {self.kuerzel}>"
+
+    @property
+    def ist_besetzt(self):
+        return self.inhaber_id is not None
+
+    @property
+    def email(self):
+        """Wie Stelle.email."""
+        domain = getattr(settings, "STELLEN_EMAIL_DOMAIN", "firma.de")
+        return f"{self.kuerzel.lower()}@{domain}"
+
+
+def _id(obj):
+    """Akzeptiert Model-Instanz, Knoten oder pk."""
+    if obj is None:
+        return None
+    return getattr(obj, "pk", None) or getattr(obj, "id", obj)
+
+
+class OrgGraph:
+    """Organisationsstruktur in zwei Queries, danach ohne DB-Zugriff."""
+
+    def __init__(self):
+        from .models import OrgEinheit, Stelle
+
+        self.einheiten = {}
+        self.stellen = {}
+        self.untereinheiten = {}
+        self.untergeordnete = {}
+        self.stellen_je_einheit = {}
+        self.wurzel_stellen_je_einheit = {}
+
+        # Default-Ordering (kuerzel) bleibt erhalten → Kinderlisten sind sortiert
+        for zeile in OrgEinheit.objects.values(
+            "id", "kuerzel", "bezeichnung", "ist_reserviert",
+            "uebergeordnet_id", "leitende_stelle_id",
+        ):
+            knoten = EinheitKnoten(zeile)
+            self.einheiten[knoten.id] = knoten
+            self.untereinheiten.setdefault(knoten.uebergeordnet_id, []).append(knoten.id)
+
+        for zeile in Stelle.objects.values(
+            "id", "kuerzel", "bezeichnung", "kategorie", "org_einheit_id",
+            "uebergeordnete_stelle_id", "delegiert_an_id", "vertreten_durch_id",
+            "vertretung_von", "vertretung_bis",
+            "hrmitarbeiter__id", "hrmitarbeiter__vorname", "hrmitarbeiter__nachname",
+        ):
+            knoten = StellenKnoten(zeile)
+            self.stellen[knoten.id] = knoten
+            self.stellen_je_einheit.setdefault(knoten.org_einheit_id, []).append(knoten.id)
+            if knoten.uebergeordnete_stelle_id is None:
+                self.wurzel_stellen_je_einheit.setdefault(
+                    knoten.org_einheit_id, []
+                ).append(knoten.id)
+            else:
+                self.untergeordnete.setdefault(
+                    knoten.uebergeordnete_stelle_id, []
+                ).append(knoten.id)
+
+    # --- Cache ---
+
+    @classmethod
+    def aktuell(cls):
+        """Gibt den Graphen zur aktuellen Version zurueck (prozesslokal gecacht)."""
+        global _AKTUELL
+        try:
+            version = _cache().get(VERSION_KEY, 0)
+        except Exception:
+            logger.exception("OrgGraph-Version nicht lesbar")
+            version = None
+
+        jetzt = time.monotonic()
+        if (
+            _AKTUELL is not None
+            and version is not None
+            and _AKTUELL[0] == version
+            and jetzt - _AKTUELL[1] < MAX_ALTER
+        ):
+            return _AKTUELL[2]
+
+        graph = cls()
+        _AKTUELL = (version, jetzt, graph)
+        return graph
+
+    @staticmethod
+    def invalidieren():
+        """Setzt eine neue globale Version – alle Prozesse laden den Graphen neu.
+
+        Neu gesetzt statt hochgezaehlt: FileBasedCache.incr() ist get + set und
+        nicht atomar, zwei parallele Invalidierungen koennten sonst dieselbe
+        Version schreiben (wie bei NavKontext.invalidieren).
+        """
+        global _AKTUELL
+        _AKTUELL = None
+        try:
+            _cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+        except Exception:
+            logger.exception("OrgGraph-Invalidierung fehlgeschlagen")
+
+    # --- Zugriff ---
+
+    def stelle(self, stelle):
+        """StellenKnoten zu Stelle/pk oder None."""
+        return self.stellen.get(_id(stelle))
+
+    def einheit(self, einheit):
+        """EinheitKnoten zu OrgEinheit/pk oder None."""
+        return self.einheiten.get(_id(einheit))
+
+    def wurzel_einheiten(self):
+        """OrgEinheiten ohne uebergeordnete Einheit (nach Kuerzel sortiert)."""
+        return [self.einheiten[pk] for pk in self.untereinheiten.get(None, [])]
+
+    def kinder_einheiten(self, einheit):
+        return [self.einheiten[pk] for pk in self.untereinheiten.get(_id(einheit), [])]
+
+    def kinder_stellen(self, stelle):
+        return [self.stellen[pk] for pk in self.untergeordnete.get(_id(stelle), [])]
+
+    def stellen_der_einheit(self, einheit):
+        return [self.stellen[pk] for pk in self.stellen_je_einheit.get(_id(einheit), [])]
+
+    def wurzel_stellen(self, einheit):
+        """Stellen der Einheit ohne uebergeordnete Stelle."""
+        return [self.stellen[pk] for pk in self.wurzel_stellen_je_einheit.get(_id(einheit), [])]
+
+    def vorgesetzte(self, stelle):
+        """Kette der uebergeordneten Stellen, direkter Vorgesetzter zuerst.
+
+        Zyklen in den Daten brechen die Kette ab.
+        """
+        kette = []
+        gesehen = {_id(stelle)}
+        knoten = self.stelle(stelle)
+        while knoten is not None and knoten.uebergeordnete_stelle_id is not None:
+            if knoten.uebergeordnete_stelle_id in gesehen:
+                break
+            gesehen.add(knoten.uebergeordnete_stelle_id)
+            knoten = self.stellen.get(knoten.uebergeordnete_stelle_id)
+            if knoten is not None:
+                kette.append(knoten)
+        return kette
+
+    def uebergeordnete_einheiten(self, einheit):
+        """Kette der uebergeordneten OrgEinheiten, direkte zuerst."""
+        kette = []
+        gesehen = {_id(einheit)}
+        knoten = self.einheit(einheit)
+        while knoten is not None and knoten.uebergeordnet_id is not None:
+            if knoten.uebergeordnet_id in gesehen:
+                break
+            gesehen.add(knoten.uebergeordnet_id)
+            knoten = self.einheiten.get(knoten.uebergeordnet_id)
+            if knoten is not None:
+                kette.append(knoten)
+        return kette
+
+    def teilbaum(self, einheit):
+        """Einheit und alle untergeordneten Einheiten (Pre-Order)."""
+        start = self.einheit(einheit)
+        if start is None:
+            return []
+        ergebnis = []
+        gesehen = set()
+        stapel = [start.id]
+        while stapel:
+            pk = stapel.pop()
+            if pk in gesehen:
+                continue
+            gesehen.add(pk)
+            ergebnis.append(self.einheiten[pk])
+            stapel.extend(reversed(self.untereinheiten.get(pk, [])))
+        return ergebnis
+
+    def verantwortliche_stelle(self, stelle, datum=None):
+        """Wie Stelle.verantwortliche_stelle(), aber ohne Queries.
+
+        1. Temporaere Vertretung aktiv (von <= datum <= bis)? -> vertreten_durch
+        2. Delegation gesetzt? -> delegiert_an
+        3. Sonst: die Stelle selbst
+        """
+        knoten = self.stelle(stelle)
+        if knoten is None:
+            return None
+        if datum is None:
+            datum = timezone.localdate()
+
+        if (
+            knoten.vertreten_durch_id is not None
+            and knoten.vertretung_von is not None
+            and knoten.vertretung_bis is not None
+            and knoten.vertretung_von <= datum <= knoten.vertretung_bis
+        ):
+            return self.stellen.get(knoten.vertreten_durch_id)
+
+        if knoten.delegiert_an_id is not None:
+            return self.stellen.get(knoten.delegiert_an_id)
+
+        return knoten
+
+    def leitung(self, einheit):
+        """Erste Stelle mit kategorie='leitung' in der Einheit (nach Kuerzel)."""
+        for knoten in self.stellen_der_einheit(einheit):
+            if knoten.kategorie == "leitung":
+                return knoten
+        return None
+
+    def erste_stelle_mit_praefix(self, praefix):
+        """Erste Stelle (nach Kuerzel), deren Kuerzel mit praefix beginnt."""
+        praefix = praefix.lower()
+        for knoten in self.stellen.values():
+            if knoten.kuerzel.lower().startswith(praefix):
+                return knoten
+        return None
+
+    @staticmethod
+    def als_stelle(knoten):
+        """Laedt die Stelle zum Knoten als Model-Instanz (eine Query)."""
+        from .models import Stelle
+
+        if knoten is None:
+            return None
+        return Stelle.objects.select_related("org_einheit").filter(pk=knoten.id).first()
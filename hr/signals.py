@@ -4,7 +4,7 @@ Django Signals fuer die HR-App.
 """
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
@@ -175,3 +175,16 @@ def auto_erstelle_zertifikat(sender, instance, created, **kwargs):
             instance.pk,
             exc,
         )
+
+
+def _org_graph_invalidieren(sender, **kwargs):
+    """Setzt eine neue OrgGraph-Version, sobald die Aenderung committet ist."""
+    from django.db import transaction
+
+    from .org_graph import OrgGraph
+    transaction.on_commit(OrgGraph.invalidieren)
+
+
+for _modell in ("hr.OrgEinheit", "hr.Stelle", "hr.HRMitarbeiter"):
+    post_save.connect(_org_graph_invalidieren, sender=_modell, dispatch_uid=f"org_graph_{_modell}")
+    post_delete.connect(_org_graph_invalidieren, sender=_modell, dispatch_uid=f"org_graph_{_modell}")
@@ -0,0 +1,98 @@
+from datetime import date
+
+from django.test import TestCase, override_settings
+
+from workflow.services import WorkflowEngine
+
+from .models import HRMitarbeiter, OrgEinheit, Stelle
+from .org_graph import OrgGraph
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "nav_kontext": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "nav-kontext-test",
+    },
+    "org_graph": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "org-graph-test",
+    },
+})
+class OrgGraphTest(TestCase):
+    """Rollenaufloesung ueber den OrgGraph und Neuladen nach Invalidierung.
+
+    Aufbau: Bereich BV > Abteilung IT > Team IT-SD.
+    Kette: sb (Sachbearbeitung) -> tl (unbesetzt) -> al (besetzt) -> bl (besetzt)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        bereich = OrgEinheit.objects.create(kuerzel="bv", bezeichnung="Bereich BV")
+        cls.it = OrgEinheit.objects.create(kuerzel="it", bezeichnung="IT", uebergeordnet=bereich)
+        cls.sd = OrgEinheit.objects.create(kuerzel="it-sd", bezeichnung="Service Desk", uebergeordnet=cls.it)
+
+        cls.bl = Stelle.objects.create(
+            kuerzel="bl_bv", bezeichnung="Bereichsleitung", org_einheit=bereich, kategorie="leitung",
+        )
+        cls.al = Stelle.objects.create(
+            kuerzel="al_it", bezeichnung="Abteilungsleitung IT", org_einheit=cls.it,
+            kategorie="leitung", uebergeordnete_stelle=cls.bl,
+        )
+        cls.tl = Stelle.objects.create(
+            kuerzel="tl_sd", bezeichnung="Teamleitung SD", org_einheit=cls.sd, uebergeordnete_stelle=cls.al,
+        )
+        cls.sb = Stelle.objects.create(
+            kuerzel="sb_sd", bezeichnung="Sachbearbeitung SD", org_einheit=cls.sd, uebergeordnete_stelle=cls.tl,
+        )
+        for nachname, stelle in (("Leiter", cls.bl), ("Abt", cls.al), ("Sach", cls.sb)):
+            HRMitarbeiter.objects.create(vorname="X", nachname=nachname, stelle=stelle)
+
+    def setUp(self):
+        OrgGraph.invalidieren()
+        self.engine = WorkflowEngine()
+
+    def test_graph_ohne_queries_bis_zur_invalidierung(self):
+        graph = OrgGraph.aktuell()
+        with self.assertNumQueries(0):
+            self.assertIs(OrgGraph.aktuell(), graph)
+            self.assertEqual([k.kuerzel for k in graph.vorgesetzte(self.sb)], ["tl_sd", "al_it", "bl_bv"])
+            self.assertEqual([k.kuerzel for k in graph.teilbaum(self.it)], ["it", "it-sd"])
+
+        OrgGraph.invalidieren()
+        self.assertIsNot(OrgGraph.aktuell(), graph)
+
+    def test_direkte_fuehrungskraft_ueberspringt_unbesetzte_stelle(self):
+        self.assertEqual(self.engine.resolve_rolle("direkte_fuehrungskraft", self.sb), self.al)
+
+        # Besetzung per Signal: nach dem Commit neue Version, neuer Graph
+        with self.captureOnCommitCallbacks(execute=True):
+            HRMitarbeiter.objects.create(vorname="X", nachname="Team", stelle=self.tl)
+        self.assertEqual(self.engine.resolve_rolle("direkte_fuehrungskraft", self.sb), self.tl)
+
+    def test_aenderung_ohne_signal_erst_nach_invalidierung(self):
+        OrgGraph.aktuell()
+        Stelle.objects.filter(pk=self.sb.pk).update(uebergeordnete_stelle=self.bl)
+        self.assertEqual(self.engine.resolve_rolle("direkte_fuehrungskraft", self.sb), self.al)
+        OrgGraph.invalidieren()
+        self.assertEqual(self.engine.resolve_rolle("direkte_fuehrungskraft", self.sb), self.bl)
+
+    def test_abteilungsleitung_aus_uebergeordneter_einheit(self):
+        # Team ohne Leitungsstelle -> Leitung der Abteilung IT
+        self.assertEqual(self.engine.resolve_rolle("abteilungsleitung", self.sb), self.al)
+        self.assertEqual(self.engine.resolve_rolle("abteilungsleitung", self.al), self.al)
+
+    def test_verantwortliche_stelle_wie_model(self):
+        Stelle.objects.filter(pk=self.al.pk).update(
+            delegiert_an=self.bl, vertreten_durch=self.tl,
+            vertretung_von=date(2026, 8, 1), vertretung_bis=date(2026, 8, 14),
+        )
+        OrgGraph.invalidieren()
+        graph = OrgGraph.aktuell()
+        stelle = Stelle.objects.get(pk=self.al.pk)
+        for datum in (date(2026, 7, 31), date(2026, 8, 1), date(2026, 8, 14), date(2026, 8, 15)):
+            self.assertEqual(
+                graph.verantwortliche_stelle(self.al, datum).id,
+                stelle.verantwortliche_stelle(datum).pk,
+                datum,
+            )
@@ -357,16 +357,20 @@ def stellen_organigramm(request):
     """Feature 4: Visuelle Hierarchie basierend auf OrgEinheiten."""
     import json
 
+    from .org_graph import OrgGraph
+
+    graph = OrgGraph.aktuell()
+
     def orgeinheit_to_dict(orgeinheit):
         """Konvertiert eine OrgEinheit in D3 Tree Format."""
         data = {
-            "id": f"org_{orgeinheit.pk}",
+            "id": f"org_{orgeinheit.id}",
             "name": orgeinheit.kuerzel,
             "title": orgeinheit.bezeichnung,
             "className": "node-orgeinheit",
             "extra": {
                 "typ": "orgeinheit",
-                "stellen_count": orgeinheit.stellen.count(),
+                "stellen_count": len(graph.stellen_der_einheit(orgeinheit)),
                 "ist_reserviert": orgeinheit.ist_reserviert,
             },
         }
@@ -375,12 +379,11 @@ def stellen_organigramm(request):
         children = []
 
         # 1. Untergeordnete OrgEinheiten
-        for untereinheit in orgeinheit.untereinheiten.all():
+        for untereinheit in graph.kinder_einheiten(orgeinheit):
             children.append(orgeinheit_to_dict(untereinheit))
 
         # 2. Root-Stellen dieser OrgEinheit (ohne uebergeordnete_stelle)
-        root_stellen = orgeinheit.stellen.filter(uebergeordnete_stelle__isnull=True)
-        for stelle in root_stellen:
+        for stelle in graph.wurzel_stellen(orgeinheit):
             children.append(stelle_to_dict(stelle))
 
         if children:
@@ -391,48 +394,37 @@ def stellen_organigramm(request):
     def stelle_to_dict(stelle):
         """Konvertiert eine Stelle in D3 Tree Format."""
         data = {
-            "id": f"stelle_{stelle.pk}",
+            "id": f"stelle_{stelle.id}",
             "name": stelle.kuerzel,
             "title": stelle.bezeichnung,
             "className": f"node-{stelle.kuerzel[:2].lower()}",
             "extra": {
                 "typ": "stelle",
-                "org": stelle.org_einheit.kuerzel,
+                "org": graph.einheiten[stelle.org_einheit_id].kuerzel,
                 "email": stelle.email,
                 "besetzt": stelle.ist_besetzt,
-                "inhaber": stelle.aktueller_inhaber.vollname if stelle.ist_besetzt else "Unbesetzt",
-                "inhaber_url": f"/hr/{stelle.aktueller_inhaber.pk}/" if stelle.ist_besetzt else None,
-                "edit_url": f"/hr/stellen/{stelle.pk}/bearbeiten/",
+                "inhaber": stelle.inhaber_name if stelle.ist_besetzt else "Unbesetzt",
+                "inhaber_url": f"/hr/{stelle.inhaber_id}/" if stelle.ist_besetzt else None,
+                "edit_url": f"/hr/stellen/{stelle.id}/bearbeiten/",
             },
         }
 
         # Delegation/Vertretung
-        if stelle.delegiert_an:
-            data["extra"]["delegiert_an"] = stelle.delegiert_an.kuerzel
-        if stelle.vertreten_durch:
-            data["extra"]["vertreten_durch"] = stelle.vertreten_durch.kuerzel
+        if stelle.delegiert_an_id:
+            data["extra"]["delegiert_an"] = graph.stellen[stelle.delegiert_an_id].kuerzel
+        if stelle.vertreten_durch_id:
+            data["extra"]["vertreten_durch"] = graph.stellen[stelle.vertreten_durch_id].kuerzel
 
         # Rekursiv untergeordnete Stellen hinzufuegen
-        untergeordnete = stelle.untergeordnete_stellen.select_related(
-            "org_einheit"
-        ).prefetch_related("untergeordnete_stellen")
-
-        if untergeordnete.exists():
+        untergeordnete = graph.kinder_stellen(stelle)
+        if untergeordnete:
             data["children"] = [stelle_to_dict(kind) for kind in untergeordnete]
 
         return data
 
-    # Root-OrgEinheiten (ohne uebergeordnete)
-    root_orgeinheiten = OrgEinheit.objects.filter(
-        uebergeordnet__isnull=True
-    ).prefetch_related(
-        'untereinheiten',
-        'stellen__untergeordnete_stellen'
-    ).order_by('kuerzel')
-
-    # Konvertiere zu D3 Tree Format
+    # Root-OrgEinheiten (ohne uebergeordnete), konvertiert zu D3 Tree Format
     orgchart_data = []
-    for orgeinheit in root_orgeinheiten:
+    for orgeinheit in graph.wurzel_einheiten():
         orgchart_data.append(orgeinheit_to_dict(orgeinheit))
 
     return render(
@@ -1014,9 +1006,12 @@ def orgchart_editor(request):
 @user_passes_test(_ist_staff)
 def orgchart_editor_data(request):
     """API: Liefert Org-Chart Daten als JSON."""
-    import json
     from django.http import JsonResponse
 
+    from .org_graph import OrgGraph
+
+    graph = OrgGraph.aktuell()
+
     def build_tree(orgeinheit):
         data = {
             "id": orgeinheit.id,
@@ -1029,11 +1024,11 @@ def orgchart_editor_data(request):
         }
 
         # Untergeordnete OrgEinheiten
-        for unter in orgeinheit.untereinheiten.all():
+        for unter in graph.kinder_einheiten(orgeinheit):
             data["children"].append(build_tree(unter))
 
         # Root-Stellen dieser OrgEinheit
-        for stelle in orgeinheit.stellen.filter(uebergeordnete_stelle__isnull=True):
+        for stelle in graph.wurzel_stellen(orgeinheit):
             data["children"].append(build_stelle_tree(stelle))
 
         return data
@@ -1047,19 +1042,18 @@ def orgchart_editor_data(request):
             "title": stelle.bezeichnung,
             "bezeichnung": stelle.bezeichnung,
             "email": stelle.email,
-            "inhaber": stelle.aktueller_inhaber.vollname if stelle.ist_besetzt else None,
+            "inhaber": stelle.inhaber_name,
             "children": []
         }
 
         # Untergeordnete Stellen
-        for unter in stelle.untergeordnete_stellen.all():
+        for unter in graph.kinder_stellen(stelle):
             data["children"].append(build_stelle_tree(unter))
 
         return data
 
     # Root-OrgEinheiten
-    root_orgs = OrgEinheit.objects.filter(uebergeordnet__isnull=True).order_by('kuerzel')
-    tree_data = [build_tree(org) for org in root_orgs]
+    tree_data = [build_tree(org) for org in graph.wurzel_einheiten()]
 
     return JsonResponse(tree_data, safe=False)
 
@@ -1410,11 +1404,14 @@ def netzwerk_editor_data(request):
     """API: Liefert Netzwerk-Daten."""
     from django.http import JsonResponse
 
+    from .org_graph import OrgGraph
+
+    graph = OrgGraph.aktuell()
     nodes = []
     edges = []
 
     # OrgEinheiten als Nodes
-    for org in OrgEinheit.objects.select_related('uebergeordnet', 'leitende_stelle'):
+    for org in graph.einheiten.values():
         nodes.append({
             'id': org.id,
             'type': 'orgeinheit',
@@ -1422,23 +1419,23 @@ def netzwerk_editor_data(request):
             'title': org.bezeichnung
         })
         # Verbindung zur uebergeordneten OrgEinheit
-        if org.uebergeordnet:
+        if org.uebergeordnet_id:
             edges.append({
-                'id': f'org_{org.id}_to_{org.uebergeordnet.id}',
-                'from': f'orgeinheit_{org.uebergeordnet.id}',
+                'id': f'org_{org.id}_to_{org.uebergeordnet_id}',
+                'from': f'orgeinheit_{org.uebergeordnet_id}',
                 'to': f'orgeinheit_{org.id}'
             })
         # Verbindung zur leitenden Stelle (Bereichsleiter -> OrgEinheit)
-        if org.leitende_stelle:
+        if org.leitende_stelle_id:
             edges.append({
-                'id': f'stelle_{org.leitende_stelle.id}_to_org_{org.id}',
-                'from': f'stelle_{org.leitende_stelle.id}',
+                'id': f'stelle_{org.leitende_stelle_id}_to_org_{org.id}',
+                'from': f'stelle_{org.leitende_stelle_id}',
                 'to': f'orgeinheit_{org.id}'
             })
 
     # Stellen als Nodes
-    for stelle in Stelle.objects.select_related('org_einheit', 'uebergeordnete_stelle'):
-        inhaber = f' ({stelle.aktueller_inhaber.vollname})' if stelle.ist_besetzt else ''
+    for stelle in graph.stellen.values():
+        inhaber = f' ({stelle.inhaber_name})' if stelle.ist_besetzt else ''
         nodes.append({
             'id': stelle.id,
             'type': 'stelle',
@@ -1447,17 +1444,17 @@ def netzwerk_editor_data(request):
             'title': f'{stelle.bezeichnung}{inhaber}'
         })
         # Verbindung zur OrgEinheit (wenn Root-Stelle in dieser OrgEinheit)
-        if not stelle.uebergeordnete_stelle:
+        if not stelle.uebergeordnete_stelle_id:
             edges.append({
-                'id': f'org_{stelle.org_einheit.id}_to_stelle_{stelle.id}',
-                'from': f'orgeinheit_{stelle.org_einheit.id}',
+                'id': f'org_{stelle.org_einheit_id}_to_stelle_{stelle.id}',
+                'from': f'orgeinheit_{stelle.org_einheit_id}',
                 'to': f'stelle_{stelle.id}'
             })
         # Verbindung zur uebergeordneten Stelle
         else:
             edges.append({
-                'id': f'stelle_{stelle.id}_to_{stelle.uebergeordnete_stelle.id}',
-                'from': f'stelle_{stelle.uebergeordnete_stelle.id}',
+                'id': f'stelle_{stelle.id}_to_{stelle.uebergeordnete_stelle_id}',
+                'from': f'stelle_{stelle.uebergeordnete_stelle_id}',
                 'to': f'stelle_{stelle.id}'
             })
 
@@ -1475,6 +1472,7 @@ def netzwerk_editor_save(request):
     from django.http import JsonResponse
     from django.db import transaction
     from django.core.exceptions import ValidationError
+    from .org_graph import OrgGraph
 
     if request.method != 'POST':
         return JsonResponse({'error': 'Nur POST'}, status=400)
@@ -1611,6 +1609,9 @@ def netzwerk_editor_save(request):
                         )
                         edges_count += 1
 
+        # QuerySet.update() loest keine Signale aus → OrgGraph selbst invalidieren
+        OrgGraph.invalidieren()
+
         message = f'Struktur gespeichert! ({created_count} erstellt, {updated_count} aktualisiert, {edges_count} Verbindungen)'
         return JsonResponse({'status': 'success', 'message': message})
     except ValidationError as e:
@@ -1632,6 +1633,10 @@ def tree_editor_data(request):
     """API: Liefert Baumdaten fuer Tree Editor"""
     from django.http import JsonResponse
 
+    from .org_graph import OrgGraph
+
+    graph = OrgGraph.aktuell()
+
     def org_to_tree(org, visited=None):
         """Konvertiert OrgEinheit zu Tree-Format"""
         if visited is None:
@@ -1652,13 +1657,13 @@ def tree_editor_data(request):
         }
 
         # Stellen in dieser OrgEinheit (Root-Stellen)
-        for stelle in org.stellen.filter(uebergeordnete_stelle__isnull=True).order_by('kuerzel'):
+        for stelle in graph.wurzel_stellen(org):
             child = stelle_to_tree(stelle, visited)
             if child:
                 node['children'].append(child)
 
         # Untereinheiten
-        for child_org in org.untereinheiten.order_by('kuerzel'):
+        for child_org in graph.kinder_einheiten(org):
             child = org_to_tree(child_org, visited)
             if child:
                 node['children'].append(child)
@@ -1686,7 +1691,7 @@ def tree_editor_data(request):
         }
 
         # Untergeordnete Stellen
-        for child_stelle in stelle.untergeordnete_stellen.order_by('kuerzel'):
+        for child_stelle in graph.kinder_stellen(stelle):
             child = stelle_to_tree(child_stelle, visited)
             if child:
                 node['children'].append(child)
@@ -1694,9 +1699,10 @@ def tree_editor_data(request):
         return node
 
     # Root finden
-    root_org = OrgEinheit.objects.filter(uebergeordnet__isnull=True).first()
-    if not root_org:
+    wurzeln = graph.wurzel_einheiten()
+    if not wurzeln:
         return JsonResponse({'error': 'Keine Root-OrgEinheit gefunden'}, status=404)
+    root_org = wurzeln[0]
 
     tree_data = org_to_tree(root_org)
     return JsonResponse(tree_data)
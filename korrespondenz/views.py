@@ -305,7 +305,7 @@ def brief_in_ablage_speichern(request, pk):
         return redirect("korrespondenz:brief_detail", pk=pk)
 
     from dms.models import Dokument
-    from dms.services import speichere_dokument, suchvektor_befuellen
+    from dms.services import speichere_dokument, suchindex_einreihen
 
     dateiname = f"Brief_{brief.datum}_{brief.betreff[:40]}.docx".replace(" ", "_")
     inhalt_bytes = bytes(brief.inhalt)
@@ -322,7 +322,7 @@ def brief_in_ablage_speichern(request, pk):
     )
     speichere_dokument(dok, inhalt_bytes)
     dok.save()
-    suchvektor_befuellen(dok)
+    suchindex_einreihen(dok)
 
     messages.success(request, f'Brief wurde in deine persoenliche Ablage archiviert.')
     return redirect("dms:meine_ablage")
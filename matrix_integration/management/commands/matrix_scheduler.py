@@ -4,8 +4,16 @@ Management-Command: matrix_scheduler
 Endlosschleife fuer den Docker-Scheduler-Container.
 
 Aufgaben:
+  - Alle 10 Sekunden:  Branderkunder-Timeout pruefen (Eskalation),
+                       liegengebliebene Alarm-Zustellungen nachholen
+                       (erster Lauf direkt beim Start)
   - Jede Minute:       Sitzungs-Erinnerungen pruefen (Matrix-Nachrichten)
-  - Taeglich 02:00:    Matrix-Accounts anlegen + Passwort setzen
+  - Jede Stunde:       Faellige Wartungsplaene in die Facility-Queue stellen
+  - Taeglich 02:00:    Matrix-Accounts anlegen + Passwort setzen,
+                       nicht mehr referenzierte DMS-Chunks loeschen
+
+Matrix-Rueckmeldungen (Brand/EH) empfaengt der separate Dienst
+matrix_sync_listener per /sync-Long-Poll.
 
 Aufruf (docker-compose):
     command: python manage.py matrix_scheduler
@@ -23,7 +31,7 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Scheduler-Loop: Sitzungs-Erinnerungen (minuetlich) + Matrix-Sync (02:00 Uhr)."
+    help = "Scheduler-Loop: Sitzungs-Erinnerungen (minuetlich), Wartungsplaene (stuendlich) + Matrix-Sync (02:00 Uhr)."
 
     def handle(self, *args, **options):
         self.stdout.write("PRIMA Scheduler gestartet.\n")
@@ -33,17 +41,7 @@ class Command(BaseCommand):
         iteration = 0  # zaehlt 10s-Zyklen
 
         while True:
-            # --- Alle 10 Sekunden: EH-Rueckmeldungen pollen ---
-            try:
-                call_command("eh_rueckmeldung_poller", verbosity=0)
-            except Exception as exc:
-                logger.warning("eh_rueckmeldung_poller fehlgeschlagen: %s", exc)
-
-            # --- Alle 10 Sekunden: Branderkunder-DM-Rueckmeldungen pollen ---
-            try:
-                call_command("brand_rueckmeldung_poller", verbosity=0)
-            except Exception as exc:
-                logger.warning("brand_rueckmeldung_poller fehlgeschlagen: %s", exc)
+            # EH- und Branderkunder-Rueckmeldungen: eigener Dienst matrix_sync_listener
 
             # --- Alle 10 Sekunden: Branderkunder-Timeout pruefen (Eskalation nach 90s) ---
             try:
@@ -51,6 +49,12 @@ class Command(BaseCommand):
             except Exception as exc:
                 logger.warning("brand_eskalation_pruefen fehlgeschlagen: %s", exc)
 
+            # --- Alle 10 Sekunden: Alarm-Zustellungen eines beendeten Prozesses nachholen ---
+            try:
+                call_command("alarm_zustellungen_nachholen", verbosity=0)
+            except Exception as exc:
+                logger.warning("alarm_zustellungen_nachholen fehlgeschlagen: %s", exc)
+
             # --- Jede Minute (jede 6. Iteration): Sitzungs-Erinnerungen ---
             if iteration % 6 == 0:
                 try:
@@ -58,6 +62,13 @@ class Command(BaseCommand):
                 except Exception as exc:
                     logger.warning("matrix_sitzung_erinnerungen fehlgeschlagen: %s", exc)
 
+            # --- Jede Stunde (jede 360. Iteration, auch beim Start): Wartungsplaene ---
+            if iteration % 360 == 0:
+                try:
+                    call_command("facility_wartungen_pruefen", verbosity=0)
+                except Exception as exc:
+                    logger.warning("facility_wartungen_pruefen fehlgeschlagen: %s", exc)
+
             # --- Taeglich um 02:00 Uhr: Matrix-Accounts synchronisieren ---
             jetzt = datetime.now()
             heute = date.today()
@@ -74,6 +85,10 @@ class Command(BaseCommand):
                     call_command("ersthelfer_schein_warnung", verbosity=0)
                 except Exception as exc:
                     logger.warning("ersthelfer_schein_warnung fehlgeschlagen: %s", exc)
+                try:
+                    call_command("dms_speicher_aufraeumen", verbosity=0)
+                except Exception as exc:
+                    logger.warning("dms_speicher_aufraeumen fehlgeschlagen: %s", exc)
                 letzter_sync_tag = heute
                 self.stdout.write("Naechtlicher Matrix-Sync abgeschlossen.\n")
                 self.stdout.flush()
@@ -0,0 +1,182 @@
+"""
+Management-Command: matrix_sync_listener
+
+Dauerprozess, der Antworten aus Matrix per /sync-Long-Poll empfaengt und
+an die registrierten Handler verteilt (matrix_integration/sync.py):
+  - Branderkunder-DMs   → sicherheit.matrix_rueckmeldung
+  - EH_PING-Kanal       → ersthelfe.matrix_rueckmeldung
+
+Ersetzt die frueheren Poller (brand_rueckmeldung_poller,
+eh_rueckmeldung_poller), die alle 10 Sekunden je offenem Token einen
+/messages-Request stellten. Jetzt gibt es genau einen offenen Request:
+  - Sync-Filter nur auf die Raeume, die die Handler melden, nur
+    m.room.message, ohne Bot-Nachrichten, ohne Presence/State/Typing
+  - Der Homeserver antwortet, sobald eine Nachricht eintrifft
+    (Latenz ~1 s), sonst nach --timeout
+  - next_batch wird nach jedem Batch in MatrixSyncStand gespeichert –
+    nach einem Neustart geht keine Antwort verloren
+
+Beim allerersten Start wird nur der aktuelle Stand geholt, die
+Raum-Historie wird nicht verarbeitet.
+
+Aufruf (docker-compose):
+    python manage.py matrix_sync_listener
+    python manage.py matrix_sync_listener --einmal   # ein Sync-Durchlauf (Test)
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from config.kommunikation_utils import matrix_filter_anlegen, matrix_sync, matrix_text_nachrichten
+from matrix_integration.models import MatrixSyncStand
+from matrix_integration.sync import get_handler
+
+logger = logging.getLogger(__name__)
+
+STAND_NAME = "prima-bot"
+# Wartezeit nach Fehlern (Homeserver nicht erreichbar o.ae.)
+FEHLER_PAUSE = 5
+# Wartezeit, solange Matrix nicht konfiguriert ist
+LEERLAUF_PAUSE = 300
+# Maximale Nachrichten je Raum und Batch
+TIMELINE_LIMIT = 50
+
+
+class Command(BaseCommand):
+    help = "Empfaengt Matrix-Antworten per /sync-Long-Poll und verteilt sie an die Handler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=getattr(settings, "MATRIX_SYNC_TIMEOUT_MS", 30000),
+            help="Long-Poll-Timeout in Millisekunden (Standard: 30000).",
+        )
+        parser.add_argument(
+            "--einmal",
+            action="store_true",
+            help="Nur einen Sync-Durchlauf ausfuehren und dann beenden.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Matrix-Sync-Listener gestartet.\n")
+        self.stdout.flush()
+
+        while True:
+            close_old_connections()
+            self._durchlauf(options["timeout"])
+            if options["einmal"]:
+                break
+
+    def _durchlauf(self, timeout_ms):
+        """Ein /sync-Aufruf inkl. Verteilung."""
+        if not getattr(settings, "MATRIX_BOT_TOKEN", ""):
+            logger.info("MATRIX_BOT_TOKEN nicht konfiguriert – Sync-Listener pausiert.")
+            time.sleep(LEERLAUF_PAUSE)
+            return
+
+        stand, _ = MatrixSyncStand.objects.get_or_create(name=STAND_NAME)
+        raum_handler = self._raum_handler()
+
+        filter_id = self._filter_id(stand, sorted(raum_handler))
+        if not filter_id:
+            time.sleep(FEHLER_PAUSE)
+            return
+
+        if not stand.next_batch:
+            # Anlauf: nur Fortsetzungspunkt holen, alte Nachrichten ignorieren
+            daten = matrix_sync(filter_id=filter_id, timeout_ms=0)
+        else:
+            daten = matrix_sync(
+                since_token=stand.next_batch, filter_id=filter_id, timeout_ms=timeout_ms,
+            )
+        if not daten or not daten.get("next_batch"):
+            time.sleep(FEHLER_PAUSE)
+            return
+
+        close_old_connections()
+        if stand.next_batch:
+            self._verteile(daten, raum_handler)
+        else:
+            logger.info("Matrix-Sync: Anlauf abgeschlossen, Fortsetzungspunkt gespeichert.")
+
+        stand.next_batch = daten["next_batch"]
+        stand.save(update_fields=["next_batch", "aktualisiert_am"])
+
+    def _raum_handler(self):
+        """Ermittelt {room_id: [handler, ...]} aus allen registrierten Handlern."""
+        raum_handler = {}
+        for handler in get_handler():
+            try:
+                raeume = handler.raeume()
+            except Exception:
+                logger.exception("Matrix-Sync: raeume() von %s fehlgeschlagen", handler.name)
+                continue
+            for room_id in raeume:
+                if room_id:
+                    raum_handler.setdefault(room_id, []).append(handler)
+        return raum_handler
+
+    def _filter_id(self, stand, raeume):
+        """Gibt die filter_id fuer die Raumliste zurueck (legt den Filter nur bei Aenderung an)."""
+        server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
+        bot_id = f"@prima-bot:{server_name}" if server_name else ""
+        nichts = {"not_types": ["*"]}
+        filter_def = {
+            "presence": nichts,
+            "account_data": nichts,
+            "room": {
+                "rooms": raeume,
+                "include_leave": False,
+                "timeline": {
+                    "types": ["m.room.message"],
+                    "not_senders": [bot_id] if bot_id else [],
+                    "limit": TIMELINE_LIMIT,
+                },
+                "state": nichts,
+                "ephemeral": nichts,
+                "account_data": nichts,
+            },
+        }
+        schluessel = hashlib.sha256(
+            json.dumps(filter_def, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        if stand.filter_id and stand.filter_schluessel == schluessel:
+            return stand.filter_id
+
+        filter_id = matrix_filter_anlegen(filter_def)
+        if filter_id:
+            stand.filter_id = filter_id
+            stand.filter_schluessel = schluessel
+            stand.save(update_fields=["filter_id", "filter_schluessel", "aktualisiert_am"])
+            logger.info("Matrix-Sync: Filter %s fuer %d Raeume angelegt", filter_id, len(raeume))
+        return filter_id
+
+    def _verteile(self, daten, raum_handler):
+        """Gibt neue Textnachrichten je Raum an die zustaendigen Handler weiter."""
+        beigetreten = daten.get("rooms", {}).get("join", {})
+        for room_id, raum in beigetreten.items():
+            handler_liste = raum_handler.get(room_id)
+            if not handler_liste:
+                continue
+            timeline = raum.get("timeline", {})
+            if timeline.get("limited"):
+                logger.warning(
+                    "Matrix-Sync: mehr als %d Nachrichten in %s – aeltere uebersprungen",
+                    TIMELINE_LIMIT, room_id,
+                )
+            nachrichten = matrix_text_nachrichten(timeline.get("events", []))
+            if not nachrichten:
+                continue
+            for handler in handler_liste:
+                try:
+                    handler.verarbeite(room_id, nachrichten)
+                except Exception:
+                    logger.exception(
+                        "Matrix-Sync: Handler %s fehlgeschlagen (Raum %s)", handler.name, room_id,
+                    )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matrix_integration', '0005_alter_matrixraum_ping_typ'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatrixSyncStand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aktualisiert_am', models.DateTimeField(auto_now=True)),
+                ('filter_id', models.CharField(blank=True, max_length=100)),
+                ('filter_schluessel', models.CharField(blank=True, help_text='SHA-256 der Filter-Definition (Filter wird nur bei Aenderung neu angelegt)', max_length=64)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_batch', models.CharField(blank=True, max_length=500)),
+            ],
+            options={
+                'verbose_name': 'Matrix-Sync-Stand',
+                'verbose_name_plural': 'Matrix-Sync-Staende',
+            },
+        ),
+    ]
@@ -291,3 +291,29 @@ class SitzungsKalender(models.Model):
         if self.ist_aktiv and not self.naechste_ausfuehrung:
             self.naechste_ausfuehrung = self.berechne_naechste_ausfuehrung()
         super().save(*args, **kwargs)
+
+
+class MatrixSyncStand(models.Model):
+    """Fortsetzungspunkt (next_batch) des Matrix-Sync-Listeners.
+
+    Wird nach jedem verarbeiteten /sync-Batch aktualisiert. Nach einem
+    Neustart setzt der Listener genau dort wieder auf – Antworten, die
+    waehrend der Downtime eingegangen sind, werden nachgeholt.
+    """
+
+    aktualisiert_am = models.DateTimeField(auto_now=True)
+    filter_id = models.CharField(max_length=100, blank=True)
+    filter_schluessel = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 der Filter-Definition (Filter wird nur bei Aenderung neu angelegt)",
+    )
+    name = models.CharField(max_length=50, unique=True)
+    next_batch = models.CharField(max_length=500, blank=True)
+
+    class Meta:
+        verbose_name = "Matrix-Sync-Stand"
+        verbose_name_plural = "Matrix-Sync-Staende"
+
+    def __str__(self):
+        return f"{self.name} ({self.aktualisiert_am:%d.%m.%Y %H:%M:%S})"
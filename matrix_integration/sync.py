@@ -0,0 +1,81 @@
+"""
+Handler-Registry fuer den Matrix-Sync-Listener (manage.py matrix_sync_listener).
+
+Statt je Raum /messages zu pollen, haelt der Listener einen einzigen
+/sync-Long-Poll offen. Jeder Handler meldet, welche Raeume ihn interessieren,
+und bekommt neue Textnachrichten dieser Raeume zugestellt.
+
+Neue Handler: Klasse von SyncHandler ableiten und den Pfad in
+SYNC_HANDLER eintragen (oder settings.MATRIX_SYNC_HANDLER setzen).
+"""
+import logging
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SYNC_HANDLER = [
+    "sicherheit.matrix_rueckmeldung.BrandRueckmeldungHandler",
+    "ersthelfe.matrix_rueckmeldung.EHRueckmeldungHandler",
+]
+
+_HANDLER_CACHE = None
+
+
+class SyncHandler:
+    """Abstrakte Basisklasse – Empfaenger von Matrix-Nachrichten."""
+
+    name = "abstract"
+
+    def raeume(self):
+        """Room-IDs, deren Nachrichten dieser Handler erhalten will."""
+        return set()
+
+    def verarbeite(self, room_id, nachrichten):
+        """Verarbeitet neue Nachrichten eines Raums.
+
+        Args:
+            room_id: Matrix-Raum-ID
+            nachrichten: Liste von dicts mit 'sender', 'body', 'event_id', 'ts'
+                         (Bot-Nachrichten sind bereits herausgefiltert)
+        """
+        raise NotImplementedError
+
+
+def get_handler():
+    """Gibt die registrierten Handler-Instanzen zurueck (gecacht)."""
+    global _HANDLER_CACHE
+    if _HANDLER_CACHE is None:
+        pfade = getattr(settings, "MATRIX_SYNC_HANDLER", None) or SYNC_HANDLER
+        _HANDLER_CACHE = [import_string(pfad)() for pfad in pfade]
+    return _HANDLER_CACHE
+
+
+def stichwort_status(text, stichworte):
+    """Ordnet eine Antwort ueber das Stichwort-Mapping einem Status zu.
+
+    Erst exakter Treffer, dann Prefix-Match (z.B. "fehlalarm – war nur der Toaster").
+    Gibt None zurueck wenn nichts passt (= Freitext).
+    """
+    schluessel = text.lower().strip()
+    status = stichworte.get(schluessel)
+    if status:
+        return status
+    for kw, st in stichworte.items():
+        if schluessel.startswith(kw):
+            return st
+    return None
+
+
+def matrix_id_zu_hr_mitarbeiter(matrix_id):
+    """Loest eine Matrix-ID (@kuerzel:server) in einen HRMitarbeiter auf."""
+    from hr.models import HRMitarbeiter
+
+    server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
+    if not matrix_id.endswith(f":{server_name}"):
+        return None
+    kuerzel = matrix_id.split(":")[0].lstrip("@")
+    return HRMitarbeiter.objects.filter(
+        stelle__kuerzel=kuerzel
+    ).select_related("stelle").first()
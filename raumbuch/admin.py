@@ -6,6 +6,7 @@ from .models import (
     Besuchsanmeldung,
     Gebaeude,
     Geschoss,
+    GeschossGrundriss,
     Glasfaserverbindung,
     NetzwerkKomponente,
     RaumbuchLog,
@@ -54,6 +55,12 @@ class GeschossAdmin(admin.ModelAdmin):
     list_filter = ["gebaeude", "kuerzel"]
 
 
+@admin.register(GeschossGrundriss)
+class GeschossGrundrissAdmin(admin.ModelAdmin):
+    list_display = ["geschoss", "geometrie_version", "erstellt_am"]
+    readonly_fields = ["geschoss", "geometrie_version", "erstellt_am", "svg"]
+
+
 @admin.register(Bereich)
 class BereichAdmin(admin.ModelAdmin):
     list_display = ["bezeichnung", "kuerzel", "geschoss"]
@@ -0,0 +1,313 @@
+"""
+Geschoss-Grundrisse als vorberechnetes SVG.
+
+Die Geometrie eines Geschosses (Raumaufteilung, Moebel, Tueren, Fenster)
+aendert sich nur, wenn Raeume angelegt, umbenannt oder umgewidmet werden.
+Sie wird deshalb serverseitig einmal je Geschoss erzeugt und in
+GeschossGrundriss abgelegt. Der Browser laedt das SVG mit ETag
+(= geometrie_version) und zeichnet nur noch die Live-Overlays (Schloss,
+Buchung, Ping) darueber, siehe static/js/gebaeude_grundriss.js.
+
+Jeder Raum ist eine Gruppe <g class="raum" data-raum-id data-zone data-x
+data-y data-w data-h>; die Beschriftungen liegen in einer eigenen Ebene
+<g class="beschriftung">, damit Overlays darunter eingefuegt werden koennen.
+"""
+import hashlib
+import json
+import math
+import re
+
+from django.utils.html import escape
+
+from .models import GeschossGrundriss, Raum
+
+# Bei Aenderungen an der Zeichenlogik erhoehen – macht alle Grundrisse ungueltig
+LAYOUT_VERSION = 1
+
+FARBEN = {
+    "einzelbuero": "#1d4ed8", "konferenz": "#d97706", "besprechung": "#ca8a04",
+    "schulung": "#c2410c", "teekueche": "#065f46", "pausenraum": "#047857",
+    "wc_herren": "#334155", "wc_damen": "#334155", "wc_barrierefrei": "#1e293b",
+    "druckerraum": "#5b21b6", "eingang": "#713f12", "windfang": "#78350f",
+    "flur": "#1e293b", "heizungsraum": "#7f1d1d", "lueftungsraum": "#991b1b",
+    "elektroverteilung": "#b91c1c", "serverraum": "#7f1d1d", "it_verteiler": "#991b1b",
+    "lager": "#78350f", "archiv": "#713f12", "abstellraum": "#57534e", "putzraum": "#3f3f46",
+}
+FARBE_FALLBACK = "#374151"
+
+BREITE = 900
+KERN_BREITEN = {"konferenz": 300, "besprechung": 300, "teekueche": 300, "wc_herren": 150, "wc_damen": 150}
+
+_NORD = re.compile(r"A0[1-9]$|A[1-9][0-9]$")
+_SUED = re.compile(r"B0[1-9]$|B[1-9][0-9]$")
+_OBERGESCHOSS = re.compile(r"^[1-9]$")
+
+
+# ---------------------------------------------------------------------------
+# Version / Ablage
+# ---------------------------------------------------------------------------
+
+def geometrie_version(geschoss):
+    """Aktuelle Geometrie-Version eines Geschosses.
+
+    Returns:
+        (version, raeume) – raeume als Liste (pk, raumnummer, raumname, raumtyp),
+        damit grundriss_svg() sie nicht erneut laden muss.
+    """
+    raeume = list(
+        Raum.objects.filter(geschoss=geschoss, ist_aktiv=True)
+        .order_by("raumnummer")
+        .values_list("pk", "raumnummer", "raumname", "raumtyp")
+    )
+    roh = json.dumps([LAYOUT_VERSION, geschoss.kuerzel, raeume], separators=(",", ":"))
+    return hashlib.sha256(roh.encode("utf-8")).hexdigest(), raeume
+
+
+def grundriss_svg(geschoss, version=None, raeume=None):
+    """Liefert das SVG eines Geschosses aus der Ablage, erzeugt es bei Bedarf neu."""
+    if version is None:
+        version, raeume = geometrie_version(geschoss)
+
+    gespeichert = GeschossGrundriss.objects.filter(geschoss=geschoss).first()
+    if gespeichert is not None and gespeichert.geometrie_version == version:
+        return gespeichert.svg
+
+    svg = erzeuge_svg(geschoss.kuerzel, raeume, version)
+    GeschossGrundriss.objects.update_or_create(
+        geschoss=geschoss,
+        defaults={"geometrie_version": version, "svg": svg},
+    )
+    return svg
+
+
+# ---------------------------------------------------------------------------
+# SVG-Erzeugung
+# ---------------------------------------------------------------------------
+
+def _zahl(wert):
+    """Kompakte Zahlendarstellung fuer SVG-Attribute."""
+    wert = round(float(wert), 1)
+    return str(int(wert)) if wert.is_integer() else str(wert)
+
+
+def _attribute(attrs):
+    teile = []
+    for name, wert in attrs.items():
+        if isinstance(wert, (int, float)):
+            wert = _zahl(wert)
+        teile.append(f'{name}="{escape(wert)}"')
+    return " ".join(teile)
+
+
+def _el(tag, attrs, text=None):
+    if text is None:
+        return f"<{tag} {_attribute(attrs)}/>"
+    return f"<{tag} {_attribute(attrs)}>{escape(text)}</{tag}>"
+
+
+def _rect(x, y, w, h, fill, **attrs):
+    basis = {"x": x, "y": y, "width": w, "height": h, "fill": fill, "rx": 2}
+    basis.update({k.replace("_", "-"): v for k, v in attrs.items()})
+    return _el("rect", basis)
+
+
+def _ellipse(cx, cy, r, fill, **attrs):
+    basis = {"cx": cx, "cy": cy, "rx": r, "ry": r, "fill": fill}
+    basis.update({k.replace("_", "-"): v for k, v in attrs.items()})
+    return _el("ellipse", basis)
+
+
+def _buero_moebel(g, x, y, w, h, seite):
+    nord = seite == "nord"
+    dx = x + w - 10 - 90 if nord else x + 10
+    dy = y + h - 10 - 50 if nord else y + 10
+    g.append(_rect(dx, dy, 90, 50, "#1e3a5f", rx=3))
+    g.append(_rect(dx, dy, 90, 4, "#2563eb", rx=0))
+    g.append(_rect(dx + 25, dy + 8, 35, 22, "#0f172a"))
+    g.append(_rect(dx + 38, dy + 30, 10, 4, "#334155"))
+    stuhl_y = dy - 34 if nord else dy + 56
+    g.append(_ellipse(dx + 40, stuhl_y + 15, 16, "#374151"))
+    g.append(_rect(dx + 24, dy - 12 if nord else dy + 52, 32, 10, "#475569", rx=4))
+
+
+def _konferenz_moebel(g, x, y, w, h):
+    cx, cy = x + w / 2, y + h / 2
+    tw, th = min(w - 40, 200), 60
+    if tw <= 0:
+        return
+    g.append(_el("ellipse", {
+        "cx": cx, "cy": cy, "rx": tw / 2, "ry": th / 2,
+        "fill": "#1c3a2e", "stroke": "#065f46", "stroke-width": 2,
+    }))
+    anzahl = min(int(tw // 30), 8)
+    for i in range(anzahl):
+        winkel = i / anzahl * math.pi * 2
+        g.append(_ellipse(
+            cx + (tw / 2 + 18) * math.cos(winkel),
+            cy + (th / 2 + 18) * math.sin(winkel),
+            12, "#374151",
+        ))
+
+
+def _teekueche_moebel(g, x, y, w, h):
+    g.append(_rect(x + 6, y + 6, w - 12, 38, "#134e4a", rx=4))
+    g.append(_ellipse(x + 30, y + 26, 12, "#0f172a", stroke="#0d9488", stroke_width=2))
+    g.append(_rect(x + 8, y + 50, 50, 25, "#1e293b"))
+
+
+def _server_moebel(g, x, y, w, h):
+    rw, rh = 32, h - 20
+    rx0 = x + (w - rw * 2 - 10) / 2
+    for i, rack_x in enumerate((rx0, rx0 + rw + 10)):
+        g.append(_rect(rack_x, y + 10, rw, rh, "#0f172a", stroke="#1e3a5f", stroke_width=1))
+        for j in range(6):
+            g.append(_rect(
+                rack_x + 3, y + 14 + j * (rh - 10) / 6, rw - 6, 4,
+                "#16a34a" if i == 0 else "#1d4ed8", rx=1,
+            ))
+
+
+def _tuer(g, tx, ty, richtung, oeffnung):
+    """Tuerblatt mit Schwenkbogen; richtung = Seite, zu der die Tuer aufschlaegt."""
+    laenge = 36
+    nach_sued = richtung == "sued"
+    angel, ende = (tx, tx + laenge) if oeffnung == "links" else (tx + laenge, tx)
+    blatt_y = ty + laenge if nach_sued else ty - laenge
+    bogen = 1 if nach_sued == (oeffnung == "links") else 0
+    d = (
+        f"M {_zahl(angel)} {_zahl(ty)} L {_zahl(angel)} {_zahl(blatt_y)} "
+        f"A {laenge} {laenge} 0 0 {bogen} {_zahl(ende)} {_zahl(ty)}"
+    )
+    g.append(_el("path", {
+        "d": d, "stroke": "#94a3b8", "stroke-width": 1.5, "fill": "rgba(148,163,184,0.08)",
+    }))
+    g.append(_rect(tx, ty - 1 if nach_sued else ty - 4, laenge, 5, "#0f172a", stroke="none"))
+
+
+def _fenster(g, x, y, w, seite):
+    fy = y if seite == "nord" else y - 7
+    breite = (w - 20) / 3
+    for i in range(3):
+        g.append(_rect(x + 10 + i * breite, fy, breite - 4, 7, "#bfdbfe", rx=1, opacity=0.7))
+
+
+def _raum(zeichnung, raum, x, y, w, h, zone):
+    pk, nummer, _name, typ = raum
+    g = [_rect(
+        x, y, w, h, FARBEN.get(typ, FARBE_FALLBACK),
+        stroke="#0f172a", stroke_width=2, rx=3, cursor="pointer", **{"class": "raum-flaeche"},
+    )]
+
+    if zone == "nord":
+        _fenster(g, x, y, w, "nord")
+    if zone == "sued":
+        _fenster(g, x, y + h, w, "sued")
+
+    moebel = []
+    if typ == "einzelbuero":
+        _buero_moebel(moebel, x, y, w, h, "nord" if zone == "nord" else "sued")
+    elif typ in ("konferenz", "besprechung"):
+        _konferenz_moebel(moebel, x, y, w, h)
+    elif typ == "teekueche":
+        _teekueche_moebel(moebel, x, y, w, h)
+    elif typ in ("serverraum", "it_verteiler"):
+        _server_moebel(moebel, x, y, w, h)
+    if moebel:
+        g.append(f'<g opacity="0.9" pointer-events="none">{"".join(moebel)}</g>')
+
+    tuer_x = x + w / 2 - 18
+    if zone == "nord":
+        _tuer(g, tuer_x, y + h, "sued", "links")
+    elif zone == "sued":
+        _tuer(g, tuer_x, y, "nord", "links")
+    elif zone == "kern":
+        _tuer(g, tuer_x, y, "nord", "links")
+        _tuer(g, tuer_x, y + h, "sued", "rechts")
+    else:
+        _tuer(g, tuer_x, y + h, "sued", "links")
+
+    kopf = _attribute({
+        "class": "raum", "data-raum-id": pk, "data-zone": zone,
+        "data-x": x, "data-y": y, "data-w": w, "data-h": h,
+    })
+    zeichnung["raeume"].append(f"<g {kopf}>{''.join(g)}</g>")
+
+    label_y = y + h - 14 if zone == "nord" else y + 14
+    zeichnung["beschriftung"].append(_el("text", {
+        "x": x + w / 2, "y": label_y + 4, "text-anchor": "middle", "dominant-baseline": "middle",
+        "font-size": 10, "font-weight": "bold", "fill": "white", "font-family": "Arial",
+        "paint-order": "stroke", "stroke": "rgba(0,0,0,0.5)", "stroke-width": 3,
+    }, nummer))
+
+
+def _obergeschoss(zeichnung, raeume):
+    """Standard-Obergeschoss: Bueroreihen Nord/Sued, Kern mit Sonderraeumen."""
+    wand, buero_h, korridor, kern_h = 7, 155, 46, 150
+    y_nord = wand
+    y_korridor_nord = y_nord + buero_h
+    y_kern = y_korridor_nord + korridor
+    y_korridor_sued = y_kern + kern_h
+    y_sued = y_korridor_sued + korridor
+    y_wand_sued = y_sued + buero_h
+
+    nord = [r for r in raeume if _NORD.search(r[1])]
+    sued = [r for r in raeume if _SUED.search(r[1])]
+    kern = [r for r in raeume if not (_NORD.search(r[1]) or _SUED.search(r[1]))]
+
+    grund = zeichnung["grund"]
+    grund.append(_rect(0, 0, BREITE, wand, "#475569"))
+    grund.append(_rect(0, y_wand_sued, BREITE, wand, "#475569"))
+    for y, text in ((y_korridor_nord, "KORRIDOR NORD"), (y_korridor_sued, "KORRIDOR SUED")):
+        grund.append(_rect(0, y, BREITE, korridor, "#1a2a3a"))
+        grund.append(_el("text", {
+            "x": 8, "y": y + korridor / 2 + 5, "font-size": 10, "fill": "#334155", "font-family": "Arial",
+        }, text))
+
+    for reihe, y, zone in ((nord, y_nord, "nord"), (sued, y_sued, "sued")):
+        breite = BREITE / len(reihe) if reihe else BREITE
+        for i, raum in enumerate(reihe):
+            _raum(zeichnung, raum, i * breite, y, breite, buero_h, zone)
+
+    gesamt = sum(KERN_BREITEN.get(r[3], 180) for r in kern)
+    skalierung = BREITE / max(gesamt, 1)
+    x = 0
+    for raum in kern:
+        breite = KERN_BREITEN.get(raum[3], 180) * skalierung
+        _raum(zeichnung, raum, x, y_kern, breite, kern_h, "kern")
+        x += breite
+
+    return y_wand_sued + wand
+
+
+def _raster(zeichnung, raeume):
+    """EG, UG und sonstige Geschosse: einfaches Raster mit 5 Spalten."""
+    spalten, raum_h = 5, 130
+    raum_w = BREITE / spalten
+    for i, raum in enumerate(raeume):
+        _raum(zeichnung, raum, (i % spalten) * raum_w, (i // spalten) * raum_h, raum_w, raum_h, "grid")
+    return math.ceil(len(raeume) / spalten) * raum_h + 20
+
+
+def erzeuge_svg(kuerzel, raeume, version=""):
+    """Erzeugt das Grundriss-SVG aus (pk, raumnummer, raumname, raumtyp)-Tupeln."""
+    zeichnung = {"grund": [], "raeume": [], "beschriftung": []}
+    if not raeume:
+        hoehe = 0
+    elif _OBERGESCHOSS.match(kuerzel or ""):
+        hoehe = _obergeschoss(zeichnung, raeume)
+    else:
+        hoehe = _raster(zeichnung, raeume)
+
+    kopf = _attribute({
+        "xmlns": "http://www.w3.org/2000/svg",
+        "viewBox": f"0 0 {BREITE} {hoehe}",
+        "width": BREITE, "height": hoehe,
+        "data-geometrie-version": version,
+    })
+    return (
+        f"<svg {kopf}>"
+        f'<g class="grund">{"".join(zeichnung["grund"])}</g>'
+        f'<g class="raeume">{"".join(zeichnung["raeume"])}</g>'
+        f'<g class="beschriftung" pointer-events="none">{"".join(zeichnung["beschriftung"])}</g>'
+        "</svg>"
+    )
@@ -4,6 +4,10 @@ Erzeugt ein Schnittbild-Schaubild mit allen Etagen und Raeumen,
 farbkodiert nach Raumtyp.
 
 Ausgabe: docs/gebaeude_plan.svg
+
+Mit --geschosse werden zusaetzlich die Grundrisse aller Geschosse fuer
+den interaktiven Grundriss vorberechnet (GeschossGrundriss, siehe
+raumbuch/grundriss.py).
 """
 import os
 
@@ -41,9 +45,19 @@ FARBE_FALLBACK = "#9CA3AF"
 class Command(BaseCommand):
     help = "Generiert docs/gebaeude_plan.svg aus der Raumbuch-Datenbank"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--geschosse",
+            action="store_true",
+            help="Grundrisse aller Geschosse vorberechnen und speichern",
+        )
+
     def handle(self, *args, **options):
         from raumbuch.models import Gebaeude, Geschoss, Raum
 
+        if options["geschosse"]:
+            self._geschosse_vorberechnen(Geschoss)
+
         gebaeude_liste = list(Gebaeude.objects.prefetch_related(
             "geschosse"
         ).order_by("pk"))
@@ -236,3 +250,12 @@ class Command(BaseCommand):
             f.write("\n".join(linien))
 
         self.stdout.write(self.style.SUCCESS(f"SVG gespeichert: {pfad}"))
+
+    def _geschosse_vorberechnen(self, Geschoss):
+        from raumbuch.grundriss import grundriss_svg
+
+        anzahl = 0
+        for geschoss in Geschoss.objects.select_related("gebaeude"):
+            grundriss_svg(geschoss)
+            anzahl += 1
+        self.stdout.write(self.style.SUCCESS(f"{anzahl} Geschoss-Grundrisse vorberechnet"))
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:23
+"""
+Migration 0007: Doppelbuchungen auf Datenbankebene ausschliessen.
+
+Alle Datenbanken: Check-Constraint bis > von.
+
+PostgreSQL: generierte Spalte zeitraum = tsrange(datum + von, datum + bis, '[)')
+und ein GiST-Exclusion-Constraint auf (raum_id, zeitraum) fuer aktive
+Buchungen. Die Spalte ist kein Model-Feld – das ORM sieht sie nicht.
+
+SQLite: nur der Index auf (raum, datum); die Konfliktpruefung laeuft dort
+unter BEGIN IMMEDIATE (Raumbuchung.anlegen).
+
+Bestehende Buchungen mit bis <= von oder (PostgreSQL) sich ueberschneidende
+aktive Buchungen liessen die Constraints scheitern. Die Migration bricht
+dann vorab mit der Liste der betroffenen Buchungsnummern ab; die Buchungen
+sind von Hand zu korrigieren oder zu stornieren (Admin), Buchende zu
+informieren – danach die Migration erneut ausfuehren.
+"""
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+_AKTIVE_STATUS = ("offen", "bestaetigt")
+
+# So viele Buchungen nennt die Fehlermeldung hoechstens einzeln
+_MAX_GENANNT = 50
+
+
+def ueberschneidungen_finden(Raumbuchung):
+    """Paare sich ueberschneidender aktiver Buchungen.
+
+    Je Paar die zuerst angelegte und die spaetere Buchung; jede Buchung wird
+    mit allen frueher angelegten desselben Raums und Tags verglichen.
+
+    Returns:
+        Liste von (frueher, spaeter)-Tupeln
+    """
+    ueberschneidend = Raumbuchung.objects.filter(
+        raum_id=OuterRef("raum_id"),
+        datum=OuterRef("datum"),
+        status__in=_AKTIVE_STATUS,
+        von__lt=OuterRef("bis"),
+        bis__gt=OuterRef("von"),
+    ).exclude(pk=OuterRef("pk"))
+    kandidaten = (
+        Raumbuchung.objects
+        .filter(Exists(ueberschneidend), status__in=_AKTIVE_STATUS)
+        .order_by("raum_id", "datum", "erstellt_am", "pk")
+        .only("pk", "raum_id", "datum", "von", "bis", "buchungs_nr")
+    )
+    je_tag = {}
+    paare = []
+    for buchung in kandidaten:
+        tag = je_tag.setdefault((buchung.raum_id, buchung.datum), [])
+        paare.extend((b, buchung) for b in tag if b.von < buchung.bis and b.bis > buchung.von)
+        tag.append(buchung)
+    return paare
+
+
+def _liste(zeilen):
+    text = "\n".join(f"  {z}" for z in zeilen[:_MAX_GENANNT])
+    if len(zeilen) > _MAX_GENANNT:
+        text += f"\n  ... und {len(zeilen) - _MAX_GENANNT} weitere"
+    return text
+
+
+def bestand_pruefen(apps, schema_editor):
+    """Bricht ab, wenn bestehende Buchungen die neuen Constraints verletzen."""
+    Raumbuchung = apps.get_model("raumbuch", "Raumbuchung")
+    fehler = []
+    ungueltig = [
+        f"{nr} ({datum} {von}–{bis})"
+        for nr, datum, von, bis in Raumbuchung.objects.filter(bis__lte=F("von"))
+        .order_by("datum", "pk")
+        .values_list("buchungs_nr", "datum", "von", "bis")
+    ]
+    if ungueltig:
+        fehler.append(f"Buchungen mit Ende nicht nach Beginn ({len(ungueltig)}):\n{_liste(ungueltig)}")
+    if schema_editor.connection.vendor == "postgresql":
+        paare = [
+            f"{frueher.buchungs_nr} / {spaeter.buchungs_nr} (Raum {frueher.raum_id}, {frueher.datum})"
+            for frueher, spaeter in ueberschneidungen_finden(Raumbuchung)
+        ]
+        if paare:
+            fehler.append(f"Sich ueberschneidende aktive Buchungen ({len(paare)}):\n{_liste(paare)}")
+    if fehler:
+        raise RuntimeError(
+            "Migration raumbuch 0007 abgebrochen – bestehende Buchungen bitte "
+            "korrigieren oder stornieren und die Buchenden informieren:\n"
+            + "\n".join(fehler)
+        )
+
+
+def exclusion_constraint_erstellen(apps, schema_editor):
+    """Legt Spalte + Exclusion-Constraint an (nur PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # btree_gist: '=' auf raum_id innerhalb eines GiST-Index
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        "ALTER TABLE raumbuch_raumbuchung ADD COLUMN IF NOT EXISTS zeitraum tsrange "
+        "GENERATED ALWAYS AS (tsrange(datum + von, datum + bis, '[)')) STORED"
+    )
+    schema_editor.execute(
+        "ALTER TABLE raumbuch_raumbuchung "
+        "ADD CONSTRAINT raumbuch_raumbuchung_keine_ueberschneidung "
+        "EXCLUDE USING gist (raum_id WITH =, zeitraum WITH &&) "
+        "WHERE (status IN ('offen', 'bestaetigt'))"
+    )
+
+
+def exclusion_constraint_loeschen(apps, schema_editor):
+    """Entfernt Constraint + Spalte (nur PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE raumbuch_raumbuchung "
+        "DROP CONSTRAINT IF EXISTS raumbuch_raumbuchung_keine_ueberschneidung"
+    )
+    schema_editor.execute("ALTER TABLE raumbuch_raumbuchung DROP COLUMN IF EXISTS zeitraum")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('raumbuch', '0006_raum_hat_kundenkontakt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(bestand_pruefen, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='raumbuchung',
+            index=models.Index(fields=['raum', 'datum'], name='raumbuchung_raum_datum_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='raumbuchung',
+            constraint=models.CheckConstraint(
+                condition=models.Q(bis__gt=models.F('von')), name='raumbuchung_bis_nach_von',
+            ),
+        ),
+        migrations.RunPython(
+            exclusion_constraint_erstellen,
+            exclusion_constraint_loeschen,
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('raumbuch', '0007_raumbuchung_zeitraum_exclusion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeschossGrundriss',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('erstellt_am', models.DateTimeField(auto_now=True)),
+                ('geometrie_version', models.CharField(max_length=64)),
+                ('svg', models.TextField()),
+                ('geschoss', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grundriss', to='raumbuch.geschoss')),
+            ],
+            options={
+                'verbose_name': 'Geschoss-Grundriss',
+                'verbose_name_plural': 'Geschoss-Grundrisse',
+            },
+        ),
+    ]
@@ -2,7 +2,9 @@ import logging
 from datetime import date, timedelta
 
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+
+from utils.transaktion import schreibtransaktion
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +175,29 @@ class Bereich(models.Model):
         return f"{self.geschoss} – {self.bezeichnung}"
 
 
+class GeschossGrundriss(models.Model):
+    """Vorberechneter SVG-Grundriss eines Geschosses (siehe raumbuch/grundriss.py).
+
+    geometrie_version ist ein Hash ueber die darstellungsrelevanten Raumdaten
+    und dient zugleich als ETag. Weicht er vom aktuellen Stand ab, wird das
+    SVG beim naechsten Abruf neu erzeugt.
+    """
+
+    erstellt_am = models.DateTimeField(auto_now=True)
+    geometrie_version = models.CharField(max_length=64)
+    geschoss = models.OneToOneField(
+        Geschoss, on_delete=models.CASCADE, related_name="grundriss"
+    )
+    svg = models.TextField()
+
+    class Meta:
+        verbose_name = "Geschoss-Grundriss"
+        verbose_name_plural = "Geschoss-Grundrisse"
+
+    def __str__(self):
+        return f"Grundriss: {self.geschoss}"
+
+
 # ---------------------------------------------------------------------------
 # 2b. Raum (Kernobjekt)
 # ---------------------------------------------------------------------------
@@ -737,6 +762,29 @@ class Besuchsanmeldung(models.Model):
 # 2g. Phase 4 – Buchungssystem
 # ---------------------------------------------------------------------------
 
+# Exclusion-Constraint auf (raum, zeitraum) – nur PostgreSQL, siehe Migration 0007
+BUCHUNG_KONFLIKT_CONSTRAINT = "raumbuch_raumbuchung_keine_ueberschneidung"
+# Nur diese Buchungen blockieren den Raum
+BUCHUNG_AKTIVE_STATUS = ("offen", "bestaetigt")
+
+
+class BuchungsKonflikt(Exception):
+    """Die Buchung ueberschneidet sich mit einer bestehenden Buchung."""
+
+    def __init__(self, konflikt=None):
+        self.konflikt = konflikt
+        super().__init__(
+            f"Zeitkonflikt mit Buchung {konflikt.buchungs_nr}" if konflikt else "Zeitkonflikt"
+        )
+
+
+def _ist_buchungskonflikt(exc):
+    diag = getattr(exc.__cause__, "diag", None)
+    if diag is not None and getattr(diag, "constraint_name", None):
+        return diag.constraint_name == BUCHUNG_KONFLIKT_CONSTRAINT
+    return BUCHUNG_KONFLIKT_CONSTRAINT in str(exc)
+
+
 class Raumbuchung(models.Model):
     """Zeitliche Buchung eines buchbaren Raums."""
 
@@ -787,30 +835,98 @@ class Raumbuchung(models.Model):
         ordering = ["-datum", "von"]
         verbose_name = "Raumbuchung"
         verbose_name_plural = "Raumbuchungen"
+        indexes = [
+            models.Index(fields=["raum", "datum"], name="raumbuchung_raum_datum_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(bis__gt=models.F("von")), name="raumbuchung_bis_nach_von"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.buchungs_nr} – {self.raum} am {self.datum}"
 
+    @classmethod
+    def ueberschneidungen(cls, raum_id, datum, von, bis):
+        """Aktive Buchungen desselben Raums, die sich mit [von, bis) ueberschneiden."""
+        return cls.objects.filter(
+            raum_id=raum_id,
+            datum=datum,
+            status__in=BUCHUNG_AKTIVE_STATUS,
+            von__lt=bis,
+            bis__gt=von,
+        )
+
+    @classmethod
+    def anlegen(cls, jitsi_link_fuer=None, **felder):
+        """Legt eine Buchung an – ohne Doppelbuchung, auch bei parallelen Requests.
+
+        PostgreSQL: der Exclusion-Constraint prueft beim INSERT (kein Vorab-Query).
+        SQLite: Pruefung und INSERT laufen unter BEGIN IMMEDIATE; der Aufruf
+        muss deshalb ausserhalb von transaction.atomic() erfolgen.
+
+        Fehlt buchungs_nr, wird sie in derselben Transaktion wie der INSERT
+        gezogen – ein Konflikt oder Rollback hinterlaesst keine Luecke im
+        Nummernkreis. jitsi_link_fuer(buchungs_nr) liefert dann bei Bedarf
+        den Jitsi-Link zur gezogenen Nummer.
+
+        Raises:
+            BuchungsKonflikt: mit der kollidierenden Buchung (falls noch vorhanden)
+            TransactionManagementError: SQLite und bereits offene Transaktion
+        """
+        schluessel = (felder["raum_id"], felder["datum"], felder["von"], felder["bis"])
+
+        def einfuegen():
+            if not felder.get("buchungs_nr"):
+                felder["buchungs_nr"] = cls.generiere_buchungsnummer()
+                if jitsi_link_fuer is not None:
+                    felder["jitsi_link"] = jitsi_link_fuer(felder["buchungs_nr"])
+            return cls.objects.create(**felder)
+
+        if connection.vendor == "postgresql":
+            try:
+                with transaction.atomic():
+                    return einfuegen()
+            except IntegrityError as exc:
+                if not _ist_buchungskonflikt(exc):
+                    raise
+                raise BuchungsKonflikt(cls.ueberschneidungen(*schluessel).first()) from exc
+
+        with schreibtransaktion():
+            konflikt = cls.ueberschneidungen(*schluessel).first()
+            if konflikt is not None:
+                raise BuchungsKonflikt(konflikt)
+            return einfuegen()
+
     @classmethod
     def generiere_buchungsnummer(cls):
-        """Generiert eine eindeutige Buchungsnummer im Format RB-YYYYMMDD-XXXX."""
+        """Generiert eine eindeutige Buchungsnummer im Format RB-YYYYMMDD-XXXX.
+
+        Die laufende Nummer kommt aus dem Nummernkreis "RB-YYYYMMDD"
+        (ein Zaehler je Tag).
+        """
         from django.utils import timezone
-        heute = timezone.now().strftime("%Y%m%d")
-        basis = f"RB-{heute}-"
-        # Hoechste laufende Nummer heute ermitteln
-        letzte = (
-            cls.objects.filter(buchungs_nr__startswith=basis)
-            .order_by("-buchungs_nr")
-            .first()
-        )
-        if letzte:
+        from hr.models import Nummernkreis
+
+        jetzt = timezone.now()
+        basis = f"RB-{jetzt:%Y%m%d}"
+
+        def bisher_hoechste():
+            # Nur beim ersten Zugriff des Tages: bereits vergebene Nummern uebernehmen
+            letzte = (
+                cls.objects.filter(buchungs_nr__startswith=f"{basis}-")
+                .order_by("-buchungs_nr")
+                .values_list("buchungs_nr", flat=True)
+                .first()
+            )
             try:
-                nr = int(letzte.buchungs_nr.split("-")[-1]) + 1
+                return int(letzte.split("-")[-1]) if letzte else 0
             except (ValueError, IndexError):
-                nr = 1
-        else:
-            nr = 1
-        return f"{basis}{nr:04d}"
+                return 0
+
+        nr = Nummernkreis.naechster_wert(basis, jahr=jetzt.year, startwert=bisher_hoechste)
+        return f"{basis}-{nr:04d}"
 
 
 # ---------------------------------------------------------------------------
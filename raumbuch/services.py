@@ -0,0 +1,202 @@
+"""
+Raumbuch-Services: freie Zeitfenster und Live-Buchungsstatus der Raeume.
+
+freie_slots() ersetzt das visuelle Absuchen des Belegungsplans. Es laedt
+die Buchungen aller Kandidaten-Raeume fuer den Zeitraum in einer Query
+(sortiert nach Raum, Datum, Beginn), verschmilzt sie je Raum zu
+disjunkten Intervallen und liefert die fruehesten passenden Luecken.
+
+Aufwand: O(n log n) fuer n Buchungen + Luecken – die Sortierung der
+Buchungen uebernimmt die Datenbank (Index raum, datum).
+
+raum_status() liefert die Buchungslage aller Raeume fuer den Grundriss in
+einer einzigen gruppierten Query.
+"""
+import heapq
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, F, Max, Min, Q, TimeField, Value, When
+from django.utils import timezone
+
+from .models import BUCHUNG_AKTIVE_STATUS, Belegung, Raum, Raumbuchung
+
+# Buchbarer Tagesrahmen (Buchungen koennen Mitternacht nicht ueberschreiten)
+TAG_BEGINN = time(7, 0)
+TAG_ENDE = time(20, 0)
+
+# Laengster Suchzeitraum – begrenzt Buchungs-Query und Tagesschleife
+MAX_ZEITRAUM = timedelta(days=31)
+
+# Ausstattungs-Kuerzel → Filter auf die Raum-Schichten
+AUSSTATTUNG_FILTER = {
+    "barrierefrei": Q(arbeitsschutz_daten__barrierefrei=True),
+    "verdunkelbar": Q(facility_daten__fenster_verdunkelbar=True),
+    "lueftung": Q(facility_daten__lueftungsanlage=True),
+    "klima": Q(facility_daten__isnull=False) & ~Q(facility_daten__klima_typ=""),
+    "lan": Q(netzwerk_daten__lan_ports_anzahl__gt=0),
+    "telefon": Q(netzwerk_daten__telefondosen__gt=0),
+    "jitsi": ~Q(jitsi_room_url=""),
+    "matrix": ~Q(matrix_room_url=""),
+}
+
+
+def _lokal_naiv(zeitpunkt):
+    """Buchungszeiten sind lokale Uhrzeiten ohne Zeitzone."""
+    if timezone.is_aware(zeitpunkt):
+        return timezone.localtime(zeitpunkt).replace(tzinfo=None)
+    return zeitpunkt
+
+
+def _verschmelzen(intervalle):
+    """Verschmilzt nach Beginn sortierte (beginn, ende)-Intervalle zu disjunkten Bloecken."""
+    bloecke = []
+    for beginn, ende in intervalle:
+        if bloecke and beginn <= bloecke[-1][1]:
+            if ende > bloecke[-1][1]:
+                bloecke[-1][1] = ende
+        else:
+            bloecke.append([beginn, ende])
+    return bloecke
+
+
+def _tagesrahmen(von, bis):
+    """Liefert je Kalendertag den buchbaren Ausschnitt [beginn, ende) innerhalb von [von, bis)."""
+    tag = von.date()
+    while tag <= bis.date():
+        beginn = max(von, datetime.combine(tag, TAG_BEGINN))
+        ende = min(bis, datetime.combine(tag, TAG_ENDE))
+        if beginn < ende:
+            yield tag, beginn, ende
+        tag += timedelta(days=1)
+
+
+def freie_slots(von, bis, dauer, kapazitaet=None, ausstattung=(), anzahl=10, raeume=None):
+    """Findet die fruehesten freien Zeitfenster in buchbaren Raeumen.
+
+    Args:
+        von, bis: Suchzeitraum (datetime)
+        dauer: Mindestlaenge des Fensters (timedelta)
+        kapazitaet: Mindestanzahl Plaetze (optional)
+        ausstattung: Kuerzel aus AUSSTATTUNG_FILTER, alle muessen erfuellt sein
+        anzahl: Maximale Anzahl Ergebnisse
+        raeume: Optionales Raum-QuerySet statt aller buchbaren Raeume
+
+    Returns:
+        Liste von dicts (nach Beginn, dann Raum sortiert):
+        {"raum": Raum, "datum", "von", "bis", "frei_bis"} – von/bis ist das
+        vorgeschlagene Fenster der Laenge dauer, frei_bis das Ende der Luecke.
+
+    Raises:
+        ValueError: unbekanntes Ausstattungs-Kuerzel oder ungueltiger Zeitraum
+            (kuerzer als dauer oder laenger als MAX_ZEITRAUM)
+    """
+    von, bis = _lokal_naiv(von), _lokal_naiv(bis)
+    if dauer <= timedelta(0) or bis - von < dauer:
+        raise ValueError("Der Zeitraum muss laenger als die gewuenschte Dauer sein.")
+    if bis - von > MAX_ZEITRAUM:
+        raise ValueError(f"Der Zeitraum darf hoechstens {MAX_ZEITRAUM.days} Tage umfassen.")
+    unbekannt = set(ausstattung) - set(AUSSTATTUNG_FILTER)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Ausstattung: {', '.join(sorted(unbekannt))}")
+
+    kandidaten = raeume if raeume is not None else Raum.objects.filter(
+        nutzungsmodell="dynamisch", ist_aktiv=True
+    )
+    if kapazitaet:
+        kandidaten = kandidaten.filter(kapazitaet__gte=kapazitaet)
+    for kuerzel in ausstattung:
+        kandidaten = kandidaten.filter(AUSSTATTUNG_FILTER[kuerzel])
+    raum_map = {
+        r.pk: r for r in kandidaten.distinct().select_related("geschoss__gebaeude")
+    }
+    if not raum_map:
+        return []
+
+    # Alle Buchungen der Kandidaten in einer Query, schon sortiert
+    belegt = {raum_id: [] for raum_id in raum_map}
+    for raum_id, datum, b_von, b_bis in (
+        Raumbuchung.objects.filter(
+            raum_id__in=raum_map,
+            datum__range=(von.date(), bis.date()),
+            status__in=BUCHUNG_AKTIVE_STATUS,
+        )
+        .order_by("raum_id", "datum", "von")
+        .values_list("raum_id", "datum", "von", "bis")
+    ):
+        belegt[raum_id].append((datetime.combine(datum, b_von), datetime.combine(datum, b_bis)))
+
+    # Dauerhafte Belegungen sperren ganze Tage
+    gesperrt = {}
+    for raum_id, b_von, b_bis in Belegung.objects.filter(
+        Q(bis__isnull=True) | Q(bis__gte=von.date()),
+        raum_id__in=raum_map,
+        von__lte=bis.date(),
+    ).values_list("raum_id", "von", "bis"):
+        gesperrt.setdefault(raum_id, []).append((b_von, b_bis))
+
+    tage = list(_tagesrahmen(von, bis))
+    luecken = []
+    for raum_id, intervalle in belegt.items():
+        bloecke = _verschmelzen(intervalle)
+        i = 0
+        sperren = gesperrt.get(raum_id, ())
+        for tag, beginn, ende in tage:
+            if any(s_von <= tag and (s_bis is None or tag <= s_bis) for s_von, s_bis in sperren):
+                continue
+            cursor = beginn
+            # Bloecke vor dem Tagesrahmen ueberspringen (sortiert → Zeiger laeuft nur vorwaerts)
+            while i < len(bloecke) and bloecke[i][1] <= beginn:
+                i += 1
+            j = i
+            while j < len(bloecke) and bloecke[j][0] < ende:
+                if bloecke[j][0] - cursor >= dauer:
+                    luecken.append((cursor, raum_id, bloecke[j][0]))
+                cursor = max(cursor, bloecke[j][1])
+                j += 1
+            if ende - cursor >= dauer:
+                luecken.append((cursor, raum_id, ende))
+
+    ergebnis = []
+    for beginn, raum_id, frei_bis in heapq.nsmallest(anzahl, luecken):
+        ergebnis.append({
+            "raum": raum_map[raum_id],
+            "datum": beginn.date(),
+            "von": beginn.time(),
+            "bis": (beginn + dauer).time(),
+            "frei_bis": frei_bis.time(),
+        })
+    return ergebnis
+
+
+def raum_status(geschoss_id=None, jetzt=None):
+    """Kompakte Buchungslage von heute: {raum_id: status}.
+
+    status ist "belegt" fuer eine laufende Buchung, sonst die Startzeit
+    ("HH:MM") der naechsten Buchung. Raeume ohne weitere Buchung heute
+    fehlen in der Map. Alle Geschosse (oder eines) in einer gruppierten Query.
+    """
+    jetzt = timezone.localtime(jetzt)
+    uhrzeit = jetzt.time().replace(microsecond=0)
+
+    buchungen = Raumbuchung.objects.filter(
+        datum=jetzt.date(),
+        bis__gt=uhrzeit,
+        status__in=BUCHUNG_AKTIVE_STATUS,
+        raum__ist_aktiv=True,
+    )
+    if geschoss_id:
+        buchungen = buchungen.filter(raum__geschoss_id=geschoss_id)
+
+    zeilen = (
+        buchungen.order_by()
+        .values("raum_id")
+        .annotate(
+            laeuft=Max(Case(When(von__lte=uhrzeit, then=Value(1)), default=Value(0))),
+            naechste=Min(Case(When(von__gt=uhrzeit, then=F("von")), output_field=TimeField())),
+        )
+        .values_list("raum_id", "laeuft", "naechste")
+    )
+    return {
+        raum_id: "belegt" if laeuft else naechste.strftime("%H:%M")
+        for raum_id, laeuft, naechste in zeilen
+    }
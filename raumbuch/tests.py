@@ -0,0 +1,170 @@
+import importlib
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .models import BuchungsKonflikt, Gebaeude, Geschoss, Raum, Raumbuchung, Standort
+from .services import freie_slots
+
+
+class DoppelbuchungTest(TransactionTestCase):
+    """Ueberschneidende Buchungen werden abgelehnt.
+
+    TransactionTestCase: Raumbuchung.anlegen() braucht auf SQLite eine eigene
+    Transaktion und lehnt den Aufruf innerhalb von atomic() ab.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("bucher", password="x")
+        standort = Standort.objects.create(kuerzel="HQ", name="Zentrale")
+        gebaeude = Gebaeude.objects.create(bezeichnung="Haus A", kuerzel="A", standort=standort)
+        geschoss = Geschoss.objects.create(bezeichnung="Erdgeschoss", gebaeude=gebaeude, kuerzel="EG")
+        self.raum = Raum.objects.create(
+            geschoss=geschoss, raumnummer="A.0.01", raumtyp="besprechung", nutzungsmodell="dynamisch",
+        )
+        self.datum = date.today() + timedelta(days=1)
+        self.bestehend = Raumbuchung.objects.create(
+            raum=self.raum, datum=self.datum, von=time(9), bis=time(10),
+            betreff="Jour fixe", buchender=self.user, buchungs_nr="RB-TEST-0001",
+        )
+
+    def _buchen(self, von, bis):
+        self.client.force_login(self.user)
+        return self.client.post(reverse("raumbuch:buchung_erstellen"), {
+            "raum": self.raum.pk, "datum": self.datum.isoformat(),
+            "von": von, "bis": bis, "betreff": "Workshop",
+        })
+
+    def test_ueberschneidung_abgelehnt(self):
+        antwort = self._buchen("09:30", "11:00")
+        self.assertEqual(antwort.status_code, 200)
+        self.assertContains(antwort, "Zeitkonflikt mit Buchung RB-TEST-0001")
+        self.assertEqual(Raumbuchung.objects.count(), 1)
+
+    def test_anschlussbuchung_erlaubt(self):
+        antwort = self._buchen("10:00", "11:00")
+        self.assertEqual(antwort.status_code, 302)
+        self.assertEqual(Raumbuchung.objects.count(), 2)
+
+    def test_stornierte_buchung_blockiert_nicht(self):
+        Raumbuchung.objects.filter(pk=self.bestehend.pk).update(status="storniert")
+        self.assertEqual(self._buchen("09:00", "10:00").status_code, 302)
+
+    def test_anlegen_konflikt(self):
+        with self.assertRaises(BuchungsKonflikt) as ctx:
+            Raumbuchung.anlegen(
+                raum_id=self.raum.pk, datum=self.datum, von=time(8), bis=time(9, 30),
+                betreff="Frueh", buchender=self.user, buchungs_nr="RB-TEST-0002",
+            )
+        self.assertEqual(ctx.exception.konflikt, self.bestehend)
+
+    def test_konflikt_hinterlaesst_keine_nummernluecke(self):
+        felder = {"datum": self.datum, "betreff": "Workshop", "buchender": self.user}
+        erste = Raumbuchung.anlegen(raum_id=self.raum.pk, von=time(10), bis=time(11), **felder)
+        with self.assertRaises(BuchungsKonflikt):
+            Raumbuchung.anlegen(raum_id=self.raum.pk, von=time(10, 30), bis=time(12), **felder)
+        zweite = Raumbuchung.anlegen(raum_id=self.raum.pk, von=time(11), bis=time(12), **felder)
+        erste_nr = int(erste.buchungs_nr.rsplit("-", 1)[1])
+        self.assertEqual(zweite.buchungs_nr.rsplit("-", 1)[1], f"{erste_nr + 1:04d}")
+
+    def test_ende_vor_beginn_abgelehnt(self):
+        with self.assertRaises(IntegrityError):
+            Raumbuchung.objects.create(
+                raum=self.raum, datum=self.datum, von=time(12), bis=time(11),
+                buchender=self.user, buchungs_nr="RB-TEST-0004",
+            )
+
+    def test_migration_bricht_bei_ueberschneidungen_ab(self):
+        migration = importlib.import_module("raumbuch.migrations.0007_raumbuchung_zeitraum_exclusion")
+        Raumbuchung.objects.create(
+            raum=self.raum, datum=self.datum, von=time(9, 30), bis=time(11),
+            buchender=self.user, buchungs_nr="RB-TEST-0005",
+        )
+        postgres = SimpleNamespace(connection=SimpleNamespace(vendor="postgresql"))
+        with self.assertRaisesMessage(RuntimeError, "RB-TEST-0001 / RB-TEST-0005"):
+            migration.bestand_pruefen(apps, postgres)
+        # Nichts wird storniert – die Migration aendert keine Buchungen
+        self.assertFalse(Raumbuchung.objects.filter(status="storniert").exists())
+
+    def test_anlegen_in_offener_transaktion_abgelehnt(self):
+        if transaction.get_connection().vendor != "sqlite":
+            self.skipTest("Nur SQLite braucht die eigene Transaktion")
+        with self.assertRaises(transaction.TransactionManagementError), transaction.atomic():
+            Raumbuchung.anlegen(
+                raum_id=self.raum.pk, datum=self.datum, von=time(14), bis=time(15),
+                betreff="Spaet", buchender=self.user, buchungs_nr="RB-TEST-0003",
+            )
+
+
+class FreieSlotsTest(TestCase):
+    """Luecken zwischen bestehenden Buchungen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("sucher", password="x")
+        standort = Standort.objects.create(kuerzel="HQ", name="Zentrale")
+        gebaeude = Gebaeude.objects.create(bezeichnung="Haus A", kuerzel="A", standort=standort)
+        geschoss = Geschoss.objects.create(bezeichnung="Erdgeschoss", gebaeude=gebaeude, kuerzel="EG")
+        cls.raum = Raum.objects.create(
+            geschoss=geschoss, raumnummer="A.0.02", raumtyp="besprechung", nutzungsmodell="dynamisch",
+        )
+        cls.datum = date.today() + timedelta(days=1)
+        for nr, (von, bis, status) in enumerate([
+            (time(9), time(10), "offen"),
+            (time(9, 30), time(10, 30), "offen"),   # ueberlappt → ein Block 9:00–10:30
+            (time(11), time(12), "offen"),          # Luecke 10:30–11:00 zu kurz fuer 60 Min.
+            (time(14), time(16), "storniert"),      # blockiert nicht
+        ], start=1):
+            Raumbuchung.objects.create(
+                raum=cls.raum, datum=cls.datum, von=von, bis=bis, status=status,
+                buchender=cls.user, buchungs_nr=f"RB-SLOT-{nr:04d}",
+            )
+
+    def _slots(self, von, bis, minuten=60, **kwargs):
+        return [
+            (s["von"], s["bis"], s["frei_bis"])
+            for s in freie_slots(
+                datetime.combine(self.datum, von), datetime.combine(self.datum, bis),
+                timedelta(minutes=minuten), raeume=Raum.objects.filter(pk=self.raum.pk), **kwargs,
+            )
+        ]
+
+    def test_luecken_um_buchungen(self):
+        self.assertEqual(self._slots(time(0), time(23, 59)), [
+            (time(7), time(8), time(9)),
+            (time(12), time(13), time(20)),
+        ])
+
+    def test_kurze_luecke_passt_bei_kurzer_dauer(self):
+        self.assertEqual(self._slots(time(10), time(11, 30), minuten=30), [
+            (time(10, 30), time(11), time(11)),
+        ])
+
+    def test_suche_beginnt_in_buchung(self):
+        self.assertEqual(self._slots(time(9, 45), time(13)), [(time(12), time(13), time(13))])
+
+    def test_anzahl_begrenzt(self):
+        self.assertEqual(len(self._slots(time(0), time(23, 59), anzahl=1)), 1)
+
+    def test_zeitraum_begrenzt(self):
+        von = datetime.combine(self.datum, time(8))
+        with self.assertRaises(ValueError):
+            freie_slots(von, von + timedelta(days=32), timedelta(hours=1))
+
+    def test_api_lehnt_zu_langen_zeitraum_ab(self):
+        self.client.force_login(self.user)
+        von = datetime.combine(self.datum, time(8))
+        antwort = self.client.get(reverse("raumbuch:freie_slots"), {
+            "von": von.isoformat(), "bis": (von + timedelta(days=60)).isoformat(),
+        })
+        self.assertEqual(antwort.status_code, 400)
+        antwort = self.client.get(reverse("raumbuch:freie_slots"), {
+            "von": von.isoformat(), "bis": (von + timedelta(hours=4)).isoformat(),
+        })
+        self.assertEqual(antwort.status_code, 200)
+        self.assertEqual(antwort.json()["slots"][0]["von"], "08:00")
@@ -62,6 +62,7 @@ urlpatterns = [
     path("buchung/raum/<int:raum_pk>/neu/", views.buchung_erstellen, name="buchung_fuer_raum"),
     path("buchung/<int:pk>/", views.buchung_detail, name="buchung_detail"),
     path("buchung/<int:pk>/stornieren/", views.buchung_stornieren, name="buchung_stornieren"),
+    path("buchung/freie-slots/", views.freie_slots_api, name="freie_slots"),
     # Umzug
     path("umzug/", views.umzug_liste, name="umzug_liste"),
     path("umzug/neu/", views.umzug_form, name="umzug_erstellen"),
@@ -72,6 +73,7 @@ urlpatterns = [
     # Interaktiver Grundriss
     path("grundriss/", views.gebaeude_grundriss, name="grundriss"),
     path("grundriss/status/", views.gebaeude_status_api, name="grundriss_status"),
+    path("grundriss/<int:geschoss_pk>/svg/", views.gebaeude_grundriss_svg, name="grundriss_svg"),
     # Netzwerkplan
     path("raum/<int:pk>/netzwerkplan/", views.raum_netzwerkplan, name="netzwerkplan"),
 ]
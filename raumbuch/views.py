@@ -3,6 +3,7 @@ from datetime import date, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
@@ -12,6 +13,7 @@ from .models import (
     Belegung,
     Bereich,
     Besuchsanmeldung,
+    BuchungsKonflikt,
     Gebaeude,
     Geschoss,
     Glasfaserverbindung,
@@ -111,53 +113,118 @@ def gebaeude_grundriss(request):
         "raeume": raeume_data,
         "geschoss": geschoss,
         "geschoss_id": geschoss_id or "",
-        "geschoss_kuerzel": geschoss.kuerzel if geschoss else "",
     })
 
 
+@login_required
+def gebaeude_grundriss_svg(request, geschoss_pk):
+    """Vorberechneter SVG-Grundriss eines Geschosses (ETag = Geometrie-Version)."""
+    from django.http import HttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+
+    from .grundriss import geometrie_version, grundriss_svg
+
+    geschoss = get_object_or_404(Geschoss, pk=geschoss_pk)
+    version, raeume = geometrie_version(geschoss)
+    etag = f'"{version}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            grundriss_svg(geschoss, version, raeume),
+            content_type="image/svg+xml; charset=utf-8",
+        )
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @login_required
 def gebaeude_status_api(request):
-    """JSON-API: Buchungsstatus fuer alle Raeume eines Geschosses."""
-    from django.http import JsonResponse
+    """JSON-API: kompakte Buchungslage {raum_id: status} aller Raeume (ETag/304)."""
+    import hashlib
+    import json
 
-    geschoss_id = request.GET.get("geschoss")
-    if not geschoss_id:
-        return JsonResponse({"raeume": {}})
-
-    jetzt = timezone.now()
-    heute = timezone.localdate()
-
-    raeume = Raum.objects.filter(geschoss_id=geschoss_id, ist_aktiv=True)
-
-    buchungen_jetzt = set(
-        Raumbuchung.objects.filter(
-            raum__in=raeume,
-            datum=heute,
-            von__lte=jetzt.time(),
-            bis__gte=jetzt.time(),
-            status__in=["offen", "bestaetigt"],
-        ).values_list("raum_id", flat=True)
+    from django.http import HttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+
+    from .services import raum_status
+
+    geschoss_id = request.GET.get("geschoss") or None
+    if geschoss_id is not None and not geschoss_id.isdigit():
+        return HttpResponse(status=400)
+
+    inhalt = json.dumps(
+        raum_status(geschoss_id=geschoss_id),
+        separators=(",", ":"),
+        sort_keys=True,
     )
+    etag = f'"{hashlib.md5(inhalt.encode(), usedforsecurity=False).hexdigest()}"'
 
-    naechste = {}
-    for b in Raumbuchung.objects.filter(
-        raum__in=raeume,
-        datum=heute,
-        von__gt=jetzt.time(),
-        status__in=["offen", "bestaetigt"],
-    ).order_by("von").select_related("buchender"):
-        if b.raum_id not in naechste:
-            name = b.buchender.get_full_name() or b.buchender.username if b.buchender else "?"
-            naechste[b.raum_id] = f"{b.von.strftime('%H:%M')} {b.betreff or name}"
-
-    result = {}
-    for raum in raeume:
-        result[str(raum.pk)] = {
-            "buchung_aktiv": raum.pk in buchungen_jetzt,
-            "naechste_buchung": naechste.get(raum.pk),
-        }
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(inhalt, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def freie_slots_api(request):
+    """JSON-API: frueheste freie Zeitfenster in buchbaren Raeumen.
+
+    GET-Parameter:
+        von, bis      – ISO-Zeitpunkte (Standard: jetzt bis +7 Tage, hoechstens 31 Tage)
+        dauer         – Minuten (Standard: 60)
+        kapazitaet    – Mindestanzahl Plaetze (optional)
+        ausstattung   – mehrfach oder kommagetrennt (siehe AUSSTATTUNG_FILTER)
+        anzahl        – max. Ergebnisse (Standard: 10, hoechstens 50)
+    """
+    from datetime import datetime
 
-    return JsonResponse({"raeume": result})
+    from django.http import JsonResponse
+    from django.urls import reverse
+
+    from .services import freie_slots
+
+    try:
+        jetzt = timezone.localtime().replace(tzinfo=None, second=0, microsecond=0)
+        von = datetime.fromisoformat(request.GET["von"]) if request.GET.get("von") else jetzt
+        bis = (
+            datetime.fromisoformat(request.GET["bis"])
+            if request.GET.get("bis") else von + timedelta(days=7)
+        )
+        dauer = timedelta(minutes=int(request.GET.get("dauer") or 60))
+        kapazitaet = int(request.GET["kapazitaet"]) if request.GET.get("kapazitaet") else None
+        anzahl = min(int(request.GET.get("anzahl") or 10), 50)
+        ausstattung = [
+            k.strip()
+            for wert in request.GET.getlist("ausstattung")
+            for k in wert.split(",")
+            if k.strip()
+        ]
+        slots = freie_slots(von, bis, dauer, kapazitaet, ausstattung, anzahl=anzahl)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    return JsonResponse({
+        "slots": [
+            {
+                "raum_id": s["raum"].pk,
+                "raum": s["raum"].get_anzeigename(),
+                "kapazitaet": s["raum"].kapazitaet,
+                "datum": s["datum"].isoformat(),
+                "von": s["von"].strftime("%H:%M"),
+                "bis": s["bis"].strftime("%H:%M"),
+                "frei_bis": s["frei_bis"].strftime("%H:%M"),
+                "buchen_url": (
+                    reverse("raumbuch:buchung_fuer_raum", args=[s["raum"].pk])
+                    + f"?datum={s['datum'].isoformat()}"
+                ),
+            }
+            for s in slots
+        ]
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -1284,8 +1351,13 @@ def buchung_kalender(request):
 
 @login_required
 @login_required
+@transaction.non_atomic_requests
 def buchung_erstellen(request, raum_pk=None):
-    """Buchung erstellen mit Konfliktpruefung."""
+    """Buchung erstellen mit Konfliktpruefung.
+
+    Nicht atomar: Raumbuchung.anlegen() braucht auf SQLite eine eigene
+    Transaktion (BEGIN IMMEDIATE).
+    """
     buchbare_raeume = Raum.objects.filter(
         nutzungsmodell="dynamisch", ist_aktiv=True
     ).select_related("geschoss__gebaeude")
@@ -1316,38 +1388,29 @@ def buchung_erstellen(request, raum_pk=None):
 
         if not raum_id or not datum or not von or not bis:
             messages.error(request, "Raum, Datum, Von und Bis sind Pflichtfelder.")
+        elif bis <= von:
+            messages.error(request, "Die Endzeit muss nach der Startzeit liegen.")
         else:
-            # Konfliktpruefung
-            konflikt_qs = Raumbuchung.objects.filter(
-                raum_id=raum_id,
-                datum=datum,
-                status__in=["offen", "bestaetigt"],
-            ).exclude(
-                # Keine Ueberschneidung wenn neue Buchung vor oder nach bestehender liegt
-                bis__lte=von
-            ).exclude(
-                von__gte=bis
+            raum = get_object_or_404(Raum, pk=raum_id)
+            raumname_slug = (
+                f"{raum.raumnummer}-{raum.raumname}"
+                if raum.raumname
+                else raum.raumnummer
             )
-            if konflikt_qs.exists():
-                konflikt = konflikt_qs.first()
-                messages.error(
-                    request,
-                    f"Zeitkonflikt mit Buchung {konflikt.buchungs_nr} ({konflikt.von}–{konflikt.bis}).",
-                )
-            else:
-                buchungs_nr = Raumbuchung.generiere_buchungsnummer()
-                raum = get_object_or_404(Raum, pk=raum_id)
-                raumname_slug = (
-                    f"{raum.raumnummer}-{raum.raumname}"
-                    if raum.raumname
-                    else raum.raumnummer
-                )
-                # Jitsi-Link nur generieren wenn Jitsi explizit gewaehlt
-                # Fester Raum-Link hat Vorrang vor automatisch generiertem
-                jitsi_url = ""
-                if virtual_meeting == "jitsi":
-                    jitsi_url = raum.jitsi_room_url or jitsi_link_generieren(raumname_slug, datum, buchungs_nr)
-                buchung = Raumbuchung.objects.create(
+            # Jitsi-Link nur generieren wenn Jitsi explizit gewaehlt
+            # Fester Raum-Link hat Vorrang vor automatisch generiertem
+            jitsi_url = ""
+            jitsi_link_fuer = None
+            if virtual_meeting == "jitsi":
+                jitsi_url = raum.jitsi_room_url
+                if not jitsi_url:
+                    def jitsi_link_fuer(buchungs_nr):
+                        return jitsi_link_generieren(raumname_slug, datum, buchungs_nr)
+            try:
+                # Konfliktpruefung in der Datenbank (Exclusion-Constraint bzw. SQLite-Sperre);
+                # die Buchungsnummer wird in derselben Transaktion gezogen
+                buchung = Raumbuchung.anlegen(
+                    jitsi_link_fuer=jitsi_link_fuer,
                     raum_id=raum_id,
                     datum=datum,
                     von=von,
@@ -1355,13 +1418,22 @@ def buchung_erstellen(request, raum_pk=None):
                     betreff=betreff,
                     teilnehmerzahl=teilnehmerzahl,
                     buchender=request.user,
-                    buchungs_nr=buchungs_nr,
                     jitsi_link=jitsi_url,
                     virtual_meeting=virtual_meeting,
                     status="offen",
                 )
-                _log(raum, "Buchung erstellt", buchungs_nr, request.user, "Raumbuchung", buchung.pk)
-                messages.success(request, f"Buchung {buchungs_nr} angelegt.")
+            except BuchungsKonflikt as exc:
+                konflikt = exc.konflikt
+                if konflikt is not None:
+                    messages.error(
+                        request,
+                        f"Zeitkonflikt mit Buchung {konflikt.buchungs_nr} ({konflikt.von}–{konflikt.bis}).",
+                    )
+                else:
+                    messages.error(request, "Zeitkonflikt mit einer bestehenden Buchung.")
+            else:
+                _log(raum, "Buchung erstellt", buchung.buchungs_nr, request.user, "Raumbuchung", buchung.pk)
+                messages.success(request, f"Buchung {buchung.buchungs_nr} angelegt.")
                 return redirect("raumbuch:buchung_detail", pk=buchung.pk)
 
     return render(
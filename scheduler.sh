@@ -3,22 +3,13 @@
 #
 # Laeuft als eigener Docker-Container.
 # Aufgaben:
-#   - Alle 30 Sek:  Brand- und EH-Rueckmeldungen pollen (Matrix-DMs)
+#   (Brand- und EH-Rueckmeldungen: eigener Dienst matrix_sync_listener)
 #   - Jede Minute:  Sitzungs-Erinnerungen pruefen (Matrix-Nachrichten)
 #   - Taeglich 2:00 Uhr: Matrix-Accounts synchronisieren + Passwort setzen
 
 LETZTER_SYNC_TAG=""
-LETZTER_POLL=0
 
 while true; do
-    # Alle 30 Sekunden: Brand- und EH-Rueckmeldungen pollen
-    JETZT=$(date +%s)
-    if [ $((JETZT - LETZTER_POLL)) -ge 30 ]; then
-        python manage.py brand_rueckmeldung_poller
-        python manage.py eh_rueckmeldung_poller
-        LETZTER_POLL=$JETZT
-    fi
-
     # Minuetliche Aufgaben
     python manage.py matrix_sitzung_erinnerungen
 
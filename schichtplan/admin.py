@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Schichttyp, Schichtplan, Schicht, Schichtwunsch, Schichttausch, SchichtplanKonfiguration, RegionalerFeiertag
+from .models import Schichttyp, Schichtplan, Schicht, Schichtwunsch, Schichttausch, SchichtplanKonfiguration, RegionalerFeiertag, SchichtplanJob
 from arbeitszeit.models import Mitarbeiter
 
 
@@ -13,6 +13,12 @@ class SchichtplanAdmin(admin.ModelAdmin):
     list_display = ['name', 'start_datum', 'ende_datum', 'status']
 
 
+@admin.register(SchichtplanJob)
+class SchichtplanJobAdmin(admin.ModelAdmin):
+    list_display = ['schichtplan', 'status', 'erstellt_am', 'loesungen', 'gap', 'laufzeit_sekunden']
+    list_filter = ['status']
+
+
 @admin.register(Schicht)
 class SchichtAdmin(admin.ModelAdmin):
     list_display = ['mitarbeiter', 'datum', 'schichttyp']
@@ -0,0 +1,215 @@
+"""
+Management-Command: schichtplan_worker
+
+Arbeitet SchichtplanJob-Auftraege ausserhalb des HTTP-Requests ab.
+Die CP-SAT-Loesung blockiert dadurch keinen Gunicorn-Thread und keine
+DB-Transaktion des Webservers mehr.
+
+Ablauf pro Job:
+  1. Aeltesten wartenden Job per select_for_update(skip_locked=True) claimen
+     (SQLite: unter BEGIN IMMEDIATE, dort wirkt select_for_update nicht)
+  2. SchichtplanGenerator.generiere_vorschlag() mit Fortschritts-Callback
+  3. Callback-Werte (Zielfunktion, Schranke, Gap) sekuendlich in die Jobzeile,
+     ohne neue Werte mindestens alle HERZSCHLAG Sekunden fortschritt_am
+  4. Status fertig/fehler setzen
+
+Jobs, die laenger als SPERRE_TIMEOUT ohne Lebenszeichen 'laeuft' sind
+(Worker abgestuerzt oder beendet), werden wieder auf 'wartend' gesetzt.
+
+Aufruf:
+    python manage.py schichtplan_worker            # Endlosschleife
+    python manage.py schichtplan_worker --einmal   # nur wartende Jobs abarbeiten
+"""
+import contextlib
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from schichtplan.models import Schicht, SchichtplanJob, Schichttyp
+from schichtplan.services import SchichtplanGenerator
+from utils.transaktion import schreibtransaktion
+
+logger = logging.getLogger(__name__)
+
+# Mindestabstand zwischen zwei Fortschritts-Updates in der DB (Sekunden)
+FORTSCHRITT_INTERVALL = 1.0
+
+# Auch ohne neue Solver-Werte wird fortschritt_am so oft aufgefrischt (Sekunden)
+HERZSCHLAG = 60.0
+
+# Nach dieser Zeit ohne Lebenszeichen gilt ein laufender Job als verwaist
+SPERRE_TIMEOUT = timedelta(minutes=10)
+
+
+class _FortschrittSchreiber(threading.Thread):
+    """Schreibt den letzten gemeldeten Solver-Fortschritt periodisch in die Jobzeile.
+
+    Der Solver-Callback legt nur den neuesten Stand ab (ohne DB-Zugriff);
+    dieser Thread schreibt ihn mit eigener DB-Verbindung, damit die Werte
+    sofort sichtbar sind – unabhaengig von der Transaktion des Generators.
+    """
+
+    def __init__(self, job_pk):
+        super().__init__(daemon=True)
+        self.job_pk = job_pk
+        self._lock = threading.Lock()
+        self._stand = None
+        self._stopp = threading.Event()
+        self._geschrieben = time.monotonic()
+
+    def melde(self, stand):
+        with self._lock:
+            self._stand = stand
+
+    def _schreibe(self):
+        with self._lock:
+            stand, self._stand = self._stand, None
+        if stand or time.monotonic() - self._geschrieben >= HERZSCHLAG:
+            SchichtplanJob.objects.filter(pk=self.job_pk).update(
+                fortschritt_am=timezone.now(), **(stand or {})
+            )
+            self._geschrieben = time.monotonic()
+
+    def run(self):
+        try:
+            while not self._stopp.wait(FORTSCHRITT_INTERVALL):
+                self._schreibe()
+            self._schreibe()
+        except Exception:
+            logger.exception("Fortschritt fuer Job %s nicht schreibbar", self.job_pk)
+        finally:
+            connection.close()
+
+    def beenden(self):
+        self._stopp.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = "Arbeitet Schichtplan-Jobs (KI-Generierung) im Hintergrund ab."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--einmal",
+            action="store_true",
+            help="Nur die aktuell wartenden Jobs abarbeiten und dann beenden.",
+        )
+        parser.add_argument(
+            "--intervall",
+            type=float,
+            default=2.0,
+            help="Wartezeit in Sekunden, wenn keine Jobs anstehen (Standard: 2).",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Schichtplan-Worker gestartet.\n")
+        self.stdout.flush()
+
+        while True:
+            close_old_connections()
+            self._verwaiste_freigeben()
+            job = self._naechster_job()
+            if job:
+                self._bearbeite(job)
+                continue
+            if options["einmal"]:
+                break
+            time.sleep(options["intervall"])
+
+    def _verwaiste_freigeben(self):
+        """Setzt laufende Jobs ohne Lebenszeichen seit SPERRE_TIMEOUT wieder auf wartend."""
+        grenze = timezone.now() - SPERRE_TIMEOUT
+        freigegeben = SchichtplanJob.objects.filter(
+            Q(fortschritt_am__lt=grenze) | Q(fortschritt_am__isnull=True, gestartet_am__lt=grenze),
+            status=SchichtplanJob.STATUS_LAEUFT,
+        ).update(
+            status=SchichtplanJob.STATUS_WARTEND,
+            gestartet_am=None,
+            fortschritt_am=None,
+            meldung="Worker ohne Rueckmeldung – Job wird erneut gestartet.",
+        )
+        if freigegeben:
+            logger.warning("Schichtplan: %d verwaiste Jobs wieder freigegeben", freigegeben)
+
+    def _naechster_job(self):
+        """Claimt den aeltesten wartenden Job (parallele Worker ueberspringen gesperrte)."""
+        with schreibtransaktion():
+            job = (
+                SchichtplanJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=SchichtplanJob.STATUS_WARTEND)
+                .order_by("erstellt_am")
+                .first()
+            )
+            if not job:
+                return None
+            job.status = SchichtplanJob.STATUS_LAEUFT
+            job.gestartet_am = timezone.now()
+            job.fortschritt_am = None
+            job.save(update_fields=["status", "gestartet_am", "fortschritt_am"])
+        return job
+
+    def _bearbeite(self, job):
+        from schichtplan.views import get_planbare_mitarbeiter
+
+        plan = job.schichtplan
+        self.stdout.write(f"[JOB {job.pk}] Generiere Plan '{plan.name}' (ID={plan.pk})...\n")
+        self.stdout.flush()
+
+        schreiber = _FortschrittSchreiber(job.pk)
+        schreiber.start()
+        try:
+            planbare_mitarbeiter = get_planbare_mitarbeiter()
+            if not planbare_mitarbeiter.exists():
+                raise Exception("Keine planbaren Mitarbeiter gefunden (MA1-MA15 aktiv/nicht dauerkrank).")
+
+            required_types = ["T", "N"]
+            existing_types = set(
+                Schichttyp.objects.filter(kuerzel__in=required_types).values_list("kuerzel", flat=True)
+            )
+            if len(existing_types) != len(required_types):
+                missing = set(required_types) - existing_types
+                raise Exception(f"Schichttypen fehlen: {', '.join(missing)}. Bitte im Admin anlegen.")
+
+            # SQLite erlaubt nur einen Schreiber: eine offene Transaktion des
+            # Generators wuerde die Fortschritts-Updates blockieren
+            if connection.vendor == "sqlite":
+                atomar = contextlib.nullcontext()
+            else:
+                atomar = transaction.atomic()
+
+            with atomar:
+                # Alte Schichten loeschen (falls Plan neu generiert wird)
+                Schicht.objects.filter(schichtplan=plan).delete()
+                generator = SchichtplanGenerator(planbare_mitarbeiter, plan)
+                generator.generiere_vorschlag(plan, fortschritt_callback=schreiber.melde)
+
+            schreiber.beenden()
+            anzahl = plan.schichten.count()
+            SchichtplanJob.objects.filter(pk=job.pk).update(
+                status=SchichtplanJob.STATUS_FERTIG,
+                beendet_am=timezone.now(),
+                schichten_anzahl=anzahl,
+                meldung=(
+                    f"{anzahl} Schichten fuer {planbare_mitarbeiter.count()} "
+                    f"Mitarbeiter automatisch generiert."
+                ),
+            )
+            self.stdout.write(f"[JOB {job.pk}] Fertig: {anzahl} Schichten.\n")
+        except Exception as e:
+            traceback.print_exc()
+            schreiber.beenden()
+            SchichtplanJob.objects.filter(pk=job.pk).update(
+                status=SchichtplanJob.STATUS_FEHLER,
+                beendet_am=timezone.now(),
+                meldung=f"Die KI-Generierung schlug fehl: {e}",
+            )
+            self.stdout.write(f"[JOB {job.pk}] Fehler: {e}\n")
+        self.stdout.flush()
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schichtplan', '0014_schichtplan_zugang_permission'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchichtplanJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('wartend', 'Wartend'), ('laeuft', 'Läuft'), ('fertig', 'Fertig'), ('fehler', 'Fehler')], default='wartend', max_length=20)),
+                ('erstellt_am', models.DateTimeField(auto_now_add=True)),
+                ('gestartet_am', models.DateTimeField(blank=True, null=True)),
+                ('beendet_am', models.DateTimeField(blank=True, null=True)),
+                ('loesungen', models.IntegerField(default=0, help_text='Anzahl gefundener Zwischenloesungen')),
+                ('zielfunktion', models.FloatField(blank=True, null=True)),
+                ('beste_schranke', models.FloatField(blank=True, null=True)),
+                ('gap', models.FloatField(blank=True, help_text='Relativer Abstand zur Schranke (0.01 = 1%)', null=True)),
+                ('laufzeit_sekunden', models.FloatField(default=0)),
+                ('fortschritt_am', models.DateTimeField(blank=True, null=True)),
+                ('schichten_anzahl', models.IntegerField(default=0)),
+                ('meldung', models.TextField(blank=True)),
+                ('erstellt_von', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('schichtplan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='schichtplan.schichtplan')),
+            ],
+            options={
+                'verbose_name': 'Schichtplan-Job',
+                'verbose_name_plural': 'Schichtplan-Jobs',
+                'ordering': ['-erstellt_am'],
+                'indexes': [models.Index(fields=['status', 'erstellt_am'], name='schichtplan_status_e3462f_idx')],
+            },
+        ),
+    ]
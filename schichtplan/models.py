@@ -414,17 +414,25 @@ class SchichtplanKonfiguration(models.Model):
             return aktive
         # Keine aktive Config? Erstelle mit Defaults
         return cls.objects.create(
-            version_nummer=(cls.objects.aggregate(models.Max('version_nummer'))['version_nummer__max'] or 0) + 1,
+            version_nummer=cls.naechste_version_nummer(),
             bemerkung="Auto-erstellt - Defaults",
             aktiv=True
         )
 
+    @classmethod
+    def naechste_version_nummer(cls):
+        """Naechste Versionsnummer aus dem Nummernkreis (kollisionsfrei)."""
+        from hr.models import Nummernkreis
+        return Nummernkreis.naechster_wert(
+            "SCHICHTPLAN_KONFIGURATION",
+            startwert=lambda: cls.objects.aggregate(models.Max('version_nummer'))['version_nummer__max'],
+        )
+
     def save(self, *args, **kwargs):
         """Nur eine Konfiguration darf aktiv sein"""
         if not self.version_nummer:
             # Neue Config: auto-inkrementierte Version
-            max_version = SchichtplanKonfiguration.objects.aggregate(models.Max('version_nummer'))['version_nummer__max']
-            self.version_nummer = (max_version or 0) + 1
+            self.version_nummer = self.naechste_version_nummer()
 
         if self.aktiv:
             # Deaktiviere alle anderen
@@ -535,3 +543,81 @@ class RegionalerFeiertag(models.Model):
                 raise ValidationError(
                     "Monat und Tag sollten leer sein für Ostern-relative Feiertage."
                 )
+
+
+# ============================================
+# 11. SCHICHTPLAN-JOB (KI-Generierung im Hintergrund)
+# ============================================
+class SchichtplanJob(models.Model):
+    """
+    Auftrag fuer die KI-Generierung eines Schichtplans.
+
+    Wird von SchichtplanCreateView angelegt und vom Management-Command
+    'schichtplan_worker' ausserhalb des HTTP-Requests abgearbeitet.
+    Der Worker schreibt den Solver-Fortschritt (Zielfunktion, Schranke, Gap)
+    laufend in die Zeile – die Fortschrittsseite fragt sie per JSON ab.
+    """
+
+    STATUS_WARTEND = 'wartend'
+    STATUS_LAEUFT = 'laeuft'
+    STATUS_FERTIG = 'fertig'
+    STATUS_FEHLER = 'fehler'
+
+    STATUS_CHOICES = [
+        (STATUS_WARTEND, 'Wartend'),
+        (STATUS_LAEUFT, 'Läuft'),
+        (STATUS_FERTIG, 'Fertig'),
+        (STATUS_FEHLER, 'Fehler'),
+    ]
+
+    schichtplan = models.ForeignKey(
+        Schichtplan,
+        on_delete=models.CASCADE,
+        related_name='jobs',
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_WARTEND)
+    erstellt_von = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    erstellt_am = models.DateTimeField(auto_now_add=True)
+    gestartet_am = models.DateTimeField(null=True, blank=True)
+    beendet_am = models.DateTimeField(null=True, blank=True)
+
+    # Solver-Fortschritt (vom Worker per Solution-Callback aktualisiert)
+    loesungen = models.IntegerField(default=0, help_text="Anzahl gefundener Zwischenloesungen")
+    zielfunktion = models.FloatField(null=True, blank=True)
+    beste_schranke = models.FloatField(null=True, blank=True)
+    gap = models.FloatField(null=True, blank=True, help_text="Relativer Abstand zur Schranke (0.01 = 1%)")
+    laufzeit_sekunden = models.FloatField(default=0)
+    fortschritt_am = models.DateTimeField(null=True, blank=True)
+
+    schichten_anzahl = models.IntegerField(default=0)
+    meldung = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Schichtplan-Job"
+        verbose_name_plural = "Schichtplan-Jobs"
+        ordering = ['-erstellt_am']
+        indexes = [
+            models.Index(fields=['status', 'erstellt_am']),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} fuer {self.schichtplan.name} ({self.get_status_display()})"
+
+    @property
+    def ist_abgeschlossen(self):
+        return self.status in (self.STATUS_FERTIG, self.STATUS_FEHLER)
+
+    def als_dict(self):
+        """Kompakte Darstellung fuer den JSON-Status der Fortschrittsseite."""
+        return {
+            'id': self.pk,
+            'status': self.status,
+            'status_text': self.get_status_display(),
+            'loesungen': self.loesungen,
+            'zielfunktion': self.zielfunktion,
+            'beste_schranke': self.beste_schranke,
+            'gap': self.gap,
+            'laufzeit_sekunden': round(self.laufzeit_sekunden, 1),
+            'schichten_anzahl': self.schichten_anzahl,
+            'meldung': self.meldung,
+        }
@@ -28,6 +28,36 @@ from schichtplan.models import Schicht, Schichttyp, Schichtplan, Schichtwunsch
 from arbeitszeit.models import MonatlicheArbeitszeitSoll
 
 
+class _FortschrittCallback(cp_model.CpSolverSolutionCallback):
+    """Meldet jede Zwischenloesung des CP-SAT-Solvers an eine Callback-Funktion.
+
+    Die Funktion erhaelt ein Dict mit zielfunktion, beste_schranke, gap,
+    loesungen und laufzeit_sekunden. Sie laeuft im Solver-Thread und darf
+    daher nur kurz blockieren (kein DB-Zugriff).
+    """
+
+    def __init__(self, melde):
+        super().__init__()
+        self._melde = melde
+        self._loesungen = 0
+
+    def on_solution_callback(self):
+        self._loesungen += 1
+        ziel = self.ObjectiveValue()
+        schranke = self.BestObjectiveBound()
+        gap = abs(ziel - schranke) / max(abs(ziel), 1.0)
+        try:
+            self._melde({
+                'zielfunktion': ziel,
+                'beste_schranke': schranke,
+                'gap': gap,
+                'loesungen': self._loesungen,
+                'laufzeit_sekunden': self.WallTime(),
+            })
+        except Exception as e:
+            print(f"[WARN] Fortschritts-Callback fehlgeschlagen: {e}")
+
+
 class SchichtplanGenerator:
     def __init__(self, mitarbeiter_queryset, schichtplan_obj=None):
         self.mitarbeiter_list = list(mitarbeiter_queryset)
@@ -248,7 +278,13 @@ class SchichtplanGenerator:
     # ======================================================================
     # HAUPTFUNKTION
     # ======================================================================
-    def generiere_vorschlag(self, neuer_schichtplan_obj):
+    def generiere_vorschlag(self, neuer_schichtplan_obj, fortschritt_callback=None):
+        """Erzeugt die Schichten fuer neuer_schichtplan_obj per CP-SAT.
+
+        fortschritt_callback: optionale Funktion, die bei jeder Zwischenloesung
+        des Solvers ein Dict mit Zielfunktion, Schranke und Gap erhaelt
+        (genutzt vom Management-Command 'schichtplan_worker').
+        """
         start_datum = neuer_schichtplan_obj.start_datum
         
         if hasattr(neuer_schichtplan_obj, 'ende_datum') and neuer_schichtplan_obj.ende_datum:
@@ -911,7 +947,10 @@ class SchichtplanGenerator:
         solver.parameters.log_search_progress = True  # Debug Info
         solver.parameters.linearization_level = self.config.solver_linearization_level  # Bessere Linearisierung
         solver.parameters.relative_gap_limit = float(self.config.solver_relative_gap_limit)  # Stoppt bei X% vom Optimum
-        status = solver.Solve(model)
+        if fortschritt_callback:
+            status = solver.Solve(model, _FortschrittCallback(fortschritt_callback))
+        else:
+            status = solver.Solve(model)
         if status == cp_model.OPTIMAL:
             print('[OK] OPTIMAL gefunden!')
         elif status == cp_model.FEASIBLE:
@@ -9,6 +9,8 @@ urlpatterns = [
     
     # Schichtplan
     path('erstellen/', views.SchichtplanCreateView.as_view(), name='erstellen'),
+    path('job/<int:pk>/', views.schichtplan_job_status, name='job_status'),
+    path('job/<int:pk>/json/', views.schichtplan_job_json, name='job_json'),
     path('<int:pk>/', views.schichtplan_detail, name='detail'),
     path('<int:pk>/zur-genehmigung/', views.schichtplan_zur_genehmigung, name='zur_genehmigung'),
     path('<int:pk>/veroeffentlichen/', views.schichtplan_veroeffentlichen, name='veroeffentlichen'),
@@ -17,8 +17,6 @@ from django.urls import reverse_lazy
 from django.db import transaction
 from django import forms
 from collections import defaultdict
-from django.http import StreamingHttpResponse
-import time
 from django.utils import timezone
 from datetime import datetime, timedelta, date
 from calendar import monthrange
@@ -35,15 +33,12 @@ from weasyprint import HTML
 
 # Models
 from arbeitszeit.models import Mitarbeiter, MonatlicheArbeitszeitSoll
-from .models import Schichtplan, Schicht, Schichttyp, SchichtwunschPeriode, Schichtwunsch, SchichtplanAenderung, SchichtplanSnapshot, SchichtplanSnapshotSchicht
+from .models import Schichtplan, Schicht, Schichttyp, SchichtwunschPeriode, Schichtwunsch, SchichtplanAenderung, SchichtplanSnapshot, SchichtplanSnapshotSchicht, SchichtplanJob
 
 
 # Forms
 from .forms import ExcelImportForm, SchichtplanForm, SchichtForm
 
-# Services
-from .services import SchichtplanGenerator
-
 # Utils
 
 try:
@@ -105,22 +100,32 @@ except ImportError:
 # HELPER FUNKTIONEN
 # ============================================================================
 
-def generate_schichtplan(request):
-    if request.method == 'POST':
-        def event_stream():
-            yield "data: Starting solver...\n\n"
-            # Dein Solver hier
-            result = solver.solve()
-            yield f"data: Complete\n\n"
-        
-        return StreamingHttpResponse(event_stream(), content_type='text/event-stream')
-    if status == cp_model.OPTIMAL:
-        messages.success(request, "✅ Optimaler Schichtplan erstellt!")
-    elif status == cp_model.FEASIBLE:
-        messages.warning(request, "⚠️ Gültiger Schichtplan erstellt (nicht optimal, aber verwendbar)")
-    else:
-        messages.error(request, "❌ Kein gültiger Schichtplan möglich")
-    
+@login_required
+def schichtplan_job_status(request, pk):
+    """Fortschrittsseite eines Schichtplan-Jobs (KI-Generierung im Hintergrund)."""
+    job = get_object_or_404(SchichtplanJob.objects.select_related('schichtplan'), pk=pk)
+    if not ist_schichtplaner(request.user):
+        messages.error(request, "❌ Keine Berechtigung für diese Aktion.")
+        return redirect('arbeitszeit:dashboard')
+    return render(request, 'schichtplan/job_status.html', {'job': job})
+
+
+@login_required
+def schichtplan_job_json(request, pk):
+    """JSON-Status eines Schichtplan-Jobs fuer die Fortschrittsseite.
+
+    Liest die vom 'schichtplan_worker' geschriebene Jobzeile einmal und
+    antwortet sofort; die Seite fragt alle zwei Sekunden erneut an. So
+    belegt eine offene Fortschrittsseite keinen Gunicorn-Thread.
+    """
+    if not ist_schichtplaner(request.user):
+        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    job = get_object_or_404(SchichtplanJob, pk=pk)
+    response = JsonResponse(job.als_dict())
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 def ist_schichtplaner(user):
     # DEBUG: Zeigt im Terminal an, wer gerade prüft
     if user.is_anonymous:
@@ -251,48 +256,13 @@ def get_planbare_mitarbeiter():
 def get_nrw_feiertage(start_date, end_date):
     """
     Feiertage in NRW (Nordrhein-Westfalen) im angegebenen Zeitraum.
+    Kommt aus dem prozessweiten FeiertagsService (arbeitszeit/feiertage.py),
+    damit Schichtplan und Zeiterfassung denselben Kalender verwenden.
     Returns: (set of date, dict date -> Bezeichnung)
     """
-    feiertage_set = set()
-    feiertage_namen = {}
-    if not easter:
-        return feiertage_set, feiertage_namen
-
-    start = start_date if isinstance(start_date, date) else start_date
-    end = end_date if isinstance(end_date, date) else end_date
-    years = {start.year, end.year}
-    if start.month == 12 and end.month == 1:
-        years.add(start.year + 1)
-
-    for year in years:
-        # Fixe Feiertage
-        for d, name in [
-            (date(year, 1, 1), "Neujahr"),
-            (date(year, 5, 1), "Tag der Arbeit"),
-            (date(year, 10, 3), "Tag der Deutschen Einheit"),
-            (date(year, 11, 1), "Allerheiligen"),
-            (date(year, 12, 25), "1. Weihnachtsfeiertag"),
-            (date(year, 12, 26), "2. Weihnachtsfeiertag"),
-        ]:
-            if start <= d <= end:
-                feiertage_set.add(d)
-                feiertage_namen[d] = name
-
-        # Bewegliche Feiertage (Ostern)
-        ostersonntag = easter(year)
-        for delta, name in [
-            (-2, "Karfreitag"),
-            (1, "Ostermontag"),
-            (39, "Christi Himmelfahrt"),
-            (50, "Pfingstmontag"),
-            (60, "Fronleichnam"),
-        ]:
-            d = ostersonntag + timedelta(days=delta)
-            if start <= d <= end:
-                feiertage_set.add(d)
-                feiertage_namen[d] = name
+    from arbeitszeit.feiertage import FeiertagsService
 
-    return feiertage_set, feiertage_namen
+    return FeiertagsService.fuer_bundesland("NW").feiertage_im_zeitraum(start_date, end_date)
 
 
 def get_configured_feiertage(start_date, end_date, region='all'):
@@ -312,9 +282,6 @@ def get_configured_feiertage(start_date, end_date, region='all'):
     feiertage_set = set()
     feiertage_namen = {}
 
-    if not easter:
-        return feiertage_set, feiertage_namen
-
     # 1. Hole alle aktiven Feiertage für die Region
     feiertage = RegionalerFeiertag.objects.filter(aktiv=True).filter(
         Q(region='all') | Q(region=region)
@@ -324,6 +291,9 @@ def get_configured_feiertage(start_date, end_date, region='all'):
     if not feiertage.exists():
         return get_nrw_feiertage(start_date, end_date)
 
+    if not easter:
+        return feiertage_set, feiertage_namen
+
     # 2. Verarbeite feste Feiertage
     for f in feiertage.filter(typ='fest'):
         if f.monat and f.tag:
@@ -439,15 +409,18 @@ class SchichtplanCreateView(CreateView):
                 
                 print(f"[OK] Schichtplan '{self.object.name}' (ID={self.object.pk}) gespeichert")
                 
-                # 2. KI-Generierung (falls aktiviert)
+                # 2. KI-Generierung (falls aktiviert) – laeuft im schichtplan_worker
                 if ki_aktiviert:
-                    self._generate_with_ai()
+                    job = self._generate_with_ai()
                 else:
+                    job = None
                     messages.success(
                         self.request,
                         f"✅ Plan '{self.object.name}' wurde leer angelegt."
                     )
-            
+
+            if job:
+                return redirect('schichtplan:job_status', pk=job.pk)
             return redirect(self.get_success_url())
             
         except Exception as e:
@@ -482,32 +455,18 @@ class SchichtplanCreateView(CreateView):
             missing = set(required_types) - set(existing_types)
             raise Exception(f"Schichttypen fehlen: {', '.join(missing)}. Bitte im Admin anlegen.")
         
-        # 3. HINWEIS: Wünsche werden automatisch vom Generator geladen
-        print(f"   [INFO] Wuensche werden automatisch aus DB geladen (falls vorhanden)")
-        
-        # 4. GENERATOR STARTEN (Genau ein Aufruf)
-        try:
-            # WICHTIG: Nur ein Positionsargument!
-            # Alte Schichten löschen (falls Plan neu generiert wird)
-            Schicht.objects.filter(schichtplan=self.object).delete()
-            generator = SchichtplanGenerator(planbare_mitarbeiter)
-            
-            generator.generiere_vorschlag(self.object)
-            
-            schichten_anzahl = self.object.schichten.count()
-            
-            messages.success(
-                self.request,
-                f"Plan '{self.object.name}' wurde erfolgreich erstellt! "
-                f"{schichten_anzahl} Schichten fuer {planbare_mitarbeiter.count()} "
-                f"Mitarbeiter automatisch generiert."
-            )
-            print(f"[OK] Erfolg: {schichten_anzahl} Schichten generiert.")
-            
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            raise Exception(f"Die KI-Generierung schlug fehl: {str(e)}")
+        # 3. JOB ANLEGEN: Der CP-SAT-Solver laeuft im 'schichtplan_worker',
+        #    nicht im Request (haelt sonst Gunicorn-Thread + Transaktion fest)
+        job = SchichtplanJob.objects.create(
+            schichtplan=self.object,
+            erstellt_von=self.request.user,
+        )
+        print(f"[KI] Job {job.pk} fuer Plan '{self.object.name}' eingereiht.")
+        messages.info(
+            self.request,
+            f"Plan '{self.object.name}' wurde angelegt – die KI-Generierung läuft im Hintergrund."
+        )
+        return job
 
 
 # ============================================================================
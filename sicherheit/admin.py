@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Brandalarm, BranderkunderToken, SicherheitsAlarm
+from .models import AlarmZustellung, Brandalarm, BranderkunderToken, SicherheitsAlarm
 
 
 @admin.register(SicherheitsAlarm)
@@ -42,3 +42,14 @@ class BranderkunderTokenAdmin(admin.ModelAdmin):
     list_display = ["pk", "brandalarm", "erkunder", "status", "ort_praezise"]
     list_filter = ["status"]
     readonly_fields = ["token", "erkunder", "brandalarm", "matrix_dm_room_id"]
+
+
+@admin.register(AlarmZustellung)
+class AlarmZustellungAdmin(admin.ModelAdmin):
+    list_display = ["pk", "alarm_art", "alarm_id", "kanal", "empfaenger", "status", "dauer_ms", "erstellt_am"]
+    list_filter = ["alarm_art", "kanal", "status"]
+    search_fields = ["empfaenger", "fehler"]
+    readonly_fields = [
+        "alarm_art", "alarm_id", "kanal", "empfaenger", "status", "fehler",
+        "dauer_ms", "erstellt_am", "abgeschlossen_am",
+    ]
@@ -0,0 +1,326 @@
+"""
+Alarm-Fan-out: Benachrichtigungen parallel ueber einen begrenzten Thread-Pool.
+
+Alarm-Views legen nur den Alarm-Datensatz an und rufen nach_commit() auf –
+die Antwort geht sofort an den Browser. Die eigentliche Zustellung
+(Matrix-Raeume, Matrix-DMs, ntfy) laeuft im Pool:
+
+    nach_commit(builder, alarm)      # builder laeuft im Pool
+      → verteilen(art, id, auftraege) # legt AlarmZustellung-Zeilen an
+        → je Auftrag ein Pool-Job     # schreibt Status + Dauer zurueck
+
+Der Pool ist prozessweit und auf ALARM_FANOUT_WORKER Threads begrenzt
+(schont das Synapse-Rate-Limit). Auftraege werden in Prioritaetsreihenfolge
+eingereiht – der Pool arbeitet FIFO, naechste Empfaenger zuerst.
+
+Ergebnis eines Auftrags:
+    True      → gesendet
+    None      → uebersprungen (Kanal nicht konfiguriert)
+    False     → fehlgeschlagen
+    Exception → fehlgeschlagen (Meldung in AlarmZustellung.fehler)
+
+Jeder Auftrag hat ALARM_FANOUT_TIMEOUT Sekunden Zeitbudget fuer alle seine
+HTTP-Aufrufe (kommunikation_utils.http_frist) – ein haengender Homeserver
+blockiert den Pool-Thread also nicht laenger. Zusaetzlich markiert ein
+Waechter-Thread laufende Auftraege nach dieser Zeit als timeout; kommt die
+Antwort doch noch, ueberschreibt der Job den Status mit dem Ergebnis.
+
+Der Pool lebt nur im Speicher. Damit ein Neustart keine Zustellungen
+verschluckt, speichert jede AlarmZustellung ihren Aufruf (funktion +
+argumente); nachholen() – per alarm_zustellungen_nachholen aus dem
+Scheduler – stellt liegengebliebene Zeilen erneut zu. Vor dem Start
+claimt jeder Job seine Zeile (ausstehend → laeuft), so dass Pool und
+Nachholen nie doppelt senden.
+"""
+import importlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+from django.utils import timezone
+
+from config.kommunikation_utils import http_frist
+
+from .models import AlarmZustellung
+
+logger = logging.getLogger(__name__)
+
+# Abfrageintervall des Waechters in Sekunden
+_WAECHTER_INTERVALL = 0.5
+
+# Zeilen, die so lange ausstehend/laufend sind, gelten als liegengeblieben
+NACHHOLEN_NACH = timedelta(minutes=2)
+# Aeltere Alarme werden nicht mehr nachgeholt, sondern als fehlgeschlagen markiert
+NACHHOLEN_MAX_ALTER = timedelta(minutes=30)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class Auftrag(NamedTuple):
+    """Eine Zustellung: funktion(*args) an empfaenger ueber kanal."""
+
+    kanal: str
+    empfaenger: str
+    funktion: Callable
+    args: tuple = ()
+
+
+def _executor():
+    """Prozessweiter Pool, beim ersten Alarm angelegt."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, "ALARM_FANOUT_WORKER", 8),
+                thread_name_prefix="alarm-fanout",
+            )
+        return _pool
+
+
+def _mit_db_verbindung(funktion, *args):
+    """Fuehrt funktion im Pool-Thread aus und raeumt dessen DB-Verbindung auf."""
+    close_old_connections()
+    try:
+        return funktion(*args)
+    finally:
+        close_old_connections()
+
+
+def _im_pool(funktion, *args):
+    """Reicht funktion in den Pool ein; Fehler landen im Log statt im Nichts."""
+    def _ausfuehren():
+        try:
+            _mit_db_verbindung(funktion, *args)
+        except Exception:
+            logger.exception("Alarm-Fan-out: %s fehlgeschlagen.", getattr(funktion, "__name__", funktion))
+    return _executor().submit(_ausfuehren)
+
+
+def nach_commit(funktion, *args):
+    """Startet funktion(*args) im Pool, sobald die aktuelle Transaktion committet ist."""
+    transaction.on_commit(lambda: _im_pool(funktion, *args))
+
+
+def _status_aus_ergebnis(ergebnis):
+    if ergebnis is None:
+        return AlarmZustellung.STATUS_UEBERSPRUNGEN
+    if ergebnis is False:
+        return AlarmZustellung.STATUS_FEHLGESCHLAGEN
+    return AlarmZustellung.STATUS_GESENDET
+
+
+def _timeout():
+    return getattr(settings, "ALARM_FANOUT_TIMEOUT", 15)
+
+
+def _ausfuehren(zustellung_id, funktion, args, timeout, gestartet=None):
+    """Fuehrt einen geclaimten Auftrag im Zeitbudget aus und schreibt das Ergebnis zurueck."""
+    start = time.monotonic()
+    if gestartet is not None:
+        gestartet[zustellung_id] = start
+    fehler = ""
+    try:
+        with http_frist(timeout):
+            status = _status_aus_ergebnis(funktion(*args))
+    except Exception as exc:
+        status = AlarmZustellung.STATUS_FEHLGESCHLAGEN
+        fehler = str(exc)[:1000] or exc.__class__.__name__
+        logger.warning("Alarm-Zustellung %s fehlgeschlagen: %s", zustellung_id, exc)
+    AlarmZustellung.objects.filter(pk=zustellung_id).update(
+        status=status,
+        fehler=fehler,
+        dauer_ms=int((time.monotonic() - start) * 1000),
+        abgeschlossen_am=timezone.now(),
+    )
+
+
+def _zustellen(zustellung_id, auftrag, timeout, gestartet):
+    """Pool-Job: claimt die Zeile und fuehrt den Auftrag aus."""
+    geclaimt = AlarmZustellung.objects.filter(
+        pk=zustellung_id, status=AlarmZustellung.STATUS_AUSSTEHEND,
+    ).update(status=AlarmZustellung.STATUS_LAEUFT, gestartet_am=timezone.now())
+    if not geclaimt:
+        return  # bereits von nachholen() uebernommen
+    _ausfuehren(zustellung_id, auftrag.funktion, auftrag.args, timeout, gestartet)
+
+
+def _ueberwachen(futures, gestartet, timeout):
+    """Waechter: markiert laufende Auftraege nach timeout Sekunden als timeout."""
+    offen = dict(futures)
+    try:
+        while offen:
+            time.sleep(_WAECHTER_INTERVALL)
+            jetzt = time.monotonic()
+            abgelaufen = []
+            for zustellung_id, future in list(offen.items()):
+                start = gestartet.get(zustellung_id)
+                if future.done():
+                    del offen[zustellung_id]
+                elif start is not None and jetzt - start > timeout:
+                    abgelaufen.append(zustellung_id)
+                    del offen[zustellung_id]
+            if abgelaufen:
+                AlarmZustellung.objects.filter(
+                    pk__in=abgelaufen, status=AlarmZustellung.STATUS_LAEUFT
+                ).update(
+                    status=AlarmZustellung.STATUS_TIMEOUT,
+                    fehler=f"Keine Antwort nach {timeout} Sekunden",
+                    abgeschlossen_am=timezone.now(),
+                )
+                logger.warning("Alarm-Fan-out: %d Zustellung(en) ohne Antwort.", len(abgelaufen))
+    except Exception:
+        logger.exception("Alarm-Fan-out: Waechter abgebrochen.")
+    finally:
+        connection.close()
+
+
+def verteilen(alarm_art, alarm_id, auftraege, timeout=None):
+    """Stellt die Auftraege parallel zu und kehrt sofort zurueck.
+
+    Legt je Auftrag eine AlarmZustellung (ausstehend) an und reiht die
+    Auftraege in der uebergebenen Reihenfolge in den Pool ein.
+
+    Returns:
+        Liste der AlarmZustellung-IDs in Auftragsreihenfolge
+    """
+    auftraege = list(auftraege)
+    if not auftraege:
+        return []
+    if timeout is None:
+        timeout = _timeout()
+
+    zeilen = AlarmZustellung.objects.bulk_create([
+        AlarmZustellung(
+            alarm_art=alarm_art,
+            alarm_id=alarm_id,
+            kanal=auftrag.kanal,
+            empfaenger=auftrag.empfaenger[:200],
+            **_aufruf_speichern(auftrag),
+        )
+        for auftrag in auftraege
+    ])
+
+    pool = _executor()
+    gestartet = {}
+    futures = {
+        zeile.pk: pool.submit(_mit_db_verbindung, _zustellen, zeile.pk, auftrag, timeout, gestartet)
+        for zeile, auftrag in zip(zeilen, auftraege)
+    }
+    threading.Thread(
+        target=_ueberwachen,
+        args=(futures, gestartet, timeout),
+        name="alarm-fanout-waechter",
+        daemon=True,
+    ).start()
+    logger.info(
+        "Alarm-Fan-out %s #%s: %d Zustellung(en) eingereiht.",
+        alarm_art, alarm_id, len(auftraege),
+    )
+    return [zeile.pk for zeile in zeilen]
+
+
+# ---------------------------------------------------------------------------
+# Nachholen nach Prozess-Neustart
+# ---------------------------------------------------------------------------
+
+def _argument_kodieren(wert):
+    if isinstance(wert, models.Model):
+        return {"modell": wert._meta.label, "pk": wert.pk}
+    if wert is None or isinstance(wert, (str, int, float, bool)):
+        return wert
+    raise TypeError(f"Nicht speicherbares Argument: {type(wert).__name__}")
+
+
+def _argument_laden(wert):
+    if isinstance(wert, dict) and set(wert) == {"modell", "pk"}:
+        return apps.get_model(wert["modell"]).objects.get(pk=wert["pk"])
+    return wert
+
+
+def _aufruf_speichern(auftrag):
+    """funktion/argumente-Felder fuer AlarmZustellung (leer, wenn nicht speicherbar)."""
+    try:
+        name = auftrag.funktion.__qualname__
+        if "<" in name:
+            raise TypeError(f"{name} ist nicht importierbar")
+        return {
+            "funktion": f"{auftrag.funktion.__module__}:{name}",
+            "argumente": [_argument_kodieren(arg) for arg in auftrag.args],
+        }
+    except (AttributeError, TypeError) as exc:
+        logger.debug("Alarm-Auftrag %s nicht nachholbar: %s", auftrag.empfaenger, exc)
+        return {"funktion": "", "argumente": []}
+
+
+def _aufruf_laden(zeile):
+    modul, _, name = zeile.funktion.partition(":")
+    funktion = importlib.import_module(modul)
+    for teil in name.split("."):
+        funktion = getattr(funktion, teil)
+    return funktion, [_argument_laden(arg) for arg in zeile.argumente]
+
+
+def _nachholen_ausfuehren(zeile, timeout):
+    try:
+        funktion, args = _aufruf_laden(zeile)
+    except Exception as exc:
+        AlarmZustellung.objects.filter(pk=zeile.pk).update(
+            status=AlarmZustellung.STATUS_FEHLGESCHLAGEN,
+            fehler=f"Nachholen nicht moeglich: {exc}"[:1000],
+            abgeschlossen_am=timezone.now(),
+        )
+        return
+    _ausfuehren(zeile.pk, funktion, args, timeout)
+
+
+def nachholen(timeout=None):
+    """Stellt Zeilen erneut zu, die ein beendeter Prozess liegen gelassen hat.
+
+    Liegengeblieben: laenger als NACHHOLEN_NACH ausstehend bzw. laufend.
+    Aeltere Alarme als NACHHOLEN_MAX_ALTER und Zeilen ohne gespeicherten
+    Aufruf werden als fehlgeschlagen markiert. Wartet, bis alle nachgeholten
+    Zustellungen abgeschlossen sind.
+
+    Returns:
+        Anzahl erneut zugestellter Zeilen
+    """
+    if timeout is None:
+        timeout = _timeout()
+    jetzt = timezone.now()
+    grenze = jetzt - NACHHOLEN_NACH
+    liegen = (
+        models.Q(status=AlarmZustellung.STATUS_AUSSTEHEND, erstellt_am__lt=grenze)
+        | models.Q(status=AlarmZustellung.STATUS_LAEUFT, gestartet_am__lt=grenze)
+    )
+
+    AlarmZustellung.objects.filter(liegen).filter(
+        models.Q(erstellt_am__lt=jetzt - NACHHOLEN_MAX_ALTER) | models.Q(funktion=""),
+    ).update(
+        status=AlarmZustellung.STATUS_FEHLGESCHLAGEN,
+        fehler="Nicht zugestellt (Prozess beendet) und nicht nachholbar",
+        abgeschlossen_am=jetzt,
+    )
+
+    pool = _executor()
+    futures = []
+    for zeile in AlarmZustellung.objects.filter(liegen).order_by("pk"):
+        # Zeilenweise claimen – ein paralleler Lauf oder der Pool sendet nicht doppelt
+        geclaimt = AlarmZustellung.objects.filter(liegen, pk=zeile.pk).update(
+            status=AlarmZustellung.STATUS_LAEUFT, gestartet_am=timezone.now(),
+        )
+        if geclaimt:
+            logger.warning(
+                "Alarm-Zustellung %s (%s an %s) wird nachgeholt.",
+                zeile.pk, zeile.kanal, zeile.empfaenger,
+            )
+            futures.append(pool.submit(_mit_db_verbindung, _nachholen_ausfuehren, zeile, timeout))
+    for future in futures:
+        future.result()
+    return len(futures)
@@ -0,0 +1,22 @@
+"""
+Management-Command: alarm_zustellungen_nachholen
+
+Stellt Alarm-Zustellungen erneut zu, die ein beendeter Prozess (Neustart,
+Deployment, OOM) als 'ausstehend' oder 'laeuft' liegen gelassen hat.
+Zu alte Alarme und Zeilen ohne gespeicherten Aufruf werden als
+fehlgeschlagen markiert (siehe sicherheit.alarm_fanout.nachholen).
+
+Wird vom Scheduler beim Start und danach alle 10 Sekunden aufgerufen.
+"""
+from django.core.management.base import BaseCommand
+
+from sicherheit.alarm_fanout import nachholen
+
+
+class Command(BaseCommand):
+    help = "Liegengebliebene Alarm-Zustellungen erneut zustellen."
+
+    def handle(self, *args, **options):
+        anzahl = nachholen()
+        if anzahl and options["verbosity"] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"{anzahl} Alarm-Zustellung(en) nachgeholt."))
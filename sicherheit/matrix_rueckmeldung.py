@@ -1,8 +1,9 @@
 """
-Management-Command: Pollt Matrix-DMs auf Branderkunder-Rueckmeldungen.
+Branderkunder-Rueckmeldungen aus Matrix-DMs.
 
-Laeuft alle 30 Sekunden im Scheduler.
-Wertet Zahl-Antworten in persoenlichen DM-Raeumen aus:
+Wird vom Sync-Listener aufgerufen (manage.py matrix_sync_listener, siehe
+matrix_integration/sync.py). Wertet Zahl-Antworten in persoenlichen
+DM-Raeumen aus:
   1 – unterwegs
   2 – Brand bestaetigt (Feueralarm)
   3 / Freitext – Lagemeldung / freie Nachricht
@@ -10,7 +11,7 @@ Wertet Zahl-Antworten in persoenlichen DM-Raeumen aus:
 """
 import logging
 
-from django.core.management.base import BaseCommand
+from matrix_integration.sync import SyncHandler, matrix_id_zu_hr_mitarbeiter, stichwort_status
 
 logger = logging.getLogger(__name__)
 
@@ -32,20 +33,6 @@ KEYWORD_STATUS = {
 }
 
 
-def _matrix_id_zu_erkunder(matrix_id):
-    """Loeest eine Matrix-ID (@kuerzel:server) in einen HRMitarbeiter auf."""
-    from django.conf import settings
-    from hr.models import HRMitarbeiter
-
-    server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
-    if not matrix_id.endswith(f":{server_name}"):
-        return None
-    kuerzel = matrix_id.split(":")[0].lstrip("@")
-    return HRMitarbeiter.objects.filter(
-        stelle__kuerzel=kuerzel
-    ).select_related("stelle").first()
-
-
 def _security_ping(text):
     """Sendet kurzen Status-Ping an den Security-Raum."""
     from django.conf import settings
@@ -125,73 +112,67 @@ def _freitext_verarbeiten(token_obj, erkunder, text):
     )
 
 
-class Command(BaseCommand):
-    help = "Pollt Matrix-DM-Antworten auf Brand-Erkunder-Alarme"
-
-    def handle(self, *args, **options):
-        from django.conf import settings
-        from config.kommunikation_utils import matrix_messages_seit_token
-        from sicherheit.models import Brandalarm, BranderkunderToken
-
-        server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
-        bot_id = f"@prima-bot:{server_name}" if server_name else ""
-
-        # Nur Tokens aktiver Alarme mit DM-Raum und since_token pollen
-        tokens = (
-            BranderkunderToken.objects
-            .filter(
-                matrix_dm_room_id__gt="",
-                matrix_dm_since_token__gt="",
-                brandalarm__status__in=[
-                    Brandalarm.STATUS_GEMELDET,
-                    Brandalarm.STATUS_BESTAETIGUNG,
-                    Brandalarm.STATUS_EVAKUIERUNG,
-                ],
-            )
-            .exclude(status__in=[
-                BranderkunderToken.STATUS_FEHLALARM,
-                BranderkunderToken.STATUS_BESTAETIGT,
-            ])
-            .select_related("erkunder__stelle", "brandalarm")
+def _aktive_tokens():
+    """Tokens laufender Alarme, die noch auf eine Rueckmeldung warten."""
+    from sicherheit.models import Brandalarm, BranderkunderToken
+
+    return (
+        BranderkunderToken.objects
+        .filter(
+            matrix_dm_room_id__gt="",
+            brandalarm__status__in=[
+                Brandalarm.STATUS_GEMELDET,
+                Brandalarm.STATUS_BESTAETIGUNG,
+                Brandalarm.STATUS_EVAKUIERUNG,
+            ],
         )
+        .exclude(status__in=[
+            BranderkunderToken.STATUS_FEHLALARM,
+            BranderkunderToken.STATUS_BESTAETIGT,
+        ])
+    )
 
-        for token_obj in tokens:
-            try:
-                nachrichten, neuer_token = matrix_messages_seit_token(
-                    token_obj.matrix_dm_room_id,
-                    since_token=token_obj.matrix_dm_since_token,
-                )
-            except Exception as exc:
-                logger.warning(
-                    "Brand-Poller: Fehler beim Polling fuer Token %s: %s",
-                    token_obj.pk, exc,
-                )
-                continue
 
-            if neuer_token and neuer_token != token_obj.matrix_dm_since_token:
-                token_obj.matrix_dm_since_token = neuer_token
-                token_obj.save(update_fields=["matrix_dm_since_token"])
+class BrandRueckmeldungHandler(SyncHandler):
+    """Ordnet DM-Antworten dem offenen Token des jeweiligen Erkunders zu."""
 
-            erkunder = token_obj.erkunder
+    name = "brand_rueckmeldung"
 
-            for msg in nachrichten:
-                # Eigene Bot-Nachrichten ignorieren
-                if bot_id and msg["sender"] == bot_id:
+    def raeume(self):
+        from hr.models import HRMitarbeiter
+
+        # Alle Bot-DM-Raeume (werden je Erkunder wiederverwendet) – der Filter
+        # bleibt dadurch stabil und ein neuer Alarm ist sofort abgedeckt
+        raeume = set(
+            HRMitarbeiter.objects.exclude(matrix_bot_dm_room_id="")
+            .values_list("matrix_bot_dm_room_id", flat=True)
+        )
+        raeume.update(_aktive_tokens().values_list("matrix_dm_room_id", flat=True))
+        return raeume
+
+    def verarbeite(self, room_id, nachrichten):
+        tokens = list(
+            _aktive_tokens()
+            .filter(matrix_dm_room_id=room_id)
+            .select_related("erkunder__stelle", "brandalarm")
+        )
+        if not tokens:
+            return
+
+        for msg in nachrichten:
+            # Nur Nachrichten vom zugewiesenen Erkunder
+            absender = matrix_id_zu_hr_mitarbeiter(msg["sender"])
+            if not absender:
+                continue
+            for token_obj in tokens:
+                if token_obj.erkunder_id != absender.pk:
                     continue
-                # Nur Nachrichten vom zugewiesenen Erkunder
-                absender = _matrix_id_zu_erkunder(msg["sender"])
-                if not absender or absender.pk != erkunder.pk:
+                # Aeltere Nachrichten im wiederverwendeten DM-Raum ignorieren
+                if msg["ts"] and msg["ts"] < token_obj.erstellt_am.timestamp() * 1000:
                     continue
 
-                schluessel = msg["body"].lower().strip()
-                status = KEYWORD_STATUS.get(schluessel)
-                # Prefix-Match (z.B. "fehlalarm – es war nur der Toaster")
-                if not status:
-                    for kw, st in KEYWORD_STATUS.items():
-                        if schluessel.startswith(kw):
-                            status = st
-                            break
-
+                erkunder = token_obj.erkunder
+                status = stichwort_status(msg["body"], KEYWORD_STATUS)
                 if status:
                     _verarbeite_rueckmeldung(token_obj, erkunder, status, notiz=msg["body"])
                 else:
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sicherheit', '0006_alter_branderkundertoken_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlarmZustellung',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('abgeschlossen_am', models.DateTimeField(blank=True, null=True)),
+                ('alarm_art', models.CharField(choices=[('sicherheit', 'Sicherheitsalarm'), ('brand', 'Brandalarm'), ('erste_hilfe', 'Erste-Hilfe-Vorfall')], max_length=20)),
+                ('alarm_id', models.PositiveIntegerField()),
+                ('dauer_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('empfaenger', models.CharField(max_length=200)),
+                ('erstellt_am', models.DateTimeField(auto_now_add=True)),
+                ('fehler', models.TextField(blank=True)),
+                ('kanal', models.CharField(choices=[('matrix_raum', 'Matrix-Raum'), ('matrix_dm', 'Matrix-DM'), ('ntfy', 'ntfy-Push')], max_length=20)),
+                ('status', models.CharField(choices=[('ausstehend', 'Ausstehend'), ('gesendet', 'Gesendet'), ('uebersprungen', 'Uebersprungen (nicht konfiguriert)'), ('fehlgeschlagen', 'Fehlgeschlagen'), ('timeout', 'Zeitueberschreitung')], default='ausstehend', max_length=20)),
+            ],
+            options={
+                'verbose_name': 'Alarm-Zustellung',
+                'verbose_name_plural': 'Alarm-Zustellungen',
+                'ordering': ['alarm_art', 'alarm_id', 'pk'],
+                'indexes': [models.Index(fields=['alarm_art', 'alarm_id'], name='alarmzustellung_alarm_idx')],
+            },
+        ),
+    ]
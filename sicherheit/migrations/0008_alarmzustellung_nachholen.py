@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sicherheit', '0007_alarmzustellung'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alarmzustellung',
+            name='argumente',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='alarmzustellung',
+            name='funktion',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='alarmzustellung',
+            name='gestartet_am',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='alarmzustellung',
+            name='status',
+            field=models.CharField(choices=[('ausstehend', 'Ausstehend'), ('laeuft', 'Wird zugestellt'), ('gesendet', 'Gesendet'), ('uebersprungen', 'Uebersprungen (nicht konfiguriert)'), ('fehlgeschlagen', 'Fehlgeschlagen'), ('timeout', 'Zeitueberschreitung')], default='ausstehend', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='alarmzustellung',
+            index=models.Index(fields=['status', 'erstellt_am'], name='alarmzustellung_status_idx'),
+        ),
+    ]
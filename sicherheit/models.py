@@ -228,3 +228,75 @@ class BranderkunderToken(models.Model):
         if not self.token:
             self.token = secrets.token_urlsafe(32)
         super().save(*args, **kwargs)
+
+
+class AlarmZustellung(models.Model):
+    """Zustellstatus einer Alarm-Benachrichtigung je Empfaenger und Kanal.
+
+    Wird von sicherheit.alarm_fanout angelegt und aktualisiert. Bezug ueber
+    alarm_art + alarm_id, da Sicherheits-, Brand- und Erste-Hilfe-Alarme in
+    verschiedenen Tabellen liegen.
+    """
+
+    ART_SICHERHEIT = "sicherheit"
+    ART_BRAND = "brand"
+    ART_ERSTE_HILFE = "erste_hilfe"
+    ART_CHOICES = [
+        (ART_SICHERHEIT, "Sicherheitsalarm"),
+        (ART_BRAND, "Brandalarm"),
+        (ART_ERSTE_HILFE, "Erste-Hilfe-Vorfall"),
+    ]
+
+    KANAL_MATRIX_RAUM = "matrix_raum"
+    KANAL_MATRIX_DM = "matrix_dm"
+    KANAL_NTFY = "ntfy"
+    KANAL_CHOICES = [
+        (KANAL_MATRIX_RAUM, "Matrix-Raum"),
+        (KANAL_MATRIX_DM, "Matrix-DM"),
+        (KANAL_NTFY, "ntfy-Push"),
+    ]
+
+    STATUS_AUSSTEHEND = "ausstehend"
+    STATUS_LAEUFT = "laeuft"
+    STATUS_GESENDET = "gesendet"
+    STATUS_UEBERSPRUNGEN = "uebersprungen"
+    STATUS_FEHLGESCHLAGEN = "fehlgeschlagen"
+    STATUS_TIMEOUT = "timeout"
+    STATUS_CHOICES = [
+        (STATUS_AUSSTEHEND, "Ausstehend"),
+        (STATUS_LAEUFT, "Wird zugestellt"),
+        (STATUS_GESENDET, "Gesendet"),
+        (STATUS_UEBERSPRUNGEN, "Uebersprungen (nicht konfiguriert)"),
+        (STATUS_FEHLGESCHLAGEN, "Fehlgeschlagen"),
+        (STATUS_TIMEOUT, "Zeitueberschreitung"),
+    ]
+
+    abgeschlossen_am = models.DateTimeField(null=True, blank=True)
+    alarm_art = models.CharField(max_length=20, choices=ART_CHOICES)
+    alarm_id = models.PositiveIntegerField()
+    # Aufruf zum Nachholen nach einem Prozess-Neustart (alarm_zustellungen_nachholen):
+    # "modul:funktion" und JSON-Argumente (Model-Instanzen als {"modell", "pk"}).
+    # Leer = nicht nachholbar.
+    argumente = models.JSONField(default=list, blank=True)
+    dauer_ms = models.PositiveIntegerField(null=True, blank=True)
+    empfaenger = models.CharField(max_length=200)
+    erstellt_am = models.DateTimeField(auto_now_add=True)
+    fehler = models.TextField(blank=True)
+    funktion = models.CharField(max_length=200, blank=True)
+    gestartet_am = models.DateTimeField(null=True, blank=True)
+    kanal = models.CharField(max_length=20, choices=KANAL_CHOICES)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_AUSSTEHEND
+    )
+
+    class Meta:
+        ordering = ["alarm_art", "alarm_id", "pk"]
+        verbose_name = "Alarm-Zustellung"
+        verbose_name_plural = "Alarm-Zustellungen"
+        indexes = [
+            models.Index(fields=["alarm_art", "alarm_id"], name="alarmzustellung_alarm_idx"),
+            models.Index(fields=["status", "erstellt_am"], name="alarmzustellung_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_alarm_art_display()} #{self.alarm_id} → {self.empfaenger} ({self.status})"
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from . import alarm_fanout
+from .alarm_fanout import Auftrag, nachholen, verteilen
+from .models import AlarmZustellung
+
+_AUFRUFE = []
+_AUFRUFE_LOCK = threading.Lock()
+
+
+def _senden(empfaenger, ergebnis=True):
+    """Test-Zustellung: merkt sich den Aufruf und liefert ergebnis."""
+    with _AUFRUFE_LOCK:
+        _AUFRUFE.append(empfaenger)
+    if ergebnis == "fehler":
+        raise ConnectionError("Homeserver nicht erreichbar")
+    return ergebnis
+
+
+class AlarmFanoutTest(TransactionTestCase):
+    """Zustellstatus je Auftrag und Nachholen ohne Doppelversand.
+
+    TransactionTestCase: die Auftraege laufen im Thread-Pool mit eigener
+    DB-Verbindung und muessen die Zeilen des Tests sehen.
+    """
+
+    def setUp(self):
+        with _AUFRUFE_LOCK:
+            _AUFRUFE.clear()
+
+    def _warten(self, ids, sekunden=5):
+        offen = [AlarmZustellung.STATUS_AUSSTEHEND, AlarmZustellung.STATUS_LAEUFT]
+        ende = time.monotonic() + sekunden
+        while AlarmZustellung.objects.filter(pk__in=ids, status__in=offen).exists():
+            if time.monotonic() > ende:
+                self.fail("Zustellungen nicht abgeschlossen")
+            time.sleep(0.05)
+
+    def _zeile(self, empfaenger, status=AlarmZustellung.STATUS_AUSSTEHEND, alter=timedelta(minutes=5),
+               funktion=f"{__name__}:_senden"):
+        zeile = AlarmZustellung.objects.create(
+            alarm_art=AlarmZustellung.ART_BRAND, alarm_id=1, kanal=AlarmZustellung.KANAL_NTFY,
+            empfaenger=empfaenger, status=status, funktion=funktion, argumente=[empfaenger],
+        )
+        zeitpunkt = timezone.now() - alter
+        gestartet = zeitpunkt if status == AlarmZustellung.STATUS_LAEUFT else None
+        AlarmZustellung.objects.filter(pk=zeile.pk).update(erstellt_am=zeitpunkt, gestartet_am=gestartet)
+        return zeile
+
+    def _status(self, zeile):
+        zeile.refresh_from_db()
+        return zeile.status
+
+    def test_status_je_auftrag(self):
+        ids = verteilen(AlarmZustellung.ART_SICHERHEIT, 7, [
+            Auftrag(AlarmZustellung.KANAL_MATRIX_RAUM, "!raum", _senden, ("!raum",)),
+            Auftrag(AlarmZustellung.KANAL_MATRIX_DM, "@dm", _senden, ("@dm", None)),
+            Auftrag(AlarmZustellung.KANAL_NTFY, "ntfy", _senden, ("ntfy", "fehler")),
+            Auftrag(AlarmZustellung.KANAL_NTFY, "aus", _senden, ("aus", False)),
+        ])
+        self._warten(ids)
+
+        zeilen = list(AlarmZustellung.objects.filter(pk__in=ids).order_by("pk"))
+        self.assertEqual([z.status for z in zeilen], [
+            AlarmZustellung.STATUS_GESENDET,
+            AlarmZustellung.STATUS_UEBERSPRUNGEN,
+            AlarmZustellung.STATUS_FEHLGESCHLAGEN,
+            AlarmZustellung.STATUS_FEHLGESCHLAGEN,
+        ])
+        self.assertEqual(zeilen[2].fehler, "Homeserver nicht erreichbar")
+        self.assertTrue(all(z.dauer_ms is not None and z.abgeschlossen_am for z in zeilen))
+        # Aufruf gespeichert -> nach einem Neustart nachholbar
+        self.assertEqual(zeilen[0].funktion, f"{__name__}:_senden")
+        self.assertEqual(zeilen[1].argumente, ["@dm", None])
+        self.assertEqual(sorted(_AUFRUFE), ["!raum", "@dm", "aus", "ntfy"])
+
+    def test_nachholen_sendet_genau_einmal(self):
+        liegen = self._zeile("liegen")
+        haengt = self._zeile("haengt", status=AlarmZustellung.STATUS_LAEUFT)
+        frisch = self._zeile("frisch", alter=timedelta(seconds=10))
+        zu_alt = self._zeile("zu_alt", alter=timedelta(hours=1))
+        ohne_aufruf = self._zeile("ohne", funktion="")
+
+        self.assertEqual(nachholen(), 2)
+        self.assertEqual(nachholen(), 0)
+        self.assertEqual(sorted(_AUFRUFE), ["haengt", "liegen"])
+
+        self.assertEqual(self._status(liegen), AlarmZustellung.STATUS_GESENDET)
+        self.assertEqual(self._status(haengt), AlarmZustellung.STATUS_GESENDET)
+        self.assertEqual(self._status(frisch), AlarmZustellung.STATUS_AUSSTEHEND)
+        self.assertEqual(self._status(zu_alt), AlarmZustellung.STATUS_FEHLGESCHLAGEN)
+        self.assertEqual(self._status(ohne_aufruf), AlarmZustellung.STATUS_FEHLGESCHLAGEN)
+
+    def test_pool_sendet_nicht_nach_nachholen(self):
+        zeile = self._zeile("doppelt")
+        nachholen()
+        # Verspaeteter Pool-Job derselben Zeile: Claim schlaegt fehl, kein zweiter Versand
+        alarm_fanout._zustellen(zeile.pk, Auftrag(zeile.kanal, "doppelt", _senden, ("doppelt",)), 5, {})
+        self.assertEqual(_AUFRUFE, ["doppelt"])
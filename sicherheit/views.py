@@ -1,6 +1,5 @@
 import json
 import logging
-import threading
 import time
 import urllib.error
 import urllib.request
@@ -13,7 +12,10 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
-from .models import Brandalarm, BranderkunderToken, SicherheitsAlarm
+from config.kommunikation_utils import http_timeout, matrix_zugang
+
+from . import alarm_fanout
+from .models import AlarmZustellung, Brandalarm, BranderkunderToken, SicherheitsAlarm
 
 logger = logging.getLogger(__name__)
 
@@ -44,19 +46,15 @@ def _ist_security(user):
 
 
 def _benachrichtige_security(alarm):
-    """Sendet Matrix-Ping und ntfy-Push an Security-Raum.
+    """Sendet Matrix-Ping und ntfy-Push an Security-Raum (ueber alarm_fanout).
 
     Bei AMOK: dringende Benachrichtigung mit @room-Mention.
     Bei Stillem Alarm: diskrete Benachrichtigung ohne @room.
-    Faellt bei Fehlern graceful ab – kein Exception-Bubble.
+    Kehrt sofort zurueck – Zustellstatus steht in AlarmZustellung.
     """
     from django.conf import settings
 
-    homeserver = (
-        getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "").rstrip("/")
-        or getattr(settings, "MATRIX_HOMESERVER_URL", "").rstrip("/")
-    )
-    bot_token = getattr(settings, "MATRIX_BOT_TOKEN", "")
+    homeserver, bot_token = matrix_zugang()
     security_room = getattr(settings, "MATRIX_SECURITY_PING_ROOM_ID", "")
     ntfy_url = getattr(settings, "NTFY_URL", "").rstrip("/")
 
@@ -64,19 +62,43 @@ def _benachrichtige_security(alarm):
     zeit_str = jetzt.strftime("%H:%M")
     ort_str = alarm.ort or "unbekannt"
 
+    auftraege = []
+
     # Matrix-Ping
     if homeserver and bot_token and security_room:
-        _matrix_security_ping(
-            homeserver, bot_token, security_room, alarm, ort_str, zeit_str
-        )
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_RAUM, security_room, _matrix_security_ping,
+            (security_room, alarm, ort_str, zeit_str),
+        ))
 
     # ntfy-Push
+    if alarm.typ == SicherheitsAlarm.TYP_AMOK:
+        topic = getattr(settings, "NTFY_AMOK_TOPIC", "amok-alarm-prima")
+        priority = "urgent"
+        title = "AMOK-ALARM"
+    else:
+        topic = getattr(settings, "NTFY_STILL_TOPIC", "security-intern")
+        priority = "high"
+        title = "Stiller Alarm"
     if ntfy_url:
-        _ntfy_security_senden(alarm, ort_str, zeit_str, ntfy_url, settings)
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_NTFY, topic, _ntfy_senden,
+            (ntfy_url, topic, title,
+             f"Ort: {ort_str} | {zeit_str} Uhr | Alarm #{alarm.pk}", priority),
+        ))
+
+    alarm_fanout.verteilen(AlarmZustellung.ART_SICHERHEIT, alarm.pk, auftraege)
 
 
-def _matrix_security_ping(homeserver, bot_token, security_room, alarm, ort_str, zeit_str):
-    """Sendet Nachricht in den SECURITY_PING Matrix-Raum."""
+def _matrix_security_ping(security_room, alarm, ort_str, zeit_str):
+    """Sendet Nachricht in den SECURITY_PING Matrix-Raum (Fehler werden geworfen).
+
+    Zugangsdaten kommen aus den Settings – die Argumente werden in
+    AlarmZustellung gespeichert und duerfen keinen Token enthalten.
+    """
+    homeserver, bot_token = matrix_zugang()
+    if not homeserver or not bot_token:
+        return None
     if alarm.typ == SicherheitsAlarm.TYP_AMOK:
         body_text = (
             f"@room AMOK-ALARM - Ort: {ort_str} - {zeit_str} Uhr - SOFORT HANDELN"
@@ -115,27 +137,24 @@ def _matrix_security_ping(homeserver, bot_token, security_room, alarm, ort_str,
         },
         method="PUT",
     )
-    try:
-        with urllib.request.urlopen(req, timeout=5):
-            pass
-        logger.info(
-            "Security Matrix-Ping gesendet fuer Alarm %s (%s).",
-            alarm.pk, alarm.typ,
-        )
-    except Exception as exc:
-        logger.warning(
-            "Security Matrix-Ping fehlgeschlagen (nicht kritisch): %s", exc
-        )
+    with urllib.request.urlopen(req, timeout=http_timeout(5)):
+        pass
+    logger.info(
+        "Security Matrix-Ping gesendet fuer Alarm %s (%s).",
+        alarm.pk, alarm.typ,
+    )
+    return True
 
 
-def _ntfy_push(ntfy_url, topic, title, body, priority="urgent", click_url=""):
-    """Generischer ntfy-Push. Faellt graceful ab.
+def _ntfy_senden(ntfy_url, topic, title, body, priority="urgent", click_url=""):
+    """ntfy-Push fuer alarm_fanout: None wenn nicht konfiguriert, sonst True.
 
+    Fehler werden geworfen und vom Fan-out als Zustellstatus erfasst.
     click_url wird als Click-Header gesetzt – Tippen auf die Notification
     oeffnet die URL direkt im Browser.
     """
     if not ntfy_url or not topic:
-        return
+        return None
     headers = {
         "Title": title,
         "Priority": priority,
@@ -143,54 +162,24 @@ def _ntfy_push(ntfy_url, topic, title, body, priority="urgent", click_url=""):
     }
     if click_url:
         headers["Click"] = click_url
-    try:
-        req = urllib.request.Request(
-            f"{ntfy_url}/{topic}",
-            data=body.encode("utf-8"),
-            headers=headers,
-            method="POST",
-        )
-        urllib.request.urlopen(req, timeout=5)
-        logger.info("ntfy Push an Topic %s gesendet.", topic)
-    except Exception as exc:
-        logger.warning("ntfy Push an %s fehlgeschlagen (nicht kritisch): %s", topic, exc)
-
-
-def _ntfy_security_senden(alarm, ort_str, zeit_str, ntfy_url, settings):
-    """Sendet Push-Benachrichtigung via ntfy an Security-Topic."""
-    if alarm.typ == SicherheitsAlarm.TYP_AMOK:
-        topic = getattr(settings, "NTFY_AMOK_TOPIC", "amok-alarm-prima")
-        priority = "urgent"
-        title = "AMOK-ALARM"
-        nachricht = f"Ort: {ort_str} | {zeit_str} Uhr | Alarm #{alarm.pk}"
-    else:
-        topic = getattr(settings, "NTFY_STILL_TOPIC", "security-intern")
-        priority = "high"
-        title = "Stiller Alarm"
-        nachricht = f"Ort: {ort_str} | {zeit_str} Uhr | Alarm #{alarm.pk}"
-
-    url = f"{ntfy_url}/{topic}"
     req = urllib.request.Request(
-        url,
-        data=nachricht.encode("utf-8"),
-        headers={
-            "Title": title,
-            "Priority": priority,
-            "Content-Type": "text/plain; charset=utf-8",
-        },
+        f"{ntfy_url}/{topic}",
+        data=body.encode("utf-8"),
+        headers=headers,
         method="POST",
     )
+    with urllib.request.urlopen(req, timeout=http_timeout(5)):
+        pass
+    logger.info("ntfy Push an Topic %s gesendet.", topic)
+    return True
+
+
+def _ntfy_push(ntfy_url, topic, title, body, priority="urgent", click_url=""):
+    """Generischer ntfy-Push. Faellt graceful ab."""
     try:
-        with urllib.request.urlopen(req, timeout=5):
-            pass
-        logger.info(
-            "ntfy Security-Push gesendet fuer Alarm %s (%s).",
-            alarm.pk, alarm.typ,
-        )
+        _ntfy_senden(ntfy_url, topic, title, body, priority, click_url)
     except Exception as exc:
-        logger.warning(
-            "ntfy Security-Push fehlgeschlagen (nicht kritisch): %s", exc
-        )
+        logger.warning("ntfy Push an %s fehlgeschlagen (nicht kritisch): %s", topic, exc)
 
 
 # ---------------------------------------------------------------------------
@@ -229,12 +218,8 @@ def alarm_ausloesen(request):
         ausgeloest_von=request.user,
     )
 
-    try:
-        _benachrichtige_security(alarm)
-    except Exception:
-        logger.exception(
-            "Fehler beim Benachrichtigen Security (Alarm %s)", alarm.pk
-        )
+    # Benachrichtigungen im Fan-out-Pool – Antwort wartet nicht auf Matrix/ntfy
+    alarm_fanout.nach_commit(_benachrichtige_security, alarm)
 
     if typ == SicherheitsAlarm.TYP_AMOK:
         return redirect("sicherheit:amok_bestaetigung", pk=alarm.pk)
@@ -492,13 +477,17 @@ def _ermittle_ort_aus_hr(user):
 def _benachrichtige_branderkunder(brandalarm):
     """Benachrichtigt alle Branderkunder via Matrix-Raum, Matrix-DM und ntfy.
 
-    Kanaele parallel:
+    Laeuft im alarm_fanout-Pool. Kanaele parallel:
     - Matrix Security-Raum: Hinweis fuer Security zur Bereitschaft
     - Matrix Branderkunder-Raum: @room-Ping, alle Erkunder sehen die Meldung
+    - ntfy: ein Broadcast an alle Abonnenten des Branderkunder-Topics
     - Matrix DM: individueller Token-Link an jeden Erkunder (kein Login noetig)
-    - ntfy: individueller Push pro Erkunder mit Token-Link als Click-URL
+
+    Die DMs werden nach Etagenabstand zum Brandort eingereiht – der Pool
+    arbeitet FIFO, die naechsten Erkunder werden zuerst benachrichtigt.
     """
     from django.conf import settings
+    from config.kommunikation_utils import matrix_nachricht_senden
     from hr.models import HRMitarbeiter
 
     security_room      = getattr(settings, "MATRIX_SECURITY_PING_ROOM_ID", "")
@@ -508,35 +497,38 @@ def _benachrichtige_branderkunder(brandalarm):
     zeit               = timezone.localtime(brandalarm.erstellt_am).strftime("%H:%M")
     ort                = brandalarm.ort
 
+    auftraege = []
+
     # Matrix Security-Raum
     if security_room:
-        try:
-            from config.kommunikation_utils import matrix_nachricht_senden
-            matrix_nachricht_senden(
-                security_room,
-                f"BRANDMELDUNG – Ort: {ort} – {zeit} Uhr"
-                " – Branderkunder informiert – Security bitte bereithalten",
-            )
-        except Exception as exc:
-            logger.warning("Security-Ping bei Brandmeldung fehlgeschlagen: %s", exc)
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_RAUM, security_room, matrix_nachricht_senden,
+            (security_room,
+             f"BRANDMELDUNG – Ort: {ort} – {zeit} Uhr"
+             " – Branderkunder informiert – Security bitte bereithalten"),
+        ))
 
     # Matrix Branderkunder-Raum
     if erkunder_room:
-        try:
-            from config.kommunikation_utils import matrix_nachricht_senden
-            matrix_nachricht_senden(
-                erkunder_room,
-                f"@room BRANDMELDUNG – {zeit} Uhr\n"
-                f"Gemeldet: {ort}\n"
-                f"\n"
-                f"Bitte Brandort aufsuchen und Rueckmeldung geben.\n"
-                f"Jeder Erkunder hat einen persoenlichen Link per DM und ntfy erhalten.",
-            )
-        except Exception as exc:
-            logger.warning("Branderkunder-Raum-Ping fehlgeschlagen: %s", exc)
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_RAUM, erkunder_room, matrix_nachricht_senden,
+            (erkunder_room,
+             f"@room BRANDMELDUNG – {zeit} Uhr\n"
+             f"Gemeldet: {ort}\n"
+             f"\n"
+             f"Bitte Brandort aufsuchen und Rueckmeldung geben.\n"
+             f"Jeder Erkunder hat einen persoenlichen Link per DM und ntfy erhalten."),
+        ))
+
+    # ntfy: ein einziger Broadcast an alle Abonnenten von branderkunder-prima
+    if ntfy_url:
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_NTFY, ntfy_topic, _ntfy_senden,
+            (ntfy_url, ntfy_topic, "BRANDMELDUNG",
+             f"Ort: {ort} – bitte Brandort aufsuchen und Rueckmeldung geben", "urgent"),
+        ))
 
     # Tokens erstellen – Branderkunder + al_as (Arbeitsschutzbeauftragter)
-    from django.db.models import Q
     erkunder_qs = list(
         HRMitarbeiter.objects.filter(
             Q(ist_branderkunder=True) | Q(stelle__kuerzel="al_as")
@@ -547,14 +539,6 @@ def _benachrichtige_branderkunder(brandalarm):
         token_obj = BranderkunderToken.objects.create(brandalarm=brandalarm, erkunder=ma)
         token_map[ma.pk] = token_obj
 
-    # ntfy: ein einziger Broadcast an alle Abonnenten von branderkunder-prima
-    _ntfy_push(
-        ntfy_url, ntfy_topic,
-        title="BRANDMELDUNG",
-        body=f"Ort: {ort} – bitte Brandort aufsuchen und Rueckmeldung geben",
-        priority="urgent",
-    )
-
     # Brandort-Etage aus Belegung des Melders ermitteln
     brand_raum_info = None
     try:
@@ -563,65 +547,50 @@ def _benachrichtige_branderkunder(brandalarm):
         pass
 
     if brand_raum_info is None:
-        # Kein Raumvektor bekannt – alle mit 1s-Pause senden
+        # Kein Raumvektor bekannt – alle Erkunder in einer Welle
         logger.info(
-            "Brandmeldung %s: kein Raumvektor fuer Melder – sende alle Erkunder sequenziell.",
+            "Brandmeldung %s: kein Raumvektor fuer Melder – alle Erkunder in einer Welle.",
             brandalarm.pk,
         )
+        reihenfolge = erkunder_qs
+    else:
+        brand_gebaeude_pk, brand_reihenfolge = brand_raum_info
+
+        # Erkunder nach Etagenabstand gruppieren
+        # Anderes Gebaeude: Basisabstand 100 + Etagenabstand (immer nach allen anderen)
+        wellen = {}   # abstand (int) -> [HRMitarbeiter]
+        kein_raum = []
         for ma in erkunder_qs:
-            token_obj = token_map.get(ma.pk)
-            if token_obj:
-                _sende_brand_dm(ma, brandalarm, token_obj)
-                time.sleep(0.3)
-        return
-
-    brand_gebaeude_pk, brand_reihenfolge = brand_raum_info
-
-    # Erkunder nach Etagenabstand gruppieren
-    # Anderes Gebaeude: Basisabstand 100 + Etagenabstand (immer nach allen anderen)
-    wellen = {}   # abstand (int) -> [HRMitarbeiter]
-    kein_raum = []
-    for ma in erkunder_qs:
-        info = _belegung_raum_info(ma)
-        if info is None:
-            kein_raum.append(ma)
-        else:
-            erkunder_gebaeude_pk, erkunder_reihenfolge = info
-            if erkunder_gebaeude_pk != brand_gebaeude_pk:
-                abstand = 100 + abs(erkunder_reihenfolge - brand_reihenfolge)
+            info = _belegung_raum_info(ma)
+            if info is None:
+                kein_raum.append(ma)
             else:
-                abstand = abs(erkunder_reihenfolge - brand_reihenfolge)
-            wellen.setdefault(abstand, []).append(ma)
-
-    # Erkunder ohne Raumzuweisung in eigene letzte Welle
-    if kein_raum:
-        wellen[999] = kein_raum
-
-    # Pausen zwischen den Wellen – nur zur Entlastung des Synapse Rate-Limits
-    # Innerhalb jeder Welle: 1s pro DM
-    # Zwischen Wellen: kurze Atempause damit Synapse nicht drosselt
-    PAUSEN = {1: 5, 2: 5}
-    STANDARD_PAUSE = 5
-
-    for i, abstand in enumerate(sorted(wellen.keys())):
-        if i > 0:
-            pause = PAUSEN.get(i, STANDARD_PAUSE)
+                erkunder_gebaeude_pk, erkunder_reihenfolge = info
+                if erkunder_gebaeude_pk != brand_gebaeude_pk:
+                    abstand = 100 + abs(erkunder_reihenfolge - brand_reihenfolge)
+                else:
+                    abstand = abs(erkunder_reihenfolge - brand_reihenfolge)
+                wellen.setdefault(abstand, []).append(ma)
+
+        # Erkunder ohne Raumzuweisung in eigene letzte Welle
+        if kein_raum:
+            wellen[999] = kein_raum
+
+        reihenfolge = []
+        for i, abstand in enumerate(sorted(wellen.keys())):
             logger.info(
-                "Brandmeldung %s Welle %d (Abstand %d) – warte %d Sek.",
-                brandalarm.pk, i + 1, abstand, pause,
+                "Brandmeldung %s Welle %d: %d Erkunder (Abstand %d Etagen).",
+                brandalarm.pk, i + 1, len(wellen[abstand]), abstand,
             )
-            time.sleep(pause)
+            reihenfolge.extend(wellen[abstand])
 
-        gruppe = wellen[abstand]
-        logger.info(
-            "Brandmeldung %s Welle %d: %d Erkunder (Abstand %d Etagen).",
-            brandalarm.pk, i + 1, len(gruppe), abstand,
-        )
-        for ma in gruppe:
-            token_obj = token_map.get(ma.pk)
-            if token_obj:
-                _sende_brand_dm(ma, brandalarm, token_obj)
-                time.sleep(0.3)
+    for ma in reihenfolge:
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_DM, str(ma), _sende_brand_dm,
+            (ma, brandalarm, token_map[ma.pk]),
+        ))
+
+    alarm_fanout.verteilen(AlarmZustellung.ART_BRAND, brandalarm.pk, auftraege)
 
 
 def _belegung_raum_info(ma):
@@ -655,15 +624,16 @@ def _sende_brand_dm(erkunder, brandalarm, token_obj):
     """Sendet Matrix-DM mit Token-Link an einen Branderkunder.
 
     Matrix-ID wird aus dem Stellen-Kuerzel gebildet (z.B. @ma_fm2:server).
-    Mitarbeiter ohne Stelle werden uebersprungen.
+    Mitarbeiter ohne Stelle werden uebersprungen (None). Rueckgabe True/False
+    bzw. Exception – wird von alarm_fanout als Zustellstatus erfasst.
     """
     stelle = getattr(erkunder, "stelle", None)
     if not stelle:
-        return
+        return None
     from django.conf import settings
     server_name = getattr(settings, "MATRIX_SERVER_NAME", "")
     if not server_name:
-        return
+        return None
     matrix_id = f"@{stelle.kuerzel}:{server_name}"
     base = getattr(settings, "PRIMA_BASE_URL", "https://prima.georg-klein.com")
     token_url = f"{base}/sicherheit/brand/erkunden/{token_obj.token}/"
@@ -679,36 +649,36 @@ def _sende_brand_dm(erkunder, brandalarm, token_obj):
         f"\n"
         f"Rueckmeldeseite (kein Login noetig):\n{token_url}"
     )
-    try:
-        from config.kommunikation_utils import matrix_dm_senden, matrix_nachricht_senden, matrix_messages_seit_token
-
-        # Bestehenden DM-Raum wiederverwenden (kein erneutes Einladen noetig)
-        bestehender_raum = erkunder.matrix_bot_dm_room_id
-        if bestehender_raum:
-            matrix_nachricht_senden(bestehender_raum, nachricht)
-            room_id = bestehender_raum
-            logger.info("Brand-DM wiederverwendet Raum %s fuer %s", room_id, erkunder)
-        else:
-            room_id = matrix_dm_senden(matrix_id, nachricht)
-            if room_id:
-                erkunder.matrix_bot_dm_room_id = room_id
-                erkunder.save(update_fields=["matrix_bot_dm_room_id"])
-                logger.info("Brand-DM neuer Raum %s fuer %s", room_id, erkunder)
-
-        if room_id:
-            _, seit = matrix_messages_seit_token(room_id, since_token=None)
-            felder = ["matrix_dm_room_id"]
-            token_obj.matrix_dm_room_id = room_id
-            if seit:
-                token_obj.matrix_dm_since_token = seit
-                felder.append("matrix_dm_since_token")
-            token_obj.save(update_fields=felder)
-    except Exception as exc:
-        logger.warning("Brand-DM an %s fehlgeschlagen: %s", erkunder, exc)
+    from config.kommunikation_utils import matrix_dm_senden, matrix_nachricht_senden, matrix_messages_seit_token
+
+    # Bestehenden DM-Raum wiederverwenden (kein erneutes Einladen noetig)
+    bestehender_raum = erkunder.matrix_bot_dm_room_id
+    if bestehender_raum:
+        gesendet = matrix_nachricht_senden(bestehender_raum, nachricht)
+        if not gesendet:
+            return gesendet
+        room_id = bestehender_raum
+        logger.info("Brand-DM wiederverwendet Raum %s fuer %s", room_id, erkunder)
+    else:
+        room_id = matrix_dm_senden(matrix_id, nachricht)
+        if not room_id:
+            return False
+        erkunder.matrix_bot_dm_room_id = room_id
+        erkunder.save(update_fields=["matrix_bot_dm_room_id"])
+        logger.info("Brand-DM neuer Raum %s fuer %s", room_id, erkunder)
+
+    _, seit = matrix_messages_seit_token(room_id, since_token=None)
+    felder = ["matrix_dm_room_id"]
+    token_obj.matrix_dm_room_id = room_id
+    if seit:
+        token_obj.matrix_dm_since_token = seit
+        felder.append("matrix_dm_since_token")
+    token_obj.save(update_fields=felder)
+    return True
 
 
 def _vollalarm_brand(brandalarm):
-    """Sendet Vollalarm nach Security-Bestaetigung.
+    """Sendet Vollalarm nach Security-Bestaetigung (ueber alarm_fanout).
 
     Kanaele parallel:
     - Matrix: EH-Raum, Security-Raum, Raeumungshelfer-Raum (@room)
@@ -716,6 +686,8 @@ def _vollalarm_brand(brandalarm):
     - Matrix-DM: individuell an jeden Raeumungshelfer
     """
     from django.conf import settings
+    from config.kommunikation_utils import matrix_nachricht_senden
+
     eh_room              = getattr(settings, "MATRIX_EH_PING_ROOM_ID", "")
     security_room        = getattr(settings, "MATRIX_SECURITY_PING_ROOM_ID", "")
     raeumungshelfer_room = getattr(settings, "MATRIX_RAEUMUNGSHELFER_ROOM_ID", "")
@@ -733,46 +705,63 @@ def _vollalarm_brand(brandalarm):
         " – Bitte sofort Raeumung des eigenen Bereichs starten!"
         " Sammelplatz aufsuchen. Alle Personen erfassen."
     )
-    try:
-        from config.kommunikation_utils import matrix_nachricht_senden
-        for room_id in [r for r in [eh_room, security_room] if r]:
-            matrix_nachricht_senden(room_id, matrix_text)
-        if raeumungshelfer_room:
-            matrix_nachricht_senden(raeumungshelfer_room, raeumungs_text)
-    except Exception as exc:
-        logger.warning("Vollalarm Matrix fehlgeschlagen: %s", exc)
-
-    # ntfy: alle Mitarbeiter
-    _ntfy_push(
-        ntfy_url,
-        getattr(settings, "NTFY_BRAND_TOPIC", "brand-alarm-prima"),
-        title="BRAND-ALARM",
-        body=f"Ort: {ort} – Gebaeude verlassen! Security verstaendigt Feuerwehr.",
-        priority="urgent",
-    )
-    # ntfy: Raeumungshelfer
-    _ntfy_push(
-        ntfy_url,
-        getattr(settings, "NTFY_RAEUMUNGSHELFER_TOPIC", "raeumungshelfer-prima"),
-        title="VOLLALARM – RAEUMUNG",
-        body=f"Ort: {ort} – Sofort Bereich raeumen! Sammelplatz aufsuchen und absichern.",
-        priority="urgent",
-    )
-    # ntfy: Brandbekaempfer
-    _ntfy_push(
-        ntfy_url,
-        getattr(settings, "NTFY_BRANDBEKAEMPFER_TOPIC", "brandbekaempfer-prima"),
-        title="VOLLALARM – BRANDBEKAEMPFUNG",
-        body=f"Ort: {ort} – Kleiner Brand? Loescher einsetzen wenn sicher. Bei Ausbreitung: sofort evakuieren!",
-        priority="urgent",
-    )
+    raeume = [(r, matrix_text) for r in [eh_room, security_room] if r]
+    if raeumungshelfer_room:
+        raeume.append((raeumungshelfer_room, raeumungs_text))
+
+    # ntfy: alle Mitarbeiter, Raeumungshelfer, Brandbekaempfer
+    pushes = [
+        (
+            getattr(settings, "NTFY_BRAND_TOPIC", "brand-alarm-prima"),
+            "BRAND-ALARM",
+            f"Ort: {ort} – Gebaeude verlassen! Security verstaendigt Feuerwehr.",
+        ),
+        (
+            getattr(settings, "NTFY_RAEUMUNGSHELFER_TOPIC", "raeumungshelfer-prima"),
+            "VOLLALARM – RAEUMUNG",
+            f"Ort: {ort} – Sofort Bereich raeumen! Sammelplatz aufsuchen und absichern.",
+        ),
+        (
+            getattr(settings, "NTFY_BRANDBEKAEMPFER_TOPIC", "brandbekaempfer-prima"),
+            "VOLLALARM – BRANDBEKAEMPFUNG",
+            f"Ort: {ort} – Kleiner Brand? Loescher einsetzen wenn sicher. Bei Ausbreitung: sofort evakuieren!",
+        ),
+    ]
+
+    # Breitenwirksame Pushes zuerst, dann Raeume, dann Einzel-DMs
+    auftraege = []
+    if ntfy_url:
+        auftraege += [
+            alarm_fanout.Auftrag(
+                AlarmZustellung.KANAL_NTFY, topic, _ntfy_senden,
+                (ntfy_url, topic, titel, text, "urgent"),
+            )
+            for topic, titel, text in pushes
+        ]
+    auftraege += [
+        alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_RAUM, room_id, matrix_nachricht_senden, (room_id, text),
+        )
+        for room_id, text in raeume
+    ]
+    auftraege += _raeumungshelfer_auftraege(brandalarm)
+
+    alarm_fanout.verteilen(AlarmZustellung.ART_BRAND, brandalarm.pk, auftraege)
 
-    # Matrix-DM an jeden Raeumungshelfer individuell
-    _benachrichtige_raeumungshelfer(brandalarm)
 
+def _raeumungshelfer_dm(matrix_id, nachricht):
+    """Matrix-DM an einen Raeumungshelfer.
 
-def _benachrichtige_raeumungshelfer(brandalarm):
-    """Sendet Matrix-DM an alle Raeumungshelfer."""
+    True wenn ein DM-Raum zustande kam, None wenn Matrix nicht konfiguriert ist.
+    """
+    from config.kommunikation_utils import matrix_dm_senden
+    if not all(matrix_zugang()):
+        return None
+    return matrix_dm_senden(matrix_id, nachricht) is not None
+
+
+def _raeumungshelfer_auftraege(brandalarm):
+    """Fan-out-Auftraege fuer die Matrix-DM an alle Raeumungshelfer."""
     from hr.models import HRMitarbeiter
     ort = brandalarm.ort_aktuell
     nachricht = (
@@ -782,16 +771,18 @@ def _benachrichtige_raeumungshelfer(brandalarm):
     )
     from django.conf import settings as _settings
     server_name = getattr(_settings, "MATRIX_SERVER_NAME", "")
+    if not server_name:
+        return []
+    auftraege = []
     for ma in HRMitarbeiter.objects.filter(ist_raeumungshelfer=True).select_related("stelle"):
         stelle = getattr(ma, "stelle", None)
-        if not stelle or not server_name:
+        if not stelle:
             continue
         matrix_id = f"@{stelle.kuerzel}:{server_name}"
-        try:
-            from config.kommunikation_utils import matrix_dm_senden
-            matrix_dm_senden(matrix_id, nachricht)
-        except Exception as exc:
-            logger.warning("Raeumungshelfer-DM an %s fehlgeschlagen: %s", ma, exc)
+        auftraege.append(alarm_fanout.Auftrag(
+            AlarmZustellung.KANAL_MATRIX_DM, matrix_id, _raeumungshelfer_dm, (matrix_id, nachricht),
+        ))
+    return auftraege
 
 
 # ---------------------------------------------------------------------------
@@ -829,13 +820,8 @@ def brand_melden(request):
 
     brandalarm = Brandalarm.objects.create(ort=ort, gemeldet_von=request.user)
 
-    # Benachrichtigungen im Hintergrund – Browser wartet nicht
-    t = threading.Thread(
-        target=_benachrichtige_branderkunder,
-        args=(brandalarm,),
-        daemon=True,
-    )
-    t.start()
+    # Benachrichtigungen im Fan-out-Pool – Browser wartet nicht
+    alarm_fanout.nach_commit(_benachrichtige_branderkunder, brandalarm)
 
     return redirect("sicherheit:brand_gemeldet", pk=brandalarm.pk)
 
@@ -995,11 +981,7 @@ def brand_security_bestaetigen(request, pk):
             brandalarm.save(update_fields=[
                 "status", "security_bestaetigt_von", "security_bestaetigt_am",
             ])
-            threading.Thread(
-                target=_vollalarm_brand,
-                args=(brandalarm,),
-                daemon=True,
-            ).start()
+            alarm_fanout.nach_commit(_vollalarm_brand, brandalarm)
             return redirect("sicherheit:brand_detail", pk=brandalarm.pk)
 
         if entscheidung == "fehlalarm":
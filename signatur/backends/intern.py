@@ -13,6 +13,8 @@ import logging
 import uuid
 from datetime import date, datetime, timezone
 
+from signatur.schluessel_cache import SchluesselCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,57 +58,10 @@ class InternBackend:
     # ------------------------------------------------------------------
     def starte_signatur_job(self, pdf_bytes: bytes, user, meta: dict) -> str:
         """Signiert das PDF synchron und legt einen Job-Eintrag an."""
-        from django.utils import timezone as tz
-        from signatur.models import MitarbeiterZertifikat, SignaturJob, SignaturProtokoll
-
-        job_id = f"INT-{uuid.uuid4().hex[:12].upper()}"
-        dokument_name = meta.get("dokument_name", "Dokument")
-
-        job = SignaturJob.objects.create(
-            job_id=job_id,
-            backend="intern",
-            status="pending",
-            erstellt_von=user,
-            dokument_name=dokument_name,
-            content_type=meta.get("content_type", ""),
-            object_id=meta.get("object_id"),
-        )
-
-        try:
-            zert = MitarbeiterZertifikat.objects.get(user=user, status="aktiv")
-            sichtbar = meta.get("sichtbar", True)
-            seite = meta.get("seite", -1)
-            stempel_y_oben = meta.get("stempel_y_oben", 60)
-            stempel_hoehe = meta.get("stempel_hoehe", 45)
-
-            signiertes_pdf = self._signiere_mit_pyhanko(
-                pdf_bytes, zert, user, sichtbar, seite, meta,
-                stempel_y_oben=stempel_y_oben,
-                stempel_hoehe=stempel_hoehe,
-            )
-
-            doc_hash = hashlib.sha256(pdf_bytes).hexdigest()
-
-            SignaturProtokoll.objects.create(
-                job=job,
-                unterzeichner=user,
-                zertifikat=zert,
-                hash_sha256=doc_hash,
-                signatur_typ="FES",
-                signiertes_pdf=signiertes_pdf,
-            )
-
-            job.status = "completed"
-            job.abgeschlossen_am = tz.now()
-            job.save()
-
-        except Exception as exc:
-            job.status = "failed"
-            job.fehler_meldung = str(exc)
-            job.save()
-            logger.error("Signatur-Job %s fehlgeschlagen: %s", job_id, exc)
-            raise
-
+        _, jobs = self._signiere_batch(pdf_bytes, [user], meta)
+        job_id, fehler = jobs[0]
+        if fehler is not None:
+            raise fehler
         return job_id
 
     # ------------------------------------------------------------------
@@ -168,37 +123,152 @@ class InternBackend:
     # signiere_direkt (Komfort)
     # ------------------------------------------------------------------
     def signiere_direkt(self, pdf_bytes: bytes, user, meta: dict) -> bytes:
-        job_id = self.starte_signatur_job(pdf_bytes, user, meta)
-        return self.hole_signiertes_pdf(job_id)
+        pdf, jobs = self._signiere_batch(pdf_bytes, [user], meta)
+        _, fehler = jobs[0]
+        if fehler is not None:
+            raise fehler
+        return pdf
 
     # ------------------------------------------------------------------
-    # Interne pyhanko-Signatur
+    # signiere_batch (mehrere Unterzeichner)
     # ------------------------------------------------------------------
-    def _signiere_mit_pyhanko(
-        self, pdf_bytes: bytes, zert, user, sichtbar: bool, seite: int, meta: dict,
-        stempel_y_oben: int = 60, stempel_hoehe: int = 45,
-    ) -> bytes:
-        """Kern-Signatur via pyhanko."""
-        import pyhanko.sign.fields as fields
+    def signiere_batch(self, pdf_bytes: bytes, unterzeichner, meta: dict = None) -> bytes:
+        """
+        Signiert ein PDF nacheinander fuer alle Unterzeichner in einem Durchgang.
+
+        Das Dokument wird einmal in einen Speicher-Stream geladen; jede
+        Signatur wird als inkrementelles Update direkt angehaengt. Geprueft
+        wird nur die letzte Revision (sie deckt alle vorherigen ab).
+
+        Fehler einzelner Unterzeichner (z.B. kein Zertifikat) werden
+        geloggt und uebersprungen – die uebrigen signieren trotzdem.
+
+        Returns:
+            Signiertes PDF als Bytes
+        """
+        pdf, _ = self._signiere_batch(pdf_bytes, list(unterzeichner), meta or {})
+        return pdf
+
+    def _signiere_batch(self, pdf_bytes: bytes, unterzeichner: list, meta: dict):
+        """
+        Kern fuer signiere_batch/starte_signatur_job.
+
+        Legt je Unterzeichner einen SignaturJob (+ SignaturProtokoll) an.
+
+        Returns:
+            (pdf_bytes, [(job_id, exception_oder_None), ...])
+        """
+        from django.utils import timezone as tz
         from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
-        from pyhanko.pdf_utils.reader import PdfFileReader
-        from pyhanko.sign import signers
-        from pyhanko.sign.signers.pdf_signer import PdfSignatureMetadata
-        from asn1crypto import pem as asn1pem, x509 as asn1x509, keys as asn1keys
-        from pyhanko_certvalidator.registry import SimpleCertificateStore
+        from signatur.models import MitarbeiterZertifikat, SignaturJob, SignaturProtokoll
 
-        def _lade_asn1_cert(pem_str):
-            """Laedt ein PEM-Zertifikat als asn1crypto.x509.Certificate."""
-            pem_bytes = pem_str.encode() if isinstance(pem_str, str) else pem_str
-            _, _, der = asn1pem.unarmor(pem_bytes)
-            return asn1x509.Certificate.load(der)
+        dokument_name = meta.get("dokument_name", "Dokument")
+        sichtbar = meta.get("sichtbar", True)
+        seite = meta.get("seite", -1)
+        stempel_y_oben = meta.get("stempel_y_oben", 60)
+        stempel_hoehe = meta.get("stempel_hoehe", 45)
+
+        zertifikate = {
+            z.user_id: z
+            for z in MitarbeiterZertifikat.objects.filter(
+                user__in=[u.pk for u in unterzeichner], status="aktiv",
+            )
+        }
+        root_cert = SchluesselCache.root_zertifikat()
+
+        # Einmal laden, alle Signaturen haengen an denselben Stream an
+        puffer = io.BytesIO(pdf_bytes)
+        feld_nr = None
+        seiten = None
+
+        jobs = []
+        erfolgreich = []  # (job, zert, user, doc_hash, revision_ende)
+        for user in unterzeichner:
+            job = SignaturJob.objects.create(
+                job_id=f"INT-{uuid.uuid4().hex[:12].upper()}",
+                backend="intern",
+                status="pending",
+                erstellt_von=user,
+                dokument_name=dokument_name,
+                content_type=meta.get("content_type", ""),
+                object_id=meta.get("object_id"),
+            )
+            revision_start = puffer.seek(0, io.SEEK_END)
+            try:
+                zert = zertifikate.get(user.pk)
+                if zert is None:
+                    raise ValueError(
+                        f"Kein aktives Zertifikat fuer {user.get_full_name()}."
+                    )
+                if root_cert is None:
+                    raise ValueError("Keine Root-CA vorhanden.")
+
+                with puffer.getbuffer() as ansicht:
+                    doc_hash = hashlib.sha256(ansicht).hexdigest()
+
+                writer = IncrementalPdfFileWriter(puffer)
+                if feld_nr is None:
+                    # Vorhandene Signaturen → eindeutige Feldnamen, Seitenzahl aendert sich nicht
+                    feld_nr = len(list(writer.prev.embedded_signatures)) + 1
+                    seiten = int(writer.root["/Pages"]["/Count"])
+
+                signer = SchluesselCache.signer(
+                    zert, lambda: self._baue_signer(zert, user, root_cert)
+                )
+                self._signiere_revision(
+                    writer, signer, user, feld_nr, seiten,
+                    sichtbar, seite, meta,
+                    stempel_y_oben=stempel_y_oben,
+                    stempel_hoehe=stempel_hoehe,
+                )
+                feld_nr += 1
+                erfolgreich.append((job, zert, user, doc_hash, puffer.seek(0, io.SEEK_END)))
+                jobs.append((job.job_id, None))
+            except Exception as exc:
+                # Angefangenes Update verwerfen – der Stream bleibt bei der letzten gueltigen Revision
+                puffer.truncate(revision_start)
+                job.status = "failed"
+                job.fehler_meldung = str(exc)
+                job.save()
+                logger.error("Signatur-Job %s fehlgeschlagen: %s", job.job_id, exc)
+                jobs.append((job.job_id, exc))
+
+        signiertes_pdf = puffer.getvalue()
+        if not erfolgreich:
+            return signiertes_pdf, jobs
+
+        try:
+            self._pruefe_letzte_revision(signiertes_pdf, root_cert)
+        except Exception as exc:
+            for job, *_ in erfolgreich:
+                job.status = "failed"
+                job.fehler_meldung = str(exc)
+                job.save()
+            logger.error("Signaturpruefung fehlgeschlagen (%s): %s", dokument_name, exc)
+            return pdf_bytes, [(job_id, fehler or exc) for job_id, fehler in jobs]
+
+        jetzt = tz.now()
+        for job, zert, user, doc_hash, revision_ende in erfolgreich:
+            SignaturProtokoll.objects.create(
+                job=job,
+                unterzeichner=user,
+                zertifikat=zert,
+                hash_sha256=doc_hash,
+                signatur_typ="FES",
+                signiertes_pdf=signiertes_pdf[:revision_ende],
+            )
+            job.status = "completed"
+            job.abgeschlossen_am = jetzt
+            job.save()
+        return signiertes_pdf, jobs
 
-        def _lade_asn1_privkey(pem_str):
-            """Laedt einen privaten Schluessel als asn1crypto.keys.PrivateKeyInfo.
-            pyhanko 0.34 ruft intern signing_key.dump() auf → asn1crypto-Typ benoetigt."""
-            pem_bytes = pem_str.encode() if isinstance(pem_str, str) else pem_str
-            _, _, der = asn1pem.unarmor(pem_bytes)
-            return asn1keys.PrivateKeyInfo.load(der)
+    # ------------------------------------------------------------------
+    # Interne pyhanko-Signatur
+    # ------------------------------------------------------------------
+    def _baue_signer(self, zert, user, root_cert):
+        """Entsperrt den privaten Schluessel und baut den pyhanko-Signer (gecacht via SchluesselCache)."""
+        from pyhanko.sign import signers
+        from pyhanko_certvalidator.registry import SimpleCertificateStore
 
         # Privaten Schluessel entschluesseln (PBKDF2+AES-256-GCM via Session-Schluessel)
         from signatur.crypto import privaten_schluessel_aus_session
@@ -218,28 +288,25 @@ class InternBackend:
             )
 
         # Zertifikat + Schluessel als asn1crypto laden (pyhanko 0.34 Anforderung)
-        cert = _lade_asn1_cert(zert.zertifikat_pem)
+        cert = SchluesselCache.zertifikat(zert)
         privkey = _lade_asn1_privkey(privater_schluessel_pem)
 
-        # Root-CA-Kette laden
-        from signatur.models import RootCA
-        root = RootCA.objects.first()
-        root_cert = _lade_asn1_cert(root.zertifikat_pem)
-
-        # Signer aufbauen
-        signer = signers.SimpleSigner(
+        return signers.SimpleSigner(
             signing_cert=cert,
             signing_key=privkey,
             cert_registry=SimpleCertificateStore.from_certs([root_cert]),
         )
 
-        # PDF einlesen
-        reader = PdfFileReader(io.BytesIO(pdf_bytes))
-        writer = IncrementalPdfFileWriter(io.BytesIO(pdf_bytes))
+    def _signiere_revision(
+        self, writer, signer, user, feld_nr: int, seiten: int,
+        sichtbar: bool, seite: int, meta: dict,
+        stempel_y_oben: int = 60, stempel_hoehe: int = 45,
+    ) -> None:
+        """Kern-Signatur via pyhanko: haengt eine Signatur in-place an den Stream des Writers an."""
+        import pyhanko.sign.fields as fields
+        from pyhanko.sign import signers
+        from pyhanko.sign.signers.pdf_signer import PdfSignatureMetadata
 
-        # Anzahl vorhandener Signaturen ermitteln → eindeutigen Feldnamen vergeben
-        vorhandene = len(list(reader.embedded_signatures))
-        feld_nr = vorhandene + 1
         feld_name = f"Signatur_{feld_nr}"
 
         # Metadaten
@@ -271,10 +338,8 @@ class InternBackend:
         # Auf der PRIMA-Signaturseite (A4, 595x842pt) liegt der Stempelrahmen bei:
         #   box = (20, 539, 502, 667)
         # Fuer einzelne Signaturen auf der Signaturseite wird der volle Rahmen genutzt.
-        sig_field_spec = None
         if sichtbar:
-            total_pages = reader.root["/Pages"]["/Count"]
-            zielseite = int(total_pages) - 1 if seite < 0 else min(seite, int(total_pages) - 1)
+            zielseite = seiten - 1 if seite < 0 else min(seite, seiten - 1)
 
             # Grid-Layout: 3 Stempel pro Reihe, skaliert auf A4-Breite (595pt)
             # Nutzbare Breite: 555pt (595 - 2*20 Rand)
@@ -301,12 +366,39 @@ class InternBackend:
             )
             fields.append_signature_field(writer, sig_field_spec)
 
-        # Signieren
-        out = io.BytesIO()
+        # Signieren – inkrementelles Update direkt an den Eingabe-Stream
         signers.sign_pdf(
             writer,
             sig_meta,
             signer=signer,
-            output=out,
+            in_place=True,
         )
-        return out.getvalue()
+
+    def _pruefe_letzte_revision(self, pdf_bytes: bytes, root_cert) -> None:
+        """Prueft die letzte Signatur (Integritaet + Abdeckung der ganzen Datei)."""
+        from pyhanko.pdf_utils.reader import PdfFileReader
+        from pyhanko_certvalidator import ValidationContext
+        from pyhanko.sign.validation import validate_pdf_signature
+        from pyhanko.sign.validation.status import SignatureCoverageLevel
+
+        signaturen = PdfFileReader(io.BytesIO(pdf_bytes)).embedded_signatures
+        if not signaturen:
+            raise ValueError("Keine Signatur im PDF gefunden.")
+        # Aenderungsanalyse ueberspringen: alle Revisionen stammen aus diesem Durchgang
+        status = validate_pdf_signature(
+            signaturen[-1],
+            signer_validation_context=ValidationContext(trust_roots=[root_cert]),
+            skip_diff=True,
+        )
+        if not status.bottom_line or status.coverage != SignatureCoverageLevel.ENTIRE_FILE:
+            raise ValueError("Letzte Signatur deckt das Dokument nicht vollstaendig ab.")
+
+
+def _lade_asn1_privkey(pem_str):
+    """Laedt einen privaten Schluessel als asn1crypto.keys.PrivateKeyInfo.
+    pyhanko 0.34 ruft intern signing_key.dump() auf → asn1crypto-Typ benoetigt."""
+    from asn1crypto import keys as asn1keys, pem as asn1pem
+
+    pem_bytes = pem_str.encode() if isinstance(pem_str, str) else pem_str
+    _, _, der = asn1pem.unarmor(pem_bytes)
+    return asn1keys.PrivateKeyInfo.load(der)
@@ -5,6 +5,9 @@ Aufruf:
   python manage.py erstelle_ca              # Root-CA + alle Mitarbeiter
   python manage.py erstelle_ca --nur_ca     # Nur Root-CA
   python manage.py erstelle_ca --user max   # Einzelnen User
+  python manage.py erstelle_ca --rotieren   # Neue Root-CA (alter Schluessel
+                                            # kompromittiert), alle Mitarbeiter-
+                                            # Zertifikate neu ausstellen
 """
 import datetime
 import uuid
@@ -22,6 +25,9 @@ class Command(BaseCommand):
                             help="Nur fuer diesen Username")
         parser.add_argument("--gueltig_jahre", type=int, default=2,
                             help="Gueltigkeitsdauer in Jahren (Standard: 2)")
+        parser.add_argument("--rotieren", action="store_true",
+                            help="Root-CA ersetzen und alle damit ausgestellten "
+                                 "Mitarbeiter-Zertifikate verwerfen")
 
     def handle(self, *args, **options):
         from cryptography import x509
@@ -30,6 +36,20 @@ class Command(BaseCommand):
         from cryptography.x509.oid import NameOID
         from signatur.models import MitarbeiterZertifikat, RootCA
 
+        # ------------------------------------------------------------------
+        # 0. Rotation: alte CA samt ausgestellter Zertifikate verwerfen
+        # ------------------------------------------------------------------
+        if options["rotieren"]:
+            from django.db import transaction
+
+            with transaction.atomic():
+                verworfen, _ = MitarbeiterZertifikat.objects.all().delete()
+                RootCA.objects.all().delete()
+            self.stdout.write(self.style.WARNING(
+                f"Root-CA verworfen, {verworfen} Mitarbeiter-Zertifikat(e) geloescht "
+                "– werden mit der neuen CA neu ausgestellt."
+            ))
+
         # ------------------------------------------------------------------
         # 1. Root-CA anlegen (falls noch nicht vorhanden)
         # ------------------------------------------------------------------
@@ -63,6 +83,11 @@ class Command(BaseCommand):
                 f"Root-CA-Schluessel gespeichert: {ca_key_pfad} "
                 "(SICHER AUFBEWAHREN – nicht committen!)"
             ))
+            if os.environ.get("CA_ROOT_KEY_B64"):
+                self.stdout.write(self.style.WARNING(
+                    "CA_ROOT_KEY_B64 enthaelt noch den alten Schluessel – "
+                    "durch den neuen ersetzen (base64 der Schluesseldatei)."
+                ))
             self.stdout.write(self.style.SUCCESS("Root-CA erstellt."))
 
         if options["nur_ca"]:
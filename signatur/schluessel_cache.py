@@ -0,0 +1,131 @@
+"""
+SchluesselCache – geparste Zertifikate und entsperrte Signer pro Prozess.
+
+Jede Signatur lud bisher den RootCA-Datensatz, parste Root- und
+Mitarbeiter-Zertifikat (PEM → ASN.1), entschluesselte den privaten
+Schluessel (AES-GCM) und baute einen neuen SimpleSigner. Bei
+Sammelfreigaben wiederholt sich das fuer dieselben Personen immer wieder.
+
+Der Cache haelt mit kurzer Lebensdauer (SIGNATUR_SCHLUESSEL_CACHE_SEKUNDEN):
+  - das Root-CA-Zertifikat (prozessweit)
+  - Mitarbeiter-Zertifikate als asn1crypto-Objekte (prozessweit)
+  - entsperrte SimpleSigner, gebunden an den Session-Schluessel der
+    SignaturKeyMiddleware: ein Signer ist nur abrufbar, solange derselbe
+    Session-Schluessel im Request-Thread aktiv ist
+
+Geleert wird
+  - beim Logout (user_logged_out, siehe signals.py) fuer User und Session
+  - beim Speichern von RootCA oder MitarbeiterZertifikat
+  - spaetestens nach Ablauf der Lebensdauer
+
+Andere Prozesse erreichen die Signer einer abgemeldeten Session nicht mehr
+(ihr Session-Schluessel ist geloescht) und verwerfen sie nach Ablauf.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from .crypto import get_session_schluessel
+
+# Schluessel -> (ablauf, wert)
+_EINTRAEGE = {}
+_LOCK = threading.Lock()
+
+# Fingerabdruck fuer Signer ohne Session-Schluessel (Klartext-Fallback)
+OHNE_SESSION = "-"
+
+
+def _lebensdauer():
+    return getattr(settings, "SIGNATUR_SCHLUESSEL_CACHE_SEKUNDEN", 300)
+
+
+def _fingerabdruck(dk_hex):
+    """Kurzer Hash des Session-Schluessels – der Schluessel selbst bleibt nicht im Cache."""
+    if not dk_hex:
+        return OHNE_SESSION
+    return hashlib.sha256(dk_hex.encode("ascii")).hexdigest()[:16]
+
+
+class SchluesselCache:
+    """Prozesslokaler TTL-Cache fuer Signatur-Material (nur Klassenmethoden)."""
+
+    @staticmethod
+    def _hole(schluessel, fabrik):
+        jetzt = time.monotonic()
+        with _LOCK:
+            eintrag = _EINTRAEGE.get(schluessel)
+            if eintrag is not None and eintrag[0] > jetzt:
+                return eintrag[1]
+
+        wert = fabrik()
+        if wert is None:
+            return None
+
+        with _LOCK:
+            # Abgelaufene Eintraege bei Gelegenheit entfernen
+            for k in [k for k, (ablauf, _) in _EINTRAEGE.items() if ablauf <= jetzt]:
+                del _EINTRAEGE[k]
+            _EINTRAEGE[schluessel] = (jetzt + _lebensdauer(), wert)
+        return wert
+
+    @classmethod
+    def root_zertifikat(cls):
+        """Root-CA-Zertifikat als asn1crypto.x509.Certificate (oder None)."""
+        def laden():
+            from .models import RootCA
+            root = RootCA.objects.first()
+            return lade_asn1_zertifikat(root.zertifikat_pem) if root else None
+
+        return cls._hole(("root",), laden)
+
+    @classmethod
+    def zertifikat(cls, zert):
+        """Mitarbeiter-Zertifikat als asn1crypto.x509.Certificate."""
+        return cls._hole(
+            ("zert", zert.user_id, zert.pk, zert.seriennummer),
+            lambda: lade_asn1_zertifikat(zert.zertifikat_pem),
+        )
+
+    @classmethod
+    def signer(cls, zert, fabrik):
+        """Entsperrter Signer fuer zert, gebunden an den aktiven Session-Schluessel.
+
+        Args:
+            zert: MitarbeiterZertifikat
+            fabrik: Callable, das den Signer baut (nur bei Cache-Fehltreffer)
+        """
+        fingerabdruck = _fingerabdruck(get_session_schluessel())
+        return cls._hole(
+            ("signer", zert.user_id, zert.pk, zert.seriennummer, fingerabdruck),
+            fabrik,
+        )
+
+    @staticmethod
+    def verwerfen(user_id=None, dk_hex=None):
+        """Entfernt alle Eintraege eines Users und/oder eines Session-Schluessels."""
+        fingerabdruck = _fingerabdruck(dk_hex) if dk_hex else None
+        with _LOCK:
+            for k in list(_EINTRAEGE):
+                if k[0] == "root":
+                    continue
+                if (user_id is not None and k[1] == user_id) or (
+                    fingerabdruck is not None and k[0] == "signer" and k[4] == fingerabdruck
+                ):
+                    del _EINTRAEGE[k]
+
+    @staticmethod
+    def leeren():
+        """Entfernt alle Eintraege (z.B. nach neuer Root-CA)."""
+        with _LOCK:
+            _EINTRAEGE.clear()
+
+
+def lade_asn1_zertifikat(pem_str):
+    """Laedt ein PEM-Zertifikat als asn1crypto.x509.Certificate."""
+    from asn1crypto import pem as asn1pem, x509 as asn1x509
+
+    pem_bytes = pem_str.encode() if isinstance(pem_str, str) else pem_str
+    _, _, der = asn1pem.unarmor(pem_bytes)
+    return asn1x509.Certificate.load(der)
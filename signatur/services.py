@@ -232,3 +232,40 @@ def signiere_pdf(pdf_bytes: bytes, user, dokument_name: str = "Dokument",
         **kwargs,
     }
     return backend.signiere_direkt(pdf_bytes, user, meta)
+
+
+def signiere_pdf_batch(pdf_bytes: bytes, unterzeichner, dokument_name: str = "Dokument",
+                       sichtbar: bool = True, **kwargs) -> bytes:
+    """
+    PDF nacheinander fuer mehrere Unterzeichner signieren.
+
+    Das interne Backend signiert alle in einem Durchgang (signiere_batch);
+    andere Backends signieren einzeln nacheinander. Fehler einzelner
+    Unterzeichner werden geloggt und uebersprungen.
+
+    Verwendung:
+        from signatur.services import signiere_pdf_batch
+        signiertes = signiere_pdf_batch(pdf_bytes, [antragsteller, genehmiger], "Antrag")
+
+    Returns:
+        Signiertes PDF als bytes
+    """
+    backend = get_backend()
+    meta = {
+        "dokument_name": dokument_name,
+        "sichtbar": sichtbar,
+        **kwargs,
+    }
+    unterzeichner = list(unterzeichner)
+    if hasattr(backend, "signiere_batch"):
+        return backend.signiere_batch(pdf_bytes, unterzeichner, meta)
+
+    for i, user in enumerate(unterzeichner):
+        try:
+            pdf_bytes = backend.signiere_direkt(pdf_bytes, user, meta)
+        except Exception as exc:
+            logger.warning(
+                "Signatur von %s fehlgeschlagen (Unterzeichner %s/%s, Dokument '%s'): %s",
+                user.username, i + 1, len(unterzeichner), dokument_name, exc,
+            )
+    return pdf_bytes
@@ -15,11 +15,15 @@ Falls kein Session-Schluessel vorhanden (z.B. Admin-seitiger Reset):
   - Key bleibt verschluesselt mit altem Schluessel
   - Beim naechsten Login schlaegt Entschluesselung fehl
   - Fallback: Key wird als "beschaedigt" markiert → naechste CA-Ausstellung noetig
+
+Ausserdem: SchluesselCache leeren bei Logout und bei Aenderungen an
+RootCA/MitarbeiterZertifikat.
 """
 import logging
 
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from .crypto import (
@@ -29,6 +33,7 @@ from .crypto import (
     privaten_schluessel_aus_session,
     verschluessele_privaten_schluessel,
 )
+from .schluessel_cache import SchluesselCache
 
 logger = logging.getLogger(__name__)
 
@@ -122,3 +127,28 @@ def schluessel_bei_passwortaenderung_neu_verschluesseln(sender, instance, create
             getattr(user, "username", "?"),
             exc,
         )
+
+
+@receiver(user_logged_out, dispatch_uid="signatur_schluessel_cache_logout")
+def schluessel_cache_bei_logout_leeren(sender, request, user, **kwargs):
+    """Entsperrte Signer der Session und gecachte Zertifikate des Users verwerfen."""
+    dk_hex = None
+    try:
+        dk_hex = request.session.get(SESSION_KEY) if request is not None else None
+    except Exception:
+        pass
+    SchluesselCache.verwerfen(user_id=getattr(user, "pk", None), dk_hex=dk_hex)
+
+
+@receiver(post_save, sender="signatur.MitarbeiterZertifikat", dispatch_uid="signatur_schluessel_cache_zert_save")
+@receiver(post_delete, sender="signatur.MitarbeiterZertifikat", dispatch_uid="signatur_schluessel_cache_zert_delete")
+def schluessel_cache_zertifikat_verwerfen(sender, instance, **kwargs):
+    """Neu verschluesselter oder gesperrter Schluessel → gecachte Signer des Users verwerfen."""
+    SchluesselCache.verwerfen(user_id=instance.user_id)
+
+
+@receiver(post_save, sender="signatur.RootCA", dispatch_uid="signatur_schluessel_cache_root_save")
+@receiver(post_delete, sender="signatur.RootCA", dispatch_uid="signatur_schluessel_cache_root_delete")
+def schluessel_cache_root_ca_leeren(sender, **kwargs):
+    """Neue Root-CA → alle gecachten Zertifikate und Signer verwerfen."""
+    SchluesselCache.leeren()
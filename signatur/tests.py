@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, override_settings
+
+from .crypto import SESSION_KEY, clear_session_schluessel, set_session_schluessel
+from .models import MitarbeiterZertifikat, RootCA
+from .schluessel_cache import SchluesselCache
+from .signals import schluessel_cache_bei_logout_leeren
+
+DK_ANNA = "a1" * 32
+DK_BERT = "b2" * 32
+
+
+class SchluesselCacheTest(SimpleTestCase):
+    """Entsperrte Signer: Bindung an die Session, Logout, Lebensdauer."""
+
+    def setUp(self):
+        SchluesselCache.leeren()
+        self.addCleanup(SchluesselCache.leeren)
+        self.addCleanup(clear_session_schluessel)
+        self.anna = SimpleNamespace(user_id=1, pk=10, seriennummer="01")
+        self.bert = SimpleNamespace(user_id=2, pk=20, seriennummer="02")
+
+    def _signer(self, zert, dk_hex):
+        set_session_schluessel(dk_hex)
+        fabrik = mock.Mock(return_value=object())
+        return SchluesselCache.signer(zert, fabrik), fabrik
+
+    def test_signer_nur_mit_derselben_session(self):
+        signer, fabrik = self._signer(self.anna, DK_ANNA)
+        self.assertIs(self._signer(self.anna, DK_ANNA)[0], signer)
+
+        # Andere Session (z.B. zweiter Login) baut einen eigenen Signer
+        anderer, fabrik = self._signer(self.anna, DK_BERT)
+        self.assertIsNot(anderer, signer)
+        fabrik.assert_called_once()
+
+    def test_logout_verwirft_signer_der_session(self):
+        signer, _ = self._signer(self.anna, DK_ANNA)
+        bert, _ = self._signer(self.bert, DK_BERT)
+
+        request = SimpleNamespace(session={SESSION_KEY: DK_ANNA})
+        schluessel_cache_bei_logout_leeren(sender=None, request=request, user=SimpleNamespace(pk=1))
+
+        neu, fabrik = self._signer(self.anna, DK_ANNA)
+        self.assertIsNot(neu, signer)
+        fabrik.assert_called_once()
+        self.assertIs(self._signer(self.bert, DK_BERT)[0], bert)
+
+    def test_logout_ohne_session_verwirft_eintraege_des_users(self):
+        signer, _ = self._signer(self.anna, DK_ANNA)
+        schluessel_cache_bei_logout_leeren(sender=None, request=None, user=SimpleNamespace(pk=1))
+        self.assertIsNot(self._signer(self.anna, DK_ANNA)[0], signer)
+
+    def test_neues_zertifikat_und_root_ca_leeren(self):
+        signer, _ = self._signer(self.anna, DK_ANNA)
+        bert, _ = self._signer(self.bert, DK_BERT)
+        post_save.send(sender=MitarbeiterZertifikat, instance=self.anna, created=True)
+        self.assertIsNot(self._signer(self.anna, DK_ANNA)[0], signer)
+        self.assertIs(self._signer(self.bert, DK_BERT)[0], bert)
+
+        post_save.send(sender=RootCA, instance=None, created=True)
+        self.assertIsNot(self._signer(self.bert, DK_BERT)[0], bert)
+
+    @override_settings(SIGNATUR_SCHLUESSEL_CACHE_SEKUNDEN=0)
+    def test_abgelaufener_eintrag_wird_neu_gebaut(self):
+        signer, _ = self._signer(self.anna, DK_ANNA)
+        neu, fabrik = self._signer(self.anna, DK_ANNA)
+        self.assertIsNot(neu, signer)
+        fabrik.assert_called_once()
+
+    def test_fehlschlag_wird_nicht_gecacht(self):
+        set_session_schluessel(DK_ANNA)
+        self.assertIsNone(SchluesselCache.signer(self.anna, lambda: None))
+        signer, fabrik = self._signer(self.anna, DK_ANNA)
+        self.assertIsNotNone(signer)
+        fabrik.assert_called_once()
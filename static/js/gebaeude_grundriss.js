@@ -4,19 +4,13 @@
 var STRUKTUR    = JSON.parse(document.getElementById("grundriss-struktur").textContent);
 var RAEUME      = JSON.parse(document.getElementById("grundriss-raeume").textContent);
 var GESCHOSS_ID = JSON.parse(document.getElementById("grundriss-geschoss-id").textContent);
-var GESCHOSS_KUERZEL = JSON.parse(document.getElementById("grundriss-kuerzel").textContent);
-
-// ─── Farben ────────────────────────────────────────────────────────────────
-var FARBEN = {
-  einzelbuero: '#1d4ed8', konferenz: '#d97706', besprechung: '#ca8a04',
-  schulung: '#c2410c', teekueche: '#065f46', pausenraum: '#047857',
-  wc_herren: '#334155', wc_damen: '#334155', wc_barrierefrei: '#1e293b',
-  druckerraum: '#5b21b6', eingang: '#713f12', windfang: '#78350f',
-  flur: '#1e293b', heizungsraum: '#7f1d1d', lueftungsraum: '#991b1b',
-  elektroverteilung: '#b91c1c', serverraum: '#7f1d1d', it_verteiler: '#991b1b',
-  lager: '#78350f', archiv: '#713f12', abstellraum: '#57534e', putzraum: '#3f3f46',
-};
-var FARBE_FALLBACK = '#374151';
+
+// Geometrie (Raeume, Moebel, Tueren) kommt als vorberechnetes SVG vom Server
+// (raumbuch/grundriss.py); hier werden nur noch die Live-Overlays gezeichnet.
+var RAEUME_NACH_ID = {};
+RAEUME.forEach(function(r) { RAEUME_NACH_ID[String(r.id)] = r; });
+
+// ─── Raumtypen ─────────────────────────────────────────────────────────────
 var IT_TYPEN = ['serverraum','it_verteiler','elektroverteilung','heizungsraum','lueftungsraum'];
 var BUCHUNGS_TYPEN = ['konferenz','besprechung','schulung'];
 var KEIN_SCHLOSS = ['wc_herren','wc_damen','wc_barrierefrei','flur','windfang','eingang','putzraum'];
@@ -51,20 +45,34 @@ function setSimModus(modus) {
   simModus = modus;
   document.getElementById('btnTag').className   = 'sim-btn' + (modus === 'tag'   ? ' aktiv' : '');
   document.getElementById('btnNacht').className = 'sim-btn' + (modus === 'nacht' ? ' aktiv' : '');
-  if (RAEUME.length) zeichneGrundriss(RAEUME);
+  zeichneOverlays();
 }
 
 // ─── Status API ────────────────────────────────────────────────────────────
+// Kompakte Map {raum_id: "belegt" | "HH:MM"}; dank ETag antwortet der Server
+// bei unveraendertem Stand mit 304 und der Browser liefert den Cache-Inhalt.
+var statusText = null;
+
 function aktualisiereStatus() {
   if (!GESCHOSS_ID) return;
-  fetch('/raumbuch/grundriss/status/?geschoss=' + GESCHOSS_ID)
-    .then(function(r) { return r.json(); })
-    .then(function(data) {
-      buchungsStatus = data.raeume || {};
-      if (RAEUME.length) zeichneGrundriss(RAEUME);
+  fetch('/raumbuch/grundriss/status/', {cache: 'no-cache', credentials: 'same-origin'})
+    .then(function(r) { return r.text(); })
+    .then(function(text) {
+      if (text === statusText) return;
+      statusText = text;
+      buchungsStatus = JSON.parse(text);
+      zeichneOverlays();
     }).catch(function() {});
 }
 
+function buchungsStatusFuer(raumId) {
+  var s = buchungsStatus[String(raumId)];
+  return {
+    buchung_aktiv: s === 'belegt',
+    naechste_buchung: s && s !== 'belegt' ? 'ab ' + s : null,
+  };
+}
+
 // ─── SVG Hilfsfunktionen ────────────────────────────────────────────────────
 function el(tag, attrs, children) {
   var e = document.createElementNS('http://www.w3.org/2000/svg', tag);
@@ -82,82 +90,6 @@ function textEl(x, y, str, attrs) {
   return el('text', Object.assign({x: x, y: y, 'font-family': 'Arial,sans-serif'}, attrs), [str]);
 }
 
-// ─── Moebel ────────────────────────────────────────────────────────────────
-function zeichneBueroMoebel(g, x, y, w, h, seite) {
-  var dx = seite === 'nord' ? x + w - 10 - 90 : x + 10;
-  var dy = seite === 'nord' ? y + h - 10 - 50 : y + 10;
-  g.appendChild(rect(dx, dy, 90, 50, '#1e3a5f', {rx: 3}));
-  g.appendChild(rect(dx, dy, 90, 4, '#2563eb', {rx: 0}));
-  g.appendChild(rect(dx + 25, dy + 8, 35, 22, '#0f172a', {rx: 2}));
-  g.appendChild(rect(dx + 38, dy + 30, 10, 4, '#334155'));
-  var cDy = seite === 'nord' ? dy - 34 : dy + 56;
-  g.appendChild(el('ellipse', {cx: dx + 40, cy: cDy + 15, rx: 16, ry: 16, fill: '#374151'}));
-  g.appendChild(rect(dx + 24, seite === 'nord' ? dy - 12 : dy + 52, 32, 10, '#475569', {rx: 4}));
-}
-
-function zeichneKonferenzMoebel(g, x, y, w, h) {
-  var cx = x + w / 2, cy = y + h / 2;
-  var tw = Math.min(w - 40, 200), th = 60;
-  g.appendChild(el('ellipse', {cx: cx, cy: cy, rx: tw/2, ry: th/2, fill: '#1c3a2e', stroke: '#065f46', 'stroke-width': 2}));
-  var anz = Math.min(Math.floor(tw / 30), 8);
-  for (var i = 0; i < anz; i++) {
-    var a = (i / anz) * Math.PI * 2;
-    var sx = cx + (tw/2 + 18) * Math.cos(a);
-    var sy = cy + (th/2 + 18) * Math.sin(a);
-    g.appendChild(el('ellipse', {cx: sx, cy: sy, rx: 12, ry: 12, fill: '#374151'}));
-  }
-}
-
-function zeichneTKMoebel(g, x, y, w, h) {
-  g.appendChild(rect(x + 6, y + 6, w - 12, 38, '#134e4a', {rx: 4}));
-  g.appendChild(el('ellipse', {cx: x + 30, cy: y + 26, rx: 12, ry: 12, fill: '#0f172a', stroke: '#0d9488', 'stroke-width': 2}));
-  g.appendChild(rect(x + 8, y + 50, 50, 25, '#1e293b', {rx: 2}));
-}
-
-function zeichneServerMoebel(g, x, y, w, h) {
-  var rw = 32, rh = h - 20;
-  var rx0 = x + (w - rw * 2 - 10) / 2;
-  [rx0, rx0 + rw + 10].forEach(function(rx2, i) {
-    g.appendChild(rect(rx2, y + 10, rw, rh, '#0f172a', {rx: 2, stroke: '#1e3a5f', 'stroke-width': 1}));
-    for (var j = 0; j < 6; j++) {
-      g.appendChild(rect(rx2 + 3, y + 14 + j * (rh - 10) / 6, rw - 6, 4, i === 0 ? '#16a34a' : '#1d4ed8', {rx: 1}));
-    }
-  });
-}
-
-// ─── Tuer ────────────────────────────────────────────────────────────────
-function zeichneTuer(g, tx, ty, richtung, oeffnungsSeite) {
-  var L = 36, d;
-  if (richtung === 'sued') {
-    if (oeffnungsSeite === 'links') {
-      d = 'M ' + tx + ' ' + ty + ' L ' + tx + ' ' + (ty + L) + ' A ' + L + ' ' + L + ' 0 0 1 ' + (tx + L) + ' ' + ty;
-    } else {
-      d = 'M ' + (tx + L) + ' ' + ty + ' L ' + (tx + L) + ' ' + (ty + L) + ' A ' + L + ' ' + L + ' 0 0 0 ' + tx + ' ' + ty;
-    }
-  } else {
-    if (oeffnungsSeite === 'links') {
-      d = 'M ' + tx + ' ' + ty + ' L ' + tx + ' ' + (ty - L) + ' A ' + L + ' ' + L + ' 0 0 0 ' + (tx + L) + ' ' + ty;
-    } else {
-      d = 'M ' + (tx + L) + ' ' + ty + ' L ' + (tx + L) + ' ' + (ty - L) + ' A ' + L + ' ' + L + ' 0 0 1 ' + tx + ' ' + ty;
-    }
-  }
-  g.appendChild(el('path', {d: d, stroke: '#94a3b8', 'stroke-width': 1.5, fill: 'rgba(148,163,184,0.08)'}));
-  var gapRect = richtung === 'sued'
-    ? {x: tx, y: ty - 1, width: L, height: 5}
-    : {x: tx, y: ty - 4, width: L, height: 5};
-  g.appendChild(rect(gapRect.x, gapRect.y, gapRect.width, gapRect.height, '#0f172a', {stroke: 'none'}));
-}
-
-// ─── Fenster ───────────────────────────────────────────────────────────────
-function zeichneFenster(g, x, y, w, aussenwandSeite) {
-  var wy = aussenwandSeite === 'nord' ? y : y - 7;
-  var slots = 3, sw = (w - 20) / slots;
-  for (var i = 0; i < slots; i++) {
-    var fx = x + 10 + i * sw;
-    g.appendChild(rect(fx, wy, sw - 4, 7, '#bfdbfe', {rx: 1, opacity: 0.7}));
-  }
-}
-
 // ─── Schloss-Indikator ─────────────────────────────────────────────────────
 function zeichneLockIndikator(g, ix, iy, istOffen, istElektronisch) {
   var fill   = istOffen ? '#22c55e' : '#ef4444';
@@ -211,42 +143,35 @@ function zeichneBuchungsOverlay(g, x, y, w, h, aktiv, naechste) {
   }
 }
 
-// ─── Raum zeichnen ─────────────────────────────────────────────────────────
-function zeichneRaum(g, raum, x, y, w, h, zone) {
-  var fill = FARBEN[raum.typ] || FARBE_FALLBACK;
-  var bs   = buchungsStatus[String(raum.id)] || {};
-  var lock  = simuliereLock(raum.id);
-  var istEl = ELEKTRONISCH_TYPEN.includes(raum.typ);
-  var ohneSchloss = KEIN_SCHLOSS.includes(raum.typ);
-
-  var raumEl = rect(x, y, w, h, fill, {stroke: '#0f172a', 'stroke-width': 2, rx: 3, style: 'cursor:pointer'});
-  raumEl.addEventListener('click', (function(r, l, e, b) {
-    return function() { zeigeInfo(r, l, e, b); };
-  })(raum, lock, istEl, bs));
-  g.appendChild(raumEl);
-
-  if (zone === 'nord') zeichneFenster(g, x, y, w, 'nord');
-  if (zone === 'sued') zeichneFenster(g, x, y + h, w, 'sued');
-
-  var mg = el('g', {opacity: '0.9'});
-  if (raum.typ === 'einzelbuero')  zeichneBueroMoebel(mg, x, y, w, h, zone === 'nord' ? 'nord' : 'sued');
-  if (raum.typ === 'konferenz' || raum.typ === 'besprechung') zeichneKonferenzMoebel(mg, x, y, w, h);
-  if (raum.typ === 'teekueche')    zeichneTKMoebel(mg, x, y, w, h);
-  if (raum.typ === 'serverraum' || raum.typ === 'it_verteiler') zeichneServerMoebel(mg, x, y, w, h);
-  g.appendChild(mg);
-
-  var tuerX = x + w/2 - 18;
-  if (zone === 'nord') zeichneTuer(g, tuerX, y + h, 'sued', 'links');
-  if (zone === 'sued') zeichneTuer(g, tuerX, y, 'nord', 'links');
-  if (zone === 'kern') {
-    zeichneTuer(g, tuerX, y, 'nord', 'links');
-    zeichneTuer(g, tuerX, y + h, 'sued', 'rechts');
-  }
-  if (zone === 'grid') zeichneTuer(g, tuerX, y + h, 'sued', 'links');
+// ─── Grundriss laden ───────────────────────────────────────────────────────
+function ladeGrundriss() {
+  fetch('/raumbuch/grundriss/' + GESCHOSS_ID + '/svg/', {cache: 'no-cache', credentials: 'same-origin'})
+    .then(function(r) { return r.text(); })
+    .then(function(text) {
+      var quelle = new DOMParser().parseFromString(text, 'image/svg+xml').documentElement;
+      var svg = document.getElementById('grundrissSvg');
+      while (svg.firstChild) svg.removeChild(svg.firstChild);
+      svg.setAttribute('viewBox', quelle.getAttribute('viewBox'));
+      svg.setAttribute('height', quelle.getAttribute('height'));
+      Array.prototype.slice.call(quelle.childNodes).forEach(function(n) {
+        svg.appendChild(document.importNode(n, true));
+      });
+      svg.querySelectorAll('g.raum').forEach(function(knoten) {
+        var raum = RAEUME_NACH_ID[knoten.getAttribute('data-raum-id')];
+        if (!raum) return;
+        knoten.addEventListener('click', function() {
+          zeigeInfo(raum, simuliereLock(raum.id), ELEKTRONISCH_TYPEN.includes(raum.typ), buchungsStatusFuer(raum.id));
+        });
+      });
+      zeichneOverlays();
+    }).catch(function() {});
+}
 
-  if (!ohneSchloss) {
+// ─── Overlays (Schloss, Ping, Temperatur, Buchung) ─────────────────────────
+function zeichneRaumOverlay(g, raum, x, y, w, h, zone) {
+  if (!KEIN_SCHLOSS.includes(raum.typ)) {
     var liy = zone === 'nord' ? y + h - 10 : (zone === 'sued' ? y + 10 : y + h/2);
-    zeichneLockIndikator(g, x + w - 12, liy, lock, istEl);
+    zeichneLockIndikator(g, x + w - 12, liy, simuliereLock(raum.id), ELEKTRONISCH_TYPEN.includes(raum.typ));
   }
 
   if (IT_TYPEN.includes(raum.typ)) {
@@ -255,92 +180,30 @@ function zeichneRaum(g, raum, x, y, w, h, zone) {
   }
 
   if (BUCHUNGS_TYPEN.includes(raum.typ)) {
+    var bs = buchungsStatusFuer(raum.id);
     zeichneBuchungsOverlay(g, x, y, w, h, bs.buchung_aktiv, bs.naechste_buchung);
   }
-
-  var lblY = zone === 'nord' ? y + h - 14 : y + 14;
-  var lbl = el('text', {x: x + w/2, y: lblY + 4, 'text-anchor': 'middle', 'dominant-baseline': 'middle',
-    'font-size': 10, 'font-weight': 'bold', fill: 'white', 'font-family': 'Arial',
-    'paint-order': 'stroke', stroke: 'rgba(0,0,0,0.5)', 'stroke-width': 3, style: 'pointer-events:none'});
-  lbl.textContent = raum.nummer;
-  g.appendChild(lbl);
-}
-
-// ─── OG Etage (Standard 1-7) ───────────────────────────────────────────────
-function zeichneOGEtage(svg, raeume) {
-  var W = 900, WALL = 7, BUERO_H = 155, KORR = 46, KERN_H = 150;
-  var yN0 = WALL, yN1 = yN0 + BUERO_H;
-  var yKN1 = yN1 + KORR;
-  var yK1 = yKN1 + KERN_H;
-  var yKS1 = yK1 + KORR;
-  var yS1 = yKS1 + BUERO_H;
-  var TOTAL_H = yS1 + WALL;
-
-  svg.setAttribute('viewBox', '0 0 ' + W + ' ' + TOTAL_H);
-  svg.setAttribute('height', TOTAL_H);
-
-  var nord = raeume.filter(function(r) { return r.nummer.match(/A0[1-9]$|A[1-9][0-9]$/); }).sort(function(a, b) { return a.nummer.localeCompare(b.nummer); });
-  var sued = raeume.filter(function(r) { return r.nummer.match(/B0[1-9]$|B[1-9][0-9]$/); }).sort(function(a, b) { return a.nummer.localeCompare(b.nummer); });
-  var kern = raeume.filter(function(r) { return !r.nummer.match(/[AB]0[1-9]$/); }).sort(function(a, b) { return a.nummer.localeCompare(b.nummer); });
-
-  var g = el('g', {});
-
-  g.appendChild(rect(0, 0, W, WALL, '#475569'));
-  g.appendChild(rect(0, yS1, W, WALL, '#475569'));
-  g.appendChild(rect(0, yN1, W, KORR, '#1a2a3a'));
-  g.appendChild(el('text', {x: 8, y: yN1 + KORR/2 + 5, 'font-size': 10, fill: '#334155', 'font-family': 'Arial'})).textContent = 'KORRIDOR NORD';
-  g.appendChild(rect(0, yK1, W, KORR, '#1a2a3a'));
-  g.appendChild(el('text', {x: 8, y: yK1 + KORR/2 + 5, 'font-size': 10, fill: '#334155', 'font-family': 'Arial'})).textContent = 'KORRIDOR SUED';
-
-  var nW = nord.length > 0 ? W / nord.length : W;
-  nord.forEach(function(raum, i) { zeichneRaum(g, raum, i * nW, yN0, nW, BUERO_H, 'nord'); });
-
-  var sW = sued.length > 0 ? W / sued.length : W;
-  sued.forEach(function(raum, i) { zeichneRaum(g, raum, i * sW, yKS1, sW, BUERO_H, 'sued'); });
-
-  var kernBreiten = { konferenz: 300, besprechung: 300, teekueche: 300, wc_herren: 150, wc_damen: 150 };
-  var gesamtKern = kern.reduce(function(s, r) { return s + (kernBreiten[r.typ] || 180); }, 0);
-  var kx = 0;
-  var skalierung = W / Math.max(gesamtKern, 1);
-  kern.forEach(function(raum) {
-    var kw = (kernBreiten[raum.typ] || 180) * skalierung;
-    zeichneRaum(g, raum, kx, yKN1, kw, KERN_H, 'kern');
-    kx += kw;
-  });
-
-  svg.appendChild(g);
-}
-
-// ─── Grid Etage (EG, UG, Reserve) ─────────────────────────────────────────
-function zeichneGridEtage(svg, raeume) {
-  var W = 900;
-  var COLS = 5, RAUMW = W / COLS, RAUMH = 130;
-  var ROWS = Math.ceil(raeume.length / COLS);
-  var TOTAL_H = ROWS * RAUMH + 20;
-
-  svg.setAttribute('viewBox', '0 0 ' + W + ' ' + TOTAL_H);
-  svg.setAttribute('height', TOTAL_H);
-
-  var g = el('g', {});
-  raeume.forEach(function(raum, i) {
-    var col = i % COLS, row = Math.floor(i / COLS);
-    zeichneRaum(g, raum, col * RAUMW, row * RAUMH, RAUMW, RAUMH, 'grid');
-  });
-  svg.appendChild(g);
 }
 
-// ─── Hauptfunktion ─────────────────────────────────────────────────────────
-function zeichneGrundriss(raeume) {
+function zeichneOverlays() {
   var svg = document.getElementById('grundrissSvg');
-  while (svg.firstChild) svg.removeChild(svg.firstChild);
-  if (!raeume || raeume.length === 0) return;
-
-  var isOG = /^[1-9]$/.test(GESCHOSS_KUERZEL);
-  if (isOG) {
-    zeichneOGEtage(svg, raeume);
-  } else {
-    zeichneGridEtage(svg, raeume);
-  }
+  var beschriftung = svg.querySelector('g.beschriftung');
+  if (!beschriftung) return;  // Grundriss noch nicht geladen
+
+  var alt = document.getElementById('grundrissOverlay');
+  if (alt) alt.parentNode.removeChild(alt);
+
+  var g = el('g', {id: 'grundrissOverlay', 'pointer-events': 'none'});
+  svg.querySelectorAll('g.raum').forEach(function(knoten) {
+    var raum = RAEUME_NACH_ID[knoten.getAttribute('data-raum-id')];
+    if (!raum) return;
+    zeichneRaumOverlay(g, raum,
+      parseFloat(knoten.getAttribute('data-x')), parseFloat(knoten.getAttribute('data-y')),
+      parseFloat(knoten.getAttribute('data-w')), parseFloat(knoten.getAttribute('data-h')),
+      knoten.getAttribute('data-zone'));
+  });
+  // Unter die Beschriftung, damit Raumnummern lesbar bleiben
+  svg.insertBefore(g, beschriftung);
 }
 
 // ─── Info Panel ────────────────────────────────────────────────────────────
@@ -438,7 +301,7 @@ document.addEventListener("DOMContentLoaded", function() {
 
   baueSidebar();
   if (RAEUME.length) {
-    zeichneGrundriss(RAEUME);
+    ladeGrundriss();
     aktualisiereStatus();
     setInterval(aktualisiereStatus, 30000);
   }
@@ -0,0 +1,69 @@
+/**
+ * Schichtplan-Job-Status: Zeigt den Fortschritt der KI-Generierung live an.
+ * Fragt alle zwei Sekunden den JSON-Endpoint schichtplan:job_json ab
+ * (Zielfunktion, Schranke, Gap) und hoert auf, sobald der Job fertig oder
+ * fehlgeschlagen ist.
+ */
+document.addEventListener("DOMContentLoaded", function () {
+    var karte = document.getElementById("job-status");
+    if (!karte || !window.fetch) { return; }
+
+    var INTERVALL_MS = 2000;
+
+    function setze(id, wert) {
+        var el = document.getElementById(id);
+        if (el) { el.textContent = wert; }
+    }
+
+    function zahl(wert) {
+        return (wert === null || wert === undefined) ? "–" : Number(wert).toLocaleString("de-DE");
+    }
+
+    function anzeigen(job) {
+        var balken = document.getElementById("job-fortschritt");
+
+        setze("job-status-text", job.status_text);
+        setze("job-loesungen", job.loesungen);
+        setze("job-zielfunktion", zahl(job.zielfunktion));
+        setze("job-schranke", zahl(job.beste_schranke));
+        setze("job-gap", job.gap === null ? "–" : (job.gap * 100).toFixed(2) + " %");
+        setze("job-laufzeit", job.laufzeit_sekunden + " s");
+
+        if (job.gap !== null) {
+            // Gap 100 % -> 5 % Balken, Gap 0 % -> 100 % Balken
+            var prozent = Math.max(5, Math.min(100, 100 - job.gap * 100));
+            balken.style.width = prozent + "%";
+        }
+
+        if (job.status === "fertig" || job.status === "fehler") {
+            balken.classList.remove("progress-bar-animated", "progress-bar-striped");
+            balken.style.width = "100%";
+            balken.classList.add(job.status === "fertig" ? "bg-success" : "bg-danger");
+
+            var meldung = document.getElementById("job-meldung");
+            meldung.textContent = job.meldung;
+            meldung.classList.remove("d-none");
+            meldung.classList.add(job.status === "fertig" ? "alert-success" : "alert-danger");
+            document.getElementById("job-plan-link").classList.remove("d-none");
+            return true;
+        }
+        return false;
+    }
+
+    function abfragen() {
+        fetch(karte.dataset.statusUrl, { credentials: "same-origin", cache: "no-store" })
+            .then(function (antwort) {
+                if (!antwort.ok) { throw new Error(antwort.status); }
+                return antwort.json();
+            })
+            .then(function (job) {
+                if (!anzeigen(job)) { setTimeout(abfragen, INTERVALL_MS); }
+            })
+            .catch(function () {
+                // Netzwerkfehler: spaeter erneut versuchen
+                setTimeout(abfragen, INTERVALL_MS);
+            });
+    }
+
+    abfragen();
+});
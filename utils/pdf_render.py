@@ -0,0 +1,243 @@
+"""PDF-Rendering (WeasyPrint) in vorgewaermten Worker-Prozessen mit Datei-Cache.
+
+Bisher lief jedes HTML(...).write_pdf() im Request-Thread und zahlte
+Font-Suche (fontconfig) und Pango-Initialisierung jedes Mal neu. Dieses
+Modul bietet stattdessen:
+
+  - einen kleinen Prozess-Pool (ProcessPoolExecutor, spawn) mit warmen
+    WeasyPrint-Workern: Fonts werden beim Start einmal geladen
+    (FontConfiguration + Aufwaerm-Render), optionale Stylesheets aus
+    PDF_RENDER_STYLESHEETS einmal geparst
+  - einen Datei-Cache: Schluessel ist SHA-256 ueber gerendertes HTML,
+    base_url und Template-Version – ein unveraenderter Bericht wird beim
+    erneuten Download von der Platte geliefert statt neu gerendert
+
+Nur das ungesignierte PDF wird gecacht; Signaturen kommen danach dazu.
+Der Cache ist standardmaessig aus (PDF-Dateien liegen unverschluesselt auf
+der Platte). Berichte mit personenbezogenen Daten (DSGVO-Auskunft, Wochen-
+und Monatsbericht) rufen render_pdf(..., cache=False) auf und werden auch
+bei aktivem Cache nie geschrieben.
+
+Konfiguration (settings.py / .env):
+    PDF_RENDER_WORKER   – Anzahl Worker-Prozesse (0 = im Request-Thread rendern)
+    PDF_RENDER_TIMEOUT  – max. Sekunden je Render
+    PDF_RENDER_VERSION  – bei Aenderung von CSS/Fonts/statischen Assets erhoehen
+    PDF_CACHE_DIR       – Cache-Verzeichnis (leer = Cache aus)
+    PDF_CACHE_TAGE      – Cache-Dateien werden nach so vielen Tagen entfernt
+
+Verwendung:
+    from utils.pdf_render import render_pdf
+    pdf = render_pdf(html_string, base_url=request.build_absolute_uri("/"))
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Worker-Prozesse werden nach so vielen Renders ersetzt (WeasyPrint haelt Speicher)
+RENDERS_PRO_WORKER = 200
+# Anteil der Schreibvorgaenge, nach denen der Cache aufgeraeumt wird
+BEREINIGUNG_WAHRSCHEINLICHKEIT = 0.01
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# Zustand im Worker-Prozess
+_font_config = None
+_stylesheets = []
+
+
+# ---------------------------------------------------------------------------
+# Worker-Prozess
+# ---------------------------------------------------------------------------
+
+def _worker_start(stylesheet_pfade):
+    """Initialisierung eines Workers: Fonts und Stylesheets einmal laden."""
+    global _font_config, _stylesheets
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    _font_config = FontConfiguration()
+    _stylesheets = [
+        CSS(filename=pfad, font_config=_font_config)
+        for pfad in stylesheet_pfade
+        if os.path.exists(pfad)
+    ]
+    # Aufwaermen: fontconfig/Pango laden, bevor der erste echte Auftrag kommt
+    HTML(string="<p>PRIMA</p>").write_pdf(font_config=_font_config)
+
+
+def _render(html_string, base_url):
+    """Rendert HTML zu PDF (im Worker oder als Fallback im aufrufenden Prozess)."""
+    from weasyprint import HTML
+
+    return HTML(string=html_string, base_url=base_url).write_pdf(
+        stylesheets=_stylesheets or None,
+        font_config=_font_config,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+def _stylesheet_pfade():
+    return list(getattr(settings, "PDF_RENDER_STYLESHEETS", []))
+
+
+def _get_pool():
+    """Prozessweiter Pool, nach fork (Gunicorn) neu angelegt."""
+    global _pool, _pool_pid
+    anzahl = getattr(settings, "PDF_RENDER_WORKER", 2)
+    if anzahl <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=anzahl,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_start,
+                initargs=(_stylesheet_pfade(),),
+                max_tasks_per_child=RENDERS_PRO_WORKER,
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _pool_verwerfen(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def _cache_dir():
+    return getattr(settings, "PDF_CACHE_DIR", "")
+
+
+def cache_schluessel(html_string, base_url="", version=""):
+    """SHA-256 ueber Template-Version, base_url und gerendertes HTML."""
+    h = hashlib.sha256()
+    for teil in (getattr(settings, "PDF_RENDER_VERSION", "1"), version, base_url or ""):
+        h.update(str(teil).encode("utf-8"))
+        h.update(b"\0")
+    h.update(html_string.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cache_pfad(schluessel):
+    return os.path.join(_cache_dir(), schluessel[:2], f"{schluessel}.pdf")
+
+
+def _cache_lesen(schluessel):
+    try:
+        with open(_cache_pfad(schluessel), "rb") as datei:
+            return datei.read()
+    except OSError:
+        return None
+
+
+def _cache_schreiben(schluessel, pdf):
+    pfad = _cache_pfad(schluessel)
+    try:
+        os.makedirs(os.path.dirname(pfad), exist_ok=True)
+        # Atomar: parallele Worker sehen nie eine halb geschriebene Datei
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(pfad), suffix=".tmp")
+        with os.fdopen(fd, "wb") as datei:
+            datei.write(pdf)
+        os.replace(tmp, pfad)
+    except OSError as exc:
+        logger.warning("PDF-Cache nicht schreibbar (%s): %s", pfad, exc)
+        return
+    if random.random() < BEREINIGUNG_WAHRSCHEINLICHKEIT:
+        cache_bereinigen()
+
+
+def cache_bereinigen():
+    """Entfernt Cache-Dateien, die aelter als PDF_CACHE_TAGE sind.
+
+    Returns:
+        Anzahl geloeschter Dateien
+    """
+    verzeichnis = _cache_dir()
+    if not verzeichnis or not os.path.isdir(verzeichnis):
+        return 0
+    grenze = time.time() - getattr(settings, "PDF_CACHE_TAGE", 30) * 86400
+    geloescht = 0
+    for wurzel, _dirs, dateien in os.walk(verzeichnis):
+        for name in dateien:
+            pfad = os.path.join(wurzel, name)
+            try:
+                if os.path.getmtime(pfad) < grenze:
+                    os.remove(pfad)
+                    geloescht += 1
+            except OSError:
+                continue
+    if geloescht:
+        logger.info("PDF-Cache: %d alte Dateien entfernt", geloescht)
+    return geloescht
+
+
+# ---------------------------------------------------------------------------
+# Oeffentliche Schnittstelle
+# ---------------------------------------------------------------------------
+
+def render_pdf(html_string, base_url=None, version="", cache=True):
+    """Rendert HTML zu PDF-Bytes – aus dem Cache, im Worker-Pool oder lokal.
+
+    Args:
+        html_string: Fertig gerendertes HTML (render_to_string)
+        base_url: Basis fuer relative URLs (Bilder, CSS)
+        version: Optionale Template-Version (z.B. Template-Name + Stand)
+        cache: False fuer personenbezogene Berichte – nie auf die Platte schreiben
+
+    Returns:
+        bytes (PDF)
+    """
+    schluessel = None
+    if cache and _cache_dir():
+        schluessel = cache_schluessel(html_string, base_url, version)
+        pdf = _cache_lesen(schluessel)
+        if pdf is not None:
+            return pdf
+
+    pool = _get_pool()
+    if pool is None:
+        pdf = _render(html_string, base_url)
+    else:
+        future = pool.submit(_render, html_string, base_url)
+        try:
+            pdf = future.result(timeout=getattr(settings, "PDF_RENDER_TIMEOUT", 60))
+        except FutureTimeoutError:
+            # Pool ueberlastet oder Render haengt – Auftrag verwerfen (falls noch
+            # nicht gestartet) und lokal rendern statt mit 500 abzubrechen
+            future.cancel()
+            logger.warning("PDF-Worker-Pool: Timeout – rendere im Request-Prozess")
+            pdf = _render(html_string, base_url)
+        except BrokenProcessPool:
+            # Worker abgestuerzt – Pool neu anlegen lassen, diesmal lokal rendern
+            logger.warning("PDF-Worker-Pool defekt – rendere im Request-Prozess")
+            _pool_verwerfen(pool)
+            pdf = _render(html_string, base_url)
+
+    if schluessel:
+        _cache_schreiben(schluessel, pdf)
+    return pdf
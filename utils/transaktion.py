@@ -0,0 +1,52 @@
+"""Transaktion mit sofortiger Schreibsperre (Claim-/Pruef-und-Schreib-Muster).
+
+Auf PostgreSQL sperren select_for_update() bzw. Constraints die betroffenen
+Zeilen; schreibtransaktion() ist dort ein normales transaction.atomic().
+
+SQLite kennt select_for_update() nicht. Ein normales BEGIN (DEFERRED) holt
+die Schreibsperre erst beim ersten Schreiben – zwei Prozesse koennen also
+dieselbe Zeile lesen und beide die Pruefung bestehen. schreibtransaktion()
+startet die Transaktion dort mit BEGIN IMMEDIATE: parallele Aufrufer warten
+(bis zum SQLite-Timeout), statt gleichzeitig zu lesen.
+
+Innerhalb einer bereits offenen Transaktion waere nur ein SAVEPOINT moeglich,
+ohne diese Sperre; auf SQLite wird der Aufruf dort deshalb abgelehnt.
+
+Verwendung:
+    from utils.transaktion import schreibtransaktion
+
+    with schreibtransaktion():
+        job = Job.objects.filter(status="wartend").first()
+        ...
+"""
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+
+@contextmanager
+def schreibtransaktion():
+    """transaction.atomic(); auf SQLite mit BEGIN IMMEDIATE.
+
+    Raises:
+        TransactionManagementError: SQLite und bereits offene Transaktion
+    """
+    if connection.vendor != "sqlite":
+        with transaction.atomic():
+            yield
+        return
+    if connection.in_atomic_block:
+        raise transaction.TransactionManagementError(
+            "schreibtransaktion() darf auf SQLite nicht in einer offenen "
+            "Transaktion laufen (keine IMMEDIATE-Sperre)."
+        )
+    # transaction_mode wird erst beim Verbindungsaufbau gesetzt
+    connection.ensure_connection()
+    modus = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic():
+            connection.transaction_mode = modus
+            yield
+    finally:
+        connection.transaction_mode = modus
@@ -57,7 +57,7 @@ def _auto_signiere_gutschrift(gutschrift, request):
     Schlaegt still fehl – unterbricht nie die Einreichung.
     """
     try:
-        from weasyprint import HTML
+        from utils.pdf_render import render_pdf
         from django.template.loader import render_to_string
         from signatur.services import signiere_pdf
 
@@ -85,10 +85,7 @@ def _auto_signiere_gutschrift(gutschrift, request):
             ctx,
             request=request,
         )
-        pdf = HTML(
-            string=html_string,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        pdf = render_pdf(html_string, base_url=request.build_absolute_uri())
 
         antragsteller_user = gutschrift.erstellt_von.user if gutschrift.erstellt_von else request.user
         dateiname = f"ZGS-{gutschrift.pk}_{feier.titel}.pdf".replace(" ", "_")
@@ -543,7 +540,7 @@ def gutschrift_pdf_download(request, pk):
 
     # Fallback: frisch erzeugen und signieren
     try:
-        from weasyprint import HTML
+        from utils.pdf_render import render_pdf
         from django.template.loader import render_to_string
 
         teilnehmer = gutschrift.teilnehmer_bestaetigt()
@@ -570,10 +567,7 @@ def gutschrift_pdf_download(request, pk):
             ctx,
             request=request,
         )
-        pdf_bytes = HTML(
-            string=html_string,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        pdf_bytes = render_pdf(html_string, base_url=request.build_absolute_uri())
     except Exception as exc:
         logger.error("WeasyPrint-Fehler bei Gutschrift pk=%s: %s", gutschrift.pk, exc)
         messages.error(request, "PDF konnte nicht erzeugt werden.")
@@ -6,6 +6,7 @@ from .models import (
     WorkflowInstance,
     WorkflowTask,
     WorkflowTransition,
+    WorkflowOutbox,
     ProzessAntrag,
 )
 
@@ -502,3 +503,44 @@ class ProzessAntragAdmin(admin.ModelAdmin):
             {"fields": ["workflow_instance"]},
         ),
     ]
+
+
+@admin.register(WorkflowOutbox)
+class WorkflowOutboxAdmin(admin.ModelAdmin):
+    """Admin fuer die Workflow-Outbox (inkl. Dead Letters)."""
+
+    list_display = [
+        "id",
+        "aktion",
+        "instance",
+        "status",
+        "versuche",
+        "naechster_versuch_am",
+        "erstellt_am",
+    ]
+    list_filter = ["status", "aktion", "erstellt_am"]
+    search_fields = ["idempotenz_schluessel", "instance__id", "letzter_fehler"]
+    readonly_fields = [
+        "instance",
+        "step",
+        "aktion",
+        "payload",
+        "idempotenz_schluessel",
+        "versuche",
+        "gesperrt_am",
+        "letzter_fehler",
+        "erstellt_am",
+        "erledigt_am",
+    ]
+    actions = ["erneut_einreihen"]
+
+    @admin.action(description="Erneut einreihen (Versuche zuruecksetzen)")
+    def erneut_einreihen(self, request, queryset):
+        from django.utils import timezone
+
+        anzahl = queryset.exclude(status=WorkflowOutbox.STATUS_IN_ARBEIT).update(
+            status=WorkflowOutbox.STATUS_WARTEND,
+            versuche=0,
+            naechster_versuch_am=timezone.now(),
+        )
+        self.message_user(request, f"{anzahl} Eintrag/Eintraege erneut eingereiht.")
@@ -0,0 +1,148 @@
+"""
+Management-Command: workflow_outbox_worker
+
+Arbeitet die WorkflowOutbox ab (E-Mail, Webhook, Matrix, DMS-Archivierung
+aus automatischen Workflow-Schritten). complete_task() schreibt diese
+Aktionen nur noch in die Outbox – langsame SMTP- oder Synapse-Aufrufe
+halten damit keine Zeilensperren und keinen Gunicorn-Thread mehr.
+
+Ablauf:
+  1. Faellige Eintraege per select_for_update(skip_locked=True) claimen
+     (mehrere Worker parallel moeglich; SQLite: unter BEGIN IMMEDIATE,
+     dort wirkt select_for_update nicht)
+  2. Ausfuehren ausserhalb der Transaktion
+  3. Erfolg → erledigt; Fehler → erneuter Versuch mit exponentiellem
+     Backoff; nach max_versuche oder bei Dauerfehler → Dead Letter
+     (Status "fehlgeschlagen", im Admin erneut einreihbar)
+
+Eintraege, die laenger als SPERRE_TIMEOUT "in Arbeit" haengen (Worker
+abgestuerzt), werden wieder freigegeben. Der Idempotenz-Schluessel
+verhindert dabei doppelte Zustellung bei der Gegenstelle.
+
+Aufruf:
+    python manage.py workflow_outbox_worker            # Endlosschleife
+    python manage.py workflow_outbox_worker --einmal   # nur faellige Eintraege abarbeiten
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from workflow.models import WorkflowOutbox
+from utils.transaktion import schreibtransaktion
+from workflow.outbox import OutboxDauerfehler, fuehre_aus, naechster_versuch
+
+logger = logging.getLogger(__name__)
+
+# Nach dieser Zeit gilt ein "in Arbeit"-Eintrag als verwaist
+SPERRE_TIMEOUT = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = "Fuehrt ausstehende Workflow-Aktionen (Outbox) mit Wiederholung aus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--einmal",
+            action="store_true",
+            help="Nur die aktuell faelligen Eintraege abarbeiten und dann beenden.",
+        )
+        parser.add_argument(
+            "--intervall",
+            type=float,
+            default=2.0,
+            help="Wartezeit in Sekunden, wenn nichts ansteht (Standard: 2).",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=20,
+            help="Anzahl Eintraege pro Claim (Standard: 20).",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Workflow-Outbox-Worker gestartet.\n")
+        self.stdout.flush()
+
+        while True:
+            close_old_connections()
+            self._verwaiste_freigeben()
+            eintraege = self._claimen(options["batch"])
+            for eintrag in eintraege:
+                self._bearbeite(eintrag)
+            if eintraege:
+                continue
+            if options["einmal"]:
+                break
+            time.sleep(options["intervall"])
+
+    def _verwaiste_freigeben(self):
+        freigegeben = WorkflowOutbox.objects.filter(
+            status=WorkflowOutbox.STATUS_IN_ARBEIT,
+            gesperrt_am__lt=timezone.now() - SPERRE_TIMEOUT,
+        ).update(status=WorkflowOutbox.STATUS_WARTEND, gesperrt_am=None)
+        if freigegeben:
+            logger.warning("Outbox: %d verwaiste Eintraege wieder freigegeben", freigegeben)
+
+    def _claimen(self, anzahl):
+        """Claimt faellige Eintraege (parallele Worker ueberspringen gesperrte)."""
+        jetzt = timezone.now()
+        with schreibtransaktion():
+            eintraege = list(
+                WorkflowOutbox.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    status=WorkflowOutbox.STATUS_WARTEND,
+                    naechster_versuch_am__lte=jetzt,
+                )
+                .order_by("naechster_versuch_am")[:anzahl]
+            )
+            if eintraege:
+                WorkflowOutbox.objects.filter(pk__in=[e.pk for e in eintraege]).update(
+                    status=WorkflowOutbox.STATUS_IN_ARBEIT, gesperrt_am=jetzt,
+                )
+        return eintraege
+
+    def _bearbeite(self, eintrag):
+        versuche = eintrag.versuche + 1
+        try:
+            fuehre_aus(eintrag)
+        except Exception as exc:
+            dauerfehler = isinstance(exc, OutboxDauerfehler)
+            if dauerfehler or versuche >= eintrag.max_versuche:
+                WorkflowOutbox.objects.filter(pk=eintrag.pk).update(
+                    status=WorkflowOutbox.STATUS_FEHLGESCHLAGEN,
+                    versuche=versuche,
+                    gesperrt_am=None,
+                    letzter_fehler=str(exc)[:2000],
+                )
+                logger.error(
+                    "Outbox #%s (%s) endgueltig fehlgeschlagen nach %d Versuch(en): %s",
+                    eintrag.pk, eintrag.aktion, versuche, exc,
+                )
+                self.stdout.write(f"[OUTBOX {eintrag.pk}] Dead Letter: {exc}\n")
+            else:
+                WorkflowOutbox.objects.filter(pk=eintrag.pk).update(
+                    status=WorkflowOutbox.STATUS_WARTEND,
+                    versuche=versuche,
+                    gesperrt_am=None,
+                    naechster_versuch_am=naechster_versuch(versuche),
+                    letzter_fehler=str(exc)[:2000],
+                )
+                logger.warning(
+                    "Outbox #%s (%s) Versuch %d fehlgeschlagen: %s",
+                    eintrag.pk, eintrag.aktion, versuche, exc,
+                )
+        else:
+            WorkflowOutbox.objects.filter(pk=eintrag.pk).update(
+                status=WorkflowOutbox.STATUS_ERLEDIGT,
+                versuche=versuche,
+                gesperrt_am=None,
+                erledigt_am=timezone.now(),
+                letzter_fehler="",
+            )
+            self.stdout.write(f"[OUTBOX {eintrag.pk}] {eintrag.aktion} erledigt.\n")
+        self.stdout.flush()
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0015_alter_workflowstep_aktion_typ'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aktion', models.CharField(choices=[('email', 'E-Mail'), ('webhook', 'Webhook'), ('matrix', 'Matrix-Nachricht'), ('archivieren', 'DMS-Archivierung')], max_length=20, verbose_name='Aktion')),
+                ('payload', models.JSONField(default=dict, help_text='Fertig aufgeloeste Parameter der Aktion (Platzhalter bereits ersetzt)', verbose_name='Payload')),
+                ('idempotenz_schluessel', models.CharField(max_length=100, unique=True, verbose_name='Idempotenz-Schluessel')),
+                ('status', models.CharField(choices=[('wartend', 'Wartend'), ('in_arbeit', 'In Arbeit'), ('erledigt', 'Erledigt'), ('fehlgeschlagen', 'Endgueltig fehlgeschlagen (Dead Letter)')], default='wartend', max_length=20, verbose_name='Status')),
+                ('versuche', models.PositiveIntegerField(default=0, verbose_name='Versuche')),
+                ('max_versuche', models.PositiveIntegerField(default=8, verbose_name='Max. Versuche')),
+                ('naechster_versuch_am', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Naechster Versuch am')),
+                ('gesperrt_am', models.DateTimeField(blank=True, help_text='Zeitpunkt der Uebernahme durch den Worker', null=True, verbose_name='Gesperrt am')),
+                ('letzter_fehler', models.TextField(blank=True, verbose_name='Letzter Fehler')),
+                ('erstellt_am', models.DateTimeField(auto_now_add=True, verbose_name='Erstellt am')),
+                ('erledigt_am', models.DateTimeField(blank=True, null=True, verbose_name='Erledigt am')),
+                ('instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='workflow.workflowinstance', verbose_name='Workflow-Instanz')),
+                ('step', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox', to='workflow.workflowstep', verbose_name='Workflow-Schritt')),
+            ],
+            options={
+                'verbose_name': 'Workflow-Outbox-Eintrag',
+                'verbose_name_plural': 'Workflow-Outbox',
+                'ordering': ['naechster_versuch_am'],
+                'indexes': [models.Index(fields=['status', 'naechster_versuch_am'], name='workflow_wo_status_d61826_idx')],
+            },
+        ),
+    ]
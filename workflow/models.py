@@ -1057,3 +1057,106 @@ class WorkflowTrigger(models.Model):
             if obj is None:
                 return None
         return obj
+
+
+class WorkflowOutbox(models.Model):
+    """Ausstehende Seiteneffekte automatischer Workflow-Schritte (Transactional Outbox).
+
+    Auto-Aktionen mit externem Aufruf (E-Mail, Webhook, Matrix, DMS-Archivierung)
+    werden nicht mehr im Request ausgefuehrt, sondern in derselben Transaktion
+    wie der Workflow-Fortschritt hier eingetragen. Der Worker
+    (manage.py workflow_outbox_worker) arbeitet sie nach dem Commit ab –
+    mit Wiederholung (exponentielles Backoff) und Dead-Letter-Status.
+
+    Der Idempotenz-Schluessel wird an die Gegenstelle weitergereicht
+    (Matrix-txn_id, Webhook-Header, Message-ID), damit eine Wiederholung
+    nach einem Absturz keine doppelte Zustellung erzeugt.
+    """
+
+    STATUS_WARTEND = "wartend"
+    STATUS_IN_ARBEIT = "in_arbeit"
+    STATUS_ERLEDIGT = "erledigt"
+    STATUS_FEHLGESCHLAGEN = "fehlgeschlagen"
+
+    STATUS_CHOICES = [
+        (STATUS_WARTEND, "Wartend"),
+        (STATUS_IN_ARBEIT, "In Arbeit"),
+        (STATUS_ERLEDIGT, "Erledigt"),
+        (STATUS_FEHLGESCHLAGEN, "Endgueltig fehlgeschlagen (Dead Letter)"),
+    ]
+
+    AKTION_EMAIL = "email"
+    AKTION_WEBHOOK = "webhook"
+    AKTION_MATRIX = "matrix"
+    AKTION_ARCHIVIEREN = "archivieren"
+
+    AKTION_CHOICES = [
+        (AKTION_EMAIL, "E-Mail"),
+        (AKTION_WEBHOOK, "Webhook"),
+        (AKTION_MATRIX, "Matrix-Nachricht"),
+        (AKTION_ARCHIVIEREN, "DMS-Archivierung"),
+    ]
+
+    instance = models.ForeignKey(
+        WorkflowInstance,
+        on_delete=models.CASCADE,
+        related_name="outbox",
+        verbose_name="Workflow-Instanz",
+    )
+    step = models.ForeignKey(
+        WorkflowStep,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="outbox",
+        verbose_name="Workflow-Schritt",
+    )
+    aktion = models.CharField(
+        max_length=20,
+        choices=AKTION_CHOICES,
+        verbose_name="Aktion",
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name="Payload",
+        help_text="Fertig aufgeloeste Parameter der Aktion (Platzhalter bereits ersetzt)",
+    )
+    idempotenz_schluessel = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Idempotenz-Schluessel",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_WARTEND,
+        verbose_name="Status",
+    )
+    versuche = models.PositiveIntegerField(default=0, verbose_name="Versuche")
+    max_versuche = models.PositiveIntegerField(default=8, verbose_name="Max. Versuche")
+    naechster_versuch_am = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Naechster Versuch am",
+    )
+    gesperrt_am = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Gesperrt am",
+        help_text="Zeitpunkt der Uebernahme durch den Worker",
+    )
+    letzter_fehler = models.TextField(blank=True, verbose_name="Letzter Fehler")
+    erstellt_am = models.DateTimeField(auto_now_add=True, verbose_name="Erstellt am")
+    erledigt_am = models.DateTimeField(
+        null=True, blank=True, verbose_name="Erledigt am"
+    )
+
+    class Meta:
+        ordering = ["naechster_versuch_am"]
+        verbose_name = "Workflow-Outbox-Eintrag"
+        verbose_name_plural = "Workflow-Outbox"
+        indexes = [
+            models.Index(fields=["status", "naechster_versuch_am"]),
+        ]
+
+    def __str__(self):
+        return f"Outbox #{self.id}: {self.get_aktion_display()} ({self.get_status_display()})"
@@ -0,0 +1,172 @@
+"""Workflow-Outbox: Seiteneffekte automatischer Schritte entkoppelt ausfuehren.
+
+- einreihen(): schreibt eine Aktion in WorkflowOutbox (in der laufenden
+  Transaktion des Aufrufers – Rollback verwirft auch die Aktion)
+- fuehre_aus(): fuehrt einen Eintrag aus (nur vom Worker aufgerufen)
+- naechster_versuch(): exponentielles Backoff fuer Wiederholungen
+
+Worker: python manage.py workflow_outbox_worker
+"""
+import json
+import logging
+import random
+import urllib.request
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import WorkflowOutbox
+
+logger = logging.getLogger(__name__)
+
+# Backoff: 30 s, 60 s, 120 s, ... hoechstens 1 h zwischen zwei Versuchen
+BACKOFF_BASIS_SEKUNDEN = 30
+BACKOFF_MAX_SEKUNDEN = 3600
+
+
+class OutboxDauerfehler(Exception):
+    """Fehler, den eine Wiederholung nicht behebt (→ sofort Dead Letter)."""
+
+
+def einreihen(instance, step, aktion, payload, idempotenz_schluessel=None):
+    """Reiht eine Aktion in die Outbox ein.
+
+    Ein bereits vorhandener Idempotenz-Schluessel wird nicht erneut
+    eingetragen. Ohne Schluessel wird ein eindeutiger erzeugt.
+
+    Returns:
+        WorkflowOutbox-Eintrag
+    """
+    if not idempotenz_schluessel:
+        idempotenz_schluessel = f"wf{instance.pk}-s{step.pk if step else 0}-{uuid.uuid4().hex}"
+    eintrag, angelegt = WorkflowOutbox.objects.get_or_create(
+        idempotenz_schluessel=idempotenz_schluessel,
+        defaults={
+            "instance": instance,
+            "step": step,
+            "aktion": aktion,
+            "payload": payload,
+        },
+    )
+    if angelegt:
+        logger.info(
+            "Outbox: %s eingereiht (Instanz %s, Eintrag %s)", aktion, instance.pk, eintrag.pk
+        )
+    return eintrag
+
+
+def naechster_versuch(versuche):
+    """Zeitpunkt des naechsten Versuchs nach `versuche` Fehlversuchen."""
+    sekunden = min(BACKOFF_BASIS_SEKUNDEN * 2 ** max(versuche - 1, 0), BACKOFF_MAX_SEKUNDEN)
+    # Etwas Streuung, damit nach einem Ausfall nicht alles gleichzeitig wiederholt
+    sekunden *= random.uniform(1.0, 1.2)
+    return timezone.now() + timedelta(seconds=sekunden)
+
+
+def fuehre_aus(eintrag):
+    """Fuehrt einen Outbox-Eintrag aus. Wirft bei Fehlern eine Exception."""
+    ausfuehrer = {
+        WorkflowOutbox.AKTION_EMAIL: _email,
+        WorkflowOutbox.AKTION_WEBHOOK: _webhook,
+        WorkflowOutbox.AKTION_MATRIX: _matrix,
+        WorkflowOutbox.AKTION_ARCHIVIEREN: _archivieren,
+    }.get(eintrag.aktion)
+    if ausfuehrer is None:
+        raise OutboxDauerfehler(f"Unbekannte Outbox-Aktion '{eintrag.aktion}'")
+    ausfuehrer(eintrag)
+
+
+def _email(eintrag):
+    from django.core.mail import EmailMessage
+
+    payload = eintrag.payload
+    empfaenger = payload.get("empfaenger") or []
+    if not empfaenger:
+        raise OutboxDauerfehler("Kein Empfaenger angegeben")
+
+    EmailMessage(
+        subject=payload.get("betreff", ""),
+        body=payload.get("text", ""),
+        from_email=payload.get("absender") or None,
+        to=empfaenger,
+        # Gleiche Message-ID bei Wiederholung – Mailserver/Clients erkennen Duplikate
+        headers={"Message-ID": f"<{eintrag.idempotenz_schluessel}@prima.workflow>"},
+    ).send(fail_silently=False)
+    logger.info(
+        "Outbox E-Mail gesendet an %s: %s (Instanz %s)",
+        empfaenger, payload.get("betreff", ""), eintrag.instance_id,
+    )
+
+
+def _webhook(eintrag):
+    import requests
+
+    payload = eintrag.payload
+    url = payload.get("url", "")
+    if not url:
+        raise OutboxDauerfehler("Keine Webhook-URL angegeben")
+    method = payload.get("method", "POST")
+    headers = {"Idempotency-Key": eintrag.idempotenz_schluessel}
+
+    if method == "POST":
+        response = requests.post(url, json=payload.get("data", {}), headers=headers, timeout=10)
+    elif method == "GET":
+        response = requests.get(url, params=payload.get("data", {}), headers=headers, timeout=10)
+    else:
+        raise OutboxDauerfehler(f"Nicht unterstuetzte Webhook-Methode '{method}'")
+    response.raise_for_status()
+    logger.info(
+        "Outbox Webhook %s erfolgreich: %s - Status: %s", method, url, response.status_code
+    )
+
+
+def _matrix(eintrag):
+    from django.conf import settings
+
+    payload = eintrag.payload
+    raum_id = payload.get("raum_id", "")
+    bot_token = getattr(settings, "MATRIX_BOT_TOKEN", "")
+    homeserver = (
+        getattr(settings, "MATRIX_HOMESERVER_INTERNAL_URL", "")
+        or getattr(settings, "MATRIX_HOMESERVER_URL", "")
+    ).rstrip("/")
+    if not raum_id or not bot_token or not homeserver:
+        raise OutboxDauerfehler("Matrix nicht konfiguriert oder kein Raum angegeben")
+
+    # txn_id = Idempotenz-Schluessel: Synapse verwirft Wiederholungen mit gleicher txn_id
+    url = (
+        f"{homeserver}/_matrix/client/v3/rooms/{raum_id}"
+        f"/send/m.room.message/{eintrag.idempotenz_schluessel}"
+    )
+    daten = json.dumps({"msgtype": "m.text", "body": payload.get("nachricht", "")}).encode("utf-8")
+    req = urllib.request.Request(
+        url,
+        data=daten,
+        headers={
+            "Authorization": f"Bearer {bot_token}",
+            "Content-Type": "application/json",
+        },
+        method="PUT",
+    )
+    with urllib.request.urlopen(req, timeout=10):
+        pass
+    logger.info(
+        "Outbox Matrix-Nachricht gesendet an %s (Instanz %s)", raum_id, eintrag.instance_id
+    )
+
+
+def _archivieren(eintrag):
+    content_object = eintrag.instance.content_object
+    kategorie_id = eintrag.payload.get("kategorie_id")
+    if content_object is None:
+        raise OutboxDauerfehler("Verknuepftes Objekt existiert nicht mehr")
+    if not hasattr(content_object, "archiviere_in_dms"):
+        raise OutboxDauerfehler(
+            f"{type(content_object).__name__} hat keine archiviere_in_dms-Methode"
+        )
+    content_object.archiviere_in_dms(kategorie_id)
+    logger.info(
+        "DMS-Archivierung OK: %s pk=%s -> Kategorie %s",
+        type(content_object).__name__, content_object.pk, kategorie_id,
+    )
@@ -20,7 +20,14 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.utils import timezone
 
-from .models import WorkflowInstance, WorkflowStep, WorkflowTask, WorkflowTransition
+from .models import (
+    WorkflowInstance,
+    WorkflowOutbox,
+    WorkflowStep,
+    WorkflowTask,
+    WorkflowTransition,
+)
+from .outbox import einreihen
 
 logger = logging.getLogger(__name__)
 
@@ -86,14 +93,11 @@ class WorkflowEngine:
         Beispiel:
             stelle = engine.resolve_rolle("direkte_fuehrungskraft", antragsteller.stelle)
         """
-        from hr.models import Stelle, OrgEinheit
+        from hr.org_graph import OrgGraph
 
         # Feste Rollen
-        if rolle == "hr":
-            return Stelle.objects.filter(kuerzel__istartswith="hr").first()
-
-        if rolle == "gf":
-            return Stelle.objects.filter(kuerzel__istartswith="gf").first()
+        if rolle in ("hr", "gf"):
+            return OrgGraph.als_stelle(OrgGraph.aktuell().erste_stelle_mit_praefix(rolle))
 
         # Antragsteller
         if rolle == "antragsteller":
@@ -250,6 +254,11 @@ class WorkflowEngine:
 
         Wird aufgerufen wenn schritt_typ == "auto".
 
+        Aktionen mit externem Aufruf (email, webhook, verteilen, archivieren)
+        werden nur in die WorkflowOutbox eingetragen und nach dem Commit vom
+        workflow_outbox_worker ausgefuehrt – der Aufrufer (z.B. complete_task)
+        schreibt dadurch nur in die Datenbank.
+
         Args:
             step: WorkflowStep Instanz
             instance: WorkflowInstance
@@ -280,13 +289,12 @@ class WorkflowEngine:
             self._loeschfreigabe_setzen(step, instance, content_object)
 
     def _archiviere_in_dms(self, step, instance, content_object):
-        """Archiviert das verknuepfte Objekt in der angegebenen DMS-Kategorie.
+        """Reiht die Archivierung in der angegebenen DMS-Kategorie in die Outbox ein.
 
         Erwartet in step.auto_config: {"kategorie_id": <int>}
 
-        Unterstuetzte content_object-Typen:
-          - dms.Dokument        → Kategorie des bestehenden Dokuments aendern
-          - alle anderen        → archiviere_in_dms(kategorie_id)-Methode aufrufen
+        Der Worker ruft archiviere_in_dms(kategorie_id) am verknuepften
+        Objekt auf (siehe workflow/outbox.py).
         """
         config = step.auto_config or {}
         kategorie_id = config.get("kategorie_id")
@@ -295,23 +303,13 @@ class WorkflowEngine:
                 "archivieren-Schritt %s hat keine kategorie_id in auto_config", step.pk
             )
             return
-        try:
-            if hasattr(content_object, "archiviere_in_dms"):
-                content_object.archiviere_in_dms(kategorie_id)
-                logger.info(
-                    "DMS-Archivierung OK: %s pk=%s -> Kategorie %s",
-                    type(content_object).__name__, content_object.pk, kategorie_id,
-                )
-            else:
-                logger.warning(
-                    "DMS-Archivierung: %s hat keine archiviere_in_dms-Methode",
-                    type(content_object).__name__,
-                )
-        except Exception as exc:
-            logger.error(
-                "DMS-Archivierung fehlgeschlagen fuer %s pk=%s: %s",
-                type(content_object).__name__, content_object.pk, exc,
+        if not hasattr(content_object, "archiviere_in_dms"):
+            logger.warning(
+                "DMS-Archivierung: %s hat keine archiviere_in_dms-Methode",
+                type(content_object).__name__,
             )
+            return
+        einreihen(instance, step, WorkflowOutbox.AKTION_ARCHIVIEREN, {"kategorie_id": kategorie_id})
 
     def _loeschfreigabe_setzen(self, step, instance, content_object):
         """Setzt das Loeschfreigabe-Flag am verknuepften DMS-Dokument.
@@ -361,7 +359,7 @@ class WorkflowEngine:
         #     # Notification erstellen...
 
     def _send_email(self, step, instance, content_object):
-        """Sendet Email.
+        """Reiht eine Email in die Outbox ein.
 
         Args:
             step: WorkflowStep mit auto_config
@@ -369,46 +367,28 @@ class WorkflowEngine:
             content_object: Verknuepftes Objekt
         """
         config = step.auto_config or {}
-        betreff = config.get("betreff", "Workflow-Benachrichtigung")
-        text = config.get("text", "")
         empfaenger = config.get("empfaenger", "")
-
-        from django.core.mail import send_mail
-        try:
-            send_mail(
-                subject=betreff,
-                message=text,
-                from_email="noreply@firma.de",
-                recipient_list=[empfaenger],
-                fail_silently=False,
-            )
-            logger.info(f"Email gesendet an {empfaenger}: {betreff}")
-        except Exception as e:
-            logger.error(f"Email-Versand fehlgeschlagen: {e}")
+        einreihen(instance, step, WorkflowOutbox.AKTION_EMAIL, {
+            "betreff": config.get("betreff", "Workflow-Benachrichtigung"),
+            "text": config.get("text", ""),
+            "absender": "noreply@firma.de",
+            "empfaenger": [empfaenger] if empfaenger else [],
+        })
 
     def _call_webhook(self, step, instance, content_object):
-        """Ruft Webhook auf.
+        """Reiht einen Webhook-Aufruf in die Outbox ein.
 
         Args:
             step: WorkflowStep mit auto_config
             instance: WorkflowInstance
             content_object: Verknuepftes Objekt
         """
-        import requests
         config = step.auto_config or {}
-        url = config.get("url", "")
-        method = config.get("method", "POST")
-        data = config.get("data", {})
-
-        try:
-            if method == "POST":
-                response = requests.post(url, json=data, timeout=10)
-                logger.info(f"Webhook POST erfolgreich: {url} - Status: {response.status_code}")
-            elif method == "GET":
-                response = requests.get(url, params=data, timeout=10)
-                logger.info(f"Webhook GET erfolgreich: {url} - Status: {response.status_code}")
-        except Exception as e:
-            logger.error(f"Webhook-Aufruf fehlgeschlagen: {e}")
+        einreihen(instance, step, WorkflowOutbox.AKTION_WEBHOOK, {
+            "url": config.get("url", ""),
+            "method": config.get("method", "POST"),
+            "data": config.get("data", {}),
+        })
 
     def _execute_python_code(self, step, instance, content_object):
         """Fuehrt Python-Code aus (VORSICHT: Sicherheitsrisiko!).
@@ -625,21 +605,20 @@ class WorkflowEngine:
         Returns:
             Stelle oder None
         """
-        current = stelle.uebergeordnete_stelle
-        ebenen = 0
+        from hr.org_graph import OrgGraph
 
-        while current and ebenen < max_ebenen:
-            # Wenn Stelle besetzt ist → zurueckgeben
-            if current.ist_besetzt:
-                return current
+        kette = OrgGraph.aktuell().vorgesetzte(stelle)
 
-            # Sonst eine Ebene hoeher
-            current = current.uebergeordnete_stelle
-            ebenen += 1
+        for vorgesetzte in kette[:max_ebenen]:
+            # Wenn Stelle besetzt ist → zurueckgeben
+            if vorgesetzte.ist_besetzt:
+                return OrgGraph.als_stelle(vorgesetzte)
 
-        # Falls nicht gefunden: letzte gefundene Stelle zurueckgeben
+        # Falls nicht gefunden: Stelle oberhalb von max_ebenen zurueckgeben
         # (auch wenn unbesetzt, besser als None)
-        return current
+        if len(kette) > max_ebenen:
+            return OrgGraph.als_stelle(kette[max_ebenen])
+        return None
 
     def _find_abteilungsleitung(self, stelle):
         """Findet die Abteilungsleitung fuer eine Stelle.
@@ -655,34 +634,29 @@ class WorkflowEngine:
         Returns:
             Stelle oder None
         """
-        org = stelle.org_einheit
+        from hr.org_graph import OrgGraph
+
+        graph = OrgGraph.aktuell()
+        knoten = graph.stelle(stelle)
+        org = graph.einheit(knoten.org_einheit_id) if knoten else None
         if not org:
             return None
 
         # Wenn Stelle direkt in Abteilung → finde Leitung
         # Annahme: Leitung hat kategorie='leitung' in dieser OrgEinheit
-        leitung = (
-            stelle.__class__.objects.filter(
-                org_einheit=org, kategorie="leitung"
-            ).first()
-        )
-
-        if leitung:
-            return leitung
+        leitung = graph.leitung(org)
 
         # Fallback: gehe zur uebergeordneten OrgEinheit
-        if org.uebergeordnet:
-            return self._find_abteilungsleitung_in_org(org.uebergeordnet)
+        if leitung is None and org.uebergeordnet_id:
+            leitung = graph.leitung(org.uebergeordnet_id)
 
-        return None
+        return OrgGraph.als_stelle(leitung)
 
     def _find_abteilungsleitung_in_org(self, org_einheit):
         """Findet Leitung in einer OrgEinheit."""
-        from hr.models import Stelle
+        from hr.org_graph import OrgGraph
 
-        return Stelle.objects.filter(
-            org_einheit=org_einheit, kategorie="leitung"
-        ).first()
+        return OrgGraph.als_stelle(OrgGraph.aktuell().leitung(org_einheit))
 
     def _find_bereichsleitung(self, stelle):
         """Findet die Bereichsleitung fuer eine Stelle.
@@ -697,26 +671,23 @@ class WorkflowEngine:
         Returns:
             Stelle oder None
         """
-        org = stelle.org_einheit
+        from hr.org_graph import OrgGraph
+
+        graph = OrgGraph.aktuell()
+        knoten = graph.stelle(stelle)
+        org = graph.einheit(knoten.org_einheit_id) if knoten else None
         if not org:
             return None
 
         # Gehe die Hierarchie hoch bis zum Bereich (2. Ebene nach GF)
-        current_org = org
+        kette = [org] + graph.uebergeordnete_einheiten(org)
         max_ebenen = 5
-        ebenen = 0
 
-        while current_org and ebenen < max_ebenen:
+        for aktuell, uebergeordnet in zip(kette[:max_ebenen], kette[1:]):
             # Pruefe ob das ein Bereich ist (hat GF als uebergeordnet)
-            if (
-                current_org.uebergeordnet
-                and current_org.uebergeordnet.kuerzel == "GF"
-            ):
+            if uebergeordnet.kuerzel == "GF":
                 # Das ist ein Bereich → finde Leitung
-                return self._find_abteilungsleitung_in_org(current_org)
-
-            current_org = current_org.uebergeordnet
-            ebenen += 1
+                return OrgGraph.als_stelle(graph.leitung(aktuell))
 
         return None
 
@@ -821,10 +792,11 @@ class WorkflowEngine:
         for kanal in kanaele:
             typ = kanal.get("typ", "")
             try:
+                # email/matrix: je Kanal ein eigener Outbox-Eintrag (einzeln wiederholbar)
                 if typ == "email":
-                    self._verteilen_email(kanal, instance, content_object)
+                    self._verteilen_email(step, kanal, instance, content_object)
                 elif typ == "matrix":
-                    self._verteilen_matrix(kanal, instance, content_object)
+                    self._verteilen_matrix(step, kanal, instance, content_object)
                 elif typ == "intern":
                     self._verteilen_intern(kanal, instance, content_object)
                 else:
@@ -838,9 +810,8 @@ class WorkflowEngine:
                     typ, step.pk, exc,
                 )
 
-    def _verteilen_email(self, kanal, instance, content_object):
-        """Sendet eine E-Mail ueber den konfigurierten SMTP-Server (Mailpit)."""
-        from django.core.mail import send_mail
+    def _verteilen_email(self, step, kanal, instance, content_object):
+        """Reiht eine E-Mail ueber den konfigurierten SMTP-Server (Mailpit) in die Outbox ein."""
         from django.conf import settings as django_settings
 
         empfaenger_raw = self._interpoliere(
@@ -864,20 +835,15 @@ class WorkflowEngine:
             )
             return
 
-        send_mail(
-            subject=betreff,
-            message=text,
-            from_email=absender,
-            recipient_list=empfaenger_liste,
-            fail_silently=False,
-        )
-        logger.info(
-            "Verteiler E-Mail gesendet an %s: %s (Instanz %s)",
-            empfaenger_liste, betreff, instance.pk,
-        )
+        einreihen(instance, step, WorkflowOutbox.AKTION_EMAIL, {
+            "betreff": betreff,
+            "text": text,
+            "absender": absender,
+            "empfaenger": empfaenger_liste,
+        })
 
-    def _verteilen_matrix(self, kanal, instance, content_object):
-        """Sendet eine Matrix-Nachricht (nutzt bestehende Matrix-Integration)."""
+    def _verteilen_matrix(self, step, kanal, instance, content_object):
+        """Reiht eine Matrix-Nachricht des Bots in die Outbox ein."""
         from django.conf import settings as django_settings
 
         nachricht = self._interpoliere(
@@ -913,27 +879,10 @@ class WorkflowEngine:
             )
             return
 
-        import time
-        import urllib.request
-        import json as jsonlib
-
-        txn_id = str(int(time.time() * 1000))
-        url = f"{homeserver}/_matrix/client/v3/rooms/{raum_id}/send/m.room.message/{txn_id}"
-        payload = jsonlib.dumps({"msgtype": "m.text", "body": nachricht}).encode("utf-8")
-        req = urllib.request.Request(
-            url,
-            data=payload,
-            headers={
-                "Authorization": f"Bearer {bot_token}",
-                "Content-Type": "application/json",
-            },
-            method="PUT",
-        )
-        with urllib.request.urlopen(req, timeout=10):
-            pass
-        logger.info(
-            "Verteiler Matrix-Nachricht gesendet an %s (Instanz %s)", raum_id, instance.pk
-        )
+        einreihen(instance, step, WorkflowOutbox.AKTION_MATRIX, {
+            "raum_id": raum_id,
+            "nachricht": nachricht,
+        })
 
     def _verteilen_intern(self, kanal, instance, content_object):
         """Interne PRIMA-Benachrichtigung – wird als Protokoll-Eintrag geloggt.
@@ -987,7 +936,7 @@ class WorkflowEngine:
         """
         try:
             from dms.models import Dokument
-            from dms.services import lade_dokument_inhalt, speichere_dokument
+            from dms.services import INHALT_FELDER, lade_dokument_inhalt, speichere_dokument
 
             if not isinstance(content_object, Dokument):
                 return
@@ -1042,7 +991,7 @@ class WorkflowEngine:
             # Signiertes PDF zurueck in DMS speichern
             speichere_dokument(content_object, signiertes_pdf)
             content_object.groesse_bytes = len(signiertes_pdf)
-            content_object.save(update_fields=["groesse_bytes"])
+            content_object.save(update_fields=INHALT_FELDER + ["groesse_bytes"])
 
             logger.info(
                 "DMS-Dokument %s von %s signiert (Workflow-Task %s)",
@@ -1,3 +1,119 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from .models import WorkflowInstance, WorkflowOutbox, WorkflowTemplate
+from .outbox import BACKOFF_MAX_SEKUNDEN, einreihen, naechster_versuch
+
+WORKER = "workflow.management.commands.workflow_outbox_worker"
+
+
+class BackoffTest(SimpleTestCase):
+
+    def assertWartezeit(self, versuche, sekunden):
+        vorher = timezone.now()
+        zeitpunkt = naechster_versuch(versuche)
+        nachher = timezone.now()
+        self.assertGreaterEqual(zeitpunkt, vorher + timedelta(seconds=sekunden))
+        self.assertLessEqual(zeitpunkt, nachher + timedelta(seconds=sekunden * 1.2))
+
+    def test_verdoppelt_bis_obergrenze(self):
+        for versuche, sekunden in ((1, 30), (2, 60), (4, 240), (30, BACKOFF_MAX_SEKUNDEN)):
+            self.assertWartezeit(versuche, sekunden)
+
+
+class OutboxWorkerTest(TransactionTestCase):
+    """workflow_outbox_worker: Zustellung, Wiederholung mit Backoff, Dead Letter.
+
+    TransactionTestCase: der Worker claimt auf SQLite unter BEGIN IMMEDIATE
+    und lehnt den Aufruf innerhalb von atomic() ab.
+    """
+
+    def setUp(self):
+        template = WorkflowTemplate.objects.create(name="Outbox-Test")
+        self.instance = WorkflowInstance.objects.create(
+            template=template,
+            content_type=ContentType.objects.get_for_model(template),
+            object_id=template.pk,
+        )
+
+    def _email(self, **payload):
+        payload.setdefault("empfaenger", ["team@example.org"])
+        return einreihen(self.instance, None, WorkflowOutbox.AKTION_EMAIL, payload)
+
+    def _worker(self):
+        call_command("workflow_outbox_worker", einmal=True, stdout=StringIO())
+
+    def _faellig_machen(self, eintrag):
+        WorkflowOutbox.objects.filter(pk=eintrag.pk).update(
+            naechster_versuch_am=timezone.now() - timedelta(seconds=1),
+        )
+
+    def test_email_wird_einmal_zugestellt(self):
+        eintrag = self._email(betreff="Antrag genehmigt")
+        self._worker()
+        self._worker()
+        eintrag.refresh_from_db()
+        self.assertEqual(eintrag.status, WorkflowOutbox.STATUS_ERLEDIGT)
+        self.assertEqual(eintrag.versuche, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].extra_headers["Message-ID"],
+            f"<{eintrag.idempotenz_schluessel}@prima.workflow>",
+        )
+
+    def test_idempotenz_schluessel_nur_einmal(self):
+        erster = einreihen(self.instance, None, WorkflowOutbox.AKTION_EMAIL, {}, "schluessel-1")
+        zweiter = einreihen(self.instance, None, WorkflowOutbox.AKTION_EMAIL, {}, "schluessel-1")
+        self.assertEqual(erster.pk, zweiter.pk)
+        self.assertEqual(WorkflowOutbox.objects.count(), 1)
+
+    def test_fehler_mit_backoff_dann_dead_letter(self):
+        eintrag = self._email()
+        WorkflowOutbox.objects.filter(pk=eintrag.pk).update(max_versuche=2)
+
+        with mock.patch(f"{WORKER}.fuehre_aus", side_effect=ConnectionError("SMTP weg")) as aufruf:
+            self._worker()
+            eintrag.refresh_from_db()
+            self.assertEqual(eintrag.status, WorkflowOutbox.STATUS_WARTEND)
+            self.assertEqual(eintrag.versuche, 1)
+            self.assertGreater(eintrag.naechster_versuch_am, timezone.now())
+            self.assertEqual(eintrag.letzter_fehler, "SMTP weg")
+
+            # Vor Ablauf des Backoffs kein neuer Versuch
+            self._worker()
+            self.assertEqual(aufruf.call_count, 1)
+
+            self._faellig_machen(eintrag)
+            self._worker()
+            self.assertEqual(aufruf.call_count, 2)
+
+        eintrag.refresh_from_db()
+        self.assertEqual(eintrag.status, WorkflowOutbox.STATUS_FEHLGESCHLAGEN)
+        self.assertEqual(eintrag.versuche, 2)
+        self.assertIsNone(eintrag.gesperrt_am)
+
+    def test_dauerfehler_ohne_wiederholung(self):
+        eintrag = self._email(empfaenger=[])
+        self._worker()
+        eintrag.refresh_from_db()
+        self.assertEqual(eintrag.status, WorkflowOutbox.STATUS_FEHLGESCHLAGEN)
+        self.assertEqual(eintrag.versuche, 1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_verwaister_eintrag_wird_freigegeben(self):
+        eintrag = self._email()
+        WorkflowOutbox.objects.filter(pk=eintrag.pk).update(
+            status=WorkflowOutbox.STATUS_IN_ARBEIT,
+            gesperrt_am=timezone.now() - timedelta(hours=1),
+        )
+        self._worker()
+        eintrag.refresh_from_db()
+        self.assertEqual(eintrag.status, WorkflowOutbox.STATUS_ERLEDIGT)
+        self.assertEqual(len(mail.outbox), 1)